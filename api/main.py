@@ -4,17 +4,22 @@ FastAPI Backend для Knowledge Base
 Предоставляет REST API для доступа к инструментам в реальном времени
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse
 from pathlib import Path
 from typing import List, Dict, Optional
 import sys
 import json
+import asyncio
 
 # Добавить tools/ в Python path
 sys.path.insert(0, str(Path(__file__).parent.parent / "tools"))
 
+# Отдача файлов (ETag, Range, .gz/.br) - общий модуль backend/
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+from file_serving import serve_file
+
 # Создать приложение
 app = FastAPI(
     title="Knowledge Base API",
@@ -49,6 +54,7 @@ async def root():
             "graph": "/api/graph",
             "files": "/api/files",
             "validate": "/api/validate",
+            "prerequisites": "/api/prerequisites/path?article=...",
         }
     }
 
@@ -245,15 +251,17 @@ async def list_files(
         raise HTTPException(status_code=500, detail=f"Files error: {str(e)}")
 
 @app.get("/api/files/{filename}")
-async def get_file(filename: str):
+async def get_file(filename: str, request: Request):
     """
     Скачать конкретный файл
 
+    Сильный ETag (If-None-Match → 304), Range и заранее сжатые .gz/.br версии.
+
     Пример: /api/files/knowledge_graph.json
     """
     file_path = ROOT_DIR / filename
 
-    if not file_path.exists():
+    if not file_path.is_file():
         raise HTTPException(status_code=404, detail=f"File not found: {filename}")
 
     # Определить content type
@@ -266,11 +274,7 @@ async def get_file(filename: str):
     else:
         media_type = "application/octet-stream"
 
-    return FileResponse(
-        path=file_path,
-        media_type=media_type,
-        filename=filename
-    )
+    return await serve_file(request, file_path, media_type=media_type, filename=filename)
 
 # ============================================================================
 # VALIDATION API
@@ -422,6 +426,76 @@ async def analytics_summary():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analytics error: {str(e)}")
 
+# ============================================================================
+# PREREQUISITES API
+# ============================================================================
+
+# Персистентный DAG prerequisites (prerequisites_graph.py), живёт между запросами
+_prerequisites_store = None
+_prerequisites_lock = asyncio.Lock()
+
+
+async def get_prerequisites_store():
+    """
+    Загрузить DAG один раз и досинхронизировать изменённые статьи
+
+    Загрузка и refresh (обход и stat всего knowledge/) - в пуле потоков,
+    не блокируя event loop; одновременные запросы ждут один refresh.
+    """
+    global _prerequisites_store
+
+    from prerequisites_graph import PrerequisiteDAGStore
+
+    async with _prerequisites_lock:
+        if _prerequisites_store is None:
+            _prerequisites_store = await asyncio.to_thread(PrerequisiteDAGStore, root_dir=ROOT_DIR)
+        await asyncio.to_thread(_prerequisites_store.refresh)
+
+    return _prerequisites_store
+
+
+@app.get("/api/prerequisites/path")
+async def prerequisites_learning_path(
+    article: str = Query(..., description="Путь статьи, например knowledge/python/basics.md")
+):
+    """
+    Путь обучения к статье (prerequisites_graph.py)
+
+    Пример: /api/prerequisites/path?article=knowledge/python/advanced.md
+    """
+    try:
+        store = await get_prerequisites_store()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prerequisites error: {str(e)}")
+
+    if article not in store.dag:
+        raise HTTPException(status_code=404, detail=f"Article not found: {article}")
+
+    path = store.learning_path(article)
+
+    return {
+        "article": article,
+        "total": len(path),
+        "path": path,
+    }
+
+
+@app.get("/api/prerequisites/order")
+async def prerequisites_order():
+    """
+    Правильная последовательность изучения всех статей (topological order)
+    """
+    try:
+        store = await get_prerequisites_store()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prerequisites error: {str(e)}")
+
+    return {
+        "total": len(store.dag),
+        "order": store.dag.topological_order(),
+        "cycle_edges": [list(edge) for edge in sorted(store.dag.cycle_edges)],
+    }
+
 # ============================================================================
 # RUN
 # ============================================================================
@@ -449,6 +523,8 @@ Endpoints:
   GET  /api/validate
   GET  /api/tags
   GET  /api/analytics/summary
+  GET  /api/prerequisites/path?article=...
+  GET  /api/prerequisites/order
 
 Press Ctrl+C to stop
     """)
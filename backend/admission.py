@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Admission Control - Ограничение числа одновременно выполняемых задач
+
+Каждая задача занимает слот в трёх счётных семафорах:
+
+    admission:global          - всего задач (MAX_CONCURRENT_JOBS)
+    admission:user:<id>       - задач одного пользователя (JOB_MAX_PER_USER)
+    admission:tool:<name>     - задач одного инструмента (JOB_TOOL_LIMITS,
+                                например "build_concordance=1,check_links=1")
+
+Слоты берутся атомарно во всех трёх (Lua-скрипт в Redis - общий для API и
+воркеров Celery; без Redis - счётчики в памяти процесса). Слот в Redis -
+аренда с TTL (JOB_LEASE_SECONDS): слоты упавшего процесса освобождаются
+сами.
+
+Если слотов нет, запрос ждёт в ограниченной очереди (JOB_MAX_QUEUE
+ожидающих, не дольше JOB_QUEUE_TIMEOUT секунд). Очередь заполнена или
+время ожидания вышло - AdmissionRejected с retry_after: API отвечает
+429 с заголовком Retry-After.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+# Атомарный захват слота во всех семафорах:
+# KEYS - семафоры, ARGV - now, lease, token, лимиты по порядку KEYS
+ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local lease = tonumber(ARGV[2])
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - lease)
+    if redis.call('ZCARD', key) >= tonumber(ARGV[3 + i]) then
+        return i
+    end
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[3])
+    redis.call('EXPIRE', key, lease)
+end
+return 0
+"""
+
+
+def parse_tool_limits(value: str) -> Dict[str, int]:
+    """'build_concordance=1, check_links=2' -> {'build_concordance': 1, 'check_links': 2}"""
+    limits = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        name, limit = item.split("=", 1)
+        limits[name.strip()] = int(limit)
+    return limits
+
+
+@dataclass
+class AdmissionLimits:
+    """Лимиты одновременного выполнения и очереди ожидания"""
+    max_concurrent: int = 4
+    max_per_user: int = 2
+    tool_limits: Dict[str, int] = field(default_factory=dict)
+    max_queue: int = 20
+    queue_timeout: float = 30.0
+    lease_seconds: int = 3900  # больше task_time_limit Celery (1 час)
+
+    @classmethod
+    def from_env(cls) -> "AdmissionLimits":
+        return cls(
+            max_concurrent=int(os.getenv("MAX_CONCURRENT_JOBS", str(os.cpu_count() or 4))),
+            max_per_user=int(os.getenv("JOB_MAX_PER_USER", "2")),
+            tool_limits=parse_tool_limits(os.getenv("JOB_TOOL_LIMITS", "build_concordance=1,check_links=1")),
+            max_queue=int(os.getenv("JOB_MAX_QUEUE", "20")),
+            queue_timeout=float(os.getenv("JOB_QUEUE_TIMEOUT", "30")),
+            lease_seconds=int(os.getenv("JOB_LEASE_SECONDS", "3900"))
+        )
+
+
+class AdmissionRejected(Exception):
+    """Нет свободных слотов: очередь заполнена или время ожидания вышло"""
+
+    def __init__(self, reason: str, retry_after: int, scope: Optional[str] = None):
+        self.reason = reason  # queue_full, timeout
+        self.retry_after = retry_after
+        self.scope = scope  # global, user, tool - какой лимит исчерпан
+        super().__init__(f"Admission rejected ({reason}, {scope or 'any'} limit), retry after {retry_after}s")
+
+
+@dataclass
+class AdmissionSlot:
+    """Занятый слот: освобождается через AdmissionController.release"""
+    token: str
+    tool_name: str
+    user_id: Optional[str]
+    keys: List[str]
+    waited: float = 0.0
+
+
+class AdmissionController:
+    """Семафоры global / user / tool с ограниченной очередью ожидания"""
+
+    POLL_MIN = 0.05
+    POLL_MAX = 0.5
+
+    def __init__(self, limits: Optional[AdmissionLimits] = None, redis=None):
+        """
+        Args:
+            limits: Лимиты (по умолчанию - из переменных окружения)
+            redis: RedisClient (None или недоступен - счётчики в памяти процесса)
+        """
+        self.limits = limits or AdmissionLimits.from_env()
+        self.redis = redis
+
+        self._lock = threading.Lock()
+        self._local: Counter = Counter()
+        self._script = None
+
+        self.waiting = 0
+        self.rejected: Counter = Counter()
+
+    # ========================
+    # Semaphores
+    # ========================
+
+    def _keys(self, tool_name: str, user_id: Optional[str]) -> List[Tuple[str, int]]:
+        keys = [("admission:global", self.limits.max_concurrent)]
+        if self.limits.max_per_user:
+            keys.append((f"admission:user:{user_id or 'anonymous'}", self.limits.max_per_user))
+        if tool_name in self.limits.tool_limits:
+            keys.append((f"admission:tool:{tool_name}", self.limits.tool_limits[tool_name]))
+        return keys
+
+    def _redis_client(self):
+        if self.redis is not None and self.redis.is_available():
+            return self.redis.client
+        return None
+
+    def try_acquire(self, tool_name: str, user_id: Optional[str] = None) -> Tuple[Optional[AdmissionSlot], Optional[str]]:
+        """
+        Занять слот без ожидания
+
+        Returns:
+            (слот, None) или (None, исчерпанный лимит: global / user / tool)
+        """
+        keys = self._keys(tool_name, user_id)
+        token = uuid.uuid4().hex
+
+        client = self._redis_client()
+        if client is not None:
+            try:
+                if self._script is None:
+                    self._script = client.register_script(ACQUIRE_SCRIPT)
+                blocked = self._script(
+                    keys=[key for key, _ in keys],
+                    args=[time.time(), self.limits.lease_seconds, token] + [limit for _, limit in keys]
+                )
+                blocked = int(blocked)
+                if blocked:
+                    return None, keys[blocked - 1][0].split(":")[1]
+                return AdmissionSlot(token, tool_name, user_id, [key for key, _ in keys]), None
+            except Exception as e:
+                print(f"⚠️  Redis admission failed, using local limits: {e}")
+
+        with self._lock:
+            for key, limit in keys:
+                if self._local[key] >= limit:
+                    return None, key.split(":")[1]
+            for key, _ in keys:
+                self._local[key] += 1
+
+        return AdmissionSlot(token, tool_name, user_id, [key for key, _ in keys] + ["local"]), None
+
+    def release(self, slot: AdmissionSlot):
+        """Освободить слот (повторный вызов безопасен)"""
+        if not slot.keys:
+            return
+
+        keys, slot.keys = slot.keys, []
+
+        if keys[-1] == "local":
+            with self._lock:
+                for key in keys[:-1]:
+                    self._local[key] -= 1
+                    if self._local[key] <= 0:
+                        del self._local[key]
+            return
+
+        client = self._redis_client()
+        if client is not None:
+            try:
+                pipe = client.pipeline()
+                for key in keys:
+                    pipe.zrem(key, slot.token)
+                pipe.execute()
+            except Exception as e:
+                # Слот освободится по истечении аренды
+                print(f"⚠️  Redis admission release failed: {e}")
+
+    # ========================
+    # Bounded wait queue
+    # ========================
+
+    def _retry_after(self) -> int:
+        return max(1, int(self.limits.queue_timeout))
+
+    async def acquire(self, tool_name: str, user_id: Optional[str] = None) -> AdmissionSlot:
+        """
+        Занять слот, при необходимости подождав в очереди
+
+        Raises:
+            AdmissionRejected: очередь заполнена или слот не освободился за queue_timeout
+        """
+        # Синхронный Redis - в пуле потоков, не блокируя event loop
+        slot, scope = await asyncio.to_thread(self.try_acquire, tool_name, user_id)
+        if slot is not None:
+            return slot
+
+        if self.waiting >= self.limits.max_queue:
+            self.rejected["queue_full"] += 1
+            raise AdmissionRejected("queue_full", self._retry_after(), scope)
+
+        started = time.monotonic()
+        delay = self.POLL_MIN
+        self.waiting += 1
+        try:
+            while True:
+                remaining = self.limits.queue_timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self.rejected["timeout"] += 1
+                    raise AdmissionRejected("timeout", self._retry_after(), scope)
+
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, self.POLL_MAX)
+
+                slot, scope = await asyncio.to_thread(self.try_acquire, tool_name, user_id)
+                if slot is not None:
+                    slot.waited = time.monotonic() - started
+                    return slot
+        finally:
+            self.waiting -= 1
+
+    def active(self) -> int:
+        """Занятые слоты (global)"""
+        client = self._redis_client()
+        if client is not None:
+            try:
+                client.zremrangebyscore("admission:global", "-inf", time.time() - self.limits.lease_seconds)
+                return int(client.zcard("admission:global"))
+            except Exception:
+                pass
+        return self._local["admission:global"]
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "active": self.active(),
+            "waiting": self.waiting,
+            "rejected": dict(self.rejected),
+            "limits": {
+                "max_concurrent": self.limits.max_concurrent,
+                "max_per_user": self.limits.max_per_user,
+                "tools": self.limits.tool_limits,
+                "max_queue": self.limits.max_queue,
+                "queue_timeout": self.limits.queue_timeout
+            }
+        }
@@ -0,0 +1,95 @@
+"""Incremental ToolStats and job resource metrics
+
+Job.stats_recorded, Welford/quantile columns of ToolStats
+(tool_stats.record_job_stats) and process tree metrics of JobResult
+(ToolRunner resources).
+
+Databases created by init_database() already have some of these columns
+(Base.metadata.create_all), so only missing columns are added.
+
+Backfill:
+- jobs.stats_recorded = true for finished jobs: the former hourly
+  update_tool_statistics already counted them in ToolStats;
+- tool_stats.duration_count = successful_runs where avg_duration is set,
+  so the running mean keeps its weight. duration_m2 starts at 0 and the
+  quantile sketch empty: stddev and p50/p95 accumulate from new runs.
+
+Revision ID: 3b7e2c9d41a6
+Revises:
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e2c9d41a6'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+FINISHED_STATUSES = "('COMPLETED', 'FAILED', 'CANCELLED')"
+
+
+def _existing_columns(table: str) -> set:
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _add_missing(table: str, columns) -> list:
+    existing = _existing_columns(table)
+    added = []
+    for column in columns:
+        if column.name not in existing:
+            op.add_column(table, column)
+            added.append(column.name)
+    return added
+
+
+def upgrade() -> None:
+    # Job.stats_recorded
+    if _add_missing("jobs", [
+        sa.Column("stats_recorded", sa.Boolean(), nullable=False, server_default=sa.false())
+    ]):
+        op.execute(f"UPDATE jobs SET stats_recorded = true WHERE status IN {FINISHED_STATUSES}")
+
+    indexes = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("jobs")}
+    if "ix_jobs_stats_recorded" not in indexes:
+        op.create_index("ix_jobs_stats_recorded", "jobs", ["stats_recorded"])
+
+    # ToolStats: Welford mean/variance and quantile sketch
+    added = _add_missing("tool_stats", [
+        sa.Column("duration_count", sa.Integer(), server_default="0"),
+        sa.Column("duration_m2", sa.Float(), server_default="0"),
+        sa.Column("p50_duration", sa.Float()),
+        sa.Column("p95_duration", sa.Float()),
+        sa.Column("duration_sketch", sa.JSON()),
+    ])
+    if "duration_count" in added:
+        op.execute(
+            "UPDATE tool_stats SET duration_count = COALESCE(successful_runs, 0) "
+            "WHERE avg_duration IS NOT NULL"
+        )
+
+    # JobResult: process tree metrics
+    _add_missing("job_results", [
+        sa.Column("cpu_time", sa.Float()),
+        sa.Column("io_read_bytes", sa.BigInteger()),
+        sa.Column("io_write_bytes", sa.BigInteger()),
+    ])
+
+
+def downgrade() -> None:
+    op.drop_column("job_results", "io_write_bytes")
+    op.drop_column("job_results", "io_read_bytes")
+    op.drop_column("job_results", "cpu_time")
+
+    op.drop_column("tool_stats", "duration_sketch")
+    op.drop_column("tool_stats", "p95_duration")
+    op.drop_column("tool_stats", "p50_duration")
+    op.drop_column("tool_stats", "duration_m2")
+    op.drop_column("tool_stats", "duration_count")
+
+    op.drop_index("ix_jobs_stats_recorded", table_name="jobs")
+    op.drop_column("jobs", "stats_recorded")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Artifact Store - Контентно-адресуемое хранилище результатов задач
+
+Файлы, созданные задачей, сохраняются как неизменяемые blob-ы по SHA-256
+содержимого:
+
+    .artifacts/ab/cdef0123...        - без сжатия
+    .artifacts/ab/cdef0123....gz     - gzip
+    .artifacts/ab/cdef0123....zst    - zstd (если установлен zstandard)
+
+Одинаковое содержимое хранится один раз (повторный put только возвращает
+ссылку). Blob записывается во временный файл и переименовывается атомарно,
+поэтому параллельные задачи не видят недописанных файлов и не мешают друг
+другу.
+
+Ссылка на артефакт (JobResult.output_files):
+    {'name': 'PAGERANK.md', 'sha256': '...', 'size': 1234,
+     'compression': 'gzip', 'stored_size': 456}
+"""
+
+import os
+import gzip
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+# Суффиксы blob-ов по способу сжатия
+SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+# Маленькие файлы не сжимаются - выигрыш меньше заголовков
+MIN_COMPRESS_SIZE = 512
+
+
+class ArtifactStore:
+    """Хранилище неизменяемых blob-ов с дедупликацией по SHA-256"""
+
+    def __init__(self, root: Path, compression: Optional[str] = None):
+        """
+        Args:
+            root: Директория хранилища
+            compression: None, "gzip" или "zstd" (без zstandard - gzip)
+        """
+        if compression not in SUFFIXES:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            compression = "gzip"
+
+        self.root = Path(root)
+        self.compression = compression
+
+    # ========================
+    # Blobs
+    # ========================
+
+    def _blob_base(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:]
+
+    def find_blob(self, digest: str) -> Optional[tuple]:
+        """(путь, сжатие) сохранённого blob-а или None"""
+        base = self._blob_base(digest)
+        for compression, suffix in SUFFIXES.items():
+            path = base.with_name(base.name + suffix)
+            if path.exists():
+                return path, compression
+        return None
+
+    def exists(self, digest: str) -> bool:
+        return self.find_blob(digest) is not None
+
+    def _compress(self, data: bytes) -> tuple:
+        if self.compression is None or len(data) < MIN_COMPRESS_SIZE:
+            return data, None
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(data), "zstd"
+        return gzip.compress(data, compresslevel=6, mtime=0), "gzip"
+
+    def put_bytes(self, data: bytes, name: str) -> Dict[str, Any]:
+        """Сохранить содержимое (если такого ещё нет) и вернуть ссылку"""
+        digest = hashlib.sha256(data).hexdigest()
+
+        found = self.find_blob(digest)
+        if found is None:
+            stored, compression = self._compress(data)
+            path = self._blob_base(digest)
+            path = path.with_name(path.name + SUFFIXES[compression])
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Атомарная запись: временный файл в той же директории + rename
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(stored)
+                os.chmod(tmp_path, 0o444)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        else:
+            path, compression = found
+
+        return {
+            "name": name,
+            "sha256": digest,
+            "size": len(data),
+            "compression": compression,
+            "stored_size": path.stat().st_size
+        }
+
+    def put_file(self, file_path: Path, name: Optional[str] = None) -> Dict[str, Any]:
+        """Сохранить файл; name - имя в ссылке (по умолчанию имя файла)"""
+        file_path = Path(file_path)
+        return self.put_bytes(file_path.read_bytes(), name or file_path.name)
+
+    def read_bytes(self, digest: str) -> bytes:
+        """Содержимое blob-а (распакованное)"""
+        found = self.find_blob(digest)
+        if found is None:
+            raise FileNotFoundError(f"Artifact not found: {digest}")
+
+        path, compression = found
+        data = path.read_bytes()
+
+        if compression == "gzip":
+            return gzip.decompress(data)
+        if compression == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstandard is required to read zstd artifacts")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return data
+
+    def iter_bytes(self, digest: str, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+        """Содержимое blob-а (распакованное) кусками - без чтения целиком в память"""
+        found = self.find_blob(digest)
+        if found is None:
+            raise FileNotFoundError(f"Artifact not found: {digest}")
+
+        path, compression = found
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is required to read zstd artifacts")
+
+        with open(path, "rb") as raw:
+            if compression == "gzip":
+                stream = gzip.GzipFile(fileobj=raw)
+            elif compression == "zstd":
+                stream = zstandard.ZstdDecompressor().stream_reader(raw)
+            else:
+                stream = raw
+
+            with stream:
+                for chunk in iter(lambda: stream.read(chunk_size), b""):
+                    yield chunk
+
+    def materialize(self, ref: Dict[str, Any], destination: Path):
+        """Записать артефакт в файл атомарно (читатели видят старую или новую версию целиком)"""
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=destination.parent, prefix=f".{destination.name}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.read_bytes(ref["sha256"]))
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, destination)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Число blob-ов и занимаемое место"""
+        blobs = 0
+        total_size = 0
+        if self.root.exists():
+            for path in self.root.glob("??/*"):
+                if path.name.startswith(".tmp-"):
+                    continue
+                blobs += 1
+                total_size += path.stat().st_size
+
+        return {"blobs": blobs, "total_size": total_size, "compression": self.compression}
@@ -15,6 +15,7 @@ import os
 
 from database import get_db
 from models import User, UserRole
+from principal_cache import PrincipalCache, TokenCache, principal_to_user, user_to_principal
 
 
 # ========================
@@ -32,6 +33,9 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
+# Verified token payloads, memoized until expiry
+token_cache = TokenCache()
+
 
 # ========================
 # Password Hashing
@@ -143,8 +147,13 @@ def verify_token(token: str) -> Dict[str, Any]:
     Raises:
         HTTPException: If token is invalid or expired
     """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        token_cache.put(token, payload)
         return payload
 
     except JWTError as e:
@@ -192,6 +201,62 @@ def authenticate_user(
     return user
 
 
+# ========================
+# Principal Cache
+# ========================
+
+_principal_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get singleton principal cache (shared through Redis when available)"""
+    global _principal_cache
+
+    if _principal_cache is None:
+        from redis_client import get_redis
+        _principal_cache = PrincipalCache(redis=get_redis())
+
+    return _principal_cache
+
+
+def resolve_user(db: Session, user_id: str) -> Optional[User]:
+    """
+    Load the user referenced by a token, from cache when possible
+
+    A cached user is a detached snapshot: read-only, reload it
+    through the session before modifying.
+
+    Args:
+        db: Database session (queried only on cache miss)
+        user_id: User ID from token "sub" claim
+
+    Returns:
+        User object or None if not found
+    """
+    cache = get_principal_cache()
+    principal, version = cache.get(user_id)
+    if principal is not None:
+        return principal_to_user(principal)
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        cache.put(user_id, user_to_principal(user), version)
+    return user
+
+
+def invalidate_user(user_id: str, token: Optional[str] = None):
+    """
+    Drop cached user data after role/status changes, deletion or logout
+
+    Args:
+        user_id: User ID
+        token: Access token to forget as well (logout)
+    """
+    get_principal_cache().invalidate(str(user_id))
+    if token:
+        token_cache.discard(token)
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -231,8 +296,8 @@ def get_current_user(
             detail="Could not validate credentials",
         )
 
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    # Get user from cache or database
+    user = resolve_user(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -299,14 +364,16 @@ require_user = RoleChecker([UserRole.ADMIN, UserRole.USER])
 # Optional Authentication
 # ========================
 
-async def get_current_user_optional(
+def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
 ) -> Optional[User]:
     """
     Get current user if token provided, None otherwise
 
-    For endpoints that work with or without authentication
+    For endpoints that work with or without authentication.
+    A plain function: FastAPI runs it in the threadpool, so the
+    cache/database lookup does not block the event loop.
 
     Args:
         credentials: Optional HTTP Bearer token
@@ -329,7 +396,7 @@ async def get_current_user_optional(
         if user_id is None:
             return None
 
-        user = db.query(User).filter(User.id == user_id).first()
+        user = resolve_user(db, user_id)
         if user and user.is_active:
             return user
 
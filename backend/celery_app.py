@@ -30,10 +30,19 @@ celery_app.conf.update(
     enable_utc=True,
 
     # Task routing
+    # run_tool_task отправляется в tools.fast / tools.standard / tools.long
+    # по оценке длительности (job_scheduler.py); tools - очередь по умолчанию
     task_routes={
         "celery_tasks.run_tool_task": {"queue": "tools"},
+        "celery_tasks.run_workflow_task": {"queue": "tools"},
+        "celery_tasks.run_workflow_step_task": {"queue": "tools"},
+        "celery_tasks.finish_workflow_run_task": {"queue": "tools"},
+        "celery_tasks.fail_workflow_run_task": {"queue": "tools"},
         "celery_tasks.cleanup_old_jobs": {"queue": "maintenance"},
+        "celery_tasks.reconcile_tool_statistics": {"queue": "maintenance"},
     },
+    # Задачи без маршрута - в очередь, которую слушают воркеры (не "celery")
+    task_default_queue="default",
 
     # Task time limits
     task_time_limit=3600,  # Hard limit: 1 hour
@@ -45,8 +54,16 @@ celery_app.conf.update(
         "master_name": "mymaster",
     },
 
+    # Message priorities (Redis: 0 - highest, see job_scheduler.celery_priority)
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
+    task_default_priority=5,
+
     # Worker settings
-    worker_prefetch_multiplier=4,  # Prefetch 4 tasks per worker
+    worker_prefetch_multiplier=1,  # Prefetch 1 task: priorities apply to everything still queued
     worker_max_tasks_per_child=100,  # Restart worker after 100 tasks
 
     # Task retry settings
@@ -60,8 +77,8 @@ celery_app.conf.update(
             "schedule": 86400.0,  # Every 24 hours
             "args": (48,),  # Delete jobs older than 48 hours
         },
-        "update-tool-stats-hourly": {
-            "task": "celery_tasks.update_tool_statistics",
+        "reconcile-tool-stats-hourly": {
+            "task": "celery_tasks.reconcile_tool_statistics",
             "schedule": 3600.0,  # Every hour
         },
     },
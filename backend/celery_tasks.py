@@ -5,24 +5,55 @@ Phase 5.1.9: Distributed tool execution tasks
 """
 
 from celery import Task
+from celery.exceptions import Ignore
+from celery.signals import task_revoked
 from celery_app import celery_app
 from pathlib import Path
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Union
 
 # Import database and models
 from database import get_db_context
-from models import Job as DBJob, JobResult as DBJobResult, JobLog as DBJobLog, JobStatus, ToolStats, SystemMetrics
+from models import Job as DBJob, JobResult as DBJobResult, JobLog as DBJobLog, JobStatus, SystemMetrics
+from models import Workflow, WorkflowRun
 from redis_client import get_redis
+from job_scheduler import JobScheduler
+from admission import AdmissionController
+from tool_stats import record_job_stats, reconcile_tool_stats
 
 # Import tool runner
 from tool_runner import ToolRunner
+from workflow_engine import (
+    ResultCache, WorkflowExecutor, WorkflowStep, failed_record, parse_steps, run_step,
+    topological_levels, upstream_artifacts
+)
 
 # Setup paths
 tools_dir = Path(__file__).parent.parent / "tools"
 output_dir = Path(__file__).parent.parent
 
+# Лимиты одновременного выполнения - общие с API через Redis
+admission = AdmissionController(redis=get_redis())
+
+# Через сколько секунд повторить задачу, если слот занят
+ADMISSION_RETRY_DELAY = 30
+
+
+def _release_fair_share(kwargs: Optional[Dict[str, Any]]):
+    """Снять задачу со счёта пользователя в fair-share (если её ставил JobScheduler)"""
+    if kwargs and kwargs.get("scheduled"):
+        JobScheduler(None, redis=get_redis(), stats_loader=None).job_finished(
+            kwargs.get("user_id"), kwargs.get("job_id")
+        )
+
+
+@task_revoked.connect
+def release_revoked_task(sender=None, request=None, **kwargs):
+    """Отменённая (revoke, terminate) задача не вызывает on_success / on_failure"""
+    if request is not None and getattr(sender, "name", None) == "celery_tasks.run_tool_task":
+        _release_fair_share(request.kwargs)
+
 
 class CallbackTask(Task):
     """
@@ -32,16 +63,46 @@ class CallbackTask(Task):
     def on_success(self, retval, task_id, args, kwargs):
         """Called when task succeeds"""
         print(f"✅ Task {task_id} succeeded")
+        self._release_fair_share(kwargs)
 
     def on_failure(self, exc, task_id, args, kwargs, einfo):
-        """Called when task fails"""
+        """Called when task fails (after all retries)"""
         print(f"❌ Task {task_id} failed: {exc}")
+        self._release_fair_share(kwargs)
+
+    @staticmethod
+    def _release_fair_share(kwargs):
+        """Снять задачу со счёта пользователя в fair-share (если её ставил JobScheduler)"""
+        _release_fair_share(kwargs)
 
     def on_retry(self, exc, task_id, args, kwargs, einfo):
         """Called when task is retried"""
         print(f"🔄 Task {task_id} retrying: {exc}")
 
 
+def _requeue_for_admission(task: Task):
+    """
+    Вернуть задачу в её очередь через ADMISSION_RETRY_DELAY секунд
+
+    Не через self.retry: ожидание слота не должно расходовать max_retries
+    (повторы после ошибок). Тот же task_id, очередь, приоритет и счётчик
+    повторов; Ignore - без on_success / on_failure, задача остаётся в
+    fair-share.
+    """
+    request = task.request
+    delivery_info = request.delivery_info or {}
+    task.apply_async(
+        args=request.args,
+        kwargs=request.kwargs,
+        task_id=request.id,
+        retries=request.retries,
+        countdown=ADMISSION_RETRY_DELAY,
+        queue=delivery_info.get("routing_key") or "tools",
+        priority=delivery_info.get("priority")
+    )
+    raise Ignore()
+
+
 @celery_app.task(
     bind=True,
     base=CallbackTask,
@@ -53,7 +114,9 @@ def run_tool_task(
     self,
     job_id: str,
     tool_name: str,
-    parameters: Dict[str, Any]
+    parameters: Dict[str, Any],
+    user_id: Optional[str] = None,
+    scheduled: bool = False
 ) -> Dict[str, Any]:
     """
     Execute a tool as a Celery task
@@ -62,46 +125,63 @@ def run_tool_task(
         job_id: Job UUID from database
         tool_name: Name of the tool to run
         parameters: Tool parameters
+        user_id: Job owner (for fair-share accounting)
+        scheduled: Queued through JobScheduler (release fair-share slot when done)
 
     Returns:
         Dict with execution results
     """
 
-    # Update job status to RUNNING
-    with get_db_context() as db:
-        job = db.query(DBJob).filter(DBJob.id == job_id).first()
-        if job:
-            job.status = JobStatus.RUNNING
-            job.started_at = datetime.utcnow()
-            job.celery_task_id = self.request.id
-
-            # Create log
-            log = DBJobLog(
-                job_id=job_id,
-                level="INFO",
-                message=f"Task started by Celery worker {self.request.hostname}"
-            )
-            db.add(log)
-
-    # Publish status update
     redis = get_redis()
-    if redis.is_available():
-        redis.publish("job_updates", {
-            "job_id": job_id,
-            "status": "running",
-            "started_at": datetime.utcnow().isoformat(),
-            "worker": self.request.hostname
-        })
 
-    # Run the tool
-    runner = ToolRunner(tools_dir, output_dir)
+    # Слоты global / user / tool (например, один build_concordance за раз):
+    # если заняты - задача возвращается в очередь, воркер берёт следующую
+    slot, scope = admission.try_acquire(tool_name, user_id)
+    if slot is None:
+        print(f"⏳ {tool_name}: {scope} limit reached, retry in {ADMISSION_RETRY_DELAY}s")
+        _requeue_for_admission(self)
 
+    # Слот освобождается в finally - при любой ошибке после захвата
     try:
+        # Update job status to RUNNING
+        with get_db_context() as db:
+            job = db.query(DBJob).filter(DBJob.id == job_id).first()
+            if job:
+                job.status = JobStatus.RUNNING
+                job.started_at = datetime.utcnow()
+                job.celery_task_id = self.request.id
+                job.worker_name = self.request.hostname
+
+                queue = (self.request.delivery_info or {}).get("routing_key", "tools")
+                queued_at = job.queued_at or job.created_at
+                wait = (job.started_at - queued_at).total_seconds() if queued_at else None
+
+                # Create log
+                log = DBJobLog(
+                    job_id=job_id,
+                    level="INFO",
+                    message=f"Task started by Celery worker {self.request.hostname} (queue {queue}"
+                            + (f", waited {wait:.1f}s)" if wait is not None else ")")
+                )
+                db.add(log)
+
+        # Publish status update
+        if redis.is_available():
+            redis.publish("job_updates", {
+                "job_id": job_id,
+                "status": "running",
+                "started_at": datetime.utcnow().isoformat(),
+                "worker": self.request.hostname
+            })
+
+        # Run the tool
+        runner = ToolRunner(tools_dir, output_dir)
+
         # Execute tool asynchronously
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         result = loop.run_until_complete(
-            runner.run_tool(tool_name, parameters)
+            runner.run_tool(tool_name, parameters, job_id=job_id)
         )
         loop.close()
 
@@ -115,6 +195,9 @@ def run_tool_task(
                 job.duration = result.duration
                 job.return_code = result.return_code
 
+                # ToolStats - в той же транзакции
+                record_job_stats(db, job)
+
                 # Create result
                 db_result = DBJobResult(
                     job_id=job_id,
@@ -122,11 +205,12 @@ def run_tool_task(
                     stderr=result.error,
                     return_code=result.return_code,
                     output_files=result.output_files,
-                    total_size=sum(
-                        (output_dir / f).stat().st_size
-                        for f in result.output_files
-                        if (output_dir / f).exists()
-                    )
+                    total_size=sum(f["size"] for f in result.output_files),
+                    memory_used=result.resources.get("peak_rss_mb"),
+                    cpu_percent=result.resources.get("cpu_percent"),
+                    cpu_time=result.resources.get("cpu_seconds"),
+                    io_read_bytes=result.resources.get("io_read_bytes"),
+                    io_write_bytes=result.resources.get("io_write_bytes")
                 )
                 db.add(db_result)
 
@@ -145,7 +229,8 @@ def run_tool_task(
                 "status": result.status.value,
                 "completed_at": datetime.utcnow().isoformat(),
                 "output_files": result.output_files,
-                "duration": result.duration
+                "duration": result.duration,
+                "resources": result.resources
             })
 
             # Cache result
@@ -160,6 +245,7 @@ def run_tool_task(
             "status": result.status.value,
             "output_files": result.output_files,
             "duration": result.duration,
+            "resources": result.resources,
             "return_code": result.return_code
         }
 
@@ -190,6 +276,9 @@ def run_tool_task(
         # Retry if possible
         raise self.retry(exc=e)
 
+    finally:
+        admission.release(slot)
+
 
 @celery_app.task(name="celery_tasks.cleanup_old_jobs")
 def cleanup_old_jobs(max_age_hours: int = 48) -> Dict[str, int]:
@@ -228,52 +317,22 @@ def cleanup_old_jobs(max_age_hours: int = 48) -> Dict[str, int]:
     }
 
 
-@celery_app.task(name="celery_tasks.update_tool_statistics")
-def update_tool_statistics() -> Dict[str, Any]:
+@celery_app.task(name="celery_tasks.reconcile_tool_statistics")
+def reconcile_tool_statistics(batch_size: int = 500, max_batches: int = 20) -> Dict[str, Any]:
     """
-    Update tool usage statistics
+    Count finished jobs missed at completion into ToolStats
+
+    ToolStats is updated incrementally when a job finishes (tool_stats.py);
+    this only picks up jobs that were not recorded, in bounded batches.
 
     Returns:
         Dict with statistics
     """
+    result = reconcile_tool_stats(get_db_context, batch_size=batch_size, max_batches=max_batches)
 
-    with get_db_context() as db:
-        from sqlalchemy import func
-
-        # Get tool usage stats
-        stats = db.query(
-            DBJob.tool_name,
-            func.count(DBJob.id).label('total_runs'),
-            func.count(DBJob.id).filter(DBJob.status == JobStatus.COMPLETED).label('successful_runs'),
-            func.avg(DBJob.duration).label('avg_duration')
-        ).group_by(DBJob.tool_name).all()
-
-        # Update or create ToolStats records
-        for stat in stats:
-            tool_stat = db.query(ToolStats).filter(ToolStats.tool_name == stat.tool_name).first()
-
-            if tool_stat:
-                tool_stat.total_runs = stat.total_runs
-                tool_stat.successful_runs = stat.successful_runs or 0
-                tool_stat.failed_runs = stat.total_runs - (stat.successful_runs or 0)
-                tool_stat.average_duration = float(stat.avg_duration) if stat.avg_duration else 0.0
-                tool_stat.last_run = datetime.utcnow()
-            else:
-                tool_stat = ToolStats(
-                    tool_name=stat.tool_name,
-                    total_runs=stat.total_runs,
-                    successful_runs=stat.successful_runs or 0,
-                    failed_runs=stat.total_runs - (stat.successful_runs or 0),
-                    average_duration=float(stat.avg_duration) if stat.avg_duration else 0.0,
-                    last_run=datetime.utcnow()
-                )
-                db.add(tool_stat)
+    print(f"📊 Reconciled tool statistics: {result['recorded']} jobs in {result['batches']} batches")
 
-    print(f"📊 Updated statistics for {len(stats)} tools")
-
-    return {
-        "tools_updated": len(stats)
-    }
+    return result
 
 
 @celery_app.task(name="celery_tasks.health_check")
@@ -316,6 +375,223 @@ def health_check() -> Dict[str, Any]:
     }
 
 
+# ========================
+# Workflows
+# ========================
+
+def _finish_workflow_run(workflow_run_id: str, steps: List[Dict[str, Any]]):
+    """Сохранить записи шагов и итоговый статус WorkflowRun"""
+    ok = all(step["status"] == JobStatus.COMPLETED.value for step in steps)
+
+    with get_db_context() as db:
+        run = db.query(WorkflowRun).filter(WorkflowRun.id == workflow_run_id).first()
+        if not run:
+            return
+
+        run.job_ids = steps
+        run.status = JobStatus.COMPLETED if ok else JobStatus.FAILED
+        run.completed_at = datetime.utcnow()
+        if run.started_at:
+            run.duration = (run.completed_at - run.started_at).total_seconds()
+
+        workflow = db.query(Workflow).filter(Workflow.id == run.workflow_id).first()
+        if workflow:
+            workflow.run_count = (workflow.run_count or 0) + 1
+            workflow.last_run = run.completed_at
+
+    redis = get_redis()
+    if redis.is_available():
+        redis.publish("workflow_updates", {
+            "workflow_run_id": workflow_run_id,
+            "status": "completed" if ok else "failed",
+            "completed_at": datetime.utcnow().isoformat()
+        })
+
+
+def _fail_workflow_run(workflow_run_id: str, error: str, steps: Optional[List[Dict[str, Any]]] = None):
+    """Отметить WorkflowRun FAILED после исключения (записи шагов - сохранённые или steps)"""
+    with get_db_context() as db:
+        run = db.query(WorkflowRun).filter(WorkflowRun.id == workflow_run_id).first()
+        if not run or run.status in (JobStatus.COMPLETED, JobStatus.FAILED):
+            return
+
+        if steps is not None:
+            run.job_ids = steps
+        run.status = JobStatus.FAILED
+        run.completed_at = datetime.utcnow()
+        if run.started_at:
+            run.duration = (run.completed_at - run.started_at).total_seconds()
+
+    redis = get_redis()
+    if redis.is_available():
+        redis.publish("workflow_updates", {
+            "workflow_run_id": workflow_run_id,
+            "status": "failed",
+            "error": error,
+            "completed_at": datetime.utcnow().isoformat()
+        })
+
+
+def _start_workflow_run(workflow_run_id: str) -> Optional[List[Dict[str, Any]]]:
+    """Отметить WorkflowRun запущенным и вернуть шаги workflow"""
+    with get_db_context() as db:
+        run = db.query(WorkflowRun).filter(WorkflowRun.id == workflow_run_id).first()
+        if not run:
+            return None
+
+        run.status = JobStatus.RUNNING
+        run.started_at = datetime.utcnow()
+        run.job_ids = []
+        return list(run.workflow.steps)
+
+
+@celery_app.task(name="celery_tasks.run_workflow_task")
+def run_workflow_task(workflow_run_id: str, max_parallel: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Execute a whole workflow on one worker (independent steps in parallel)
+
+    Args:
+        workflow_run_id: WorkflowRun UUID
+        max_parallel: Max concurrent steps (default: CPU count)
+
+    Returns:
+        Dict with run status and step records
+    """
+    steps = _start_workflow_run(workflow_run_id)
+    if steps is None:
+        return {"workflow_run_id": workflow_run_id, "status": "not_found"}
+
+    records = []
+
+    def on_step(record: Dict[str, Any]):
+        # Промежуточный прогресс - для GET /api/workflows/runs/{id}
+        records.append(record)
+        with get_db_context() as db:
+            run = db.query(WorkflowRun).filter(WorkflowRun.id == workflow_run_id).first()
+            if run:
+                run.job_ids = list(records)
+
+    executor = WorkflowExecutor(ToolRunner(tools_dir, output_dir), max_parallel=max_parallel)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        result = loop.run_until_complete(executor.run(steps, on_step=on_step))
+    except Exception as e:
+        _fail_workflow_run(workflow_run_id, str(e), list(records))
+        raise
+    finally:
+        loop.close()
+
+    _finish_workflow_run(workflow_run_id, result["steps"])
+
+    print(f"🔀 Workflow run {workflow_run_id}: {result['status']} in {result['duration']:.1f}s")
+    return {"workflow_run_id": workflow_run_id, "status": result["status"], "duration": result["duration"]}
+
+
+def _merge_step_records(previous: Union[None, Dict, List]) -> Dict[str, Dict[str, Any]]:
+    """Записи шагов от предыдущей задачи chain или от всех задач группы chord"""
+    if not previous:
+        return {}
+    if isinstance(previous, dict):
+        return dict(previous)
+
+    merged = {}
+    for records in previous:
+        merged.update(records)
+    return merged
+
+
+@celery_app.task(name="celery_tasks.run_workflow_step_task")
+def run_workflow_step_task(previous: Union[None, Dict, List], step_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Execute one workflow step inside a chord
+
+    Args:
+        previous: Step records of earlier DAG levels (dict, or list of dicts from a group)
+        step_data: WorkflowStep as dict
+
+    Returns:
+        Step records (earlier ones plus this step) keyed by step id
+    """
+    records = _merge_step_records(previous)
+    step = WorkflowStep.from_dict(step_data)
+
+    upstream_statuses = [records.get(d, {}).get("status") for d in step.depends_on]
+    if any(status != JobStatus.COMPLETED.value for status in upstream_statuses):
+        now = datetime.utcnow().isoformat()
+        records[step.id] = {
+            "step": step.id, "tool": step.tool, "job_id": None,
+            "status": JobStatus.CANCELLED.value, "cached": False,
+            "started_at": now, "completed_at": now, "duration": 0.0,
+            "output_files": [], "error": "dependency failed"
+        }
+        return records
+
+    runner = ToolRunner(tools_dir, output_dir)
+    cache = ResultCache(output_dir)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        record = loop.run_until_complete(
+            run_step(runner, cache, step, upstream_artifacts(step, records))
+        )
+    except Exception as e:
+        # Как в WorkflowExecutor: шаг FAILED, зависимые отменяются, chord продолжается
+        record = failed_record(step, f"{type(e).__name__}: {e}")
+    finally:
+        loop.close()
+
+    cache.save()
+    records[step.id] = record
+    return records
+
+
+@celery_app.task(name="celery_tasks.finish_workflow_run_task")
+def finish_workflow_run_task(previous: Union[None, Dict, List], workflow_run_id: str) -> Dict[str, Any]:
+    """Chord callback: store step records in WorkflowRun.job_ids"""
+    records = _merge_step_records(previous)
+    steps = sorted(records.values(), key=lambda record: record["completed_at"])
+    _finish_workflow_run(workflow_run_id, steps)
+
+    return {"workflow_run_id": workflow_run_id, "steps": len(steps)}
+
+
+@celery_app.task(name="celery_tasks.fail_workflow_run_task")
+def fail_workflow_run_task(request, exc, traceback, workflow_run_id: str):
+    """Chord errback: a step task died (time limit, lost worker) - mark WorkflowRun FAILED"""
+    _fail_workflow_run(workflow_run_id, f"{type(exc).__name__}: {exc}")
+
+
+def build_workflow_canvas(workflow_run_id: str, steps: List[Dict[str, Any]]):
+    """
+    Celery canvas for a workflow: one group per DAG level, levels chained
+    (a group followed by a task or group becomes a chord), so the steps of a
+    level run on all workers at once; any task failure marks the run FAILED
+
+    Usage:
+        build_workflow_canvas(run_id, workflow.steps).apply_async()
+    """
+    from celery import chain, group
+
+    parsed = parse_steps(steps)
+    levels = topological_levels(parsed)
+
+    signatures = []
+    for index, level in enumerate(levels):
+        tasks = [
+            # Первый уровень получает пустые записи, следующие - результат предыдущего
+            run_workflow_step_task.s({}, parsed[step_id].to_dict()) if index == 0
+            else run_workflow_step_task.s(parsed[step_id].to_dict())
+            for step_id in level
+        ]
+        signatures.append(group(tasks) if len(tasks) > 1 else tasks[0])
+
+    signatures.append(finish_workflow_run_task.s(workflow_run_id))
+    return chain(*signatures).on_error(fail_workflow_run_task.s(workflow_run_id))
+
+
 # ========================
 # Task Utilities
 # ========================
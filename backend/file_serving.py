@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+File Serving - Отдача больших сгенерированных файлов
+
+Отчёты (concordance.json, master_index.html, графы) отдавались целиком,
+без сжатия и валидаторов - дашборды, опрашивающие их, каждый раз качали
+файл заново. Здесь:
+
+- сильный ETag из SHA-256 содержимого (хэш считается один раз на версию
+  файла - по mtime/size - в отдельном потоке), If-None-Match → 304;
+- Range (один диапазон, If-Range) → 206, неудовлетворимый → 416;
+- заранее сжатые соседние файлы X.br / X.gz (создаются при записи -
+  precompress), если клиент их принимает и они не старше оригинала;
+- тело отдаётся через ASGI-расширение zero-copy (sendfile), если сервер
+  его поддерживает, иначе кусками из mmap в отдельном потоке - цикл
+  событий не держит файл в памяти целиком.
+
+Использование:
+    response = await serve_file(request, path, media_type="application/json")
+
+    python3 file_serving.py DIR   # создать .gz/.br для файлов директории
+"""
+
+import os
+import gzip
+import mmap
+import hashlib
+import tempfile
+import mimetypes
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+# Текстовые форматы, которые имеет смысл сжимать заранее
+COMPRESSIBLE_SUFFIXES = {
+    '.html', '.htm', '.json', '.csv', '.md', '.txt', '.xml', '.svg',
+    '.js', '.css', '.tex', '.rss'
+}
+MIN_PRECOMPRESS_SIZE = 1024
+
+# Кодировки: заголовок Content-Encoding → суффикс соседнего файла (по предпочтению)
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+CHUNK_SIZE = 256 * 1024
+ETAG_CACHE_SIZE = 4096
+
+# path -> (mtime_ns, size, sha256)
+_etag_cache: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+
+
+# ========================
+# Write time
+# ========================
+
+def _atomic_write(path: Path, data: bytes):
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def precompress(path: Path) -> list:
+    """
+    Создать X.gz (и X.br, если установлен brotli) рядом с файлом
+
+    Returns: список созданных файлов (пустой - формат не сжимается или файл мал)
+    """
+    path = Path(path)
+    if path.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+        return []
+
+    data = path.read_bytes()
+    if len(data) < MIN_PRECOMPRESS_SIZE:
+        return []
+
+    created = []
+
+    gz_path = path.with_name(path.name + '.gz')
+    _atomic_write(gz_path, gzip.compress(data, compresslevel=9, mtime=0))
+    created.append(gz_path)
+
+    if BROTLI_AVAILABLE:
+        br_path = path.with_name(path.name + '.br')
+        _atomic_write(br_path, brotli.compress(data, quality=11))
+        created.append(br_path)
+
+    return created
+
+
+def precompress_directory(directory: Path) -> int:
+    """Сжать все подходящие файлы директории (рекурсивно), у которых нет свежих соседей"""
+    count = 0
+    for path in Path(directory).rglob('*'):
+        if not path.is_file() or path.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+            continue
+        if _fresh_sibling(path, path.stat(), '.gz') is None:
+            if precompress(path):
+                count += 1
+    return count
+
+
+# ========================
+# Validators
+# ========================
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def content_hash(path: Path, stat_result: os.stat_result) -> str:
+    """SHA-256 файла - из кэша, пока mtime/size не изменились"""
+    key = str(path)
+    cached = _etag_cache.get(key)
+    if cached and cached[:2] == (stat_result.st_mtime_ns, stat_result.st_size):
+        _etag_cache.move_to_end(key)
+        return cached[2]
+
+    digest = await anyio.to_thread.run_sync(_hash_file, key)
+
+    _etag_cache[key] = (stat_result.st_mtime_ns, stat_result.st_size, digest)
+    _etag_cache.move_to_end(key)
+    while len(_etag_cache) > ETAG_CACHE_SIZE:
+        _etag_cache.popitem(last=False)
+
+    return digest
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match: '*' или список тегов (слабое сравнение, как для GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return any(tag.removeprefix('W/') == etag for tag in tags)
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Один диапазон bytes=a-b / a- / -n → (start, end) включительно
+
+    Returns: None - заголовка нет или он не поддерживается (отдать весь файл)
+    Raises: ValueError - диапазон неудовлетворим (416)
+    """
+    if not header or not header.startswith('bytes='):
+        return None
+
+    spec = header[len('bytes='):].strip()
+    if ',' in spec:
+        return None  # Несколько диапазонов - весь файл (допускается RFC 9110)
+
+    start_text, sep, end_text = spec.partition('-')
+    if not sep:
+        return None
+
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            suffix = int(end_text)
+            if suffix == 0:
+                raise ValueError("empty suffix range")
+            start = max(0, size - suffix)
+            end = size - 1
+    except ValueError:
+        if start_text.isdigit() or end_text.isdigit():
+            raise
+        return None
+
+    if start >= size:
+        raise ValueError("unsatisfiable range")
+    if start > end:
+        return None  # Некорректный диапазон игнорируется
+
+    return start, min(end, size - 1)
+
+
+def _fresh_sibling(path: Path, stat_result: os.stat_result, suffix: str) -> Optional[Tuple[Path, os.stat_result]]:
+    """Заранее сжатый соседний файл, если он не старше оригинала"""
+    sibling = path.with_name(path.name + suffix)
+    try:
+        sibling_stat = sibling.stat()
+    except OSError:
+        return None
+    if sibling_stat.st_mtime_ns < stat_result.st_mtime_ns:
+        return None
+    return sibling, sibling_stat
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set:
+    """Кодировки из Accept-Encoding (без q=0)"""
+    accepted = set()
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+# ========================
+# Responses
+# ========================
+
+class FileRangeResponse(Response):
+    """Отдать байты [start, end] файла: zero-copy, если сервер умеет, иначе mmap по кускам"""
+
+    def __init__(self, path: Path, start: int, end: int, status_code: int = 200,
+                 headers: Optional[Dict[str, str]] = None, media_type: Optional[str] = None):
+        super().__init__(content=None, status_code=status_code, headers=headers, media_type=media_type)
+        self.path = Path(path)
+        self.start = start
+        self.end = end
+        self.headers['content-length'] = str(max(0, end - start + 1))
+
+    async def __call__(self, scope, receive, send):
+        await send({
+            'type': 'http.response.start',
+            'status': self.status_code,
+            'headers': self.raw_headers,
+        })
+
+        length = self.end - self.start + 1
+        if scope.get('method') == 'HEAD' or length <= 0:
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            return
+
+        with open(self.path, 'rb') as f:
+            if 'http.response.zerocopy' in scope.get('extensions', {}):
+                await send({
+                    'type': 'http.response.zerocopy',
+                    'file': f,
+                    'offset': self.start,
+                    'count': length,
+                    'more_body': False,
+                })
+                return
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                position = self.start
+                while position <= self.end:
+                    chunk_end = min(position + CHUNK_SIZE, self.end + 1)
+                    # Копия куска в потоке: чтение страниц с диска не блокирует цикл событий
+                    chunk = await anyio.to_thread.run_sync(lambda a=position, b=chunk_end: mapped[a:b])
+                    position = chunk_end
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': position <= self.end,
+                    })
+
+
+async def serve_file(request: Request, path: Path, media_type: Optional[str] = None,
+                     filename: Optional[str] = None, status_code: int = 200,
+                     stat_result: Optional[os.stat_result] = None,
+                     cache_control: str = 'no-cache') -> Response:
+    """
+    Ответ на GET/HEAD файла: ETag/304, Range/206/416, заранее сжатые версии
+
+    cache_control по умолчанию no-cache: клиент кэширует, но каждый раз
+    сверяет ETag (дашборды получают 304 без тела).
+    """
+    path = Path(path)
+    stat_result = stat_result or path.stat()
+    size = stat_result.st_size
+
+    if media_type is None:
+        media_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+
+    digest = await content_hash(path, stat_result)
+    headers = {
+        'accept-ranges': 'bytes',
+        'cache-control': cache_control,
+        'vary': 'Accept-Encoding',
+    }
+    if filename:
+        headers['content-disposition'] = f'attachment; filename="{filename}"'
+
+    # Выбрать представление: сжатое - только для полного ответа
+    range_header = request.headers.get('range') if status_code == 200 else None
+    body_path, body_stat, encoding = path, stat_result, None
+
+    if range_header is None and status_code == 200:
+        accepted = accepted_encodings(request.headers.get('accept-encoding'))
+        for name, suffix in ENCODINGS:
+            if name in accepted:
+                sibling = _fresh_sibling(path, stat_result, suffix)
+                if sibling:
+                    body_path, body_stat = sibling
+                    encoding = name
+                    break
+
+    # Сильный ETag отдельно для каждого представления
+    etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+    headers['etag'] = etag
+    if encoding:
+        headers['content-encoding'] = encoding
+
+    if status_code == 200 and etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers={k: v for k, v in headers.items()
+                                                  if k in ('etag', 'cache-control', 'vary')})
+
+    # Range (If-Range: диапазон только для той же версии)
+    if range_header is not None:
+        if_range = request.headers.get('if-range')
+        if if_range is None or if_range.strip() == etag:
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                return Response(status_code=416, headers={'content-range': f'bytes */{size}',
+                                                          'etag': etag})
+            if byte_range is not None:
+                start, end = byte_range
+                headers['content-range'] = f'bytes {start}-{end}/{size}'
+                return FileRangeResponse(path, start, end, status_code=206,
+                                         headers=headers, media_type=media_type)
+
+    return FileRangeResponse(body_path, 0, body_stat.st_size - 1, status_code=status_code,
+                             headers=headers, media_type=media_type)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles с сильными ETag, Range и заранее сжатыми версиями"""
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        return _DeferredFileResponse(Path(full_path), stat_result, status_code)
+
+
+class _DeferredFileResponse(Response):
+    """StaticFiles.file_response синхронный - serve_file вызывается при отправке"""
+
+    def __init__(self, path: Path, stat_result: os.stat_result, status_code: int):
+        super().__init__(status_code=status_code)
+        self.path = path
+        self.stat_result = stat_result
+
+    async def __call__(self, scope, receive, send):
+        response = await serve_file(Request(scope, receive), self.path, status_code=self.status_code,
+                                    stat_result=self.stat_result)
+        await response(scope, receive, send)
+
+
+if __name__ == "__main__":
+    import sys
+
+    for directory in sys.argv[1:] or ["."]:
+        print(f"🗜️  {directory}: {precompress_directory(Path(directory))} файлов сжато")
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Job Scheduler - Выбор очереди и приоритета Celery для задачи
+
+Все задачи шли в одну очередь tools в порядке FIFO: быстрые инструменты
+ждали за часовыми check_links. Планировщик:
+
+- оценивает длительность инструмента: оценка реестра (estimated_time с
+  поправкой на complexity) уточняется реальными длительностями из
+  ToolStats - чем больше успешных запусков, тем меньше вес оценки реестра;
+- по оценке выбирает очередь: tools.fast / tools.standard / tools.long
+  (отдельные воркеры, короткие задачи не стоят за длинными);
+- переводит Job.priority (1-10, больше - важнее) в приоритет сообщения
+  Celery (Redis: 0 - наивысший);
+- fair-share: каждая задача пользователя, которая уже стоит в очереди или
+  выполняется, понижает приоритет следующей (не больше
+  FAIR_SHARE_MAX_PENALTY) - пакет задач одного пользователя не блокирует
+  остальных. Активные задачи учитываются по job_id: sorted set в Redis
+  на пользователя (job_id -> время постановки, общий для API и воркеров),
+  без Redis - в памяти процесса. Задачи старше ACTIVE_JOBS_TTL
+  отбрасываются по одной, поэтому задача, которую никто не снял
+  (revoke, упавший воркер, выполнение в другом процессе), перестаёт
+  влиять на приоритет, а повторное снятие ничего не ломает.
+"""
+
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# Очереди по оценке длительности: (имя, верхняя граница в секундах)
+QUEUES = (
+    ("tools.fast", 60),
+    ("tools.standard", 600),
+    ("tools.long", None),
+)
+
+# Множитель оценки реестра по сложности кода инструмента
+COMPLEXITY_FACTORS = {"low": 1.0, "medium": 2.0, "high": 4.0}
+
+# Оценка для инструмента, которого нет в реестре
+DEFAULT_ESTIMATE = 60.0
+
+# Вес оценки реестра в "запусках": после N успешных запусков
+# фактическое среднее весит уже больше эвристики
+PRIOR_WEIGHT = 3
+
+# Приоритеты сообщений Celery (Redis transport: 0 - наивысший)
+CELERY_PRIORITY_STEPS = 10
+FAIR_SHARE_MAX_PENALTY = 4
+
+# Как часто перечитывать ToolStats (секунды)
+STATS_TTL = 300
+
+# Sorted set активных задач пользователя: job_id -> время постановки
+ACTIVE_JOBS_KEY = "scheduler:active_jobs:{user}"
+ACTIVE_JOBS_TTL = 6 * 3600
+
+
+@dataclass
+class ScheduleDecision:
+    """Куда и с каким приоритетом отправить задачу"""
+    queue: str
+    priority: int
+    estimated_duration: float
+    estimate_source: str  # registry, stats, default
+    user_active_jobs: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def load_tool_stats() -> Dict[str, Tuple[int, float]]:
+    """tool_name -> (успешных запусков, средняя длительность) из ToolStats"""
+    from database import get_db_context
+    from models import ToolStats
+
+    with get_db_context() as db:
+        rows = db.query(ToolStats.tool_name, ToolStats.successful_runs, ToolStats.avg_duration).all()
+
+    return {
+        name: (runs or 0, float(avg_duration))
+        for name, runs, avg_duration in rows
+        if avg_duration is not None
+    }
+
+
+class JobScheduler:
+    """Оценка стоимости задачи, выбор очереди и fair-share приоритет"""
+
+    def __init__(
+        self,
+        registry,
+        redis=None,
+        stats_loader: Optional[Callable[[], Dict[str, Tuple[int, float]]]] = load_tool_stats,
+        stats_ttl: float = STATS_TTL
+    ):
+        """
+        Args:
+            registry: ToolRegistry (estimated_time, complexity)
+            redis: RedisClient для общих счётчиков fair-share (None - в памяти)
+            stats_loader: Источник фактических длительностей (None - только реестр)
+            stats_ttl: Время жизни загруженной статистики (секунды)
+        """
+        self.registry = registry
+        self.redis = redis
+        self.stats_loader = stats_loader
+        self.stats_ttl = stats_ttl
+
+        self._stats: Dict[str, Tuple[int, float]] = {}
+        self._stats_loaded_at: Optional[float] = None
+        # Без Redis: user -> {job_id: время постановки}
+        self._local_active: Dict[str, Dict[str, float]] = {}
+
+    # ========================
+    # Cost estimation
+    # ========================
+
+    def _tool_stats(self) -> Dict[str, Tuple[int, float]]:
+        now = time.monotonic()
+        if self.stats_loader and (self._stats_loaded_at is None or now - self._stats_loaded_at > self.stats_ttl):
+            try:
+                self._stats = self.stats_loader()
+            except Exception as e:
+                print(f"⚠️  Tool stats unavailable, using registry estimates: {e}")
+            self._stats_loaded_at = now
+        return self._stats
+
+    def registry_estimate(self, tool_name: str) -> Optional[float]:
+        """Оценка реестра с поправкой на сложность"""
+        tool = self.registry.get_tool(tool_name) if self.registry else None
+        if tool is None or tool.estimated_time is None:
+            return None
+        return tool.estimated_time * COMPLEXITY_FACTORS.get(tool.complexity, 1.0)
+
+    def estimate_duration(self, tool_name: str) -> Tuple[float, str]:
+        """(ожидаемая длительность в секундах, источник оценки)"""
+        prior = self.registry_estimate(tool_name)
+        runs, average = self._tool_stats().get(tool_name, (0, None))
+
+        if runs and average is not None:
+            if prior is None:
+                return average, "stats"
+            blended = (runs * average + PRIOR_WEIGHT * prior) / (runs + PRIOR_WEIGHT)
+            return blended, "stats"
+
+        if prior is not None:
+            return prior, "registry"
+        return DEFAULT_ESTIMATE, "default"
+
+    @staticmethod
+    def queue_for(duration: float) -> str:
+        for queue, limit in QUEUES:
+            if limit is None or duration <= limit:
+                return queue
+        return QUEUES[-1][0]
+
+    # ========================
+    # Fair share
+    # ========================
+
+    def _redis_client(self):
+        if self.redis is not None and self.redis.is_available():
+            return self.redis.client
+        return None
+
+    def active_jobs(self, user_id: Optional[str]) -> int:
+        """Задачи пользователя в очереди или в работе (не старше ACTIVE_JOBS_TTL)"""
+        user = user_id or "anonymous"
+        cutoff = time.time() - ACTIVE_JOBS_TTL
+        client = self._redis_client()
+        if client is not None:
+            try:
+                key = ACTIVE_JOBS_KEY.format(user=user)
+                pipe = client.pipeline()
+                pipe.zremrangebyscore(key, "-inf", cutoff)
+                pipe.zcard(key)
+                return int(pipe.execute()[1])
+            except Exception:
+                pass
+
+        jobs = self._local_active.get(user, {})
+        for job_id in [job_id for job_id, started in jobs.items() if started < cutoff]:
+            del jobs[job_id]
+        if not jobs:
+            self._local_active.pop(user, None)
+        return len(jobs)
+
+    def _add_active(self, user_id: Optional[str], job_id: str):
+        user = user_id or "anonymous"
+        now = time.time()
+        client = self._redis_client()
+        if client is not None:
+            try:
+                key = ACTIVE_JOBS_KEY.format(user=user)
+                pipe = client.pipeline()
+                pipe.zadd(key, {job_id: now})
+                # Ключ пользователя без новых задач удаляется целиком
+                pipe.expire(key, ACTIVE_JOBS_TTL)
+                pipe.execute()
+                return
+            except Exception:
+                pass
+
+        self._local_active.setdefault(user, {})[job_id] = now
+
+    def job_finished(self, user_id: Optional[str], job_id: Optional[str] = None):
+        """
+        Задача пользователя завершилась (успешно, с ошибкой или отменена)
+
+        Повторный вызов для того же job_id ничего не меняет. Без job_id
+        снимается самая старая задача пользователя.
+        """
+        user = user_id or "anonymous"
+        client = self._redis_client()
+        if client is not None:
+            try:
+                key = ACTIVE_JOBS_KEY.format(user=user)
+                if job_id is not None:
+                    client.zrem(key, job_id)
+                else:
+                    client.zpopmin(key)
+                return
+            except Exception:
+                pass
+
+        jobs = self._local_active.get(user)
+        if not jobs:
+            return
+        if job_id is None:
+            job_id = min(jobs, key=jobs.get)
+        jobs.pop(job_id, None)
+        if not jobs:
+            del self._local_active[user]
+
+    @staticmethod
+    def celery_priority(job_priority: int, active_jobs: int = 0) -> int:
+        """Job.priority 1-10 (больше - важнее) -> приоритет Celery 0-9 (меньше - раньше)"""
+        job_priority = min(max(int(job_priority), 1), CELERY_PRIORITY_STEPS)
+        priority = CELERY_PRIORITY_STEPS - job_priority
+        priority += min(active_jobs, FAIR_SHARE_MAX_PENALTY)
+        return min(priority, CELERY_PRIORITY_STEPS - 1)
+
+    # ========================
+    # Scheduling
+    # ========================
+
+    def schedule(
+        self,
+        tool_name: str,
+        priority: int = 5,
+        user_id: Optional[str] = None,
+        job_id: Optional[str] = None
+    ) -> ScheduleDecision:
+        """
+        Выбрать очередь и приоритет задачи и учесть её в fair-share
+
+        После завершения задачи нужно вызвать job_finished(user_id, job_id)
+        (celery_tasks.CallbackTask и обработчик task_revoked делают это сами).
+        """
+        duration, source = self.estimate_duration(tool_name)
+        active = self.active_jobs(user_id)
+
+        decision = ScheduleDecision(
+            queue=self.queue_for(duration),
+            priority=self.celery_priority(priority, active),
+            estimated_duration=round(duration, 1),
+            estimate_source=source,
+            user_active_jobs=active
+        )
+
+        self._add_active(user_id, job_id or str(uuid.uuid4()))
+        return decision
@@ -67,6 +67,30 @@ tool_executions_active = Gauge(
     ['tool_name']
 )
 
+# Histogram: Peak RSS of the tool process tree
+tool_peak_memory_bytes = Histogram(
+    'tool_peak_memory_bytes',
+    'Peak resident memory of a tool run (process tree)',
+    ['tool_name'],
+    buckets=tuple(mb * 1024 * 1024 for mb in (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192))
+)
+
+# Histogram: CPU time of the tool process tree
+tool_cpu_seconds = Histogram(
+    'tool_cpu_seconds',
+    'CPU time (user + system) of a tool run',
+    ['tool_name'],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+)
+
+# Histogram: Disk I/O of the tool process tree
+tool_io_bytes = Histogram(
+    'tool_io_bytes',
+    'Bytes read or written by a tool run',
+    ['tool_name', 'direction'],  # direction: read, write
+    buckets=tuple(mb * 1024 * 1024 for mb in (1, 10, 50, 100, 500, 1024, 5120, 10240))
+)
+
 
 # ========================
 # Database Metrics
@@ -147,6 +171,56 @@ celery_task_retries_total = Counter(
 )
 
 
+# ========================
+# Admission Control Metrics
+# ========================
+
+# Gauge: Requests waiting for a job slot
+admission_queue_depth = Gauge(
+    'admission_queue_depth',
+    'Tool run requests waiting for a free job slot'
+)
+
+# Gauge: Occupied job slots
+admission_slots_active = Gauge(
+    'admission_slots_active',
+    'Tool jobs holding an admission slot'
+)
+
+# Counter: Rejected requests (429)
+admission_rejected_total = Counter(
+    'admission_rejected_total',
+    'Tool run requests rejected by admission control',
+    ['reason', 'scope']  # reason: queue_full, timeout; scope: global, user, tool
+)
+
+# Histogram: Time spent waiting for a slot
+admission_wait_seconds = Histogram(
+    'admission_wait_seconds',
+    'Time tool run requests waited for a job slot',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+
+
+# ========================
+# Rate Limiting Metrics
+# ========================
+
+# Counter: Rate limit decisions
+rate_limit_requests_total = Counter(
+    'rate_limit_requests_total',
+    'Requests checked by the rate limiter',
+    ['rule', 'scope', 'result']  # scope: user, key, ip; result: allowed, limited
+)
+
+# Histogram: Time spent checking the limit
+rate_limit_check_seconds = Histogram(
+    'rate_limit_check_seconds',
+    'Rate limit check latency',
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+)
+
+
 # ========================
 # Redis Cache Metrics
 # ========================
@@ -317,6 +391,37 @@ def track_tool_execution(tool_name: str):
 # Metric Update Functions
 # ========================
 
+def record_tool_resources(tool_name: str, resources: dict):
+    """
+    Record resource usage of a finished tool run
+
+    Args:
+        tool_name: Tool name
+        resources: JobResult.resources (ProcessTreeSampler.usage())
+    """
+    if not resources:
+        return
+
+    tool_peak_memory_bytes.labels(tool_name=tool_name).observe(resources["peak_rss_mb"] * 1024 * 1024)
+    tool_cpu_seconds.labels(tool_name=tool_name).observe(resources["cpu_seconds"])
+    tool_io_bytes.labels(tool_name=tool_name, direction="read").observe(resources["io_read_bytes"])
+    tool_io_bytes.labels(tool_name=tool_name, direction="write").observe(resources["io_write_bytes"])
+
+
+def record_rate_limit(decision, scope: str, seconds: float):
+    """
+    Record a rate limit decision (RateLimitMiddleware on_decision hook)
+
+    Args:
+        decision: RateLimitDecision
+        scope: Client type (user, key, ip)
+        seconds: Check duration
+    """
+    result = "allowed" if decision.allowed else "limited"
+    rate_limit_requests_total.labels(rule=decision.rule, scope=scope, result=result).inc()
+    rate_limit_check_seconds.observe(seconds)
+
+
 def update_system_metrics():
     """Update system resource metrics"""
     # CPU
@@ -368,6 +473,34 @@ def update_redis_metrics(redis_client):
         pass
 
 
+async def update_redis_metrics_async(redis_client):
+    """
+    Update Redis cache metrics without blocking the event loop
+
+    Args:
+        redis_client: AsyncRedisClient instance
+    """
+    try:
+        info = await redis_client.client.info('memory')
+        cache_size_bytes.set(info.get('used_memory', 0))
+    except Exception:
+        pass
+
+
+def update_admission_metrics(controller):
+    """
+    Update admission control gauges
+
+    Args:
+        controller: AdmissionController instance
+    """
+    try:
+        admission_queue_depth.set(controller.waiting)
+        admission_slots_active.set(controller.active())
+    except Exception:
+        pass
+
+
 def update_celery_metrics():
     """Update Celery task queue metrics"""
     try:
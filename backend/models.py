@@ -3,7 +3,7 @@ Database models for Data20 Knowledge Base
 Phase 5.1.1: SQLAlchemy models for persistence
 """
 
-from sqlalchemy import Column, String, Integer, DateTime, JSON, Text, Enum as SQLEnum, ForeignKey, Boolean, Float
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, JSON, Text, Enum as SQLEnum, ForeignKey, Boolean, Float
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -121,6 +121,9 @@ class Job(Base):
     celery_task_id = Column(String(255), index=True)
     worker_name = Column(String(255))
 
+    # Counted in ToolStats (tool_stats.record_job_stats)
+    stats_recorded = Column(Boolean, default=False, nullable=False, index=True)
+
     # Relationships
     user = relationship("User", back_populates="jobs")
     result = relationship("JobResult", back_populates="job", uselist=False, cascade="all, delete-orphan")
@@ -142,12 +145,15 @@ class JobResult(Base):
     stderr = Column(Text)
 
     # Files
-    output_files = Column(JSON, default=[])  # List of file paths
+    output_files = Column(JSON, default=[])  # Artifact refs: {name, sha256, size, compression, stored_size}
     file_metadata = Column(JSON, default={})  # File sizes, types, etc.
 
-    # Metrics
-    memory_used = Column(Float)  # MB
-    cpu_percent = Column(Float)
+    # Metrics (ToolRunner samples the whole process tree)
+    memory_used = Column(Float)  # Peak RSS, MB
+    cpu_percent = Column(Float)  # Average: cpu_time / wall time * 100
+    cpu_time = Column(Float)  # User + system seconds
+    io_read_bytes = Column(BigInteger)
+    io_write_bytes = Column(BigInteger)
 
     # Storage
     storage_path = Column(String(500))  # Path where files are stored
@@ -260,7 +266,7 @@ class WorkflowRun(Base):
     duration = Column(Float)
 
     # Results
-    job_ids = Column(JSON, default=[])  # List of job IDs created by this run
+    job_ids = Column(JSON, default=[])  # Step records: step, tool, job_id, status, cached, timing, output_files
 
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
@@ -288,10 +294,15 @@ class ToolStats(Base):
     successful_runs = Column(Integer, default=0)
     failed_runs = Column(Integer, default=0)
 
-    # Performance
-    avg_duration = Column(Float)
+    # Performance (successful runs, updated incrementally - tool_stats.py)
+    avg_duration = Column(Float)  # Welford running mean
     min_duration = Column(Float)
     max_duration = Column(Float)
+    duration_count = Column(Integer, default=0)
+    duration_m2 = Column(Float, default=0.0)  # Welford sum of squared deviations
+    p50_duration = Column(Float)
+    p95_duration = Column(Float)
+    duration_sketch = Column(JSON, default={})  # Log-bucket histogram for quantiles
 
     # Recent activity
     last_run = Column(DateTime)
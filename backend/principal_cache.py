@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Principal Cache - Кэш аутентифицированных пользователей
+
+Раньше каждый запрос с JWT (get_current_user, get_current_user_optional)
+проверял подпись токена и читал пользователя из Postgres - клиенты,
+опрашивающие /api/jobs/{id}, нагружали базу запросами SELECT users.
+
+Теперь два уровня:
+
+- TokenCache - результат проверки JWT по токену, до его exp
+  (подпись проверяется один раз на токен и процесс);
+- PrincipalCache - снимок пользователя (id, username, role, is_active, ...):
+  LRU в памяти процесса (PRINCIPAL_LOCAL_TTL секунд) и Redis
+  (PRINCIPAL_CACHE_TTL секунд), общий для всех процессов API.
+
+Ключ в Redis - principal:<user_id>:<version>. Версия пользователя
+(principal:version:<user_id>) увеличивается при invalidate (смена роли или
+статуса, удаление, logout): старые записи становятся недостижимы, даже если
+параллельный запрос допишет устаревший снимок после invalidate. Локальный
+LRU другого процесса может отдавать старый снимок не дольше
+PRINCIPAL_LOCAL_TTL.
+
+Без Redis - только LRU в памяти процесса.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from models import User, UserRole
+
+
+class TokenCache:
+    """Проверенные payload JWT по токену, до истечения exp"""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires, payload = entry
+            if expires <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return payload
+
+    def put(self, token: str, payload: Dict[str, Any]):
+        expires = payload.get("exp")
+        if not isinstance(expires, (int, float)):
+            return  # без exp не кэшируем
+
+        with self._lock:
+            self._entries[token] = (float(expires), payload)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, token: str):
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def user_to_principal(user: User) -> Dict[str, Any]:
+    """Снимок пользователя для кэша (JSON)"""
+    return {
+        "id": str(user.id),
+        "username": user.username,
+        "email": user.email,
+        "full_name": user.full_name,
+        "role": user.role.value if user.role else None,
+        "is_active": bool(user.is_active),
+        "created_at": user.created_at.isoformat() if user.created_at else None
+    }
+
+
+def principal_to_user(principal: Dict[str, Any]) -> User:
+    """
+    Отсоединённый (transient) User из снимка
+
+    Годится для чтения полей и проверки роли; чтобы изменить пользователя,
+    его нужно заново загрузить в сессию.
+    """
+    return User(
+        id=uuid.UUID(principal["id"]),
+        username=principal["username"],
+        email=principal["email"],
+        full_name=principal.get("full_name"),
+        role=UserRole(principal["role"]) if principal.get("role") else None,
+        is_active=principal["is_active"],
+        created_at=datetime.fromisoformat(principal["created_at"]) if principal.get("created_at") else None
+    )
+
+
+class PrincipalCache:
+    """Снимки пользователей: LRU в памяти процесса + Redis с версией на пользователя"""
+
+    def __init__(
+        self,
+        redis=None,
+        ttl: Optional[int] = None,
+        local_ttl: Optional[float] = None,
+        max_size: int = 10000
+    ):
+        """
+        Args:
+            redis: RedisClient (None или недоступен - только память процесса)
+            ttl: Время жизни записи в Redis (по умолчанию PRINCIPAL_CACHE_TTL)
+            local_ttl: Время жизни записи в памяти (по умолчанию PRINCIPAL_LOCAL_TTL)
+        """
+        self.redis = redis
+        self.ttl = ttl if ttl is not None else int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+        self.local_ttl = local_ttl if local_ttl is not None else float(os.getenv("PRINCIPAL_LOCAL_TTL", "5"))
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._local: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        # Версии без Redis
+        self._versions: Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def _client(self):
+        # Без ping на каждый запрос: ошибки Redis обрабатываются на месте
+        if self.redis is not None and getattr(self.redis, "client", None) is not None:
+            return self.redis.client
+        return None
+
+    def version(self, user_id: str) -> int:
+        """Текущая версия пользователя"""
+        client = self._client()
+        if client is not None:
+            try:
+                value = client.get(f"principal:version:{user_id}")
+                return int(value or 0)
+            except Exception as e:
+                print(f"⚠️  Redis principal version failed: {e}")
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def get(self, user_id: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        Снимок пользователя из кэша
+
+        Returns:
+            (снимок или None, версия - передать в put после чтения из БД)
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._local.get(user_id)
+            if entry is not None:
+                expires, version, principal = entry
+                if expires > now:
+                    self._local.move_to_end(user_id)
+                    self.hits += 1
+                    return principal, version
+                del self._local[user_id]
+
+        version = self.version(user_id)
+
+        client = self._client()
+        if client is not None:
+            try:
+                raw = client.get(f"principal:{user_id}:{version}")
+                if raw is not None:
+                    principal = json.loads(raw)
+                    self._remember(user_id, version, principal)
+                    with self._lock:
+                        self.hits += 1
+                    return principal, version
+            except Exception as e:
+                print(f"⚠️  Redis principal get failed: {e}")
+
+        with self._lock:
+            self.misses += 1
+        return None, version
+
+    def put(self, user_id: str, principal: Dict[str, Any], version: int):
+        """Сохранить снимок, прочитанный при версии version"""
+        client = self._client()
+        if client is not None:
+            try:
+                client.setex(f"principal:{user_id}:{version}", self.ttl, json.dumps(principal))
+            except Exception as e:
+                print(f"⚠️  Redis principal set failed: {e}")
+        else:
+            with self._lock:
+                if self._versions.get(user_id, 0) != version:
+                    return  # invalidate между чтением версии и БД
+
+        self._remember(user_id, version, principal)
+
+    def _remember(self, user_id: str, version: int, principal: Dict[str, Any]):
+        with self._lock:
+            self._local[user_id] = (time.monotonic() + self.local_ttl, version, principal)
+            self._local.move_to_end(user_id)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        """Сбросить снимок пользователя во всех процессах (смена роли, статуса, logout)"""
+        user_id = str(user_id)
+        with self._lock:
+            self._local.pop(user_id, None)
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+        client = self._client()
+        if client is not None:
+            try:
+                key = f"principal:version:{user_id}"
+                pipe = client.pipeline()
+                pipe.incr(key)
+                # Версия живёт дольше любой записи этой версии
+                pipe.expire(key, max(self.ttl * 2, 3600))
+                pipe.execute()
+            except Exception as e:
+                print(f"⚠️  Redis principal invalidate failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "local_entries": len(self._local),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total * 100 if total else 0,
+            "ttl": self.ttl,
+            "local_ttl": self.local_ttl
+        }
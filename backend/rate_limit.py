@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Rate Limiting - Ограничение частоты запросов к API (token bucket)
+
+RateLimitMiddleware - ASGI middleware: для запроса находится правило по
+самому длинному префиксу пути (RATE_LIMITS), клиент определяется по
+X-API-Key (только действительный ключ models.APIKey - иначе новый ключ
+в каждом запросе давал бы новое ведро), JWT (user id) или IP. У каждой пары (правило, клиент) - ведро
+на burst токенов, пополняемое со скоростью rate в секунду; запрос берёт
+один токен. Пустое ведро - 429 с Retry-After.
+
+    RATE_LIMITS="/api/run=20/m:5,/api/jobs=120/m:30,/api=600/m:100"
+                 префикс=запросов/период(s, m, h)[:burst]
+    RATE_LIMIT_OVERRIDES="user:<id>=5,key:<hash>=0"
+                 множитель скорости и burst для клиента (0 - без ограничений)
+
+Ведро хранится в Redis (Lua-скрипт: пополнение и списание атомарны,
+один EVALSHA на запрос через AsyncRedisClient, не блокируя event loop) -
+лимиты общие для всех процессов API. Без Redis
+или при ошибке Redis - вёдра в памяти процесса (на REDIS_RETRY секунд
+после ошибки Redis не опрашивается).
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+
+# Пополнение и списание токенов:
+# KEYS[1] - ведро, ARGV - rate (токенов/с), burst, now, cost
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = burst
+    ts = now
+end
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry)}
+"""
+
+DEFAULT_RATE_LIMITS = (
+    "/auth/login=10/m:5,/api/run=20/m:5,/api/workflows=20/m:5,"
+    "/api/jobs=120/m:30,/api/search=60/m:20,/api=600/m:100"
+)
+
+PERIODS = {"s": 1, "m": 60, "h": 3600}
+
+
+@dataclass
+class RateLimitRule:
+    """Лимит для путей с префиксом prefix"""
+    prefix: str
+    rate: float  # токенов в секунду
+    burst: int
+    methods: Optional[Tuple[str, ...]] = None  # None - все методы
+
+    @property
+    def name(self) -> str:
+        return self.prefix
+
+
+@dataclass
+class RateLimitDecision:
+    """Результат проверки запроса"""
+    allowed: bool
+    rule: str
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+
+
+def parse_rate_limits(value: str) -> List[RateLimitRule]:
+    """'/api/run=20/m:5, /api=600/m' -> [RateLimitRule('/api/run', 1/3, 5), ...]"""
+    rules = []
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        prefix, spec = item.split("=", 1)
+        spec, _, burst = spec.strip().partition(":")
+        count, _, period = spec.partition("/")
+        rate = float(count) / PERIODS[period.strip() or "s"]
+        rules.append(RateLimitRule(
+            prefix=prefix.strip(),
+            rate=rate,
+            burst=int(burst) if burst else max(1, int(float(count)))
+        ))
+    return rules
+
+
+def parse_overrides(value: str) -> Dict[str, float]:
+    """'user:42=5, key:ab12=0' -> {'user:42': 5.0, 'key:ab12': 0.0}"""
+    overrides = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        identity, multiplier = item.rsplit("=", 1)
+        overrides[identity.strip()] = float(multiplier)
+    return overrides
+
+
+class RateLimiter:
+    """Token bucket на (правило, клиент): Redis или память процесса"""
+
+    REDIS_RETRY = 5.0
+
+    def __init__(
+        self,
+        rules: Optional[List[RateLimitRule]] = None,
+        overrides: Optional[Dict[str, float]] = None,
+        redis=None,
+        max_local_buckets: int = 100000
+    ):
+        """
+        Args:
+            rules: Правила (по умолчанию - из RATE_LIMITS)
+            overrides: Множители для клиентов (по умолчанию - из RATE_LIMIT_OVERRIDES)
+            redis: AsyncRedisClient (None или недоступен - вёдра в памяти процесса)
+        """
+        if rules is None:
+            rules = parse_rate_limits(os.getenv("RATE_LIMITS", DEFAULT_RATE_LIMITS))
+        if overrides is None:
+            overrides = parse_overrides(os.getenv("RATE_LIMIT_OVERRIDES", ""))
+
+        # Самый длинный префикс проверяется первым
+        self.rules = sorted(rules, key=lambda rule: len(rule.prefix), reverse=True)
+        self.overrides = overrides
+        self.redis = redis
+        self.max_local_buckets = max_local_buckets
+
+        self._lock = threading.Lock()
+        self._local: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._script = None
+        self._redis_down_until = 0.0
+
+        self.decisions: Counter = Counter()
+
+    def match(self, path: str, method: str = "GET") -> Optional[RateLimitRule]:
+        """Правило для запроса (None - без ограничений)"""
+        for rule in self.rules:
+            if path.startswith(rule.prefix) and (rule.methods is None or method in rule.methods):
+                return rule
+        return None
+
+    async def hit(self, rule: RateLimitRule, identity: str, cost: float = 1.0) -> RateLimitDecision:
+        """Списать cost токенов из ведра клиента"""
+        multiplier = self.overrides.get(identity, 1.0)
+        if multiplier <= 0:
+            return RateLimitDecision(True, rule.name, 0, 0)
+
+        rate = rule.rate * multiplier
+        burst = max(1, int(rule.burst * multiplier))
+        key = f"ratelimit:{rule.prefix}:{identity}"
+        now = time.time()
+
+        result = await self._hit_redis(key, rate, burst, now, cost)
+        if result is None:
+            result = self._hit_local(key, rate, burst, now, cost)
+
+        allowed, tokens, retry_after = result
+        self.decisions[(rule.name, "allowed" if allowed else "limited")] += 1
+        return RateLimitDecision(allowed, rule.name, burst, int(tokens), retry_after)
+
+    async def _hit_redis(self, key, rate, burst, now, cost) -> Optional[Tuple[bool, float, float]]:
+        client = getattr(self.redis, "client", None) if self.redis is not None else None
+        if client is None or time.monotonic() < self._redis_down_until:
+            return None
+
+        try:
+            if self._script is None:
+                self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+            allowed, tokens, retry_after = await self._script(keys=[key], args=[rate, burst, now, cost])
+            return bool(int(allowed)), float(tokens), float(retry_after)
+        except Exception as e:
+            self._redis_down_until = time.monotonic() + self.REDIS_RETRY
+            print(f"⚠️  Redis rate limit failed, using local buckets: {e}")
+            return None
+
+    def _hit_local(self, key, rate, burst, now, cost) -> Tuple[bool, float, float]:
+        with self._lock:
+            bucket = self._local.get(key)
+            if bucket is None:
+                bucket = [float(burst), now]
+                self._local[key] = bucket
+                while len(self._local) > self.max_local_buckets:
+                    self._local.popitem(last=False)
+            else:
+                self._local.move_to_end(key)
+
+            tokens = min(burst, bucket[0] + max(0.0, now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                return True, bucket[0], 0.0
+            bucket[0] = tokens
+            return False, tokens, (cost - tokens) / rate
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "rules": {rule.prefix: {"rate_per_minute": rule.rate * 60, "burst": rule.burst} for rule in self.rules},
+            "allowed": sum(count for (_, result), count in self.decisions.items() if result == "allowed"),
+            "limited": sum(count for (_, result), count in self.decisions.items() if result == "limited"),
+            "local_buckets": len(self._local)
+        }
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers") or []:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware: 429 при превышении лимита, заголовки X-RateLimit-*
+
+    Usage:
+        app.add_middleware(RateLimitMiddleware, limiter=RateLimiter(redis=get_async_redis()))
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: Optional[RateLimiter] = None,
+        token_subject: Optional[Callable[[str], Optional[str]]] = None,
+        on_decision: Optional[Callable[[RateLimitDecision, str, float], None]] = None,
+        trust_proxy: Optional[bool] = None,
+        api_key_valid: Optional[Callable[[str], bool]] = None,
+        api_key_ttl: float = 60.0,
+        max_api_keys: int = 10000
+    ):
+        """
+        Args:
+            limiter: RateLimiter (по умолчанию - правила из окружения, без Redis)
+            token_subject: Bearer-токен -> user id (None - токен недействителен)
+            on_decision: Вызывается после проверки: (решение, тип клиента, секунды)
+            trust_proxy: Брать IP из X-Forwarded-For (по умолчанию RATE_LIMIT_TRUST_PROXY)
+            api_key_valid: SHA-256 ключа -> ключ действителен (синхронно, в потоке;
+                           None - X-API-Key не учитывается)
+            api_key_ttl: Сколько секунд помнить результат проверки ключа
+        """
+        self.app = app
+        self.limiter = limiter or RateLimiter()
+        self.token_subject = token_subject
+        self.on_decision = on_decision
+        if trust_proxy is None:
+            trust_proxy = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+        self.trust_proxy = trust_proxy
+        self.api_key_valid = api_key_valid
+        self.api_key_ttl = api_key_ttl
+        self.max_api_keys = max_api_keys
+
+        # SHA-256 ключа -> (срок, действителен)
+        self._api_keys: "OrderedDict[str, Tuple[float, bool]]" = OrderedDict()
+
+    async def _valid_api_key(self, digest: str) -> bool:
+        now = time.monotonic()
+        cached = self._api_keys.get(digest)
+        if cached is not None and cached[0] > now:
+            self._api_keys.move_to_end(digest)
+            return cached[1]
+
+        try:
+            valid = bool(await asyncio.to_thread(self.api_key_valid, digest))
+        except Exception as e:
+            print(f"⚠️  API key check failed: {e}")
+            valid = False
+
+        self._api_keys[digest] = (now + self.api_key_ttl, valid)
+        self._api_keys.move_to_end(digest)
+        while len(self._api_keys) > self.max_api_keys:
+            self._api_keys.popitem(last=False)
+        return valid
+
+    async def identify(self, scope) -> str:
+        """Клиент: key:<hash> (действительный ключ), user:<id> или ip:<адрес>"""
+        api_key = _header(scope, b"x-api-key")
+        if api_key and self.api_key_valid is not None:
+            digest = hashlib.sha256(api_key.encode()).hexdigest()
+            if await self._valid_api_key(digest):
+                return "key:" + digest[:16]
+
+        authorization = _header(scope, b"authorization")
+        if authorization and self.token_subject is not None and authorization[:7].lower() == "bearer ":
+            subject = self.token_subject(authorization[7:].strip())
+            if subject:
+                return f"user:{subject}"
+
+        if self.trust_proxy:
+            forwarded = _header(scope, b"x-forwarded-for")
+            if forwarded:
+                return "ip:" + forwarded.split(",")[0].strip()
+
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.limiter.match(scope["path"], scope["method"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        identity = await self.identify(scope)
+        decision = await self.limiter.hit(rule, identity)
+        if self.on_decision is not None:
+            self.on_decision(decision, identity.split(":", 1)[0], time.perf_counter() - started)
+
+        headers = [
+            (b"x-ratelimit-limit", str(decision.limit).encode()),
+            (b"x-ratelimit-remaining", str(max(0, decision.remaining)).encode())
+        ] if decision.limit else []
+
+        if not decision.allowed:
+            retry_after = max(1, int(decision.retry_after + 0.999))
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded", "rule": decision.rule, "retry_after": retry_after},
+                status_code=429,
+                headers={"Retry-After": str(retry_after)}
+            )
+            response.raw_headers.extend(headers)
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -2,9 +2,14 @@
 """
 Redis Client for Data20 Knowledge Base
 Phase 5.1.8: Redis connection and caching layer
+
+RedisClient is synchronous (Celery workers, scripts); async endpoints use
+AsyncRedisClient (redis.asyncio) so Redis latency does not block the
+event loop.
 """
 
 import redis
+import redis.asyncio as aioredis
 import json
 import os
 import time
@@ -411,17 +416,20 @@ class RedisClient:
 
         Returns:
             True if request allowed, False if rate limited
+
+        Fixed window counter; API requests are limited by
+        rate_limit.RateLimitMiddleware (token bucket).
         """
         if not self.is_available():
             return True  # Allow if Redis unavailable
 
         try:
             pipe = self.client.pipeline()
-            now = int(time.time())
 
-            # Increment counter
+            # Increment counter; the window starts with the first request
+            # (EXPIRE NX does not extend it on later requests)
             pipe.incr(key)
-            pipe.expire(key, window)
+            pipe.expire(key, window, nx=True)
 
             result = pipe.execute()
             count = result[0]
@@ -477,6 +485,439 @@ class RedisClient:
                 pass
 
 
+# ========================
+# Async Client
+# ========================
+
+def _serialize(value: Any) -> str:
+    return json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+
+
+def _deserialize(value: Any) -> Any:
+    try:
+        return json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return value
+
+
+class AsyncRedisClient:
+    """
+    asyncio Redis client with the RedisClient API (methods are coroutines)
+
+    All instances created with the same URL share one connection pool.
+    Unlike RedisClient, operations do not ping first: a failed call marks
+    Redis unavailable for RETRY_AFTER seconds, and calls in that period
+    return defaults immediately instead of waiting on timeouts.
+
+    Usage:
+        redis_client = get_async_redis()
+
+        await redis_client.set("key", {"data": "value"}, ttl=3600)
+        data = await redis_client.get("key")
+
+        # Several keys in one round trip
+        values = await redis_client.mget(["job:1:status", "job:2:status"])
+    """
+
+    RETRY_AFTER = 5.0
+
+    _pools: Dict[str, aioredis.ConnectionPool] = {}
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        max_connections: Optional[int] = None
+    ):
+        """
+        Initialize async Redis client (connects lazily)
+
+        Args:
+            url: Redis connection URL (default: from env REDIS_URL)
+            max_connections: Pool size (default: from env REDIS_MAX_CONNECTIONS)
+        """
+        self.url = url or os.getenv(
+            "REDIS_URL",
+            "redis://localhost:6379/0"
+        )
+
+        pool = self._pools.get(self.url)
+        if pool is None:
+            pool = aioredis.ConnectionPool.from_url(
+                self.url,
+                decode_responses=True,
+                max_connections=max_connections or int(os.getenv("REDIS_MAX_CONNECTIONS", "50")),
+                socket_connect_timeout=5,
+                socket_timeout=float(os.getenv("REDIS_SOCKET_TIMEOUT", "2")),
+                socket_keepalive=True,
+                health_check_interval=30
+            )
+            self._pools[self.url] = pool
+
+        self.pool = pool
+        self.client = aioredis.Redis(connection_pool=pool)
+        self.connected = True
+        self._down_until = 0.0
+
+
+    def _usable(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+
+    def _failed(self, operation: str, error: Exception):
+        self.connected = False
+        self._down_until = time.monotonic() + self.RETRY_AFTER
+        print(f"⚠️  Redis {operation} failed: {error}")
+
+
+    async def is_available(self) -> bool:
+        """Check if Redis is available"""
+        if not self._usable():
+            return False
+
+        try:
+            await self.client.ping()
+            self.connected = True
+            return True
+        except Exception as e:
+            self._failed("PING", e)
+            return False
+
+
+    # ========================
+    # Key-Value Operations
+    # ========================
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Set a key-value pair (dict/list values are JSON serialized)"""
+        if not self._usable():
+            return False
+
+        try:
+            if ttl:
+                await self.client.setex(key, ttl, _serialize(value))
+            else:
+                await self.client.set(key, _serialize(value))
+            return True
+        except Exception as e:
+            self._failed(f"SET {key}", e)
+            return False
+
+
+    async def get(self, key: str, default: Any = None) -> Optional[Any]:
+        """Get a value by key"""
+        if not self._usable():
+            return default
+
+        try:
+            value = await self.client.get(key)
+        except Exception as e:
+            self._failed(f"GET {key}", e)
+            return default
+
+        return default if value is None else _deserialize(value)
+
+
+    async def delete(self, *keys: str) -> int:
+        """Delete one or more keys"""
+        if not keys or not self._usable():
+            return 0
+
+        try:
+            return await self.client.delete(*keys)
+        except Exception as e:
+            self._failed("DELETE", e)
+            return 0
+
+
+    async def exists(self, key: str) -> bool:
+        """Check if key exists"""
+        if not self._usable():
+            return False
+
+        try:
+            return bool(await self.client.exists(key))
+        except Exception as e:
+            self._failed("EXISTS", e)
+            return False
+
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        """Set expiration on a key"""
+        if not self._usable():
+            return False
+
+        try:
+            return bool(await self.client.expire(key, seconds))
+        except Exception as e:
+            self._failed("EXPIRE", e)
+            return False
+
+
+    # ========================
+    # Multi-key Operations
+    # ========================
+
+    async def mget(self, keys: List[str], default: Any = None) -> List[Any]:
+        """Get several keys in one round trip"""
+        if not keys:
+            return []
+        if not self._usable():
+            return [default] * len(keys)
+
+        try:
+            values = await self.client.mget(keys)
+        except Exception as e:
+            self._failed("MGET", e)
+            return [default] * len(keys)
+
+        return [default if value is None else _deserialize(value) for value in values]
+
+
+    async def mset(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Set several keys in one round trip (pipelined, with optional TTL)"""
+        if not mapping:
+            return True
+        if not self._usable():
+            return False
+
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    if ttl:
+                        pipe.setex(key, ttl, _serialize(value))
+                    else:
+                        pipe.set(key, _serialize(value))
+                await pipe.execute()
+            return True
+        except Exception as e:
+            self._failed("MSET", e)
+            return False
+
+
+    def pipeline(self, transaction: bool = False):
+        """
+        Raw pipeline for custom batches
+
+        Usage:
+            async with redis_client.pipeline() as pipe:
+                pipe.incr("counter")
+                pipe.expire("counter", 60)
+                results = await pipe.execute()
+        """
+        return self.client.pipeline(transaction=transaction)
+
+
+    # ========================
+    # Hash Operations
+    # ========================
+
+    async def hset(self, name: str, key: str, value: Any) -> bool:
+        """Set hash field"""
+        if not self._usable():
+            return False
+
+        try:
+            await self.client.hset(name, key, _serialize(value))
+            return True
+        except Exception as e:
+            self._failed("HSET", e)
+            return False
+
+
+    async def hget(self, name: str, key: str, default: Any = None) -> Optional[Any]:
+        """Get hash field"""
+        if not self._usable():
+            return default
+
+        try:
+            value = await self.client.hget(name, key)
+        except Exception as e:
+            self._failed("HGET", e)
+            return default
+
+        return default if value is None else _deserialize(value)
+
+
+    async def hgetall(self, name: str) -> Dict[str, Any]:
+        """Get all hash fields"""
+        if not self._usable():
+            return {}
+
+        try:
+            data = await self.client.hgetall(name)
+        except Exception as e:
+            self._failed("HGETALL", e)
+            return {}
+
+        return {k: _deserialize(v) for k, v in data.items()}
+
+
+    # ========================
+    # List Operations
+    # ========================
+
+    async def lpush(self, key: str, *values: Any) -> int:
+        """Push to list (left)"""
+        if not self._usable():
+            return 0
+
+        try:
+            return await self.client.lpush(key, *[_serialize(v) for v in values])
+        except Exception as e:
+            self._failed("LPUSH", e)
+            return 0
+
+
+    async def rpush(self, key: str, *values: Any) -> int:
+        """Push to list (right)"""
+        if not self._usable():
+            return 0
+
+        try:
+            return await self.client.rpush(key, *[_serialize(v) for v in values])
+        except Exception as e:
+            self._failed("RPUSH", e)
+            return 0
+
+
+    async def lrange(self, key: str, start: int = 0, end: int = -1) -> List[Any]:
+        """Get list range"""
+        if not self._usable():
+            return []
+
+        try:
+            values = await self.client.lrange(key, start, end)
+        except Exception as e:
+            self._failed("LRANGE", e)
+            return []
+
+        return [_deserialize(v) for v in values]
+
+
+    # ========================
+    # Pub/Sub Operations
+    # ========================
+
+    async def publish(self, channel: str, message: Any) -> int:
+        """Publish message to channel (dict/list messages are JSON serialized)"""
+        if not self._usable():
+            return 0
+
+        try:
+            return await self.client.publish(channel, _serialize(message))
+        except Exception as e:
+            self._failed("PUBLISH", e)
+            return 0
+
+
+    async def subscribe(self, *channels: str):
+        """
+        Subscribe to channels
+
+        Usage:
+            pubsub = await redis_client.subscribe("job_updates")
+            async for message in pubsub.listen():
+                print(message)
+        """
+        if not self._usable():
+            return None
+
+        try:
+            pubsub = self.client.pubsub()
+            await pubsub.subscribe(*channels)
+            return pubsub
+        except Exception as e:
+            self._failed("SUBSCRIBE", e)
+            return None
+
+
+    # ========================
+    # Cache Helpers
+    # ========================
+
+    async def cache_tool_registry(self, registry_data: dict, ttl: int = 3600) -> bool:
+        """Cache tool registry"""
+        return await self.set("tool_registry", registry_data, ttl=ttl)
+
+
+    async def get_cached_tool_registry(self) -> Optional[dict]:
+        """Get cached tool registry"""
+        return await self.get("tool_registry")
+
+
+    async def cache_job_status(self, job_id: str, status: dict, ttl: int = 300) -> bool:
+        """Cache job status"""
+        return await self.set(f"job:{job_id}:status", status, ttl=ttl)
+
+
+    async def get_cached_job_status(self, job_id: str) -> Optional[dict]:
+        """Get cached job status"""
+        return await self.get(f"job:{job_id}:status")
+
+
+    async def get_cached_job_statuses(self, job_ids: List[str]) -> Dict[str, dict]:
+        """Get cached statuses of several jobs in one round trip"""
+        values = await self.mget([f"job:{job_id}:status" for job_id in job_ids])
+        return {job_id: value for job_id, value in zip(job_ids, values) if value is not None}
+
+
+    async def publish_job_update(self, job_id: str, update: dict, status: dict, ttl: int = 300) -> bool:
+        """Publish a job update and cache its status in one round trip"""
+        if not self._usable():
+            return False
+
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.publish("job_updates", _serialize(update))
+                pipe.setex(f"job:{job_id}:status", ttl, _serialize(status))
+                await pipe.execute()
+            return True
+        except Exception as e:
+            self._failed("job update", e)
+            return False
+
+
+    async def clear_job_cache(self, job_id: str) -> int:
+        """Clear all cache for a job"""
+        return await self.delete(f"job:{job_id}:status")
+
+
+    # ========================
+    # Health & Stats
+    # ========================
+
+    async def get_info(self) -> dict:
+        """Get Redis server info"""
+        if not self._usable():
+            return {"connected": False}
+
+        try:
+            info = await self.client.info()
+        except Exception as e:
+            self._failed("INFO", e)
+            return {"connected": False}
+
+        self.connected = True
+        return {
+            "connected": True,
+            "version": info.get("redis_version"),
+            "used_memory": info.get("used_memory_human"),
+            "connected_clients": info.get("connected_clients"),
+            "uptime_days": info.get("uptime_in_days")
+        }
+
+
+    async def close(self):
+        """Close the client and its connection pool"""
+        try:
+            await self.client.aclose()
+            await self.pool.disconnect()
+        except Exception:
+            pass
+        self._pools.pop(self.url, None)
+        self.connected = False
+
+
 # ========================
 # Singleton Instance
 # ========================
@@ -504,6 +945,29 @@ def close_redis():
         _redis_client = None
 
 
+# Global async Redis client instance
+_async_redis_client: Optional[AsyncRedisClient] = None
+
+
+def get_async_redis() -> AsyncRedisClient:
+    """Get singleton async Redis client"""
+    global _async_redis_client
+
+    if _async_redis_client is None:
+        _async_redis_client = AsyncRedisClient()
+
+    return _async_redis_client
+
+
+async def close_async_redis():
+    """Close async Redis connection pool"""
+    global _async_redis_client
+
+    if _async_redis_client:
+        await _async_redis_client.close()
+        _async_redis_client = None
+
+
 # ========================
 # Testing
 # ========================
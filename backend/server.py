@@ -4,16 +4,17 @@ FastAPI Backend Server for Data20 Knowledge Base
 Phase 5.2.1: JWT Authentication Integration
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks, Depends, Response
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
-from pydantic import BaseModel, EmailStr
-from typing import Optional, Dict, Any, List
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel, EmailStr, Field
+from typing import Optional, Dict, Any, List, Union
 from pathlib import Path
 from sqlalchemy.orm import Session
 import asyncio
 import json
+import mimetypes
 from datetime import datetime
 import os
 import time
@@ -28,9 +29,10 @@ from logger import (
 # Prometheus metrics
 from metrics import (
     init_metrics, get_metrics, get_metrics_content_type,
-    update_system_metrics, update_db_pool_metrics, update_redis_metrics,
+    update_system_metrics, update_db_pool_metrics, update_redis_metrics_async, update_admission_metrics,
+    admission_rejected_total, admission_wait_seconds,
     http_requests_total, http_request_duration_seconds, http_errors_total,
-    tool_executions_total, tool_execution_duration_seconds,
+    tool_executions_total, tool_execution_duration_seconds, record_tool_resources, record_rate_limit,
     record_cache_access, track_tool_execution
 )
 
@@ -38,18 +40,28 @@ from metrics import (
 from auth import (
     get_password_hash, authenticate_user, create_tokens_for_user,
     get_current_user, get_current_active_user, get_current_user_optional,
-    refresh_access_token, require_admin, require_user
+    refresh_access_token, require_admin, require_user, invalidate_user, security, verify_token
 )
 
 from tool_registry import ToolRegistry, ToolCategory
 from tool_runner import ToolRunner, JobStatus as RunnerJobStatus
+from job_scheduler import JobScheduler
+from admission import AdmissionController, AdmissionRejected
+from rate_limit import RateLimiter, RateLimitMiddleware
+from tool_stats import record_job_stats, stats_to_dict
+from file_serving import PrecompressedStaticFiles, FileRangeResponse, accepted_encodings, etag_matches, parse_range
 from database import get_db, check_database_connection, init_database, engine
 from models import Job as DBJob, JobResult as DBJobResult, JobLog as DBJobLog, JobStatus as DBJobStatus, User, UserRole
-from redis_client import get_redis, close_redis
+from models import ToolStats
+from models import Workflow, WorkflowRun
+from models import APIKey
+from workflow_engine import WorkflowExecutor, parse_steps
+from redis_client import get_redis, close_redis, get_async_redis, close_async_redis
 
 # Celery imports
 try:
     from celery_tasks import run_tool_task, get_active_tasks, get_worker_stats, revoke_task
+    from celery_tasks import run_workflow_task, build_workflow_canvas
     CELERY_AVAILABLE = True
 except ImportError:
     CELERY_AVAILABLE = False
@@ -105,6 +117,7 @@ class ToolRunRequest(BaseModel):
     """Запрос на запуск инструмента"""
     tool_name: str
     parameters: Dict[str, Any] = {}
+    priority: int = Field(5, ge=1, le=10)  # Job.priority: больше - важнее
 
 
 class ToolRunResponse(BaseModel):
@@ -113,6 +126,8 @@ class ToolRunResponse(BaseModel):
     tool_name: str
     status: str
     message: str
+    queue: Optional[str] = None
+    estimated_duration: Optional[float] = None
 
 
 class JobStatusResponse(BaseModel):
@@ -126,7 +141,8 @@ class JobStatusResponse(BaseModel):
     started_at: Optional[str] = None
     completed_at: Optional[str] = None
     duration: Optional[float] = None
-    output_files: List[str] = []
+    output_files: List[Union[Dict[str, Any], str]] = []  # Ссылки на артефакты (старые задачи - пути)
+    resources: Optional[Dict[str, Any]] = None  # Пиковая память, CPU, ввод-вывод
 
 
 # ========================
@@ -151,6 +167,38 @@ app = FastAPI(
     version="5.2.3"
 )
 
+def _token_subject(token: str) -> Optional[str]:
+    """User ID from a valid access token (verification is memoized)"""
+    try:
+        payload = verify_token(token)
+    except HTTPException:
+        return None
+    return payload.get("sub") if payload.get("type") == "access" else None
+
+
+# Rate limiting (inside logging and CORS: 429 responses are logged and get CORS headers)
+def _api_key_valid(key_hash: str) -> bool:
+    """Active, unexpired APIKey with this SHA-256 hash (unknown keys are limited by JWT or IP)"""
+    from database import get_db_context
+
+    try:
+        with get_db_context() as db:
+            api_key = db.query(APIKey).filter(APIKey.key_hash == key_hash, APIKey.is_active.is_(True)).first()
+            return api_key is not None and (api_key.expires_at is None or api_key.expires_at > datetime.utcnow())
+    except Exception as e:
+        logger.warning("api_key_check_failed", error=str(e))
+        return False
+
+
+rate_limiter = RateLimiter(redis=get_async_redis())
+app.add_middleware(
+    RateLimitMiddleware,
+    limiter=rate_limiter,
+    token_subject=_token_subject,
+    api_key_valid=_api_key_valid,
+    on_decision=record_rate_limit
+)
+
 # Logging middleware (first!)
 app.add_middleware(LoggingMiddleware)
 
@@ -170,6 +218,8 @@ static_dir = Path(__file__).parent.parent / "static_site" / "public"
 
 registry = ToolRegistry(tools_dir)
 runner = ToolRunner(tools_dir, output_dir)
+scheduler = JobScheduler(registry, redis=get_redis())
+admission = AdmissionController(redis=get_redis())
 
 # WebSocket connections
 active_connections: List[WebSocket] = []
@@ -214,10 +264,10 @@ async def startup_event():
         logger.warning("database_unavailable", message="Running without persistence")
 
     # Проверить подключение к Redis
-    redis = get_redis()
-    redis_connected = redis.is_available()
+    redis = get_async_redis()
+    redis_connected = await redis.is_available()
     if redis_connected:
-        redis_info = redis.get_info()
+        redis_info = await redis.get_info()
         logger.info(
             "redis_connected",
             version=redis_info.get('version'),
@@ -239,7 +289,7 @@ async def startup_event():
 
     # Кэшировать реестр в Redis
     if redis_connected:
-        if redis.cache_tool_registry(registry_data, ttl=3600):
+        if await redis.cache_tool_registry(registry_data, ttl=3600):
             logger.info("registry_cached", ttl_seconds=3600)
 
     # Initialize Prometheus metrics
@@ -285,6 +335,7 @@ async def shutdown_event():
     # Закрыть Redis
     try:
         close_redis()
+        await close_async_redis()
         logger.info("redis_closed")
     except Exception as e:
         logger.warning("redis_close_failed", error=str(e))
@@ -335,8 +386,9 @@ async def metrics():
     update_system_metrics()
     update_db_pool_metrics(engine)
 
-    redis = get_redis()
-    update_redis_metrics(redis)
+    await update_redis_metrics_async(get_async_redis())
+    # Счётчики admission - синхронный Redis, вне event loop
+    await asyncio.to_thread(update_admission_metrics, admission)
 
     # Get metrics
     metrics_data = get_metrics()
@@ -491,9 +543,12 @@ async def update_current_user(
     Currently only supports updating full_name
     """
     if full_name is not None:
+        # current_user may be a cached snapshot - update the stored row
+        current_user = db.query(User).filter(User.id == current_user.id).first()
         current_user.full_name = full_name
         db.commit()
         db.refresh(current_user)
+        invalidate_user(current_user.id)
         logger.info("user_profile_updated", user_id=str(current_user.id), field="full_name")
 
     return UserResponse(
@@ -508,13 +563,18 @@ async def update_current_user(
 
 
 @app.post("/auth/logout")
-async def logout(current_user: User = Depends(get_current_active_user)):
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_active_user)
+):
     """
     Logout current user
 
+    Drops the cached user and the memoized verification of this token.
     Note: JWT tokens are stateless, so this is a placeholder for future
     token blacklisting implementation. Client should discard tokens.
     """
+    invalidate_user(current_user.id, token=credentials.credentials)
     logger.info("user_logout", user_id=str(current_user.id), username=current_user.username)
     return {"message": "Logged out successfully. Please discard your tokens."}
 
@@ -624,6 +684,7 @@ async def update_user_role(
     user.role = new_role
     db.commit()
     db.refresh(user)
+    invalidate_user(user.id)
 
     logger.info(
         "user_role_updated",
@@ -683,6 +744,7 @@ async def update_user_status(
     user.is_active = request.is_active
     db.commit()
     db.refresh(user)
+    invalidate_user(user.id)
 
     logger.info(
         "user_status_updated",
@@ -729,10 +791,12 @@ async def delete_user(
 
     username = user.username
     role = user.role.value
+    deleted_id = user.id
 
     # Delete user
     db.delete(user)
     db.commit()
+    invalidate_user(deleted_id)
 
     logger.info(
         "user_deleted",
@@ -758,13 +822,12 @@ async def get_all_tools():
     """Получить список всех инструментов (с кэшированием)"""
 
     # Попытаться получить из Redis cache
-    redis = get_redis()
-    if redis.is_available():
-        cached = redis.get_cached_tool_registry()
-        if cached:
-            # Record cache hit
-            record_cache_access("tool_registry", hit=True)
-            return cached
+    redis = get_async_redis()
+    cached = await redis.get_cached_tool_registry()
+    if cached:
+        # Record cache hit
+        record_cache_access("tool_registry", hit=True)
+        return cached
 
     # Cache miss
     record_cache_access("tool_registry", hit=False)
@@ -773,8 +836,7 @@ async def get_all_tools():
     registry_data = registry.to_json()
 
     # Обновить cache
-    if redis.is_available():
-        redis.cache_tool_registry(registry_data, ttl=3600)
+    await redis.cache_tool_registry(registry_data, ttl=3600)
 
     return registry_data
 
@@ -919,6 +981,7 @@ async def run_tool(
         tool_name=request.tool_name,
         parameters=request.parameters,
         status=DBJobStatus.PENDING,
+        priority=request.priority,
         user_id=str(current_user.id) if current_user else None
     )
 
@@ -936,13 +999,30 @@ async def run_tool(
         # ========================================
         # Celery Execution (Distributed)
         # ========================================
+        user_id = str(current_user.id) if current_user else None
         try:
-            # Запустить задачу через Celery
-            task = run_tool_task.delay(
-                job_id=job_id,
-                tool_name=request.tool_name,
-                parameters=request.parameters
+            # Очередь по оценке длительности, приоритет с учётом fair-share
+            decision = await asyncio.to_thread(
+                scheduler.schedule, request.tool_name, priority=request.priority, user_id=user_id, job_id=job_id
             )
+            logger.info("job_scheduled", job_id=job_id, **decision.to_dict())
+
+            # Запустить задачу через Celery
+            try:
+                task = run_tool_task.apply_async(
+                    kwargs={
+                        "job_id": job_id,
+                        "tool_name": request.tool_name,
+                        "parameters": request.parameters,
+                        "user_id": user_id,
+                        "scheduled": True
+                    },
+                    queue=decision.queue,
+                    priority=decision.priority
+                )
+            except Exception:
+                await asyncio.to_thread(scheduler.job_finished, user_id, job_id)
+                raise
 
             # Сохранить Celery task ID
             try:
@@ -950,6 +1030,7 @@ async def run_tool(
                 if db_job_update:
                     db_job_update.celery_task_id = task.id
                     db_job_update.status = DBJobStatus.QUEUED
+                    db_job_update.queued_at = datetime.utcnow()
                     db.commit()
             except:
                 pass
@@ -958,7 +1039,9 @@ async def run_tool(
                 job_id=job_id,
                 tool_name=request.tool_name,
                 status="queued",
-                message=f"Tool {request.tool_name} queued for execution (Celery task: {task.id})"
+                message=f"Tool {request.tool_name} queued for execution (Celery task: {task.id})",
+                queue=decision.queue,
+                estimated_duration=decision.estimated_duration
             )
 
         except Exception as e:
@@ -968,8 +1051,33 @@ async def run_tool(
     # ========================================
     # Fallback Execution (Local BackgroundTasks)
     # ========================================
+
+    # Не больше лимитов одновременных процессов: ждать слот в ограниченной очереди
+    try:
+        slot = await admission.acquire(request.tool_name, str(current_user.id) if current_user else None)
+    except AdmissionRejected as e:
+        admission_rejected_total.labels(reason=e.reason, scope=e.scope or "global").inc()
+        logger.warning("job_rejected", job_id=job_id, tool_name=request.tool_name,
+                       reason=e.reason, scope=e.scope)
+        try:
+            db.delete(db_job)
+            db.commit()
+        except Exception:
+            pass
+
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many running jobs ({e.scope or 'global'} limit), retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    admission_wait_seconds.observe(slot.waited)
+
     async def run_in_background():
-        result = await runner.run_tool(request.tool_name, request.parameters)
+        try:
+            result = await runner.run_tool(request.tool_name, request.parameters, job_id=job_id)
+        finally:
+            await asyncio.to_thread(admission.release, slot)
 
         # Record tool execution metrics
         status_str = "completed" if result.status == RunnerJobStatus.COMPLETED else "failed"
@@ -977,6 +1085,7 @@ async def run_tool(
 
         if result.duration:
             tool_execution_duration_seconds.labels(tool_name=request.tool_name).observe(result.duration)
+        record_tool_resources(request.tool_name, result.resources)
 
         # Сохранить результат в БД (с новой сессией)
         from database import get_db_context
@@ -989,6 +1098,7 @@ async def run_tool(
                     db_job_update.started_at = result.started_at
                     db_job_update.completed_at = result.completed_at
                     db_job_update.duration = result.duration
+                    record_job_stats(bg_db, db_job_update)
 
                     # Создать result
                     db_result = DBJobResult(
@@ -997,11 +1107,12 @@ async def run_tool(
                         stderr=result.error,
                         return_code=result.return_code,
                         output_files=result.output_files,
-                        total_size=sum(
-                            (output_dir / f).stat().st_size
-                            for f in result.output_files
-                            if (output_dir / f).exists()
-                        )
+                        total_size=sum(f["size"] for f in result.output_files),
+                        memory_used=result.resources.get("peak_rss_mb"),
+                        cpu_percent=result.resources.get("cpu_percent"),
+                        cpu_time=result.resources.get("cpu_seconds"),
+                        io_read_bytes=result.resources.get("io_read_bytes"),
+                        io_write_bytes=result.resources.get("io_write_bytes")
                     )
                     bg_db.add(db_result)
 
@@ -1015,21 +1126,16 @@ async def run_tool(
         except Exception as e:
             logger.warning("job_save_failed", job_id=job_id, error=str(e))
 
-        # Опубликовать обновление в Redis pub/sub
-        redis = get_redis()
-        if redis.is_available():
-            redis.publish("job_updates", {
-                "job_id": job_id,
-                "status": result.status.value,
-                "completed_at": result.completed_at.isoformat() if result.completed_at else None
-            })
-
-            # Кэшировать финальный статус
-            redis.cache_job_status(job_id, {
-                "status": result.status.value,
-                "output_files": result.output_files,
-                "duration": result.duration
-            }, ttl=600)  # 10 минут
+        # Опубликовать обновление в Redis pub/sub и кэшировать финальный статус
+        await get_async_redis().publish_job_update(job_id, {
+            "job_id": job_id,
+            "status": result.status.value,
+            "completed_at": result.completed_at.isoformat() if result.completed_at else None
+        }, {
+            "status": result.status.value,
+            "output_files": result.output_files,
+            "duration": result.duration
+        }, ttl=600)  # 10 минут
 
     background_tasks.add_task(run_in_background)
 
@@ -1175,7 +1281,8 @@ async def get_job_status(
             started_at=job.started_at.isoformat() if job.started_at else None,
             completed_at=job.completed_at.isoformat() if job.completed_at else None,
             duration=job.duration,
-            output_files=job.output_files
+            output_files=job.output_files,
+            resources=job.resources or None
         )
 
     # Проверить в БД (завершённые задачи)
@@ -1208,7 +1315,14 @@ async def get_job_status(
                 started_at=db_job.started_at.isoformat() if db_job.started_at else None,
                 completed_at=db_job.completed_at.isoformat() if db_job.completed_at else None,
                 duration=db_job.duration,
-                output_files=db_result.output_files if db_result else []
+                output_files=db_result.output_files if db_result else [],
+                resources={
+                    "peak_rss_mb": db_result.memory_used,
+                    "cpu_percent": db_result.cpu_percent,
+                    "cpu_seconds": db_result.cpu_time,
+                    "io_read_bytes": db_result.io_read_bytes,
+                    "io_write_bytes": db_result.io_write_bytes
+                } if db_result and db_result.memory_used is not None else None
             )
     except HTTPException:
         raise
@@ -1276,6 +1390,97 @@ async def get_job_logs(
         return {"job_id": job_id, "total": 0, "logs": []}
 
 
+@app.get("/api/jobs/{job_id}/artifacts/{name:path}")
+async def get_job_artifact(
+    job_id: str,
+    name: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """
+    Download a job output file from the artifact store
+
+    Authorization: same as job logs
+    """
+    is_admin = current_user and current_user.role == UserRole.ADMIN
+
+    db_job = db.query(DBJob).filter(DBJob.id == job_id).first()
+    if not db_job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    if not is_admin:
+        current_user_id = str(current_user.id) if current_user else None
+        if db_job.user_id != current_user_id:
+            # Return 404 instead of 403 to not leak job existence
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    # Ссылки на артефакты - из БД, пока результат не записан - из памяти
+    output_files = None
+    db_result = db.query(DBJobResult).filter(DBJobResult.job_id == job_id).first()
+    if db_result:
+        output_files = db_result.output_files or []
+    else:
+        job = runner.get_job(job_id)
+        if job:
+            output_files = job.output_files
+
+    if output_files is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    ref = next((f for f in output_files if isinstance(f, dict) and f.get("name") == name), None)
+    if ref is None:
+        raise HTTPException(status_code=404, detail=f"Artifact {name} not found")
+
+    found = runner.artifacts.find_blob(ref["sha256"])
+    if found is None:
+        raise HTTPException(status_code=404, detail=f"Artifact {name} not found")
+
+    blob_path, compression = found
+
+    # Blob неизменяем: ETag - хэш содержимого (и кодировка представления)
+    gzip_passthrough = compression == "gzip" and "gzip" in accepted_encodings(request.headers.get("accept-encoding"))
+    etag = f'"{ref["sha256"]}-gzip"' if gzip_passthrough else f'"{ref["sha256"]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, max-age=31536000, immutable",
+        "Vary": "Accept-Encoding"
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = f'inline; filename="{Path(name).name}"'
+    media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+    if gzip_passthrough or compression is None:
+        # Blob отдаётся как есть, кусками из файла; Range - по байтам
+        # представления (при gzip - по сжатым байтам, как у серверов статики)
+        if gzip_passthrough:
+            headers["Content-Encoding"] = "gzip"
+        headers["Accept-Ranges"] = "bytes"
+        size = blob_path.stat().st_size
+
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if range_header is not None and (if_range is None or if_range.strip() == etag):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                return Response(status_code=416, headers={"Content-Range": f"bytes */{size}", "ETag": etag})
+            if byte_range is not None:
+                start, end = byte_range
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                return FileRangeResponse(blob_path, start, end, status_code=206,
+                                         headers=headers, media_type=media_type)
+
+        return FileRangeResponse(blob_path, 0, size - 1, headers=headers, media_type=media_type)
+
+    # Распаковка потоком: синхронный итератор StreamingResponse читает в пуле потоков
+    headers["Content-Length"] = str(ref["size"])
+    return StreamingResponse(runner.artifacts.iter_bytes(ref["sha256"]), media_type=media_type, headers=headers)
+
+
 @app.delete("/api/jobs/{job_id}")
 async def cancel_job(
     job_id: str,
@@ -1317,26 +1522,146 @@ async def cancel_job(
     return {"message": f"Job {job_id} cancelled"}
 
 
+# ========================
+# Workflows
+# ========================
+
+class WorkflowRunRequest(BaseModel):
+    """Workflow run options"""
+    mode: str = "local"  # "local" - все шаги на одном воркере, "chord" - уровни DAG как Celery chord-ы
+    max_parallel: Optional[int] = None
+
+
+@app.post("/api/workflows/{workflow_id}/run")
+async def run_workflow(
+    workflow_id: str,
+    options: WorkflowRunRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Run a workflow: independent steps in parallel, unchanged steps from cache
+
+    Returns workflow_run_id; per-step records appear in GET /api/workflows/runs/{run_id}
+    """
+    workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
+    if not workflow or (workflow.user_id != current_user.id and not workflow.is_public
+                        and current_user.role != UserRole.ADMIN):
+        raise HTTPException(status_code=404, detail=f"Workflow {workflow_id} not found")
+
+    try:
+        parse_steps(workflow.steps)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    run = WorkflowRun(workflow_id=workflow.id, user_id=current_user.id, status=DBJobStatus.PENDING, job_ids=[])
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+    run_id = str(run.id)
+
+    logger.info("workflow_run_created", workflow_id=workflow_id, workflow_run_id=run_id,
+                steps=len(workflow.steps), mode=options.mode)
+
+    if CELERY_AVAILABLE:
+        try:
+            if options.mode == "chord":
+                run.status = DBJobStatus.RUNNING
+                run.started_at = datetime.utcnow()
+                db.commit()
+                build_workflow_canvas(run_id, workflow.steps).apply_async()
+            else:
+                run.status = DBJobStatus.QUEUED
+                db.commit()
+                run_workflow_task.delay(run_id, options.max_parallel)
+
+            return {"workflow_run_id": run_id, "status": "queued", "mode": options.mode}
+        except Exception as e:
+            print(f"⚠️  Celery execution failed, falling back to local: {e}")
+
+    # Fallback: локальное выполнение в фоне
+    steps = list(workflow.steps)
+
+    async def run_in_background():
+        from database import get_db_context
+
+        def save(records, **fields):
+            try:
+                with get_db_context() as bg_db:
+                    bg_run = bg_db.query(WorkflowRun).filter(WorkflowRun.id == run.id).first()
+                    if bg_run:
+                        bg_run.job_ids = list(records)
+                        for key, value in fields.items():
+                            setattr(bg_run, key, value)
+            except Exception as e:
+                logger.warning("workflow_run_save_failed", workflow_run_id=run_id, error=str(e))
+
+        started_at = datetime.utcnow()
+        records = []
+        save(records, status=DBJobStatus.RUNNING, started_at=started_at)
+
+        def on_step(record):
+            records.append(record)
+            save(records)
+
+        executor = WorkflowExecutor(runner, max_parallel=options.max_parallel)
+        try:
+            result = await executor.run(steps, on_step=on_step)
+        except Exception as e:
+            logger.error("workflow_run_failed", workflow_run_id=run_id, error=str(e))
+            save(records, status=DBJobStatus.FAILED, completed_at=datetime.utcnow(),
+                 duration=(datetime.utcnow() - started_at).total_seconds())
+            return
+
+        save(result["steps"],
+             status=DBJobStatus.COMPLETED if result["status"] == "completed" else DBJobStatus.FAILED,
+             completed_at=datetime.utcnow(),
+             duration=result["duration"])
+
+    background_tasks.add_task(run_in_background)
+
+    return {"workflow_run_id": run_id, "status": "pending", "mode": "local"}
+
+
+@app.get("/api/workflows/runs/{run_id}")
+async def get_workflow_run(
+    run_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Workflow run status with per-step timing (WorkflowRun.job_ids)"""
+    run = db.query(WorkflowRun).filter(WorkflowRun.id == run_id).first()
+    if not run or (run.user_id != current_user.id and current_user.role != UserRole.ADMIN):
+        raise HTTPException(status_code=404, detail=f"Workflow run {run_id} not found")
+
+    steps = run.job_ids or []
+    return {
+        "workflow_run_id": str(run.id),
+        "workflow_id": str(run.workflow_id),
+        "status": run.status.value if hasattr(run.status, "value") else run.status,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "completed_at": run.completed_at.isoformat() if run.completed_at else None,
+        "duration": run.duration,
+        "steps": steps,
+        "cached_steps": sum(1 for step in steps if step.get("cached"))
+    }
+
+
 @app.get("/api/stats")
 async def get_system_stats(db: Session = Depends(get_db)):
     """Получить статистику системы + БД + Redis"""
     stats = runner.get_system_stats()
 
-    # Добавить статистику из БД
+    # Добавить статистику из БД (готовые строки ToolStats, без сканирования jobs)
     try:
-        total_jobs_db = db.query(DBJob).count()
-        completed_jobs_db = db.query(DBJob).filter(DBJob.status == DBJobStatus.COMPLETED).count()
-        failed_jobs_db = db.query(DBJob).filter(DBJob.status == DBJobStatus.FAILED).count()
+        tool_stats = db.query(ToolStats).order_by(ToolStats.total_runs.desc()).all()
+        total_jobs_db = sum(row.total_runs or 0 for row in tool_stats)
+        completed_jobs_db = sum(row.successful_runs or 0 for row in tool_stats)
+        failed_jobs_db = sum(row.failed_runs or 0 for row in tool_stats)
 
         # Топ 5 инструментов
-        from sqlalchemy import func
-        top_tools = db.query(
-            DBJob.tool_name,
-            func.count(DBJob.id).label('count')
-        ).group_by(DBJob.tool_name)\
-         .order_by(func.count(DBJob.id).desc())\
-         .limit(5)\
-         .all()
+        top_tools = [(row.tool_name, row.total_runs or 0) for row in tool_stats[:5]]
 
         stats["database"] = {
             "connected": True,
@@ -1357,12 +1682,24 @@ async def get_system_stats(db: Session = Depends(get_db)):
         }
 
     # Добавить статистику Redis
-    redis = get_redis()
-    stats["redis"] = redis.get_info()
+    stats["redis"] = await get_async_redis().get_info()
+
+    # Слоты и очередь admission control (счётчики в Redis - синхронный клиент, в потоке)
+    stats["admission"] = await asyncio.to_thread(admission.get_stats)
+
+    # Лимиты частоты запросов
+    stats["rate_limit"] = rate_limiter.get_stats()
 
     return stats
 
 
+@app.get("/api/stats/tools")
+async def get_tool_stats(db: Session = Depends(get_db)):
+    """Статистика инструментов: запуски, средняя длительность, p50/p95 (ToolStats)"""
+    rows = db.query(ToolStats).order_by(ToolStats.total_runs.desc()).all()
+    return {"tools": [stats_to_dict(row) for row in rows]}
+
+
 @app.post("/api/cleanup")
 async def cleanup_old_jobs(max_age_hours: int = 24):
     """Удалить старые завершённые задачи"""
@@ -1510,7 +1847,7 @@ async def broadcast_message(message: dict):
 # ========================
 
 if static_dir.exists():
-    app.mount("/app", StaticFiles(directory=str(static_dir), html=True), name="static")
+    app.mount("/app", PrecompressedStaticFiles(directory=str(static_dir), html=True), name="static")
 
 
 # ========================
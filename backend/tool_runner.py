@@ -2,20 +2,46 @@
 """
 Tool Runner - Выполнение Python инструментов с отслеживанием прогресса
 Phase 4.3: Асинхронное выполнение инструментов
+
+Каждая задача выполняется в своей рабочей директории (JobWorkspace), а
+созданные ею файлы сохраняются в контентно-адресуемом хранилище
+(artifact_store.py) - параллельные задачи не перезаписывают результаты
+друг друга.
+
+Пока задача выполняется, ProcessTreeSampler с заданным интервалом
+опрашивает дерево её процессов (psutil): пиковая RSS, процессорное время,
+чтение/запись - JobResult.resources. Итог дополняется rusage процесса
+при завершении (os.wait4) - учитываются и задачи короче интервала опроса.
 """
 
 import subprocess
 import asyncio
+import os
+import sys
 import time
 import json
+import shutil
+import tempfile
 import psutil
 from pathlib import Path
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, Callable, List
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 import uuid
 
+from artifact_store import ArtifactStore
+from file_serving import precompress
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# ioctl FICLONE (linux/fs.h): reflink - общие блоки до первой записи
+FICLONE = 0x40049409
+
 
 class JobStatus(str, Enum):
     """Статус выполнения задачи"""
@@ -38,16 +64,370 @@ class JobResult:
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     duration: Optional[float] = None
-    output_files: list = field(default_factory=list)
+    output_files: list = field(default_factory=list)  # Ссылки на артефакты (ArtifactStore)
     progress: int = 0
+    resources: Dict[str, Any] = field(default_factory=dict)  # ProcessTreeSampler.usage()
+
+
+def clone_file(src, dst):
+    """Копия файла: reflink, если поддерживается файловой системой, иначе copy2"""
+    if FCNTL_AVAILABLE:
+        try:
+            with open(src, 'rb') as source, open(dst, 'wb') as target:
+                fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            pass
+
+    return shutil.copy2(src, dst)
+
+
+def wait_with_rusage(process: subprocess.Popen):
+    """
+    Дождаться процесса через os.wait4: rusage самого процесса и всех
+    потомков, которых он дождался (None - процесс уже подобран poll())
+    """
+    if not hasattr(os, "wait4"):
+        process.wait()
+        return None
+
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        process.wait()
+        return None
+
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return rusage
+
+
+class ProcessTreeSampler:
+    """
+    Периодический опрос дерева процессов задачи
+
+    Пиковая память - максимум суммарной RSS процесса и всех его потомков
+    на момент опроса. Процессорное время и ввод-вывод накапливаются по
+    каждому процессу (последнее увиденное значение), поэтому учитываются
+    и потомки, завершившиеся между опросами (если их застал хотя бы один
+    опрос).
+
+    Итоговое измерение (record_exit) - rusage завершившегося процесса: оно
+    покрывает процесс и дождавшихся потомков, в том числе не застанных
+    опросом; опрошенные значения остаются только для потомков, переживших
+    процесс.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+
+        # (pid, create_time) -> [cpu_seconds, read_bytes, write_bytes]
+        self.totals: Dict[tuple, List[float]] = {}
+        self.peak_rss = 0
+        self.peak_processes = 0
+        self.samples = 0
+
+        self._started = time.monotonic()
+        self._wall_time: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def sample(self):
+        """Один опрос: процесс и все его потомки"""
+        try:
+            root = psutil.Process(self.pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return
+
+        rss = 0
+        alive = 0
+        for process in processes:
+            try:
+                with process.oneshot():
+                    key = (process.pid, process.create_time())
+                    cpu = process.cpu_times()
+                    rss += process.memory_info().rss
+                    try:
+                        io = process.io_counters()
+                        read_bytes, write_bytes = io.read_bytes, io.write_bytes
+                    except (AttributeError, psutil.AccessDenied):
+                        read_bytes = write_bytes = 0
+            except psutil.Error:
+                continue  # Процесс завершился во время опроса
+
+            self.totals[key] = [cpu.user + cpu.system, read_bytes, write_bytes]
+            alive += 1
+
+        self.samples += 1
+        self.peak_rss = max(self.peak_rss, rss)
+        self.peak_processes = max(self.peak_processes, alive)
+
+    def record_exit(self, rusage):
+        """Итоговое измерение по rusage из os.wait4"""
+        survivors = {}
+        for key, total in self.totals.items():
+            pid, create_time = key
+            if pid == self.pid:
+                continue
+            try:
+                if psutil.Process(pid).create_time() == create_time:
+                    survivors[key] = total
+            except psutil.Error:
+                pass  # Завершился раньше - учтён в rusage процесса
+
+        survivors[(self.pid, "exit")] = [
+            rusage.ru_utime + rusage.ru_stime,
+            rusage.ru_inblock * 512,
+            rusage.ru_oublock * 512
+        ]
+        self.totals = survivors
+
+        # ru_maxrss - максимум по отдельным процессам (Linux - KB, macOS - байты)
+        max_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+        self.peak_rss = max(self.peak_rss, max_rss)
+        self.peak_processes = max(self.peak_processes, 1)
+
+    async def _run(self):
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._started = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Остановить опрос (процесс завершился или задача отменена)"""
+        self._wall_time = time.monotonic() - self._started
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def usage(self) -> Dict[str, Any]:
+        """Итог для JobResult.resources"""
+        wall_time = self._wall_time if self._wall_time is not None else time.monotonic() - self._started
+        cpu_seconds = sum(total[0] for total in self.totals.values())
+
+        return {
+            "peak_rss_mb": round(self.peak_rss / (1024 * 1024), 2),
+            "cpu_seconds": round(cpu_seconds, 3),
+            "cpu_percent": round(cpu_seconds / wall_time * 100, 1) if wall_time > 0 else 0.0,
+            "io_read_bytes": int(sum(total[1] for total in self.totals.values())),
+            "io_write_bytes": int(sum(total[2] for total in self.totals.values())),
+            "wall_time": round(wall_time, 3),
+            "peak_processes": self.peak_processes,
+            "samples": self.samples
+        }
+
+
+class JobWorkspace:
+    """
+    Отдельная рабочая директория задачи
+
+    Инструменты пишут результаты в root_dir = Path(__file__).parent.parent.
+    Инструмент запускается как <workspace>/tools/<name>.py, где tools -
+    символическая ссылка, поэтому его root_dir - рабочая директория задачи:
+    - директории данных (PRIVATE_DIRS: knowledge/, docs/, catalogs/, ...) и
+      скрытые директории - копии: статьи, каталоги и бэкапы, изменённые
+      задачей, попадают в результаты и не задевают параллельные задачи;
+    - остальные директории (код: tools/, backend/, ...) - ссылки, только для
+      чтения: запись в них после задачи обнаруживается (shared_writes) и
+      задача завершается с ошибкой;
+    - файлы корня (отчёты прошлых запусков, скрытые кэши) - копии: инструмент
+      читает своё прошлое состояние, но перезаписывает только копию; изменённые
+      кэши после задачи переносятся в корень;
+    - git работает с репозиторием через GIT_DIR/GIT_WORK_TREE.
+
+    Копии делаются через reflink (copy-on-write: btrfs, xfs) - данные не
+    копируются, пока инструмент их не изменит; на других файловых системах -
+    обычное копирование.
+
+    Результат задачи - новые и изменённые обычные файлы рабочей директории
+    (collect_outputs) и удалённые из копий (collect_removed).
+    """
+
+    # Директории, в которые пишут инструменты
+    PRIVATE_DIRS = ('knowledge', 'inbox', 'docs', 'catalogs', 'backups', 'exports', 'archive')
+
+    def __init__(self, root_dir: Path, path: Path, exclude=(), private_dirs=PRIVATE_DIRS):
+        self.root_dir = Path(root_dir).resolve()
+        self.path = Path(path)
+        self.exclude = {'.git', '__pycache__'} | set(exclude)
+        self.private_dirs = set(private_dirs)
+
+        # Сигнатуры скопированных файлов: name -> (mtime_ns, size)
+        self.seeded: Dict[str, tuple] = {}
+
+        # Общие директории (ссылки) и сигнатуры их файлов до запуска
+        self.shared: List[str] = []
+        self.shared_before: Dict[str, tuple] = {}
+
+    def create(self):
+        self.path.mkdir(parents=True)
+
+        for entry in self.root_dir.iterdir():
+            if entry.name in self.exclude:
+                continue
+
+            target = self.path / entry.name
+            if entry.is_dir():
+                if entry.name in self.private_dirs or entry.name.startswith('.'):
+                    shutil.copytree(
+                        entry, target, symlinks=True,
+                        ignore=shutil.ignore_patterns(*self.exclude),
+                        copy_function=self._seed_copy
+                    )
+                else:
+                    target.symlink_to(entry)
+                    self.shared.append(entry.name)
+            elif entry.is_file():
+                self._seed_copy(entry, target)
+
+        self.shared_before = self._shared_signatures()
+
+    def _seed_copy(self, src, dst):
+        """Скопировать исходный файл и запомнить его сигнатуру"""
+        clone_file(src, dst)
+        stat = os.stat(dst)
+        self.seeded[os.path.relpath(dst, self.path)] = (stat.st_mtime_ns, stat.st_size)
+        return dst
+
+    def _shared_signatures(self) -> Dict[str, tuple]:
+        """Сигнатуры файлов общих директорий (в корне репозитория)"""
+        signatures = {}
+
+        for name in self.shared:
+            for dirpath, dirnames, filenames in os.walk(self.root_dir / name):
+                dirnames[:] = [d for d in dirnames if d not in self.exclude]
+                for filename in filenames:
+                    file_path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.lstat(file_path)
+                    except OSError:
+                        continue
+                    signatures[os.path.relpath(file_path, self.root_dir)] = (stat.st_mtime_ns, stat.st_size)
+
+        return signatures
+
+    def shared_writes(self) -> List[str]:
+        """Файлы общих директорий, созданные, изменённые или удалённые с начала задачи"""
+        after = self._shared_signatures()
+        changed = set(after.items()) ^ set(self.shared_before.items())
+        return sorted({name for name, _ in changed})
+
+    def add_inputs(self, store: ArtifactStore, refs: List[Dict[str, Any]]):
+        """
+        Положить артефакты предыдущих шагов в рабочую директорию
+
+        Файлы считаются исходными (не попадают в результаты, если инструмент
+        их не изменит). Файлы внутри общих директорий (ссылок на корень) не
+        записываются - такие результаты уже опубликованы в корне.
+        """
+        for ref in refs:
+            name = ref["name"]
+            top = self.path / Path(name).parts[0]
+            if top != self.path / name and top.is_symlink():
+                continue
+
+            destination = self.path / name
+            if destination.is_symlink():
+                destination.unlink()
+            store.materialize(ref, destination)
+            stat = destination.stat()
+            self.seeded[name] = (stat.st_mtime_ns, stat.st_size)
+
+    def env(self) -> Dict[str, str]:
+        """Окружение процесса инструмента"""
+        env = dict(os.environ)
+        if (self.root_dir / '.git').exists():
+            env['GIT_DIR'] = str(self.root_dir / '.git')
+            env['GIT_WORK_TREE'] = str(self.root_dir)
+        return env
+
+    def collect_outputs(self) -> List[str]:
+        """Новые и изменённые файлы (пути от рабочей директории)"""
+        outputs = []
+
+        for dirpath, dirnames, filenames in os.walk(self.path):
+            # Ссылки на общие директории не обходятся
+            dirnames[:] = sorted(d for d in dirnames if not os.path.islink(os.path.join(dirpath, d)))
+            rel_dir = os.path.relpath(dirpath, self.path)
+
+            for filename in sorted(filenames):
+                file_path = os.path.join(dirpath, filename)
+                if os.path.islink(file_path):
+                    continue
+
+                name = filename if rel_dir == os.curdir else os.path.join(rel_dir, filename)
+                if rel_dir == os.curdir and filename.startswith('.'):
+                    continue  # Кэши - promote_caches
+
+                stat = os.stat(file_path)
+                if self.seeded.get(name) != (stat.st_mtime_ns, stat.st_size):
+                    outputs.append(name)
+
+        return outputs
+
+    def collect_removed(self) -> List[str]:
+        """Исходные файлы, удалённые задачей (например, ротация бэкапов)"""
+        return sorted(
+            name for name in self.seeded
+            if not (os.sep not in name and name.startswith('.'))
+            and not os.path.lexists(self.path / name)
+        )
+
+    def promote_caches(self):
+        """Перенести в корень скрытые файлы, созданные или изменённые задачей"""
+        for entry in self.path.iterdir():
+            if not entry.name.startswith('.') or not entry.is_file() or entry.is_symlink():
+                continue
+
+            stat = entry.stat()
+            if self.seeded.get(entry.name) != (stat.st_mtime_ns, stat.st_size):
+                os.replace(entry, self.root_dir / entry.name)
+
+    def cleanup(self):
+        shutil.rmtree(self.path, ignore_errors=True)
 
 
 class ToolRunner:
     """Менеджер выполнения инструментов"""
 
-    def __init__(self, tools_dir: Path = Path("tools"), output_dir: Path = Path(".")):
+    def __init__(
+        self,
+        tools_dir: Path = Path("tools"),
+        output_dir: Path = Path("."),
+        workspace_dir: Optional[Path] = None,
+        artifacts_dir: Optional[Path] = None,
+        compression: Optional[str] = "gzip",
+        publish_outputs: bool = True,
+        sample_interval: float = 0.5
+    ):
+        """
+        Args:
+            tools_dir: Директория инструментов
+            output_dir: Корень репозитория
+            workspace_dir: Рабочие директории задач (по умолчанию output_dir/.jobs)
+            artifacts_dir: Хранилище артефактов (по умолчанию output_dir/.artifacts)
+            compression: Сжатие артефактов: None, "gzip", "zstd"
+            publish_outputs: Копировать результаты в output_dir (атомарно, вместе с
+                             .gz/.br для отдачи), чтобы /api/files и отчёты в корне
+                             оставались актуальными
+            sample_interval: Интервал опроса ресурсов процессов задачи (секунды)
+        """
         self.tools_dir = Path(tools_dir)
         self.output_dir = Path(output_dir)
+        self.workspace_dir = Path(workspace_dir) if workspace_dir else self.output_dir / ".jobs"
+        self.artifacts = ArtifactStore(
+            Path(artifacts_dir) if artifacts_dir else self.output_dir / ".artifacts",
+            compression=compression
+        )
+        self.publish_outputs = publish_outputs
+        self.sample_interval = sample_interval
         self.jobs: Dict[str, JobResult] = {}
         self.running_processes: Dict[str, subprocess.Popen] = {}
 
@@ -55,7 +435,9 @@ class ToolRunner:
         self,
         tool_name: str,
         parameters: Dict[str, Any] = None,
-        progress_callback: Optional[Callable[[int, str], None]] = None
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+        input_artifacts: Optional[List[Dict[str, Any]]] = None,
+        job_id: Optional[str] = None
     ) -> JobResult:
         """
         Запустить инструмент асинхронно
@@ -64,13 +446,16 @@ class ToolRunner:
             tool_name: Имя инструмента (без .py)
             parameters: Параметры для инструмента
             progress_callback: Callback для обновления прогресса (progress, message)
+            input_artifacts: Ссылки на артефакты, которые нужно положить в рабочую
+                             директорию (результаты предыдущих шагов workflow)
+            job_id: ID задачи (по умолчанию - новый UUID); API передаёт ID из БД
 
         Returns:
             JobResult с результатами выполнения
         """
 
         # Создать job
-        job_id = str(uuid.uuid4())
+        job_id = job_id or str(uuid.uuid4())
         job = JobResult(
             job_id=job_id,
             tool_name=tool_name,
@@ -88,8 +473,15 @@ class ToolRunner:
             job.completed_at = datetime.now()
             return job
 
-        # Построить команду
-        cmd = ["python3", str(tool_path)]
+        # Рабочая директория задачи
+        workspace = JobWorkspace(
+            self.output_dir,
+            self.workspace_dir / job_id,
+            exclude={self.workspace_dir.name, self.artifacts.root.name}
+        )
+
+        # Построить команду: инструмент через ссылку tools/ рабочей директории
+        cmd = ["python3", str(workspace.path.resolve() / "tools" / tool_path.name)]
 
         # Добавить параметры
         if parameters:
@@ -107,21 +499,42 @@ class ToolRunner:
             if progress_callback:
                 progress_callback(10, "Starting tool...")
 
-            # Асинхронное выполнение
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=self.output_dir
+            workspace.create()
+            if input_artifacts:
+                workspace.add_inputs(self.artifacts, input_artifacts)
+
+            # Вывод - во временные файлы: процесс подбирается через os.wait4
+            # в потоке (rusage при завершении), без чтения каналов в цикле событий
+            stdout_file = tempfile.TemporaryFile()
+            stderr_file = tempfile.TemporaryFile()
+            process = subprocess.Popen(
+                cmd,
+                stdout=stdout_file,
+                stderr=stderr_file,
+                cwd=workspace.path,
+                env=workspace.env()
             )
 
             self.running_processes[job_id] = process
 
+            # Опрос ресурсов дерева процессов до завершения
+            sampler = ProcessTreeSampler(process.pid, self.sample_interval)
+            sampler.start()
+
             if progress_callback:
                 progress_callback(30, "Tool running...")
 
             # Ожидать завершения
-            stdout, stderr = await process.communicate()
+            rusage = None
+            try:
+                rusage = await asyncio.to_thread(wait_with_rusage, process)
+            finally:
+                await sampler.stop()
+                if rusage is not None:
+                    sampler.record_exit(rusage)
+                job.resources = sampler.usage()
+
+            stdout, stderr = await asyncio.to_thread(self._read_output, stdout_file, stderr_file)
 
             # Обновить результат
             job.output = stdout.decode('utf-8', errors='replace')
@@ -132,15 +545,30 @@ class ToolRunner:
             if job.started_at:
                 job.duration = (job.completed_at - job.started_at).total_seconds()
 
-            if process.returncode == 0:
+            # Запись в общие директории не изолирована задачей - результат
+            # не публикуется, чтобы не выдать чужие или частичные файлы за свои
+            shared_writes = await asyncio.to_thread(workspace.shared_writes)
+
+            if shared_writes:
+                job.status = JobStatus.FAILED
+                job.error += (
+                    "\nTool wrote outside its workspace (shared directories are read-only): "
+                    + ", ".join(shared_writes[:20])
+                    + (f" (+{len(shared_writes) - 20} more)" if len(shared_writes) > 20 else "")
+                )
+                if progress_callback:
+                    progress_callback(100, "Failed: wrote to shared directories")
+
+            elif process.returncode == 0:
                 job.status = JobStatus.COMPLETED
                 job.progress = 100
 
                 if progress_callback:
                     progress_callback(100, "Completed successfully!")
 
-                # Найти выходные файлы
-                job.output_files = self._detect_output_files(tool_name)
+                # Сохранить выходные файлы в хранилище артефактов
+                # (хэширование, сжатие, precompress - в потоке, не в цикле событий)
+                job.output_files = await asyncio.to_thread(self._store_outputs, workspace)
             else:
                 job.status = JobStatus.FAILED
                 if progress_callback:
@@ -158,6 +586,10 @@ class ToolRunner:
             if job_id in self.running_processes:
                 del self.running_processes[job_id]
 
+            if workspace.path.exists():
+                workspace.promote_caches()
+                workspace.cleanup()
+
         return job
 
     async def cancel_job(self, job_id: str) -> bool:
@@ -199,6 +631,16 @@ class ToolRunner:
 
         return False
 
+    @staticmethod
+    def _read_output(*files) -> tuple:
+        """Содержимое временных файлов вывода (файлы закрываются)"""
+        contents = []
+        for f in files:
+            with f:
+                f.seek(0)
+                contents.append(f.read())
+        return tuple(contents)
+
     def get_job(self, job_id: str) -> Optional[JobResult]:
         """Получить информацию о задаче"""
         return self.jobs.get(job_id)
@@ -211,31 +653,22 @@ class ToolRunner:
         """Получить запущенные задачи"""
         return [job for job in self.jobs.values() if job.status == JobStatus.RUNNING]
 
-    def _detect_output_files(self, tool_name: str) -> list[str]:
-        """Определить файлы, созданные инструментом"""
+    def _store_outputs(self, workspace: JobWorkspace) -> list[Dict[str, Any]]:
+        """Сохранить файлы, созданные задачей, как неизменяемые артефакты"""
 
         output_files = []
 
-        # Возможные расширения
-        extensions = ['.html', '.json', '.csv', '.txt', '.md']
+        for name in workspace.collect_outputs():
+            ref = self.artifacts.put_file(workspace.path / name, name)
+            output_files.append(ref)
 
-        for ext in extensions:
-            file_path = self.output_dir / f"{tool_name}{ext}"
-            if file_path.exists():
-                output_files.append(str(file_path.relative_to(self.output_dir)))
-
-        # Дополнительные паттерны
-        patterns = [
-            f"{tool_name}_*.html",
-            f"{tool_name}_*.json",
-            f"*{tool_name}*.html",
-        ]
+            if self.publish_outputs:
+                self.artifacts.materialize(ref, self.output_dir / name)
+                precompress(self.output_dir / name)
 
-        for pattern in patterns:
-            for file_path in self.output_dir.glob(pattern):
-                rel_path = str(file_path.relative_to(self.output_dir))
-                if rel_path not in output_files:
-                    output_files.append(rel_path)
+        if self.publish_outputs:
+            for name in workspace.collect_removed():
+                (self.output_dir / name).unlink(missing_ok=True)
 
         return output_files
 
@@ -301,7 +734,7 @@ async def main():
 
     print(f"\n✅ Статус: {result.status}")
     print(f"⏱️  Время: {result.duration:.2f}s")
-    print(f"📁 Выходные файлы: {', '.join(result.output_files)}")
+    print(f"📁 Выходные файлы: {', '.join(f['name'] for f in result.output_files)}")
 
     if result.error:
         print(f"❌ Ошибка: {result.error}")
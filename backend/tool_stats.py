@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Tool Stats - Инкрементальная статистика инструментов (models.ToolStats)
+
+Раньше update_tool_statistics раз в час делал GROUP BY по всей таблице jobs
+и по запросу на инструмент. Теперь строка ToolStats обновляется при
+завершении задачи, в той же транзакции, что и статус задачи:
+
+- счётчики запусков, время последнего запуска/успеха/ошибки;
+- длительность успешных запусков: среднее и дисперсия по Велфорду
+  (avg_duration, duration_m2), min/max;
+- p50/p95 - по логарифмической гистограмме (duration_sketch, как в
+  DDSketch): относительная погрешность RELATIVE_ACCURACY, несколько сотен
+  корзин на весь диапазон от миллисекунд до суток.
+
+Строка блокируется (SELECT ... FOR UPDATE, создание - INSERT ... ON
+CONFLICT DO NOTHING), поэтому параллельные воркеры не теряют обновлений.
+Job.stats_recorded отмечает учтённые задачи: reconcile_tool_stats
+дочитывает пропущенные (воркер упал между статусом и статистикой, задача
+упала после всех повторов) небольшими пачками.
+"""
+
+import math
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from models import Job, JobStatus, ToolStats
+
+
+# Относительная погрешность квантилей
+RELATIVE_ACCURACY = 0.02
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+# Длительности короче - в одной корзине "0"
+MIN_DURATION = 1e-3
+
+# Завершённые задачи, которые учитываются в статистике
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+# Задачи, завершённые недавно, reconcile не трогает: FAILED может быть
+# промежуточным статусом перед повтором Celery
+RECONCILE_GRACE = timedelta(minutes=10)
+
+
+# ========================
+# Quantile sketch
+# ========================
+
+def sketch_add(sketch: Optional[Dict[str, int]], value: float) -> Dict[str, int]:
+    """Новая гистограмма с добавленным значением (для JSON-колонки - новый объект)"""
+    sketch = dict(sketch or {})
+    if value <= MIN_DURATION:
+        key = "0"
+    else:
+        key = str(math.ceil(math.log(value) / LOG_GAMMA))
+    sketch[key] = sketch.get(key, 0) + 1
+    return sketch
+
+
+def sketch_quantile(sketch: Optional[Dict[str, int]], q: float) -> Optional[float]:
+    """Квантиль q (0..1) с относительной погрешностью RELATIVE_ACCURACY"""
+    if not sketch:
+        return None
+
+    buckets = sorted(
+        (float("-inf") if key == "0" else int(key), count)
+        for key, count in sketch.items()
+    )
+    total = sum(count for _, count in buckets)
+    rank = q * (total - 1)
+
+    seen = 0
+    for index, count in buckets:
+        seen += count
+        if seen > rank:
+            break
+
+    if index == float("-inf"):
+        return 0.0
+    # Середина корзины (GAMMA^(i-1), GAMMA^i] в относительном смысле
+    return 2 * GAMMA ** index / (GAMMA + 1)
+
+
+# ========================
+# Incremental updates
+# ========================
+
+def _locked_row(db, tool_name: str) -> ToolStats:
+    """Строка ToolStats инструмента под блокировкой (создаётся при необходимости)"""
+    dialect = db.get_bind().dialect.name
+    values = {"tool_name": tool_name, "total_runs": 0, "successful_runs": 0, "failed_runs": 0}
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        db.execute(insert(ToolStats).values(**values).on_conflict_do_nothing(index_elements=["tool_name"]))
+        return db.query(ToolStats).filter(ToolStats.tool_name == tool_name).with_for_update().one()
+
+    row = db.query(ToolStats).filter(ToolStats.tool_name == tool_name).with_for_update().first()
+    if row is None:
+        row = ToolStats(**values)
+        db.add(row)
+        db.flush()
+    return row
+
+
+def record_job_stats(db, job: Job) -> bool:
+    """
+    Учесть завершённую задачу в ToolStats (в транзакции вызывающего)
+
+    Returns:
+        False, если задача уже учтена или ещё не завершена
+    """
+    if job.stats_recorded or job.status not in FINISHED_STATUSES:
+        return False
+
+    # Отменённые задачи не влияют на счётчики и длительности
+    if job.status != JobStatus.CANCELLED:
+        row = _locked_row(db, job.tool_name)
+        finished_at = job.completed_at or datetime.utcnow()
+
+        row.total_runs = (row.total_runs or 0) + 1
+        row.last_run = max(row.last_run, finished_at) if row.last_run else finished_at
+
+        if job.status == JobStatus.COMPLETED:
+            row.successful_runs = (row.successful_runs or 0) + 1
+            row.last_success = max(row.last_success, finished_at) if row.last_success else finished_at
+            if job.duration is not None:
+                _add_duration(row, float(job.duration))
+        else:
+            row.failed_runs = (row.failed_runs or 0) + 1
+            row.last_failure = max(row.last_failure, finished_at) if row.last_failure else finished_at
+
+    job.stats_recorded = True
+    return True
+
+
+def _add_duration(row: ToolStats, duration: float):
+    """Велфорд: среднее и сумма квадратов отклонений, min/max, квантили"""
+    count = (row.duration_count or 0) + 1
+    mean = row.avg_duration or 0.0
+    delta = duration - mean
+    mean += delta / count
+
+    row.duration_count = count
+    row.avg_duration = mean
+    row.duration_m2 = (row.duration_m2 or 0.0) + delta * (duration - mean)
+    row.min_duration = duration if row.min_duration is None else min(row.min_duration, duration)
+    row.max_duration = duration if row.max_duration is None else max(row.max_duration, duration)
+
+    row.duration_sketch = sketch_add(row.duration_sketch, duration)
+    row.p50_duration = sketch_quantile(row.duration_sketch, 0.5)
+    row.p95_duration = sketch_quantile(row.duration_sketch, 0.95)
+
+
+def duration_stddev(row: ToolStats) -> Optional[float]:
+    """Выборочное стандартное отклонение длительности"""
+    if not row.duration_count or row.duration_count < 2:
+        return None
+    return math.sqrt(row.duration_m2 / (row.duration_count - 1))
+
+
+def stats_to_dict(row: ToolStats) -> Dict[str, Any]:
+    """Строка ToolStats для API"""
+    return {
+        "tool_name": row.tool_name,
+        "total_runs": row.total_runs or 0,
+        "successful_runs": row.successful_runs or 0,
+        "failed_runs": row.failed_runs or 0,
+        "success_rate": (row.successful_runs or 0) / row.total_runs * 100 if row.total_runs else 0,
+        "avg_duration": row.avg_duration,
+        "stddev_duration": duration_stddev(row),
+        "min_duration": row.min_duration,
+        "max_duration": row.max_duration,
+        "p50_duration": row.p50_duration,
+        "p95_duration": row.p95_duration,
+        "last_run": row.last_run.isoformat() if row.last_run else None,
+        "last_success": row.last_success.isoformat() if row.last_success else None,
+        "last_failure": row.last_failure.isoformat() if row.last_failure else None
+    }
+
+
+# ========================
+# Reconciliation
+# ========================
+
+def reconcile_tool_stats(
+    session_factory: Optional[Callable] = None,
+    batch_size: int = 500,
+    max_batches: int = 20
+) -> Dict[str, int]:
+    """
+    Учесть завершённые задачи, пропущенные при завершении
+
+    Каждая пачка (batch_size задач) - отдельная короткая транзакция, за
+    один вызов - не больше max_batches пачек; остаток - в следующий раз.
+
+    Args:
+        session_factory: Контекстный менеджер сессии (по умолчанию database.get_db_context)
+    """
+    if session_factory is None:
+        from database import get_db_context as session_factory
+
+    recorded = 0
+    batches = 0
+    cutoff = datetime.utcnow() - RECONCILE_GRACE
+
+    for _ in range(max_batches):
+        with session_factory() as db:
+            # skip_locked: параллельный reconcile берёт другие задачи
+            jobs = db.query(Job).filter(
+                Job.stats_recorded == False,  # noqa: E712
+                Job.status.in_(FINISHED_STATUSES),
+                Job.completed_at < cutoff
+            ).order_by(Job.completed_at).limit(batch_size).with_for_update(skip_locked=True).all()
+
+            for job in jobs:
+                recorded += record_job_stats(db, job)
+
+        if not jobs:
+            break
+        batches += 1
+        if len(jobs) < batch_size:
+            break
+
+    return {"recorded": recorded, "batches": batches}
@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+"""
+Workflow Engine - Выполнение Workflow как DAG шагов-инструментов
+
+Workflow.steps (models.py) - список шагов:
+
+    [{"id": "graph", "tool": "build_graph", "parameters": {},
+      "depends_on": [], "inputs": ["knowledge/**/*.md"]},
+     {"id": "pagerank", "tool": "pagerank", "depends_on": ["graph"]}]
+
+- id          - имя шага (по умолчанию имя инструмента)
+- depends_on  - шаги, которые должны завершиться раньше
+- inputs      - glob-шаблоны файлов репозитория, от которых зависит результат
+                (по умолчанию DEFAULT_INPUTS)
+
+Независимые шаги выполняются параллельно (не больше max_parallel
+одновременно - по умолчанию число ядер), локально через ToolRunner или в
+Celery (celery_tasks.build_workflow_canvas - группы шагов одного уровня
+DAG, связанные в chord-ы).
+
+Артефакты предыдущих шагов кладутся в рабочую директорию следующего
+(ToolRunner.run_tool(input_artifacts=...)).
+
+Результат шага кэшируется (ResultCache, .workflow_cache.json) по ключу:
+код инструмента и импортируемых им модулей tools/shared + параметры +
+сигнатура входных файлов + SHA-256 артефактов зависимостей. Если ничего не изменилось, инструмент не
+запускается - используются сохранённые артефакты.
+
+Записи шагов (время, статус, job_id) сохраняются в WorkflowRun.job_ids.
+"""
+
+import os
+import ast
+import json
+import asyncio
+import hashlib
+import tempfile
+from pathlib import Path
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from tool_runner import JobStatus, ToolRunner
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+
+# Входы шага по умолчанию - статьи базы знаний
+DEFAULT_INPUTS = ["knowledge/**/*.md"]
+
+
+@dataclass
+class WorkflowStep:
+    """Шаг workflow"""
+    id: str
+    tool: str
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    depends_on: List[str] = field(default_factory=list)
+    inputs: List[str] = field(default_factory=lambda: list(DEFAULT_INPUTS))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorkflowStep":
+        if "tool" not in data:
+            raise ValueError(f"Workflow step without tool: {data}")
+        return cls(
+            id=data.get("id") or data["tool"],
+            tool=data["tool"],
+            parameters=dict(data.get("parameters") or {}),
+            depends_on=list(data.get("depends_on") or []),
+            inputs=list(data["inputs"]) if data.get("inputs") is not None else list(DEFAULT_INPUTS)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "tool": self.tool,
+            "parameters": self.parameters,
+            "depends_on": self.depends_on,
+            "inputs": self.inputs
+        }
+
+
+def parse_steps(steps: List[Dict[str, Any]]) -> Dict[str, WorkflowStep]:
+    """Шаги Workflow.steps по id (проверяются дубликаты и неизвестные зависимости)"""
+    parsed: Dict[str, WorkflowStep] = {}
+
+    for data in steps:
+        step = WorkflowStep.from_dict(data)
+        if step.id in parsed:
+            raise ValueError(f"Duplicate workflow step: {step.id}")
+        parsed[step.id] = step
+
+    for step in parsed.values():
+        for dependency in step.depends_on:
+            if dependency not in parsed:
+                raise ValueError(f"Step {step.id} depends on unknown step: {dependency}")
+
+    topological_levels(parsed)
+    return parsed
+
+
+def topological_levels(steps: Dict[str, WorkflowStep]) -> List[List[str]]:
+    """
+    Уровни DAG (алгоритм Кана): шаги одного уровня не зависят друг от друга
+
+    Raises:
+        ValueError: если в зависимостях есть цикл
+    """
+    remaining = {step_id: len(step.depends_on) for step_id, step in steps.items()}
+    dependents: Dict[str, List[str]] = {step_id: [] for step_id in steps}
+    for step in steps.values():
+        for dependency in step.depends_on:
+            dependents[dependency].append(step.id)
+
+    levels = []
+    level = sorted(step_id for step_id, count in remaining.items() if count == 0)
+
+    while level:
+        levels.append(level)
+        next_level = []
+        for step_id in level:
+            for dependent in dependents[step_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    next_level.append(dependent)
+        level = sorted(next_level)
+
+    if sum(len(level) for level in levels) != len(steps):
+        cycle = sorted(step_id for step_id, count in remaining.items() if count > 0)
+        raise ValueError(f"Workflow has a dependency cycle: {', '.join(cycle)}")
+
+    return levels
+
+
+# ========================
+# Result cache
+# ========================
+
+def inputs_signature(root_dir: Path, patterns: List[str]) -> str:
+    """SHA-256 списка (путь, mtime_ns, размер) файлов по glob-шаблонам"""
+    digest = hashlib.sha256()
+    paths = set()
+    for pattern in patterns:
+        paths.update(path for path in root_dir.glob(pattern) if path.is_file())
+
+    for path in sorted(paths):
+        stat = path.stat()
+        digest.update(f"{path.relative_to(root_dir)}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode('utf-8'))
+
+    return digest.hexdigest()
+
+
+def shared_imports(path: Path, tools_dir: Path) -> List[Path]:
+    """
+    Модули tools/shared, импортируемые файлом (рекурсивно)
+
+    from shared.x import y, import shared.x, from shared import x и
+    относительные импорты внутри shared.
+    """
+    shared_dir = Path(tools_dir) / "shared"
+    found: Set[Path] = set()
+    queue = [Path(path)]
+
+    def module_path(parts: List[str]) -> Optional[Path]:
+        base = shared_dir.joinpath(*parts)
+        for candidate in (base.with_name(base.name + ".py"), base / "__init__.py"):
+            if candidate.is_file():
+                return candidate
+        return None
+
+    while queue:
+        current = queue.pop()
+        try:
+            tree = ast.parse(current.read_text(encoding="utf-8"))
+        except (OSError, SyntaxError, ValueError):
+            continue
+
+        in_shared = current.parent == shared_dir
+        modules: List[List[str]] = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    parts = alias.name.split(".")
+                    if parts[0] == "shared":
+                        modules.append(parts[1:])
+            elif isinstance(node, ast.ImportFrom):
+                if node.level == 0 and node.module and node.module.split(".")[0] == "shared":
+                    parts = node.module.split(".")[1:]
+                elif node.level == 1 and in_shared:
+                    parts = node.module.split(".") if node.module else []
+                else:
+                    continue
+                modules.append(parts)
+                # from shared import x - x может быть модулем
+                modules.extend(parts + [alias.name] for alias in node.names)
+
+        for parts in modules:
+            module = module_path(parts)
+            if module is not None and module not in found:
+                found.add(module)
+                queue.append(module)
+
+    return sorted(found)
+
+
+class ResultCache:
+    """Персистентный кэш результатов шагов: ключ -> ссылки на артефакты"""
+
+    VERSION = 2
+
+    def __init__(self, root_dir: Path, cache_file: str = ".workflow_cache.json"):
+        self.root_dir = Path(root_dir)
+        self.cache_file = self.root_dir / cache_file
+        self.lock_file = self.root_dir / f"{cache_file}.lock"
+
+        # key -> {'tool', 'output_files', 'duration', 'created'}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._tool_hashes: Dict[str, str] = {}
+
+        self.load()
+
+    def load(self):
+        if not self.cache_file.exists():
+            return
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+
+        if data.get('version') == self.VERSION:
+            self.entries = data.get('entries', {})
+
+    def save(self):
+        """
+        Атомарная запись с объединением
+
+        Шаги одного workflow в Celery сохраняют кэш с разных воркеров:
+        чтение файла, добавление своих записей и замена файла выполняются
+        под эксклюзивной блокировкой (flock) файла .lock рядом с кэшем,
+        поэтому записи параллельных save не теряются. Без fcntl (Windows)
+        блокировки нет - выигрывает последний записавший.
+        """
+        with open(self.lock_file, 'a') as lock:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                self._merge_and_replace()
+            finally:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _merge_and_replace(self):
+        """Добавить свои записи к сохранённым и атомарно заменить файл"""
+        own = self.entries
+        self.entries = {}
+        self.load()
+        self.entries.update(own)
+
+        data = {
+            'version': self.VERSION,
+            'updated': datetime.now().isoformat(),
+            'entries': self.entries
+        }
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, prefix=f"{self.cache_file.name}.")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_file)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def tool_hash(self, tool_path: Path) -> str:
+        """SHA-256 кода инструмента и импортируемых им модулей tools/shared"""
+        tool_path = Path(tool_path)
+        key = str(tool_path)
+        if key not in self._tool_hashes:
+            digest = hashlib.sha256()
+            try:
+                digest.update(tool_path.read_bytes())
+                for module in shared_imports(tool_path, tool_path.parent):
+                    digest.update(f"\0{module.relative_to(tool_path.parent)}\0".encode('utf-8'))
+                    digest.update(module.read_bytes())
+                self._tool_hashes[key] = digest.hexdigest()
+            except OSError:
+                self._tool_hashes[key] = ""
+        return self._tool_hashes[key]
+
+    def step_key(self, step: WorkflowStep, tools_dir: Path, upstream: List[Dict[str, Any]]) -> str:
+        """Ключ результата шага"""
+        data = {
+            'tool': step.tool,
+            'tool_hash': self.tool_hash(Path(tools_dir) / f"{step.tool}.py"),
+            'parameters': step.parameters,
+            'inputs': inputs_signature(self.root_dir, step.inputs),
+            'upstream': sorted(ref['sha256'] for ref in upstream)
+        }
+        encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, artifacts) -> Optional[Dict[str, Any]]:
+        """Запись, если все её артефакты ещё есть в хранилище"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if not all(artifacts.exists(ref['sha256']) for ref in entry['output_files']):
+            del self.entries[key]
+            return None
+        return entry
+
+    def put(self, key: str, tool: str, output_files: List[Dict[str, Any]], duration: Optional[float]):
+        self.entries[key] = {
+            'tool': tool,
+            'output_files': output_files,
+            'duration': duration,
+            'created': datetime.now().isoformat()
+        }
+
+
+# ========================
+# Execution
+# ========================
+
+def failed_record(step: WorkflowStep, error: str) -> Dict[str, Any]:
+    """Запись шага, который не удалось выполнить (исключение, а не код возврата)"""
+    now = datetime.utcnow().isoformat()
+    return {
+        "step": step.id, "tool": step.tool, "job_id": None,
+        "status": JobStatus.FAILED.value, "cached": False,
+        "started_at": now, "completed_at": now, "duration": 0.0,
+        "output_files": [], "error": error[-2000:]
+    }
+
+
+def upstream_artifacts(step: WorkflowStep, records: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Артефакты всех зависимостей шага (в порядке depends_on)"""
+    refs = []
+    for dependency in step.depends_on:
+        refs.extend(records[dependency].get("output_files", []))
+    return refs
+
+
+async def run_step(
+    runner: ToolRunner,
+    cache: ResultCache,
+    step: WorkflowStep,
+    upstream: List[Dict[str, Any]],
+    use_cache: bool = True
+) -> Dict[str, Any]:
+    """
+    Выполнить шаг (или взять результат из кэша)
+
+    Returns:
+        Запись шага для WorkflowRun.job_ids
+    """
+    started_at = datetime.utcnow()
+    key = cache.step_key(step, runner.tools_dir, upstream)
+
+    record = {
+        "step": step.id,
+        "tool": step.tool,
+        "job_id": None,
+        "status": JobStatus.COMPLETED.value,
+        "cached": False,
+        "started_at": started_at.isoformat(),
+        "output_files": []
+    }
+
+    entry = cache.get(key, runner.artifacts) if use_cache else None
+
+    if entry is not None:
+        record["cached"] = True
+        record["output_files"] = entry["output_files"]
+
+        # Опубликованные файлы могли быть перезаписаны - вернуть результат шага
+        if runner.publish_outputs:
+            for ref in entry["output_files"]:
+                runner.artifacts.materialize(ref, runner.output_dir / ref["name"])
+    else:
+        job = await runner.run_tool(step.tool, step.parameters, input_artifacts=upstream)
+        record["job_id"] = job.job_id
+        record["status"] = job.status.value
+        record["output_files"] = job.output_files
+        record["return_code"] = job.return_code
+
+        if job.status == JobStatus.COMPLETED:
+            cache.put(key, step.tool, job.output_files, job.duration)
+        else:
+            record["error"] = job.error[-2000:]
+
+    completed_at = datetime.utcnow()
+    record["completed_at"] = completed_at.isoformat()
+    record["duration"] = (completed_at - started_at).total_seconds()
+    return record
+
+
+class WorkflowExecutor:
+    """Локальное выполнение DAG шагов с ограничением параллельности"""
+
+    def __init__(
+        self,
+        runner: ToolRunner,
+        max_parallel: Optional[int] = None,
+        use_cache: bool = True
+    ):
+        """
+        Args:
+            runner: ToolRunner для запуска инструментов
+            max_parallel: Максимум одновременно выполняемых шагов (по умолчанию - число ядер)
+            use_cache: Пропускать шаги с неизменившимися входами
+        """
+        self.runner = runner
+        self.max_parallel = max_parallel or os.cpu_count() or 1
+        self.use_cache = use_cache
+        self.cache = ResultCache(runner.output_dir)
+
+    async def run(
+        self,
+        steps: List[Dict[str, Any]],
+        on_step: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Выполнить workflow
+
+        Шаг запускается, как только завершены все его зависимости. Если
+        зависимость завершилась ошибкой (или исключением в run_step), шаг и
+        все его потомки отменяются, независимые ветви продолжают выполняться.
+
+        Args:
+            steps: Workflow.steps
+            on_step: Callback с записью каждого завершённого шага
+
+        Returns:
+            {'status', 'duration', 'steps': [записи шагов в порядке завершения]}
+        """
+        parsed = parse_steps(steps)
+        started = datetime.utcnow()
+        semaphore = asyncio.Semaphore(self.max_parallel)
+
+        records: Dict[str, Dict[str, Any]] = {}
+        finished: List[Dict[str, Any]] = []
+        pending = dict(parsed)
+        running: Dict[asyncio.Task, str] = {}
+
+        def finish(record: Dict[str, Any]):
+            records[record["step"]] = record
+            finished.append(record)
+            if on_step:
+                on_step(record)
+
+        async def limited(step: WorkflowStep, upstream: List[Dict[str, Any]]):
+            async with semaphore:
+                try:
+                    return await run_step(self.runner, self.cache, step, upstream, self.use_cache)
+                except Exception as e:
+                    # Ошибка шага (не инструмента) - шаг FAILED, зависимые отменяются
+                    return failed_record(step, f"{type(e).__name__}: {e}")
+
+        while pending or running:
+            for step_id, step in list(pending.items()):
+                statuses = [records[d]["status"] if d in records else None for d in step.depends_on]
+                if None in statuses:
+                    continue
+
+                del pending[step_id]
+                if any(status != JobStatus.COMPLETED.value for status in statuses):
+                    now = datetime.utcnow().isoformat()
+                    finish({
+                        "step": step_id, "tool": step.tool, "job_id": None,
+                        "status": JobStatus.CANCELLED.value, "cached": False,
+                        "started_at": now, "completed_at": now, "duration": 0.0,
+                        "output_files": [], "error": "dependency failed"
+                    })
+                    continue
+
+                task = asyncio.create_task(limited(step, upstream_artifacts(step, records)))
+                running[task] = step_id
+
+            if not running:
+                continue
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                running.pop(task)
+                finish(task.result())
+
+        self.cache.save()
+
+        ok = all(record["status"] == JobStatus.COMPLETED.value for record in finished)
+        return {
+            "status": JobStatus.COMPLETED.value if ok else JobStatus.FAILED.value,
+            "duration": (datetime.utcnow() - started).total_seconds(),
+            "steps": finished
+        }
+
+
+# Пример использования: python workflow_engine.py workflow.json
+async def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Выполнение workflow (DAG инструментов)')
+    parser.add_argument('workflow', help='JSON-файл со списком шагов')
+    parser.add_argument('--parallel', type=int, default=None, help='Максимум параллельных шагов')
+    parser.add_argument('--no-cache', action='store_true', help='Выполнить все шаги заново')
+    args = parser.parse_args()
+
+    with open(args.workflow, 'r', encoding='utf-8') as f:
+        steps = json.load(f)
+    if isinstance(steps, dict):
+        steps = steps["steps"]
+
+    root_dir = Path(__file__).parent.parent
+    executor = WorkflowExecutor(
+        ToolRunner(root_dir / "tools", root_dir),
+        max_parallel=args.parallel,
+        use_cache=not args.no_cache
+    )
+
+    def on_step(record: Dict[str, Any]):
+        icon = {"completed": "✅", "cancelled": "⏭️ "}.get(record["status"], "❌")
+        note = " (кэш)" if record["cached"] else ""
+        print(f"{icon} {record['step']}: {record['status']}{note}, {record['duration']:.2f}s")
+
+    print(f"🚀 Выполнение workflow: {len(steps)} шагов, до {executor.max_parallel} параллельно")
+    result = await executor.run(steps, on_step=on_step)
+    print(f"\n⏱️  Время: {result['duration']:.2f}s, статус: {result['status']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
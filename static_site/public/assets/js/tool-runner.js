@@ -323,7 +323,7 @@ class ToolRunnerUI {
                 statusText.innerHTML = `
                     ✅ Completed in ${data.duration?.toFixed(1)}s
                     <br>
-                    <small>Files: ${data.output_files.join(', ')}</small>
+                    <small>Files: ${data.output_files.map(f => f.name || f).join(', ')}</small>
                 `;
 
                 // Автоматически удалить через 5 секунд
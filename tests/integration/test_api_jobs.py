@@ -321,6 +321,81 @@ class TestJobCancellationOwnership:
         assert response.status_code in [status.HTTP_200_OK, status.HTTP_400_BAD_REQUEST]
 
 
+@pytest.mark.integration
+class TestJobArtifactOwnership:
+    """Test GET /api/jobs/{job_id}/artifacts/{name} endpoint with ownership checks"""
+
+    def _create_running_job(self, db_session, user):
+        """Create a DB job owned by user whose artifacts are only in memory"""
+        from backend.models import Job, JobStatus
+        from backend.server import runner
+        from backend.tool_runner import JobResult, JobStatus as RunnerJobStatus
+
+        job = Job(tool_name="build_graph", parameters={}, status=JobStatus.RUNNING, user_id=user.id)
+        db_session.add(job)
+        db_session.commit()
+        job_id = str(job.id)
+
+        ref = runner.artifacts.put_bytes(b"graph data", "graph.json")
+        runner.jobs[job_id] = JobResult(
+            job_id=job_id,
+            tool_name="build_graph",
+            status=RunnerJobStatus.RUNNING,
+            output_files=[ref]
+        )
+        return job_id
+
+    def test_owner_downloads_in_memory_artifact(self, client, auth_headers_user, regular_user, db_session):
+        """Test owner can download an artifact before the result is saved to DB"""
+        job_id = self._create_running_job(db_session, regular_user)
+
+        response = client.get(f"/api/jobs/{job_id}/artifacts/graph.json", headers=auth_headers_user)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b"graph data"
+
+    def test_anonymous_cannot_download_user_artifact(self, client, regular_user, db_session):
+        """Test anonymous user cannot download another user's in-memory artifact"""
+        job_id = self._create_running_job(db_session, regular_user)
+
+        response = client.get(f"/api/jobs/{job_id}/artifacts/graph.json")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_artifact_not_modified(self, client, auth_headers_user, regular_user, db_session):
+        """Test If-None-Match with the artifact ETag returns 304"""
+        job_id = self._create_running_job(db_session, regular_user)
+        url = f"/api/jobs/{job_id}/artifacts/graph.json"
+
+        etag = client.get(url, headers=auth_headers_user).headers["etag"]
+        response = client.get(url, headers={**auth_headers_user, "If-None-Match": etag})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+    def test_artifact_range(self, client, auth_headers_user, regular_user, db_session):
+        """Test Range returns 206, unsatisfiable Range 416, stale If-Range the full artifact"""
+        job_id = self._create_running_job(db_session, regular_user)
+        url = f"/api/jobs/{job_id}/artifacts/graph.json"
+
+        response = client.get(url, headers={**auth_headers_user, "Range": "bytes=0-4"})
+        assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert response.content == b"graph"
+        assert response.headers["content-range"] == "bytes 0-4/10"
+
+        etag = response.headers["etag"]
+        response = client.get(url, headers={**auth_headers_user, "Range": "bytes=6-", "If-Range": etag})
+        assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert response.content == b"data"
+
+        response = client.get(url, headers={**auth_headers_user, "Range": "bytes=6-", "If-Range": '"stale"'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b"graph data"
+
+        response = client.get(url, headers={**auth_headers_user, "Range": "bytes=100-"})
+        assert response.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        assert response.headers["content-range"] == "bytes */10"
+
+
 @pytest.mark.integration
 class TestMultiUserScenarios:
     """Test complex multi-user scenarios"""
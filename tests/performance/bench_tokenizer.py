@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tokenizer Microbenchmark
+
+Сравнивает прежнюю токенизацию инструментов (строковый re.findall,
+множество стоп-слов на каждый вызов, подсчёт слогов на каждое вхождение)
+с shared.tokenizer (скомпилированные шаблоны, sys.intern, LRU-кэш слогов
+по типу слова). Печатает токенов в секунду до и после.
+
+Usage:
+    python tests/performance/bench_tokenizer.py              # корпус 100 MB
+    python tests/performance/bench_tokenizer.py --size-mb 10
+"""
+
+import argparse
+import math
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from shared.tokenizer import count_syllables, tokenize
+
+
+VOCABULARY = [
+    'знания', 'статья', 'программирование', 'архитектура', 'система', 'данные',
+    'индекс', 'поиск', 'документ', 'контейнер', 'оркестрация', 'сеть', 'база',
+    'и', 'в', 'на', 'для', 'что', 'это', 'как', 'при', 'не',
+    'docker', 'kubernetes', 'python', 'database', 'queue', 'rhythm', 'search',
+    'the', 'and', 'for', 'with', 'index', 'container', 'pipeline', 'service',
+]
+
+DOCUMENT_SIZE = 64 * 1024
+
+
+def legacy_tokenize(text):
+    """Токенизация в прежнем виде (search_index.tokenize до общего модуля)"""
+    stop_words = {
+        'и', 'в', 'на', 'с', 'к', 'по', 'для', 'из', 'что', 'это',
+        'как', 'или', 'но', 'а', 'о', 'от', 'до', 'за', 'при', 'не',
+        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to',
+        'for', 'of', 'as', 'by', 'with', 'from', 'is', 'are', 'was', 'were',
+    }
+    text = re.sub(r'[#*`\[\]()]', ' ', text)
+    words = re.findall(r'\b[а-яёa-z]{2,}\b', text.lower())
+    return [w for w in words if w not in stop_words]
+
+
+STOP_WORDS = frozenset({
+    'и', 'в', 'на', 'с', 'к', 'по', 'для', 'из', 'что', 'это',
+    'как', 'или', 'но', 'а', 'о', 'от', 'до', 'за', 'при', 'не',
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to',
+    'for', 'of', 'as', 'by', 'with', 'from', 'is', 'are', 'was', 'were',
+})
+
+
+def generate_documents(count, seed=42):
+    """Набор синтетических markdown-документов по ~64 KB"""
+    rng = random.Random(seed)
+    documents = []
+
+    for _ in range(count):
+        parts = []
+        size = 0
+        while size < DOCUMENT_SIZE:
+            sentence = ' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(5, 15)))
+            if rng.random() < 0.1:
+                sentence = f"## {sentence.capitalize()}"
+            elif rng.random() < 0.1:
+                sentence = f"[{sentence}](https://example.com) **важно**."
+            else:
+                sentence = sentence.capitalize() + '.'
+            parts.append(sentence)
+            size += len(sentence.encode('utf-8')) + 1
+        documents.append('\n'.join(parts))
+
+    return documents
+
+
+def run(documents, repeats, tokenizer, syllables):
+    """Прогнать корпус: (токенов, секунд)"""
+    tokens = 0
+    start = time.perf_counter()
+
+    for _ in range(repeats):
+        for document in documents:
+            words = tokenizer(document)
+            tokens += len(words)
+            for word in words:
+                syllables(word)
+
+    return tokens, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tokenizer microbenchmark')
+    parser.add_argument('--size-mb', type=int, default=100, help='Размер корпуса в MB')
+    parser.add_argument('--documents', type=int, default=64, help='Различных документов в корпусе')
+    args = parser.parse_args()
+
+    documents = generate_documents(args.documents)
+    corpus_size = sum(len(d.encode('utf-8')) for d in documents)
+    repeats = max(1, math.ceil(args.size_mb * 1024 * 1024 / corpus_size))
+
+    print(f"📚 Корпус: {corpus_size * repeats / 1024 / 1024:.0f} MB ({len(documents)} документов × {repeats})\n")
+
+    before = run(documents, repeats, legacy_tokenize, count_syllables.__wrapped__)
+    after = run(documents, repeats,
+                lambda text: tokenize(text, min_length=2, stop_words=STOP_WORDS),
+                count_syllables)
+
+    for label, (tokens, seconds) in (('До', before), ('После', after)):
+        print(f"   {label:6} {tokens / seconds:>14,.0f} токенов/с  ({seconds:.1f} с)")
+
+    print(f"\n⚡ Ускорение: {before[1] / after[1]:.2f}×")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Unit Tests for Admission Control
+
+Tests for backend/admission.py with the in-process semaphores (no Redis).
+"""
+
+import pytest
+from pathlib import Path
+import asyncio
+import sys
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from admission import AdmissionController, AdmissionLimits, AdmissionRejected, parse_tool_limits
+
+
+def controller(**kwargs):
+    kwargs.setdefault("max_concurrent", 3)
+    kwargs.setdefault("max_per_user", 2)
+    kwargs.setdefault("tool_limits", {"build_concordance": 1})
+    kwargs.setdefault("max_queue", 2)
+    kwargs.setdefault("queue_timeout", 0.3)
+    return AdmissionController(AdmissionLimits(**kwargs))
+
+
+@pytest.mark.unit
+class TestLimits:
+    """Test global, per-user and per-tool limits"""
+
+    def test_parse_tool_limits(self):
+        assert parse_tool_limits("build_concordance=1, check_links = 2,,bad") == {
+            "build_concordance": 1, "check_links": 2}
+        assert parse_tool_limits("") == {}
+
+    def test_scopes(self):
+        admission = controller()
+
+        first, _ = admission.try_acquire("build_concordance", "alice")
+        assert first is not None
+        assert admission.try_acquire("build_concordance", "bob") == (None, "tool")
+
+        second, _ = admission.try_acquire("word_count", "alice")
+        assert admission.try_acquire("word_count", "alice") == (None, "user")
+
+        third, _ = admission.try_acquire("word_count", "bob")
+        assert admission.try_acquire("word_count", "carol") == (None, "global")
+        assert admission.active() == 3
+
+        # Повторное освобождение ничего не ломает
+        admission.release(first)
+        admission.release(first)
+        assert admission.active() == 2
+        assert admission.try_acquire("build_concordance", "bob")[0] is not None
+
+
+@pytest.mark.unit
+class TestWaitQueue:
+    """Test the bounded wait queue and rejections"""
+
+    def test_waits_for_release(self):
+        admission = controller(max_concurrent=1)
+        held, _ = admission.try_acquire("word_count", "alice")
+
+        async def scenario():
+            waiter = asyncio.create_task(admission.acquire("word_count", "bob"))
+            await asyncio.sleep(0.1)
+            assert admission.waiting == 1
+            admission.release(held)
+            return await waiter
+
+        slot = asyncio.run(scenario())
+        assert slot.waited > 0
+        assert admission.waiting == 0
+
+    def test_rejections(self):
+        admission = controller(max_concurrent=1, max_queue=1)
+        admission.try_acquire("word_count", "alice")
+
+        async def scenario():
+            waiter = asyncio.create_task(admission.acquire("word_count", "bob"))
+            await asyncio.sleep(0.05)
+
+            with pytest.raises(AdmissionRejected) as full:
+                await admission.acquire("word_count", "carol")
+            with pytest.raises(AdmissionRejected) as timeout:
+                await waiter
+            return full.value, timeout.value
+
+        full, timeout = asyncio.run(scenario())
+        assert (full.reason, full.scope) == ("queue_full", "global")
+        assert timeout.reason == "timeout"
+        assert timeout.retry_after >= 1
+        assert admission.get_stats()["rejected"] == {"queue_full": 1, "timeout": 1}
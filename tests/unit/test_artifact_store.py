@@ -0,0 +1,191 @@
+"""
+Unit Tests for Artifact Store and Job Workspaces
+
+Tests for backend/artifact_store.py and the isolated job directories of
+backend/tool_runner.py.
+"""
+
+import pytest
+from pathlib import Path
+import asyncio
+import sys
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from artifact_store import ZSTD_AVAILABLE, ArtifactStore
+from tool_runner import JobStatus, ToolRunner
+
+
+COMPRESSIONS = [None, "gzip", pytest.param("zstd", marks=pytest.mark.skipif(
+    not ZSTD_AVAILABLE, reason="zstandard не установлен"))]
+
+# Инструмент как в tools/: пишет в корень, вычисленный от своего пути
+TOOL = '''
+import sys, time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+time.sleep(float(sys.argv[4]) if len(sys.argv) > 4 else 0)
+(root_dir / "REPORT.md").write_text("report " + sys.argv[2], encoding="utf-8")
+(root_dir / "same.json").write_text("{}", encoding="utf-8")
+(root_dir / "exports").mkdir(exist_ok=True)
+(root_dir / "exports" / "data.csv").write_text("a,b", encoding="utf-8")
+(root_dir / ".tool_cache.json").write_text("cache", encoding="utf-8")
+'''
+
+# Инструмент, пишущий в директории репозитория: --target <dir> --name <имя>
+TOOL_DIRS = '''
+import sys
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+target, name = sys.argv[2], sys.argv[4]
+(root_dir / target / "index.md").write_text("index " + name, encoding="utf-8")
+for old in (root_dir / "backups").glob("old_*.zip"):
+    old.unlink()
+'''
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+class TestArtifactStore:
+    """Test content addressing, deduplication and compression"""
+
+    def test_put_and_read(self, tmp_path, compression):
+        """Test round trip and one blob per content"""
+        store = ArtifactStore(tmp_path / "artifacts", compression=compression)
+        data = ("строка отчёта\n" * 200).encode("utf-8")
+
+        first = store.put_bytes(data, "a.md")
+        second = store.put_bytes(data, "b.md")
+
+        assert first["sha256"] == second["sha256"]
+        assert (first["name"], second["name"]) == ("a.md", "b.md")
+        assert first["size"] == len(data)
+        assert first["compression"] == compression
+        assert store.read_bytes(first["sha256"]) == data
+        assert store.get_stats()["blobs"] == 1
+
+        if compression:
+            assert first["stored_size"] < first["size"]
+
+    def test_materialize(self, tmp_path, compression):
+        """Test atomic publishing of an artifact"""
+        store = ArtifactStore(tmp_path / "artifacts", compression=compression)
+        ref = store.put_bytes(b"x" * 1000, "out.txt")
+
+        store.materialize(ref, tmp_path / "out" / "out.txt")
+        assert (tmp_path / "out" / "out.txt").read_bytes() == b"x" * 1000
+        assert [p.name for p in (tmp_path / "out").iterdir()] == ["out.txt"]
+
+        with pytest.raises(FileNotFoundError):
+            store.read_bytes("0" * 64)
+
+    def test_iter_bytes(self, tmp_path, compression):
+        """Test streaming decompression in chunks"""
+        store = ArtifactStore(tmp_path / "artifacts", compression=compression)
+        data = ("строка отчёта\n" * 2000).encode("utf-8")
+        ref = store.put_bytes(data, "report.md")
+
+        chunks = list(store.iter_bytes(ref["sha256"], chunk_size=4096))
+        assert b"".join(chunks) == data
+        assert max(len(chunk) for chunk in chunks) <= 4096
+
+        with pytest.raises(FileNotFoundError):
+            list(store.iter_bytes("0" * 64))
+
+
+@pytest.mark.unit
+class TestToolRunnerWorkspaces:
+    """Test that jobs run isolated and outputs are stored as artifacts"""
+
+    def setup_repo(self, root: Path):
+        (root / "tools").mkdir(parents=True)
+        (root / "tools" / "write_report.py").write_text(TOOL, encoding="utf-8")
+        (root / "knowledge").mkdir()
+        (root / "OLD_REPORT.md").write_text("old", encoding="utf-8")
+        (root / "tools" / "write_dirs.py").write_text(TOOL_DIRS, encoding="utf-8")
+        (root / "catalogs").mkdir()
+        (root / "catalogs" / "index.md").write_text("index old", encoding="utf-8")
+        (root / "backups").mkdir()
+        (root / "backups" / "old_1.zip").write_bytes(b"zip")
+        (root / "scripts").mkdir()
+
+    def test_concurrent_jobs(self, tmp_path):
+        """Test that concurrent jobs keep their own outputs"""
+        self.setup_repo(tmp_path)
+        runner = ToolRunner(tmp_path / "tools", tmp_path)
+
+        async def run_both():
+            return await asyncio.gather(
+                runner.run_tool("write_report", {"name": "first", "delay": 0.3}),
+                runner.run_tool("write_report", {"name": "second", "delay": 0}),
+            )
+
+        first, second = asyncio.run(run_both())
+        assert first.status == second.status == JobStatus.COMPLETED
+
+        outputs = {job.job_id: {ref["name"]: ref for ref in job.output_files} for job in (first, second)}
+        for job, text in ((first, "report first"), (second, "report second")):
+            refs = outputs[job.job_id]
+            assert sorted(refs) == ["REPORT.md", "exports/data.csv", "same.json"]
+            assert runner.artifacts.read_bytes(refs["REPORT.md"]["sha256"]).decode() == text
+
+        # Одинаковые файлы - один blob: 2 отчёта + same.json + data.csv
+        assert outputs[first.job_id]["same.json"]["sha256"] == outputs[second.job_id]["same.json"]["sha256"]
+        assert runner.artifacts.get_stats()["blobs"] == 4
+
+        # Рабочие директории удалены, кэш перенесён в корень, отчёт опубликован
+        assert list((tmp_path / ".jobs").iterdir()) == []
+        assert (tmp_path / ".tool_cache.json").read_text(encoding="utf-8") == "cache"
+        assert (tmp_path / "REPORT.md").read_text(encoding="utf-8") in ("report first", "report second")
+        assert (tmp_path / "OLD_REPORT.md").read_text(encoding="utf-8") == "old"
+
+    def test_without_publishing(self, tmp_path):
+        """Test that the repository root stays untouched without publishing"""
+        self.setup_repo(tmp_path)
+        runner = ToolRunner(tmp_path / "tools", tmp_path, compression=None, publish_outputs=False)
+
+        job = asyncio.run(runner.run_tool("write_report", {"name": "x"}))
+
+        assert job.status == JobStatus.COMPLETED
+        assert not (tmp_path / "REPORT.md").exists()
+        assert not (tmp_path / "exports").exists()
+        assert [ref["compression"] for ref in job.output_files] == [None, None, None]
+
+    def test_private_directories(self, tmp_path):
+        """Test that data directories are per-job copies and deletions are published"""
+        self.setup_repo(tmp_path)
+        runner = ToolRunner(tmp_path / "tools", tmp_path)
+
+        async def run_both():
+            return await asyncio.gather(
+                runner.run_tool("write_dirs", {"target": "catalogs", "name": "first"}),
+                runner.run_tool("write_dirs", {"target": "catalogs", "name": "second"}),
+            )
+
+        first, second = asyncio.run(run_both())
+        assert first.status == second.status == JobStatus.COMPLETED
+
+        for job, text in ((first, "index first"), (second, "index second")):
+            refs = {ref["name"]: ref for ref in job.output_files}
+            assert sorted(refs) == ["catalogs/index.md"]
+            assert runner.artifacts.read_bytes(refs["catalogs/index.md"]["sha256"]).decode() == text
+
+        assert (tmp_path / "catalogs" / "index.md").read_text(encoding="utf-8") in ("index first", "index second")
+        assert not (tmp_path / "backups" / "old_1.zip").exists()
+
+    def test_shared_directory_write_fails(self, tmp_path):
+        """Test that writes under symlinked code directories fail the job"""
+        self.setup_repo(tmp_path)
+        runner = ToolRunner(tmp_path / "tools", tmp_path)
+
+        job = asyncio.run(runner.run_tool("write_dirs", {"target": "scripts", "name": "x"}))
+
+        assert job.status == JobStatus.FAILED
+        assert "scripts/index.md" in job.error
+        assert job.output_files == []
+        # Результаты не опубликованы, удаление в копии backups/ не перенесено
+        assert (tmp_path / "backups" / "old_1.zip").exists()
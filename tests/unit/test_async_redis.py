@@ -0,0 +1,67 @@
+"""
+Unit Tests for the Async Redis Client
+
+Tests for AsyncRedisClient in backend/redis_client.py without a Redis
+server: operations degrade to defaults and back off after a failure.
+"""
+
+import pytest
+from pathlib import Path
+import asyncio
+import time
+import sys
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from redis_client import AsyncRedisClient, _deserialize, _serialize
+
+# Порт, на котором никто не слушает
+UNREACHABLE = "redis://127.0.0.1:1/0"
+
+
+@pytest.mark.unit
+class TestAsyncRedisClient:
+    """Test pool sharing and behaviour with Redis down"""
+
+    def test_shared_pool(self):
+        first = AsyncRedisClient(UNREACHABLE)
+        second = AsyncRedisClient(UNREACHABLE)
+        other = AsyncRedisClient("redis://127.0.0.1:1/1")
+
+        assert first.pool is second.pool
+        assert first.pool is not other.pool
+
+    def test_serialization(self):
+        assert _serialize({"a": [1, 2]}) == '{"a": [1, 2]}'
+        assert _serialize(5) == "5"
+        assert _deserialize('{"a": [1, 2]}') == {"a": [1, 2]}
+        assert _deserialize("plain") == "plain"
+
+    def test_unavailable_defaults_and_backoff(self):
+        client = AsyncRedisClient(UNREACHABLE)
+
+        async def scenario():
+            assert await client.get("key", default="fallback") == "fallback"
+            assert not client.connected
+
+            # До истечения RETRY_AFTER Redis не опрашивается
+            started = time.monotonic()
+            results = (
+                await client.set("key", {"a": 1}),
+                await client.mget(["a", "b"]),
+                await client.mset({"a": 1}),
+                await client.hgetall("hash"),
+                await client.publish("job_updates", {"job_id": "1"}),
+                await client.publish_job_update("1", {}, {}),
+                await client.get_cached_job_statuses(["1", "2"]),
+                await client.get_info(),
+                await client.is_available()
+            )
+            assert time.monotonic() - started < 0.05
+            await client.close()
+            return results
+
+        assert asyncio.run(scenario()) == (
+            False, [None, None], False, {}, 0, False, {}, {"connected": False}, False)
@@ -0,0 +1,139 @@
+"""
+Unit Tests for Blob Cache, Patience Diff and Cached Blame
+
+Tests for tools/shared/blob_cache.py, tools/shared/line_diff.py and
+version_history.AnnotationSystem.
+"""
+
+import pytest
+import random
+import shutil
+import subprocess
+from pathlib import Path
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from shared.blob_cache import BlobCache
+from shared.line_diff import PatienceMatcher, unified_diff
+from version_history import AnnotationSystem, DiffVisualizer
+
+
+requires_git = pytest.mark.skipif(shutil.which('git') is None, reason="git not installed")
+
+
+def git(repo, *args):
+    return subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Repository with one article committed once"""
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'config', 'user.email', 'alice@test.com')
+    git(tmp_path, 'config', 'user.name', 'Alice')
+
+    (tmp_path / "a.md").write_text("l1\nl2\nl3\nl4\n", encoding='utf-8')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-q', '-m', 'One')
+
+    return tmp_path
+
+
+def commit_as(repo, author, text, message):
+    (repo / "a.md").write_text(text, encoding='utf-8')
+    git(repo, '-c', f'user.name={author}', 'commit', '-q', '-am', message)
+
+
+@pytest.mark.unit
+class TestPatienceDiff:
+    """Test patience matcher opcodes and unified output"""
+
+    def test_opcodes_rebuild_target(self):
+        """Test that opcodes always transform a into b"""
+        rng = random.Random(7)
+        for _ in range(300):
+            a = [rng.choice('abcde') for _ in range(rng.randint(0, 20))]
+            b = [rng.choice('abcde') for _ in range(rng.randint(0, 20))]
+
+            rebuilt = []
+            for tag, i1, i2, j1, j2 in PatienceMatcher(a, b).get_opcodes():
+                if tag == 'equal':
+                    assert a[i1:i2] == b[j1:j2]
+                rebuilt.extend(b[j1:j2])
+
+            assert rebuilt == b
+
+    def test_unified_diff(self):
+        """Test unified diff format"""
+        diff = list(unified_diff(['a', 'b', 'c'], ['a', 'x', 'c'], 'old', 'new', lineterm=''))
+
+        assert diff == ['--- old', '+++ new', '@@ -1,3 +1,3 @@', ' a', '-b', '+x', ' c']
+
+
+@requires_git
+@pytest.mark.unit
+class TestBlobCache:
+    """Test content-addressed storage of file versions"""
+
+    def test_file_at_commit_is_cached(self, repo):
+        """Test that a second lookup is served without git"""
+        sha = git(repo, 'rev-parse', 'HEAD').strip()
+
+        cache = BlobCache(repo)
+        assert cache.file_at(sha, "a.md") == "l1\nl2\nl3\nl4\n"
+
+        reloaded = BlobCache(repo)
+        reloaded._cat_file = lambda specs: pytest.fail("git should not be called")
+        assert reloaded.file_at(sha, "a.md") == "l1\nl2\nl3\nl4\n"
+        assert reloaded.blob_id(sha, "a.md") == git(repo, 'rev-parse', 'HEAD:a.md').strip()
+
+    def test_missing_file(self, repo):
+        """Test that a path absent at the commit returns None"""
+        cache = BlobCache(repo)
+
+        assert cache.file_at("HEAD", "missing.md") is None
+
+    def test_compare_versions(self, repo):
+        """Test diff between two cached versions"""
+        first = git(repo, 'rev-parse', 'HEAD').strip()
+        commit_as(repo, "Bob", "l1\nl2x\nl3\nl4\n", "Two")
+        second = git(repo, 'rev-parse', 'HEAD').strip()
+
+        comparison = DiffVisualizer(repo).compare_versions("a.md", first, second)
+
+        assert comparison['added'] == 1
+        assert comparison['removed'] == 1
+
+
+@requires_git
+@pytest.mark.unit
+class TestCachedBlame:
+    """Test blame cache keyed by (path, HEAD) with incremental advance"""
+
+    def test_advance_matches_git_blame(self, repo):
+        """Test that annotations carried forward equal a fresh git blame"""
+        annotator = AnnotationSystem(repo)
+        assert len(annotator.annotate_file("a.md")) == 4
+
+        commit_as(repo, "Bob", "l0\nl1\nl2x\nl3\nl4\n", "Two")
+        commit_as(repo, "Carol", "l0\nl1\nl2x\nl4\nl5\n", "Three")
+
+        annotator = AnnotationSystem(repo)
+        full_blame = annotator._run_blame("a.md")
+        annotator._run_blame = lambda *args, **kwargs: pytest.fail("blame should be carried forward")
+
+        annotations = annotator.annotate_file("a.md")
+        assert annotations == full_blame
+        assert [a['author'] for a in annotations] == ['Bob', 'Alice', 'Bob', 'Alice', 'Carol']
+
+    def test_uncommitted_changes_use_worktree(self, repo):
+        """Test that a dirty working copy is blamed live"""
+        AnnotationSystem(repo).annotate_file("a.md")
+        (repo / "a.md").write_text("l1\nl2\nl3\nl4\nnew\n", encoding='utf-8')
+
+        annotations = AnnotationSystem(repo).annotate_file("a.md")
+
+        assert annotations[-1]['author'] == 'Not Committed Yet'
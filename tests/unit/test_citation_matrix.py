@@ -0,0 +1,136 @@
+"""
+Unit Tests for Shared Citation Matrix
+
+Tests for tools/shared/citation_matrix.py used by citation_index and
+backlinks_generator.
+"""
+
+import pytest
+from pathlib import Path
+from collections import Counter
+import random
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from shared.citation_matrix import NUMPY_AVAILABLE, CitationMatrix
+from backlinks_generator import BacklinkAnalyzer
+from citation_index import CitationIndexer
+
+
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(
+    not NUMPY_AVAILABLE, reason="numpy не установлен"))]
+
+
+def random_edges(nodes=30, count=150, seed=0):
+    rng = random.Random(seed)
+    names = [f"a{i}" for i in range(nodes)]
+    edges = [(rng.choice(names), rng.choice(names)) for _ in range(count)]
+    return names, [(a, b) for a, b in edges if a != b]
+
+
+def naive_h_index(values):
+    """h-index по убыванию значений - эталон"""
+    ranked = sorted(values, reverse=True)
+    return max([i for i, value in enumerate(ranked, 1) if value >= i], default=0)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+class TestCitationMatrix:
+    """Test sparse products and indices against pairwise loops"""
+
+    def test_rows_and_degrees(self, use_numpy):
+        """Test CSR rows, columns and duplicate edges"""
+        matrix = CitationMatrix([('a', 'b'), ('a', 'b'), ('a', 'c'), ('c', 'b')],
+                                nodes=['a', 'b', 'c', 'd'], use_numpy=use_numpy)
+
+        assert matrix.cites('a') == ['b', 'c']
+        assert matrix.cited_by('b') == ['a', 'c']
+        assert matrix.cites('missing') == []
+        assert matrix.edges == 3
+        assert matrix.in_degree() == [0, 2, 1, 0]
+        assert matrix.out_degree() == [2, 0, 1, 0]
+
+    def test_cocitation_and_coupling(self, use_numpy):
+        """Test CᵀC and CCᵀ with thresholds against set intersections"""
+        names, edges = random_edges()
+        matrix = CitationMatrix(edges, nodes=names, use_numpy=use_numpy)
+
+        cites = {name: {b for a, b in edges if a == name} for name in names}
+        cited_by = {name: {a for a, b in edges if b == name} for name in names}
+
+        for min_count in (1, 2):
+            for name in names:
+                cocitations = Counter()
+                coupling = Counter()
+                for other in names:
+                    if other != name:
+                        cocitations[other] = len(cited_by[name] & cited_by[other])
+                        coupling[other] = len(cites[name] & cites[other])
+
+                for found, expected in ((matrix.cocitations(name, min_count), cocitations),
+                                        (matrix.coupling(name, min_count), coupling)):
+                    assert dict(found) == {k: v for k, v in expected.items() if v >= min_count}
+                    assert [v for _, v in found] == sorted((v for _, v in found), reverse=True)
+
+    def test_mutual_pairs(self, use_numpy):
+        """Test C ∧ Cᵀ pairs"""
+        names, edges = random_edges(seed=1)
+        matrix = CitationMatrix(edges, nodes=names, use_numpy=use_numpy)
+
+        edge_set = set(edges)
+        expected = sorted({tuple(sorted((a, b))) for a, b in edge_set if (b, a) in edge_set})
+        assert matrix.mutual_pairs() == expected
+
+    def test_h_and_i10_indices(self, use_numpy):
+        """Test h-index and threshold counts over citing values"""
+        names, edges = random_edges(count=400, seed=2)
+        matrix = CitationMatrix(edges, nodes=names, use_numpy=use_numpy)
+        values = [random.Random(i).randint(0, 15) for i in range(len(names))]
+
+        h_indices = matrix.h_indices(values)
+        i10 = matrix.count_at_least(10, values)
+        for name in names:
+            citing = [values[matrix.index[source]] for source in matrix.cited_by(name)]
+            assert h_indices[matrix.index[name]] == naive_h_index(citing)
+            assert i10[matrix.index[name]] == sum(1 for value in citing if value >= 10)
+
+
+@pytest.mark.unit
+class TestToolsUseCitationMatrix:
+    """Test citation_index and backlinks_generator on a small knowledge base"""
+
+    def test_citation_index(self, tmp_path):
+        """Test co-citation, coupling, h-index and network metrics"""
+        knowledge = tmp_path / "knowledge"
+        knowledge.mkdir()
+        links = {'a': ['c', 'd'], 'b': ['c', 'd', 'c'], 'c': ['d'], 'd': [], 'e': []}
+        for name, targets in links.items():
+            body = " ".join(f"[{t}]({t}.md)" for t in targets)
+            (knowledge / f"{name}.md").write_text(f"---\ntitle: {name}\n---\nText {body}\n", encoding='utf-8')
+
+        indexer = CitationIndexer(tmp_path)
+        indexer.build_index()
+
+        assert indexer.find_cocitations("knowledge/c.md") == [("knowledge/d.md", 2)]
+        assert indexer.find_bibliographic_coupling("knowledge/a.md") == [("knowledge/b.md", 2)]
+        # d цитируют a, b, c; у них 0, 0 и 3 цитирования
+        assert indexer.calculate_h_index("knowledge/d.md") == 1
+        assert indexer.calculate_i10_index("knowledge/d.md") == 0
+        assert indexer.calculate_citation_network_metrics() == {
+            'nodes': 5, 'edges': 5, 'density': 0.25, 'avg_out_degree': 1.0, 'isolated_nodes': 1
+        }
+
+    def test_mutual_backlinks(self):
+        """Test mutual citations from the backlinks graph"""
+        backlinks = {
+            'x.md': [{'source': 'y.md'}, {'source': 'z.md'}],
+            'y.md': [{'source': 'x.md'}],
+            'z.md': [],
+        }
+        analyzer = BacklinkAnalyzer(backlinks, {'x.md': {}, 'y.md': {}, 'z.md': {}})
+
+        assert analyzer.get_mutual_citations() == [('x.md', 'y.md')]
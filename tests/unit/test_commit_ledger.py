@@ -0,0 +1,110 @@
+"""
+Unit Tests for Commit Ledger
+
+Tests for tools/shared/commit_ledger.py used by recent_changes.
+"""
+
+import pytest
+import shutil
+import subprocess
+from pathlib import Path
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from shared.commit_ledger import CommitLedger
+from recent_changes import ChangeImpactAnalyzer
+
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason="git not installed")
+
+
+def git(repo, *args):
+    subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Repository with two commits by two authors"""
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'config', 'user.email', 'alice@test.com')
+    git(tmp_path, 'config', 'user.name', 'Alice')
+
+    (tmp_path / "a.md").write_text("one\ntwo\n", encoding='utf-8')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-q', '-m', 'Add a')
+
+    (tmp_path / "a.md").write_text("one\n", encoding='utf-8')
+    (tmp_path / "b.py").write_text("x = 1\n", encoding='utf-8')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-q', '--author', 'Bob <bob@test.com>', '-m', 'Edit a, add b')
+
+    return tmp_path
+
+
+@pytest.mark.unit
+class TestCommitLedger:
+    """Test ledger building, incremental update and window aggregates"""
+
+    def test_commits_with_numstat(self, repo):
+        """Test that per-file insertions/deletions are recorded"""
+        ledger = CommitLedger.open(repo)
+
+        commits = ledger.commits_since("2000-01-01")
+        assert [c['message'] for c in commits] == ['Edit a, add b', 'Add a']
+
+        files = {f['path']: f for f in commits[0]['files']}
+        assert files['a.md']['deletions'] == 1
+        assert files['b.py']['status'] == 'A'
+        assert commits[0]['stats'] == {'insertions': 1, 'deletions': 1}
+
+    def test_aggregates(self, repo):
+        """Test contributor, file and churn aggregates"""
+        totals = CommitLedger.open(repo).aggregate("2000-01-01")
+
+        assert totals['contributors']['Alice']['insertions'] == 2
+        assert totals['contributors']['Bob']['files_changed'] == 2
+        assert totals['file_activity']['a.md'] == 2
+        assert totals['file_churn']['a.md'] == 3
+        assert sum(totals['hourly_activity'].values()) == 2
+
+    def test_incremental_update(self, repo):
+        """Test that only new commits are appended"""
+        assert len(CommitLedger.open(repo).commits_since("2000-01-01")) == 2
+
+        (repo / "b.py").write_text("x = 2\n", encoding='utf-8')
+        git(repo, 'commit', '-q', '-am', 'Edit b')
+
+        ledger = CommitLedger(repo)
+        assert ledger.update() == 1
+        assert ledger.update() == 0
+        assert len(ledger.commits_since("2000-01-01")) == 3
+        assert ledger.aggregate("2000-01-01")['file_activity']['b.py'] == 2
+        assert len(ledger.ledger_file.read_text(encoding='utf-8').splitlines()) == 3
+
+    def test_window_filter(self, repo):
+        """Test that days before the window are excluded"""
+        ledger = CommitLedger.open(repo)
+
+        assert ledger.commits_since("2999-01-01") == []
+        assert ledger.aggregate("2999-01-01")['file_activity'] == {}
+
+    def test_hotspots_use_ledger_churn(self, repo):
+        """Test ChangeImpactAnalyzer with precomputed churn"""
+        ledger = CommitLedger.open(repo)
+        totals = ledger.aggregate("2000-01-01")
+
+        analyzer = ChangeImpactAnalyzer(
+            ledger.commits_since("2000-01-01"),
+            dict(totals['file_activity']),
+            file_churn=totals['file_churn']
+        )
+        fallback = ChangeImpactAnalyzer(
+            ledger.commits_since("2000-01-01"),
+            dict(totals['file_activity'])
+        )
+
+        assert analyzer.identify_hotspots(1) == fallback.identify_hotspots(1)
+        assert analyzer.identify_hotspots(1)[0]['total_churn'] == 3
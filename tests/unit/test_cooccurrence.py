@@ -0,0 +1,139 @@
+"""
+Unit Tests for Shared Co-occurrence Matrix
+
+Tests for tools/shared/cooccurrence.py used by the tag, thesaurus,
+concordance and related-articles tools.
+"""
+
+import pytest
+from pathlib import Path
+from collections import defaultdict
+import math
+import random
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from shared.cooccurrence import NUMPY_AVAILABLE, CooccurrenceMatrix
+from build_concordance import CooccurrenceAnalyzer
+from tags_cloud import TagRecommender, TagStatisticsAnalyzer
+
+
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(
+    not NUMPY_AVAILABLE, reason="numpy не установлен"))]
+
+
+def random_documents(count=40, seed=0):
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(25)]
+    return [[rng.choice(vocabulary) for _ in range(rng.randint(0, 30))] for _ in range(count)]
+
+
+def window_counts(documents, window_size):
+    """Прежний подсчёт вложенными словарями - эталон"""
+    counts = defaultdict(lambda: defaultdict(int))
+    for words in documents:
+        for i, word in enumerate(words):
+            for j in range(max(0, i - window_size), min(len(words), i + window_size + 1)):
+                if i != j:
+                    counts[word][words[j]] += 1
+    return {term: dict(row) for term, row in counts.items()}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+class TestCooccurrenceMatrix:
+    """Test accumulation models, CSR queries and association scores"""
+
+    def test_window_counts_match_nested_dicts(self, use_numpy):
+        """Test windowed counting, including queries between additions"""
+        documents = random_documents()
+        matrix = CooccurrenceMatrix(use_numpy=use_numpy)
+
+        for n, words in enumerate(documents):
+            matrix.add_window(words, 3)
+            if n % 5 == 0:
+                matrix.related('w1')
+
+        assert matrix.to_dict() == window_counts(documents, 3)
+        assert matrix.count('w1', 'w2') == window_counts(documents, 3)['w1'].get('w2', 0)
+
+    def test_document_pairs(self, use_numpy):
+        """Test that each pair of distinct terms counts once per document"""
+        matrix = CooccurrenceMatrix(use_numpy=use_numpy)
+        matrix.add_document(['python', 'docker', 'python'])
+        matrix.add_document(['docker', 'python', 'linux'])
+        matrix.add_document(['linux'])
+
+        assert matrix.pairs() == [('python', 'docker', 2), ('python', 'linux', 1), ('docker', 'linux', 1)]
+        assert matrix.pairs(min_count=2) == [('python', 'docker', 2)]
+        assert list(matrix.term_counts) == [2, 2, 2]
+        assert 'linux' in matrix
+        assert 'rust' not in matrix
+
+    def test_scores(self, use_numpy):
+        """Test PMI, NPMI and Jaccard against direct formulas"""
+        matrix = CooccurrenceMatrix(use_numpy=use_numpy)
+        for tags in (['a', 'b'], ['a', 'b', 'c'], ['a', 'c'], ['b', 'd']):
+            matrix.add_document(tags)
+
+        # Строки: a = {b: 2, c: 2}, b = {a: 2, c: 1, d: 1}, общая сумма 12
+        pmi = dict(matrix.related('a', None, 'pmi'))
+        assert pmi['b'] == pytest.approx(math.log(2 * 12 / (4 * 4)))
+
+        npmi = dict(matrix.related('a', None, 'npmi'))
+        assert npmi['b'] == pytest.approx(math.log(2 * 12 / (4 * 4)) / -math.log(2 / 12))
+
+        jaccard = dict(matrix.related('a', None, 'jaccard'))
+        assert jaccard['b'] == pytest.approx(2 / (3 + 3 - 2))
+
+        with pytest.raises(ValueError):
+            matrix.related('a', measure='cosine')
+
+    def test_related_all_matches_related(self, use_numpy):
+        """Test vectorized top-k for all terms and tie order by first appearance"""
+        matrix = CooccurrenceMatrix(use_numpy=use_numpy)
+        for words in random_documents(seed=1):
+            matrix.add_window(words, 2)
+
+        for measure in ('count', 'npmi'):
+            top = matrix.related_all(top_n=4, measure=measure)
+            for term in matrix.terms[:10]:
+                assert top.get(term, []) == matrix.related(term, 4, measure)
+
+        counts = [count for _, count in matrix.related('w1', None)]
+        assert counts == sorted(counts, reverse=True)
+
+
+@pytest.mark.unit
+class TestToolsUseCooccurrenceMatrix:
+    """Test tool results against the former nested-dict code"""
+
+    def test_concordance_related_words(self):
+        """Test related words of the concordance analyzer"""
+        documents = random_documents(seed=2)
+        analyzer = CooccurrenceAnalyzer(window_size=10)
+        for words in documents:
+            analyzer.analyze_text(words)
+
+        expected = window_counts(documents, 10)['w3']
+        related = analyzer.get_related_words('w3', top_n=5)
+        assert [count for _, count in related] == sorted(
+            (count for word, count in expected.items() if word != 'w3'), reverse=True)[:5]
+        assert all(expected[word] == count for word, count in related)
+
+    def test_tag_co_occurrence_and_recommendations(self):
+        """Test tag pairs and co-occurrence-based recommendations"""
+        tag_stats = {
+            'python': {'count': 3, 'articles': [{'path': 'a.md'}, {'path': 'b.md'}, {'path': 'c.md'}]},
+            'docker': {'count': 2, 'articles': [{'path': 'a.md'}, {'path': 'b.md'}]},
+            'linux': {'count': 2, 'articles': [{'path': 'b.md'}, {'path': 'c.md'}]},
+        }
+
+        co_occ = TagStatisticsAnalyzer(tag_stats).calculate_co_occurrence()
+        assert co_occ == {('docker', 'python'): 2, ('linux', 'python'): 2, ('docker', 'linux'): 1}
+
+        recommendations = TagRecommender(tag_stats).recommend_tags(['docker'])
+        assert recommendations == [('python', pytest.approx(2 / 3)), ('linux', pytest.approx(1 / 3))]
@@ -0,0 +1,125 @@
+"""
+Unit Tests for File Serving
+
+Tests for backend/file_serving.py used by api/main.py /api/files/{filename}
+and the static mount of backend/server.py.
+"""
+
+import pytest
+from pathlib import Path
+import gzip
+import hashlib
+import os
+import sys
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.routing import Mount, Route
+from starlette.testclient import TestClient
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from file_serving import PrecompressedStaticFiles, parse_range, precompress, serve_file
+
+
+DATA = ('{"term": "значение"}\n' * 2000).encode('utf-8')
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "report.json").write_bytes(DATA)
+    static = tmp_path / "static"
+    static.mkdir()
+    (static / "app.js").write_bytes(b"console.log('x');\n" * 200)
+
+    async def get_file(request: Request):
+        return await serve_file(request, tmp_path / request.path_params['name'])
+
+    app = Starlette(routes=[
+        Route("/files/{name}", get_file),
+        Mount("/app", PrecompressedStaticFiles(directory=str(static))),
+    ])
+    return TestClient(app)
+
+
+@pytest.mark.unit
+class TestParseRange:
+    """Test single byte range parsing"""
+
+    def test_ranges(self):
+        assert parse_range("bytes=0-9", 100) == (0, 9)
+        assert parse_range("bytes=90-", 100) == (90, 99)
+        assert parse_range("bytes=-10", 100) == (90, 99)
+        assert parse_range("bytes=50-500", 100) == (50, 99)
+        assert parse_range("bytes=0-1,5-6", 100) is None
+        assert parse_range("bytes=9-1", 100) is None
+        assert parse_range("items=0-1", 100) is None
+
+        with pytest.raises(ValueError):
+            parse_range("bytes=100-", 100)
+
+
+@pytest.mark.unit
+class TestServeFile:
+    """Test validators, ranges and precompressed siblings"""
+
+    def test_etag_and_not_modified(self, client):
+        """Test strong content ETag and 304 on re-poll"""
+        response = client.get("/files/report.json", headers={"Accept-Encoding": "identity"})
+
+        assert response.status_code == 200
+        assert response.content == DATA
+        assert response.headers["etag"] == f'"{hashlib.sha256(DATA).hexdigest()}"'
+        assert response.headers["accept-ranges"] == "bytes"
+
+        again = client.get("/files/report.json", headers={
+            "Accept-Encoding": "identity", "If-None-Match": response.headers["etag"]})
+        assert again.status_code == 304
+        assert again.content == b""
+
+    def test_range(self, client):
+        """Test partial content, If-Range and unsatisfiable ranges"""
+        response = client.get("/files/report.json", headers={"Range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.content == DATA[10:20]
+        assert response.headers["content-range"] == f"bytes 10-19/{len(DATA)}"
+
+        stale = client.get("/files/report.json", headers={
+            "Range": "bytes=10-19", "If-Range": '"old"', "Accept-Encoding": "identity"})
+        assert stale.status_code == 200
+        assert stale.content == DATA
+
+        assert client.get("/files/report.json", headers={"Range": f"bytes={len(DATA)}-"}).status_code == 416
+
+    def test_precompressed(self, client, tmp_path):
+        """Test gzip sibling selection and freshness"""
+        path = tmp_path / "report.json"
+        assert [p.name for p in precompress(path)][0] == "report.json.gz"
+
+        response = client.get("/files/report.json", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"].endswith('-gzip"')
+        assert int(response.headers["content-length"]) == (tmp_path / "report.json.gz").stat().st_size
+        assert response.content == DATA  # распаковано клиентом
+
+        # Оригинал новее сжатой копии - копия не используется
+        stat = path.stat()
+        os.utime(tmp_path / "report.json.gz", ns=(stat.st_atime_ns, stat.st_mtime_ns - 10 ** 9))
+        response = client.get("/files/report.json", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_static_mount(self, client, tmp_path):
+        """Test the static files mount"""
+        precompress(tmp_path / "static" / "app.js")
+
+        response = client.get("/app/app.js", headers={"Accept-Encoding": "gzip, br;q=0"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert gzip.decompress((tmp_path / "static" / "app.js.gz").read_bytes()) == response.content
+
+        again = client.get("/app/app.js", headers={
+            "Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+        assert again.status_code == 304
+        assert client.get("/app/missing.js").status_code == 404
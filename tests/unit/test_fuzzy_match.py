@@ -0,0 +1,161 @@
+"""
+Unit Tests for Shared Fuzzy Matching
+
+Tests for tools/shared/fuzzy_match.py used by the glossary, tag,
+knowledge-graph and duplicate tools.
+"""
+
+import pytest
+from pathlib import Path
+import random
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from shared.fuzzy_match import BKTree, levenshtein, max_edits, similar_pairs
+from tags_cloud import TagNormalizer
+from knowledge_graph_builder import EntityLinker
+from duplicate_detector import DuplicateDetector
+
+
+def naive_distance(s1, s2):
+    """Полная матрица DP - эталон"""
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, 1):
+        current_row = [i]
+        for j, c2 in enumerate(s2, 1):
+            current_row.append(min(previous_row[j] + 1, current_row[j - 1] + 1,
+                                   previous_row[j - 1] + (c1 != c2)))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def random_words(count, alphabet='abcd', max_length=8, seed=0):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, max_length)))
+            for _ in range(count)]
+
+
+@pytest.mark.unit
+class TestLevenshtein:
+    """Test exact and bounded edit distance"""
+
+    def test_exact_distance(self):
+        """Test known distances and agreement with full DP"""
+        assert levenshtein('kitten', 'sitting') == 3
+        assert levenshtein('', 'abc') == 3
+        assert levenshtein('docker', 'docker') == 0
+
+        words = random_words(60)
+        for a in words:
+            for b in words:
+                assert levenshtein(a, b) == naive_distance(a, b)
+
+    def test_bounded_distance(self):
+        """Test that the bounded result is exact up to the bound and k+1 above"""
+        words = random_words(60, seed=1)
+        for a in words:
+            for b in words:
+                expected = naive_distance(a, b)
+                for k in (0, 1, 2, 3):
+                    assert levenshtein(a, b, k) == (expected if expected <= k else k + 1)
+
+    def test_max_edits(self):
+        """Test the largest distance allowed by a similarity threshold"""
+        assert max_edits(10, 0.8) == 2
+        assert max_edits(4, 0.8) == 0
+        assert max_edits(5, 0.8) == 1
+
+
+@pytest.mark.unit
+class TestBKTree:
+    """Test Burkhard-Keller tree queries"""
+
+    def test_search_matches_brute_force(self):
+        """Test range queries against a linear scan"""
+        words = random_words(200, seed=2)
+        tree = BKTree(words)
+
+        assert len(tree) == len(set(words))
+        for word in words[:20]:
+            for k in (1, 2):
+                expected = {(w, naive_distance(word, w)) for w in set(words)
+                            if naive_distance(word, w) <= k}
+                assert set(tree.search(word, k)) == expected
+
+
+@pytest.mark.unit
+class TestSimilarPairs:
+    """Test the self-join against all-pairs comparison"""
+
+    def test_fixed_distance(self):
+        """Test deletion-neighbourhood join, including duplicate strings"""
+        words = random_words(150, seed=3)
+        for k in (0, 1, 2):
+            expected = [(i, j, naive_distance(words[i], words[j]))
+                        for i in range(len(words)) for j in range(i + 1, len(words))
+                        if naive_distance(words[i], words[j]) <= k]
+            assert similar_pairs(words, max_distance=k) == expected
+
+    def test_similarity_threshold(self):
+        """Test q-gram prefix-filter join"""
+        words = random_words(150, alphabet='abcdef', max_length=14, seed=4)
+        for threshold in (0.5, 0.7, 0.8):
+            expected = []
+            for i in range(len(words)):
+                for j in range(i + 1, len(words)):
+                    distance = naive_distance(words[i], words[j])
+                    max_len = max(len(words[i]), len(words[j]))
+                    if max_len == 0 or 1 - distance / max_len >= threshold:
+                        expected.append((i, j, distance))
+            assert similar_pairs(words, min_similarity=threshold) == expected
+
+
+@pytest.mark.unit
+class TestToolsUseSharedMatcher:
+    """Test tool results against the former pairwise loops"""
+
+    def test_find_similar_tags(self):
+        """Test tag groups and their order"""
+        tags = ['python', 'pyhton', 'docker', 'dockers', 'java', 'jawa', 'python3']
+
+        expected = {}
+        for i, tag1 in enumerate(tags):
+            for tag2 in tags[i + 1:]:
+                if naive_distance(tag1, tag2) <= 2:
+                    expected.setdefault(tag1, []).append(tag2)
+                    expected.setdefault(tag2, []).append(tag1)
+
+        assert TagNormalizer.find_similar_tags(tags) == expected
+
+    def test_find_similar_entities(self):
+        """Test merge candidates skip identical names and respect threshold"""
+        linker = EntityLinker({'Kubernetes': {}, 'kubernetes ': {}, 'Kubernets': {},
+                               'PostgreSQL': {}, 'Postgres': {}, 'Redis': {}})
+
+        pairs = linker.find_similar_entities(threshold=0.8)
+
+        assert ('Kubernetes', 'Kubernets', 0.9) in pairs
+        assert not any({a, b} == {'Kubernetes', 'kubernetes '} for a, b, _ in pairs)
+        assert ('PostgreSQL', 'Postgres', 0.8) in pairs
+        assert all(s >= 0.8 for _, _, s in pairs)
+
+    def test_find_similar_titles(self, tmp_path):
+        """Test that title pairs match title_similarity"""
+        detector = DuplicateDetector(tmp_path)
+        titles = ['Docker Basics', 'Docker basics!', 'Docker Bascis', 'Kubernetes', 'Redis']
+        detector.articles = {f"knowledge/{i}.md": {'title': t, 'content': ''}
+                             for i, t in enumerate(titles)}
+
+        detector.find_similar_titles()
+
+        expected = [
+            (titles[i], titles[j], detector.title_similarity(titles[i], titles[j]))
+            for i in range(len(titles)) for j in range(i + 1, len(titles))
+            if detector.title_similarity(titles[i], titles[j]) >= 0.7
+        ]
+        found = [(p['articles'][0]['title'], p['articles'][1]['title'], p['similarity'])
+                 for p in detector.duplicates['similar_titles']]
+        assert found == expected
@@ -0,0 +1,128 @@
+"""
+Unit Tests for Shared Git History
+
+Tests for tools/shared/git_history.py (single-pass git log table).
+"""
+
+import pytest
+import shutil
+import subprocess
+from pathlib import Path
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from shared.git_history import GitHistory, changed_files
+
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason="git not installed")
+
+
+def git(repo, *args):
+    subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Repository with an add, a rename+edit and a second file"""
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'config', 'user.email', 'author@test.com')
+    git(tmp_path, 'config', 'user.name', 'Author')
+
+    kb = tmp_path / "knowledge"
+    kb.mkdir()
+    (kb / "old.md").write_text("one\ntwo\n", encoding='utf-8')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-q', '-m', 'Add article')
+
+    git(tmp_path, 'mv', 'knowledge/old.md', 'knowledge/new.md')
+    (kb / "new.md").write_text("one\ntwo\nthree\n", encoding='utf-8')
+    (kb / "other.md").write_text("x\n", encoding='utf-8')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'commit', '-q', '-m', 'Rename | and extend')
+
+    return tmp_path
+
+
+@pytest.mark.unit
+class TestGitHistory:
+    """Test history table building and queries"""
+
+    def test_file_history(self, repo):
+        """Test per-file entries with churn"""
+        history = GitHistory.open(repo)
+
+        entries = history.file_history("knowledge/new.md")
+        assert len(entries) == 1
+        assert entries[0]['status'] == 'R'
+        assert entries[0]['added'] == 1
+        assert entries[0]['message'] == 'Rename | and extend'
+
+    def test_follow_renames(self, repo):
+        """Test that follow=True continues through the rename"""
+        history = GitHistory.open(repo)
+
+        entries = history.file_history(repo / "knowledge" / "new.md", follow=True)
+        assert [e['path'] for e in entries] == ["knowledge/new.md", "knowledge/old.md"]
+        assert entries[1]['added'] == 2
+
+    def test_incremental_update(self, repo):
+        """Test that only new commits are read after HEAD moves"""
+        assert len(GitHistory.open(repo).commits) == 2
+
+        (repo / "knowledge" / "other.md").write_text("x\ny\n", encoding='utf-8')
+        git(repo, 'commit', '-q', '-am', 'Edit other')
+
+        history = GitHistory(repo)
+        assert history.update() == 1
+        assert len(history.commits) == 3
+        assert history.edit_count("knowledge/other.md") == 2
+        assert history.update() == 0
+
+    def test_queries(self, repo):
+        """Test commit filters and authors"""
+        history = GitHistory.open(repo)
+
+        assert history.available
+        assert history.authors() == {'Author'}
+        assert len(list(history.iter_commits(path_prefix='knowledge/'))) == 2
+        assert history.last_modified("knowledge/other.md") is not None
+        assert history.last_modified("knowledge/missing.md") is None
+
+    def test_non_ascii_paths(self, repo, monkeypatch, tmp_path_factory):
+        """Test Cyrillic file names (not C-quoted) and paths relative to root_dir"""
+        article = repo / "knowledge" / "статья.md"
+        article.write_text("текст\n", encoding='utf-8')
+        git(repo, 'add', '.')
+        git(repo, 'commit', '-q', '-m', 'Статья')
+
+        # Текущий каталог - не корень репозитория
+        monkeypatch.chdir(tmp_path_factory.mktemp("elsewhere"))
+        history = GitHistory.open(repo)
+
+        assert history.edit_count("knowledge/статья.md") == 1
+        assert history.file_history(article)[0]['added'] == 1
+        assert history.last_modified("knowledge/статья.md") is not None
+        assert history.edit_count("knowledge/other.md") == 1
+
+    def test_changed_files_non_ascii(self, repo):
+        """Test that modified and untracked Cyrillic paths are listed unquoted"""
+        (repo / "knowledge" / "статья.md").write_text("a\n", encoding='utf-8')
+        git(repo, 'add', '.')
+        git(repo, 'commit', '-q', '-m', 'Статья')
+
+        (repo / "knowledge" / "статья.md").write_text("b\n", encoding='utf-8')
+        (repo / "knowledge" / "новая статья.md").write_text("c\n", encoding='utf-8')
+
+        assert sorted(changed_files(repo, 'knowledge')) == [
+            "knowledge/новая статья.md", "knowledge/статья.md"]
+        assert all((repo / path).exists() for path in changed_files(repo, 'knowledge'))
+
+    def test_not_a_repository(self, tmp_path):
+        """Test graceful behaviour outside git"""
+        history = GitHistory.open(tmp_path)
+
+        assert not history.available
+        assert history.file_history("knowledge/a.md") == []
@@ -0,0 +1,128 @@
+"""
+Unit Tests for Job Scheduler
+
+Tests for backend/job_scheduler.py: cost estimates, queue routing,
+priorities and per-user fair share.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from job_scheduler import JobScheduler
+from tool_registry import ToolRegistry
+
+
+TOOL = '''#!/usr/bin/env python3
+"""{doc}"""
+
+def main():
+    pass
+'''
+
+
+@pytest.fixture
+def registry(tmp_path):
+    tools = tmp_path / "tools"
+    tools.mkdir()
+    (tools / "word_count.py").write_text(TOOL.format(doc="Count words"), encoding="utf-8")
+    (tools / "build_graph.py").write_text(
+        TOOL.format(doc="Build link graph") + "\n# padding\n" * 400, encoding="utf-8")
+    (tools / "check_links.py").write_text(TOOL.format(doc="Check links"), encoding="utf-8")
+
+    registry = ToolRegistry(tools)
+    registry.scan_tools()
+    return registry
+
+
+@pytest.mark.unit
+class TestCostEstimates:
+    """Test registry estimates corrected by real durations"""
+
+    def test_registry_estimates(self, registry):
+        scheduler = JobScheduler(registry, stats_loader=None)
+
+        assert scheduler.estimate_duration("word_count") == (10, "registry")
+        assert scheduler.estimate_duration("build_graph") == (120, "registry")  # 30s x high
+        assert scheduler.estimate_duration("unknown") == (60.0, "default")
+
+        assert scheduler.schedule("word_count").queue == "tools.fast"
+        assert scheduler.schedule("build_graph").queue == "tools.standard"
+
+    def test_learned_durations(self, registry):
+        """Test that ToolStats move a tool to the right queue"""
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return {"check_links": (10, 3600.0), "word_count": (1, 20.0)}
+
+        scheduler = JobScheduler(registry, stats_loader=loader)
+
+        duration, source = scheduler.estimate_duration("check_links")
+        assert source == "stats"
+        assert duration == pytest.approx((10 * 3600 + 3 * 10) / 13)
+        assert scheduler.schedule("check_links").queue == "tools.long"
+
+        # Один запуск почти не сдвигает оценку реестра
+        assert scheduler.estimate_duration("word_count")[0] == pytest.approx((20 + 3 * 10) / 4)
+        assert len(calls) == 1  # статистика кэшируется на stats_ttl
+
+    def test_stats_failure(self, registry):
+        def loader():
+            raise RuntimeError("database is down")
+
+        scheduler = JobScheduler(registry, stats_loader=loader)
+        assert scheduler.estimate_duration("word_count") == (10, "registry")
+
+
+@pytest.mark.unit
+class TestPriorities:
+    """Test Celery priorities and fair share"""
+
+    def test_priority_mapping(self):
+        assert JobScheduler.celery_priority(10) == 0
+        assert JobScheduler.celery_priority(5) == 5
+        assert JobScheduler.celery_priority(1) == 9
+        assert JobScheduler.celery_priority(42) == 0
+        assert JobScheduler.celery_priority(1, active_jobs=3) == 9
+
+    def test_fair_share(self, registry):
+        """Test that a user's backlog lowers their next jobs, not other users'"""
+        scheduler = JobScheduler(registry, stats_loader=None)
+
+        batch = [scheduler.schedule("word_count", user_id="alice").priority for _ in range(6)]
+        assert batch == [5, 6, 7, 8, 9, 9]
+
+        other = scheduler.schedule("word_count", user_id="bob")
+        assert other.priority == 5
+        assert other.user_active_jobs == 0
+
+        for _ in range(6):
+            scheduler.job_finished("alice")
+        assert scheduler.active_jobs("alice") == 0
+        assert scheduler.schedule("word_count", priority=8, user_id="alice").priority == 2
+
+    def test_fair_share_per_job(self, registry, monkeypatch):
+        """Test that jobs are released by id, at most once, and expire by age"""
+        import job_scheduler
+
+        scheduler = JobScheduler(registry, stats_loader=None)
+        scheduler.schedule("word_count", user_id="alice", job_id="j1")
+        scheduler.schedule("word_count", user_id="alice", job_id="j2")
+        assert scheduler.active_jobs("alice") == 2
+
+        # Повторное снятие (on_failure после task_revoked) не уходит в минус
+        scheduler.job_finished("alice", "j1")
+        scheduler.job_finished("alice", "j1")
+        assert scheduler.active_jobs("alice") == 1
+
+        # Никем не снятая задача перестаёт учитываться через ACTIVE_JOBS_TTL
+        now = job_scheduler.time.time()
+        monkeypatch.setattr(job_scheduler.time, "time", lambda: now + job_scheduler.ACTIVE_JOBS_TTL + 1)
+        assert scheduler.active_jobs("alice") == 0
+        assert scheduler._local_active == {}
@@ -0,0 +1,99 @@
+"""
+Unit Tests for Shared Keyword Classifier
+
+Tests for tools/shared/keyword_classifier.py used by add_dewey and
+process_inbox.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from shared.keyword_classifier import NUMPY_AVAILABLE, KeywordClassifier
+from add_dewey import MLClassifier
+from process_inbox import AdvancedInboxProcessor
+
+
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(
+    not NUMPY_AVAILABLE, reason="numpy не установлен"))]
+
+WEIGHTS = [
+    ('python', 'programming', 2.0),
+    ('code', 'programming', 1.0),
+    ('recipe', 'cooking', 3.0),
+    ('soup', 'cooking', 1.0),
+    ('code', 'security', 0.5),
+    ('code', 'programming', 1.0),  # повтор суммируется
+]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+class TestKeywordClassifier:
+    """Test batch scoring and top-k confidences"""
+
+    def test_token_scores(self, use_numpy):
+        """Test scores as counts times summed keyword weights"""
+        model = KeywordClassifier(WEIGHTS, use_numpy=use_numpy)
+        scores = [list(map(float, row)) for row in model.scores(["Python code, more CODE", "soup recipe", ""])]
+
+        assert model.labels == ['programming', 'cooking', 'security']
+        assert scores == [[2.0 + 2 * 2.0, 0.0, 1.0], [0.0, 4.0, 0.0], [0.0, 0.0, 0.0]]
+
+    def test_substring_matching(self, use_numpy):
+        """Test str.count semantics for substring keywords"""
+        model = KeywordClassifier(WEIGHTS, match='substring', use_numpy=use_numpy)
+        scores = model.scores(["pythonic codecs"])
+
+        assert [float(s) for s in scores[0]] == [2.0 + 2.0, 0.0, 0.5]
+
+    def test_top_k(self, use_numpy):
+        """Test max and sum normalization, positive classes only"""
+        model = KeywordClassifier(WEIGHTS, use_numpy=use_numpy)
+        texts = ["python code", "nothing", "code"]
+
+        assert model.top_k(texts, k=2) == [
+            [('programming', 100.0), ('security', 12.5)],
+            [],
+            [('programming', 100.0), ('security', 25.0)],
+        ]
+        assert model.top_k(["code"], normalize='sum') == [[('programming', 80.0), ('security', 20.0)]]
+
+
+@pytest.mark.unit
+class TestToolsUseKeywordClassifier:
+    """Test the tools' batch APIs against single-document results"""
+
+    def test_dewey_batch_matches_single(self):
+        """Test MLClassifier.classify_batch and classify"""
+        classifier = MLClassifier()
+        documents = [
+            ("Python programming and software development with a database query", "Code"),
+            ("Neural networks, llm and gpt models for ai", "AI"),
+            ("Nothing relevant", ""),
+        ]
+
+        batch = classifier.classify_batch(documents)
+
+        assert batch == [classifier.classify(content, title) for content, title in documents]
+        assert batch[1][0] == ('006.3', 100.0)
+        assert batch[2] == []
+
+    def test_inbox_categorization(self, tmp_path):
+        """Test category scores and confidence, including no matches"""
+        processor = AdvancedInboxProcessor(tmp_path)
+
+        # "супа" содержит "суп" - подстроки, как в str.count
+        text = "Рецепт супа: ингредиент и приготовление, python"
+        scores = processor.calculate_category_score(text)
+        assert scores == {'computers': 2.0, 'household': 0.0, 'cooking': 11.0}
+
+        assert processor.categorize_batch([text, "пусто"]) == [
+            ('cooking', round(11.0 / 13.0 * 100, 2)),
+            ('computers', 0.0),
+        ]
+        assert processor.categorize_content(text) == ('cooking', round(11.0 / 13.0 * 100, 2))
@@ -0,0 +1,206 @@
+"""
+Unit Tests for Async External Link Checking
+
+Tests for AsyncLinkChecker in tools/check_links.py against a local stub
+HTTP server.
+"""
+
+import pytest
+from pathlib import Path
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from check_links import HTTPX_AVAILABLE, AsyncLinkChecker, LinkHealthMonitor
+
+pytestmark = pytest.mark.skipif(not HTTPX_AVAILABLE, reason="httpx не установлен")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Заглушка сайта: ETag на /ok, 404, редирект, сайт без HEAD"""
+
+    def _respond(self):
+        server = self.server
+        with server.lock:
+            server.requests[(self.command, self.path)] += 1
+            server.started.append(time.monotonic())
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+
+        try:
+            time.sleep(server.delay)
+
+            if self.path == '/ok':
+                if self.headers.get('If-None-Match') == '"v1"':
+                    self.send_response(304)
+                else:
+                    self.send_response(200)
+                self.send_header('ETag', '"v1"')
+            elif self.path == '/redirect':
+                self.send_response(302)
+                self.send_header('Location', '/ok')
+            elif self.path == '/busy':
+                self.send_response(429)
+                self.send_header('Retry-After', '86400')
+            elif self.path == '/nohead' and self.command == 'HEAD':
+                self.send_response(405)
+            elif self.path == '/nohead' or self.path.startswith('/page'):
+                self.send_response(200)
+            else:
+                self.send_response(404)
+
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    do_HEAD = _respond
+    do_GET = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.lock = threading.Lock()
+    server.requests = Counter()
+    server.started = []
+    server.active = 0
+    server.max_active = 0
+    server.delay = 0.0
+    server.base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = start_server()
+    yield server
+    stop_server(server)
+
+
+@pytest.fixture
+def slow_server():
+    server = start_server()
+    server.delay = 0.2
+    yield server
+    stop_server(server)
+
+
+def write_articles(root: Path, base: str):
+    knowledge = root / "knowledge"
+    knowledge.mkdir()
+    (knowledge / "a.md").write_text(
+        f"---\ntitle: A\n---\n[сайт]({base}/ok) [нет]({base}/missing) [редирект]({base}/redirect)\n", encoding='utf-8')
+    (knowledge / "b.md").write_text(
+        f"---\ntitle: B\n---\n[тот же сайт]({base}/ok) [без HEAD]({base}/nohead)\n", encoding='utf-8')
+
+
+def checker(monitor, **kwargs):
+    kwargs.setdefault('host_delay', 0)
+    kwargs.setdefault('backoff_factor', 0)
+    return AsyncLinkChecker(monitor, **kwargs)
+
+
+@pytest.mark.unit
+class TestAsyncLinkChecker:
+    """Test statuses, deduplication, revalidation and host limits"""
+
+    def test_statuses(self, stub_server, tmp_path):
+        """Test ok, 404, redirects and GET fallback after 405"""
+        base = stub_server.base
+        monitor = LinkHealthMonitor(tmp_path)
+        results = checker(monitor).run([f"{base}/ok", f"{base}/missing", f"{base}/redirect", f"{base}/nohead"])
+
+        assert results[f"{base}/ok"]['status'] == 'ok'
+        assert results[f"{base}/missing"]['status'] == 'not_found'
+        assert results[f"{base}/redirect"]['status'] == 'ok'
+        assert results[f"{base}/redirect"]['redirect_count'] == 1
+        assert results[f"{base}/nohead"]['status'] == 'ok'
+        assert stub_server.requests[('GET', '/nohead')] == 1
+        assert monitor.history[monitor.get_link_hash(f"{base}/ok")]['etag'] == '"v1"'
+
+    def test_check_all_deduplicates(self, stub_server, tmp_path):
+        """Test that a URL shared by articles is requested once"""
+        write_articles(tmp_path, stub_server.base)
+        monitor = LinkHealthMonitor(tmp_path, host_delay=0)
+        monitor.check_all()
+
+        # /ok - один раз на обе статьи и один раз после редиректа
+        assert stub_server.requests[('HEAD', '/ok')] == 2
+        external = [link for link in monitor.links if link['type'] == 'external']
+        assert sorted(link['source'] for link in external if link['url'].endswith('/ok')) == [
+            'knowledge/a.md', 'knowledge/b.md']
+        assert [link['url'] for link in monitor.broken_links] == [f"{stub_server.base}/missing"]
+        assert (tmp_path / ".link_health_cache.json").exists()
+
+    def test_fresh_and_not_modified(self, stub_server, tmp_path):
+        """Test freshness skipping and conditional revalidation"""
+        url = f"{stub_server.base}/ok"
+        first = LinkHealthMonitor(tmp_path)
+        checker(first).run([url])
+        first.save_history()
+
+        # Свежая ссылка - без запроса
+        monitor = LinkHealthMonitor(tmp_path)
+        fresh = checker(monitor)
+        result = fresh.run([url])[url]
+        assert fresh.stats['fresh'] == 1
+        assert result['cached'] is True
+        assert stub_server.requests[('HEAD', '/ok')] == 1
+
+        # Принудительно - условный запрос, 304
+        recheck = checker(monitor, recheck=True)
+        result = recheck.run([url])[url]
+        assert recheck.stats['not_modified'] == 1
+        assert result['status'] == 'ok'
+        assert result['not_modified'] is True
+        assert len(monitor.history[monitor.get_link_hash(url)]['checks']) == 2
+
+    def test_per_host_limit(self, stub_server, tmp_path):
+        """Test that one host never gets more than max_per_host requests at once"""
+        stub_server.delay = 0.05
+        urls = [f"{stub_server.base}/page{i}" for i in range(12)]
+        results = checker(LinkHealthMonitor(tmp_path), concurrency=10, max_per_host=2).run(urls)
+
+        assert all(result['status'] == 'ok' for result in results.values())
+        assert stub_server.max_active <= 2
+
+
+    def test_slow_host_does_not_block_others(self, stub_server, slow_server, tmp_path):
+        """Test that requests queued on a slow host do not hold global slots"""
+        slow = [f"{slow_server.base}/page{i}" for i in range(6)]
+        fast = [f"{stub_server.base}/page{i}" for i in range(4)]
+
+        started = time.monotonic()
+        checker(LinkHealthMonitor(tmp_path), concurrency=2, max_per_host=1).run(slow + fast)
+
+        assert slow_server.started[-1] - started >= 1.0  # медленный хост - по одному
+        assert stub_server.started[-1] - started < 0.5
+
+    def test_retry_after_is_capped(self, stub_server, tmp_path, monkeypatch):
+        """Test that a huge Retry-After does not stall the run"""
+        monkeypatch.setattr(AsyncLinkChecker, 'MAX_RETRY_AFTER', 0.05)
+        url = f"{stub_server.base}/busy"
+
+        started = time.monotonic()
+        checker(LinkHealthMonitor(tmp_path), retries=2).run([url])
+
+        assert time.monotonic() - started < 2
+        assert stub_server.requests[('HEAD', '/busy')] == 3
@@ -0,0 +1,191 @@
+"""
+Unit Tests for Shared Link Index
+
+Tests for tools/shared/link_index.py used by popular_articles,
+find_orphans, backlinks_generator and the internal link checks of
+check_links, generate_toc and update_indexes.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from shared.link_index import LinkIndex, slugify_heading
+from check_links import LinkHealthMonitor
+from generate_toc import TOCGenerator
+from update_indexes import IndexValidator
+from backlinks_generator import BacklinksGenerator
+
+
+def write_article(path, title, body, related=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    frontmatter = f"title: {title}\n"
+    if related:
+        frontmatter += f"related: {related}\n"
+    path.write_text(f"---\n{frontmatter}---\n{body}\n", encoding='utf-8')
+
+
+@pytest.mark.unit
+class TestLinkIndex:
+    """Test link index building and incremental refresh"""
+
+    def setup_method(self):
+        self.a = "knowledge/python/a.md"
+        self.b = "knowledge/python/b.md"
+
+    def test_incoming_and_outgoing(self, tmp_path):
+        """Test both directions of the index"""
+        kb = tmp_path / "knowledge" / "python"
+        write_article(kb / "a.md", "A", "See [B](b.md#usage) and [site](https://example.com)")
+        write_article(kb / "b.md", "B", "Back to [top](#top)", related=["a.md"])
+
+        index = LinkIndex.open(tmp_path)
+
+        assert [link['target'] for link in index.outgoing(self.a)] == [self.b]
+        assert index.outgoing(self.a)[0]['anchor'] == "usage"
+        assert index.incoming_count(self.b) == 1
+        assert index.incoming_sources(self.a, kinds=('related',)) == {self.b}
+        assert index.outgoing(self.b, kinds=('anchor',))[0]['anchor'] == "top"
+        assert index.title(self.b) == "B"
+
+    def test_refresh_only_changed(self, tmp_path):
+        """Test that unchanged articles are not re-parsed"""
+        kb = tmp_path / "knowledge" / "python"
+        write_article(kb / "a.md", "A", "See [B](b.md)")
+        write_article(kb / "b.md", "B", "Text")
+
+        assert LinkIndex.open(tmp_path).incoming_count(self.b) == 1
+
+        index = LinkIndex(tmp_path)
+        assert index.refresh() == {'changed': 0, 'removed': 0}
+        assert index.incoming_count(self.b) == 1
+
+        write_article(kb / "a.md", "A", "No links any more")
+        assert index.refresh() == {'changed': 1, 'removed': 0}
+        assert index.incoming_count(self.b) == 0
+
+    def test_removed_source(self, tmp_path):
+        """Test that deleting an article drops its links"""
+        kb = tmp_path / "knowledge" / "python"
+        write_article(kb / "a.md", "A", "See [B](b.md)")
+        write_article(kb / "b.md", "B", "Text")
+
+        index = LinkIndex.open(tmp_path)
+        (kb / "a.md").unlink()
+
+        assert index.refresh() == {'changed': 0, 'removed': 1}
+        assert index.incoming(self.b) == []
+        assert index.articles() == [self.b]
+
+    def test_exists(self, tmp_path):
+        """Test target existence for articles and other files"""
+        kb = tmp_path / "knowledge" / "python"
+        write_article(kb / "a.md", "A", "![img](img.png) [missing](missing.md)")
+        (kb / "img.png").write_bytes(b"png")
+
+        index = LinkIndex.open(tmp_path)
+
+        assert index.exists("knowledge/python/img.png")
+        assert len(index.outgoing(self.a)) == 2
+        assert len(index.outgoing(self.a, existing_only=True)) == 1
+
+
+def write_linked_articles(root):
+    """a.md ссылается на b.md (якоря есть и нет), директорию, картинку и себя"""
+    kb = root / "knowledge" / "python"
+    write_article(kb / "b.md", "B", "## Установка и настройка\n\n### API: v2!\n\nText")
+    write_article(kb / "a.md", "A", "# Intro\n\n"
+                  "[ok](b.md#установка-и-настройка) [api](b.md#api-v2) [bad](b.md#nope) "
+                  "[missing](c.md) [dir](../python) [img](img.png) [self](#intro) [self bad](#outro)")
+    (kb / "img.png").write_bytes(b"png")
+    return kb
+
+
+@pytest.mark.unit
+class TestLinkChecks:
+    """Test heading anchors and in-memory link checks"""
+
+    def test_slugify_heading(self):
+        """Test GitHub-style anchors"""
+        assert slugify_heading("Установка и настройка") == "установка-и-настройка"
+        assert slugify_heading(" API: v2! ") == "api-v2"
+        assert slugify_heading("a -- b") == "a-b"
+
+    def test_check_link(self, tmp_path):
+        """Test statuses for files, directories and anchors"""
+        write_linked_articles(tmp_path)
+        index = LinkIndex.open(tmp_path)
+        a = "knowledge/python/a.md"
+
+        statuses = {url: index.check_link(a, url)['status'] for url in (
+            "b.md#установка-и-настройка", "b.md#api-v2", "b.md#nope", "c.md",
+            "../python", "img.png", "img.png#x", "#intro", "#outro", "../../../../x.md")}
+
+        assert statuses == {
+            "b.md#установка-и-настройка": 'ok', "b.md#api-v2": 'ok', "b.md#nope": 'broken_anchor',
+            "c.md": 'missing', "../python": 'directory', "img.png": 'ok', "img.png#x": 'ok',
+            "#intro": 'ok', "#outro": 'broken_anchor', "../../../../x.md": 'outside',
+        }
+        assert index.check_link(a, "../python/b.md")['target'] == "knowledge/python/b.md"
+
+    def test_anchors_refresh(self, tmp_path):
+        """Test that anchors follow edited headings"""
+        kb = write_linked_articles(tmp_path)
+        index = LinkIndex.open(tmp_path)
+        assert index.anchors("knowledge/python/b.md") == {"установка-и-настройка", "api-v2"}
+
+        write_article(kb / "b.md", "B", "## Nope\n\nText v2")
+        index.refresh()
+        assert index.anchors("knowledge/python/b.md") == {"nope"}
+        assert index.anchors("knowledge/python/img.png") is None
+
+
+@pytest.mark.unit
+class TestToolsUseLinkChecks:
+    """Test the tools' internal link validation through the index"""
+
+    def test_check_links(self, tmp_path):
+        """Test internal link results of the link health monitor"""
+        write_linked_articles(tmp_path)
+        monitor = LinkHealthMonitor(tmp_path)
+        monitor.check_all(check_external=False)
+
+        broken = {link['url']: link for link in monitor.broken_links}
+        assert set(broken) == {"b.md#nope", "c.md", "#outro"}
+        assert broken["b.md#nope"]['status'] == 'broken_anchor'
+        assert broken["b.md#nope"]['available_anchors'] == ["установка-и-настройка", "api-v2"]
+        assert broken["#outro"]['health_score'] == 50.0
+        assert broken["c.md"]['target'] == "knowledge/python/c.md"
+
+    def test_generate_toc(self, tmp_path):
+        """Test cross-reference validation of generate_toc"""
+        write_linked_articles(tmp_path)
+        result = TOCGenerator(tmp_path).validate_file_toc(tmp_path / "knowledge" / "python" / "a.md")
+
+        reasons = sorted(item['reason'] for item in result['cross_references']['broken_links'])
+        assert reasons == ['Ссылка на директорию: ../python', 'Файл не найден: c.md',
+                           'Якорь не найден: #nope', 'Якорь не найден: #outro']
+
+    def test_update_indexes(self, tmp_path):
+        """Test links of a category index file"""
+        write_linked_articles(tmp_path)
+        index_file = tmp_path / "knowledge" / "python" / "index" / "INDEX.md"
+        index_file.parent.mkdir()
+        index_file.write_text("[A](../a.md) [B](../b.md#api-v2) [x](../b.md#x) [c](../c.md)", encoding='utf-8')
+
+        broken = IndexValidator(tmp_path).validate_links(index_file)
+        assert broken == [f"{index_file}: broken anchor in ../b.md#x",
+                          f"{index_file}: broken link to ../c.md"]
+
+    def test_backlinks_broken_anchors(self, tmp_path):
+        """Test broken anchors reported by the backlinks generator"""
+        write_linked_articles(tmp_path)
+        generator = BacklinksGenerator(tmp_path)
+        generator.build_backlinks_graph()
+
+        issues = generator.broken_detector.check_backlinks(generator.backlinks, generator.articles)
+        assert sorted(issue['anchor'] for issue in issues['broken_anchors']) == ['nope', 'outro']
@@ -0,0 +1,184 @@
+"""
+Unit Tests for Incremental Prerequisites DAG
+
+Tests for IncrementalDAG and PrerequisiteDAGStore in prerequisites_graph.py.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from prerequisites_graph import IncrementalDAG, PrerequisiteDAGStore
+
+
+@pytest.mark.unit
+class TestIncrementalDAG:
+    """Test Pearce-Kelly ordering and ancestor bitsets"""
+
+    def assert_valid_order(self, dag):
+        for x, targets in dag.succ.items():
+            for y in targets:
+                assert dag.ord[x] < dag.ord[y]
+
+    def test_edges_added_in_reverse_order(self):
+        """Test that late edges reorder the affected region only"""
+        dag = IncrementalDAG()
+        for node in ['c', 'b', 'a']:
+            dag.add_node(node)
+
+        assert dag.add_edge('b', 'c')
+        assert dag.add_edge('a', 'b')
+
+        self.assert_valid_order(dag)
+        assert dag.topological_order() == ['a', 'b', 'c']
+
+    def test_learning_path(self):
+        """Test learning path uses cached ancestors"""
+        dag = IncrementalDAG()
+        dag.add_edge('basics', 'functions')
+        dag.add_edge('functions', 'decorators')
+        dag.add_edge('basics', 'classes')
+
+        assert dag.learning_path('decorators') == ['basics', 'functions', 'decorators']
+        assert dag.is_prerequisite('basics', 'decorators')
+        assert not dag.is_prerequisite('classes', 'decorators')
+
+    def test_cycle_edge_rejected(self):
+        """Test that an edge closing a cycle is deferred"""
+        dag = IncrementalDAG()
+        dag.add_edge('a', 'b')
+        dag.add_edge('b', 'c')
+
+        assert not dag.add_edge('c', 'a')
+        assert ('c', 'a') in dag.cycle_edges
+        self.assert_valid_order(dag)
+
+    def test_cycle_edge_retried_after_removal(self):
+        """Test that deferred edges are applied once the cycle disappears"""
+        dag = IncrementalDAG()
+        dag.add_edge('a', 'b')
+        dag.add_edge('b', 'a')
+
+        dag.remove_edge('a', 'b')
+
+        assert not dag.cycle_edges
+        assert dag.learning_path('a') == ['b', 'a']
+
+    def test_remove_edge_updates_ancestors(self):
+        """Test that removing an edge shrinks descendants' ancestor sets"""
+        dag = IncrementalDAG()
+        dag.add_edge('a', 'b')
+        dag.add_edge('b', 'c')
+
+        dag.remove_edge('a', 'b')
+
+        assert dag.ancestors_of('c') == ['b']
+
+    def test_remove_node(self):
+        """Test node removal drops its edges and bit"""
+        dag = IncrementalDAG()
+        dag.add_edge('a', 'b')
+        dag.add_edge('b', 'c')
+
+        dag.remove_node('b')
+        dag.add_edge('d', 'c')
+
+        assert 'b' not in dag
+        assert dag.ancestors_of('c') == ['d']
+
+    def test_roundtrip(self):
+        """Test serialization keeps edges and order"""
+        dag = IncrementalDAG()
+        dag.add_edge('a', 'b')
+        dag.add_edge('b', 'a')
+
+        restored = IncrementalDAG.from_dict(dag.to_dict())
+
+        assert restored.topological_order() == dag.topological_order()
+        assert restored.cycle_edges == dag.cycle_edges
+
+
+@pytest.mark.unit
+class TestPrerequisiteDAGStore:
+    """Test persistent store with incremental refresh"""
+
+    def write_article(self, path, title, body, prerequisites=None):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        frontmatter = f"title: {title}\n"
+        if prerequisites:
+            frontmatter += f"prerequisites: {prerequisites}\n"
+        path.write_text(f"---\n{frontmatter}---\n{body}\n", encoding='utf-8')
+
+    def test_refresh_and_reload(self, tmp_path):
+        """Test that a reloaded store only re-reads changed articles"""
+        kb = tmp_path / "knowledge" / "python"
+        self.write_article(kb / "basics.md", "Basics", "Intro")
+        self.write_article(kb / "advanced.md", "Advanced", "Text", ["basics.md"])
+
+        store = PrerequisiteDAGStore(tmp_path)
+        assert store.refresh() == {'changed': 2, 'removed': 0}
+
+        path = [step['article'] for step in store.learning_path("knowledge/python/advanced.md")]
+        assert path == ["knowledge/python/basics.md", "knowledge/python/advanced.md"]
+
+        reloaded = PrerequisiteDAGStore(tmp_path)
+        assert reloaded.refresh() == {'changed': 0, 'removed': 0}
+        assert reloaded.learning_path("knowledge/python/advanced.md")[0]['title'] == "Basics"
+
+    def test_new_article_resolves_pending_link(self, tmp_path):
+        """Test that a link to a not-yet-existing article is picked up later"""
+        kb = tmp_path / "knowledge" / "python"
+        self.write_article(kb / "advanced.md", "Advanced", "Предполагает знание [Basics](basics.md)")
+
+        store = PrerequisiteDAGStore(tmp_path)
+        store.refresh()
+        assert len(store.learning_path("knowledge/python/advanced.md")) == 1
+
+        self.write_article(kb / "basics.md", "Basics", "Intro")
+        store.refresh()
+        assert len(store.learning_path("knowledge/python/advanced.md")) == 2
+
+    def test_removed_article(self, tmp_path):
+        """Test that deleted articles leave the DAG"""
+        kb = tmp_path / "knowledge" / "python"
+        self.write_article(kb / "basics.md", "Basics", "Intro")
+        self.write_article(kb / "advanced.md", "Advanced", "Text", ["basics.md"])
+
+        store = PrerequisiteDAGStore(tmp_path)
+        store.refresh()
+        (kb / "basics.md").unlink()
+
+        assert store.refresh() == {'changed': 0, 'removed': 1}
+        assert "knowledge/python/basics.md" not in store.dag
+        assert len(store.learning_path("knowledge/python/advanced.md")) == 1
+
+    def test_edit_matches_full_rebuild(self, tmp_path):
+        """Test that editing an article without frontmatter keeps edges to it"""
+        kb = tmp_path / "knowledge"
+        kb.mkdir()
+        (kb / "a.md").write_text("Без frontmatter\n", encoding='utf-8')
+        self.write_article(kb / "b.md", "B", "Text", ["a.md"])
+
+        store = PrerequisiteDAGStore(tmp_path)
+        store.refresh()
+        with open(kb / "a.md", "a", encoding='utf-8') as f:
+            f.write("Ещё строка\n")
+        assert store.refresh() == {'changed': 1, 'removed': 0}
+
+        path = [step['article'] for step in store.learning_path("knowledge/b.md")]
+        assert path == ["knowledge/a.md", "knowledge/b.md"]
+
+        rebuilt = PrerequisiteDAGStore(tmp_path, cache_file=".rebuilt_dag.json")
+        rebuilt.refresh()
+        assert store.dag.to_dict()['edges'] == rebuilt.dag.to_dict()['edges']
+        assert set(store.dag.ord) == set(rebuilt.dag.ord)
+        assert store.articles == rebuilt.articles
+
+        # Ссылка убрана - вершина без данных статьи уходит из DAG
+        self.write_article(kb / "b.md", "B", "Text")
+        store.refresh()
+        assert "knowledge/a.md" not in store.dag
@@ -0,0 +1,102 @@
+"""
+Unit Tests for Principal Cache
+
+Tests for backend/principal_cache.py with the in-process cache (no Redis).
+"""
+
+import pytest
+from pathlib import Path
+from datetime import datetime
+import time
+import uuid
+import sys
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from models import User, UserRole
+from principal_cache import PrincipalCache, TokenCache, principal_to_user, user_to_principal
+
+
+def make_user(role=UserRole.USER, is_active=True):
+    return User(
+        id=uuid.uuid4(),
+        username="alice",
+        email="alice@example.com",
+        full_name="Alice",
+        role=role,
+        is_active=is_active,
+        created_at=datetime(2024, 5, 1, 12, 30)
+    )
+
+
+@pytest.mark.unit
+class TestTokenCache:
+    """Test memoized token verification"""
+
+    def test_expiry_and_eviction(self):
+        cache = TokenCache(max_size=2)
+        now = time.time()
+
+        cache.put("a", {"sub": "1", "exp": now + 60})
+        cache.put("expired", {"sub": "2", "exp": now - 1})
+        cache.put("no-exp", {"sub": "3"})
+        assert cache.get("a") == {"sub": "1", "exp": now + 60}
+        assert cache.get("expired") is None
+        assert cache.get("no-exp") is None
+
+        cache.put("b", {"exp": now + 60})
+        cache.get("a")  # "a" использован недавно
+        cache.put("c", {"exp": now + 60})
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+        cache.discard("a")
+        assert cache.get("a") is None
+
+
+@pytest.mark.unit
+class TestPrincipalCache:
+    """Test user snapshots and invalidation"""
+
+    def test_snapshot_roundtrip(self):
+        user = make_user(role=UserRole.ADMIN)
+        restored = principal_to_user(user_to_principal(user))
+
+        assert restored.id == user.id
+        assert restored.role == UserRole.ADMIN
+        assert restored.created_at == user.created_at
+        assert (restored.username, restored.email, restored.is_active) == ("alice", "alice@example.com", True)
+
+    def test_invalidate(self):
+        cache = PrincipalCache(local_ttl=60)
+        user = make_user()
+        user_id = str(user.id)
+
+        principal, version = cache.get(user_id)
+        assert principal is None
+        cache.put(user_id, user_to_principal(user), version)
+        assert cache.get(user_id)[0]["role"] == "user"
+
+        cache.invalidate(user_id)
+        principal, version = cache.get(user_id)
+        assert principal is None
+
+        # Снимок, прочитанный до invalidate, не возвращается в кэш
+        user.role = UserRole.ADMIN
+        cache.invalidate(user_id)
+        cache.put(user_id, user_to_principal(user), version)
+        assert cache.get(user_id)[0] is None
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 3)
+
+    def test_local_ttl(self):
+        cache = PrincipalCache(local_ttl=0.05)
+        user = make_user()
+        cache.put(str(user.id), user_to_principal(user), 0)
+
+        assert cache.get(str(user.id))[0] is not None
+        time.sleep(0.1)
+        assert cache.get(str(user.id))[0] is None
@@ -0,0 +1,138 @@
+"""
+Unit Tests for Rate Limiting
+
+Tests for backend/rate_limit.py with the in-process buckets (no Redis).
+"""
+
+import pytest
+from pathlib import Path
+import asyncio
+import hashlib
+import time
+import sys
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from rate_limit import RateLimiter, RateLimitMiddleware, parse_overrides, parse_rate_limits
+
+
+def make_client(limiter, **kwargs):
+    async def endpoint(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[
+        Route("/api/jobs/{job_id}", endpoint),
+        Route("/health", endpoint)
+    ])
+    app.add_middleware(RateLimitMiddleware, limiter=limiter, **kwargs)
+    return TestClient(app)
+
+
+@pytest.mark.unit
+class TestRateLimiter:
+    """Test rule parsing and the token bucket"""
+
+    def test_parse(self):
+        rules = parse_rate_limits("/api/run=20/m:5, /api=10/s,bad")
+        assert [(rule.prefix, rule.rate, rule.burst) for rule in rules] == [
+            ("/api/run", 20 / 60, 5), ("/api", 10.0, 10)]
+        assert parse_overrides("user:42=5, key:ab=0") == {"user:42": 5.0, "key:ab": 0.0}
+
+        limiter = RateLimiter(rules=rules, overrides={})
+        assert limiter.match("/api/run").prefix == "/api/run"
+        assert limiter.match("/api/jobs/1").prefix == "/api"
+        assert limiter.match("/health") is None
+
+    def test_bucket_refill(self):
+        limiter = RateLimiter(rules=parse_rate_limits("/api=20/s:2"), overrides={"ip:vip": 0})
+        rule = limiter.rules[0]
+
+        def hit(identity):
+            return asyncio.run(limiter.hit(rule, identity))
+
+        assert [hit("ip:a").allowed for _ in range(3)] == [True, True, False]
+        limited = hit("ip:a")
+        assert 0 < limited.retry_after <= 0.05
+        assert hit("ip:b").allowed  # у другого клиента своё ведро
+
+        time.sleep(0.06)
+        assert hit("ip:a").allowed
+
+        assert all(hit("ip:vip").allowed for _ in range(10))
+        assert limiter.get_stats()["limited"] == 2
+
+
+@pytest.mark.unit
+class TestRateLimitMiddleware:
+    """Test 429 responses and client identification"""
+
+    def test_limits_per_client(self):
+        limiter = RateLimiter(rules=parse_rate_limits("/api/jobs=1/m:2"), overrides={})
+        client = make_client(
+            limiter,
+            token_subject=lambda token: "42" if token == "good" else None,
+            api_key_valid=lambda digest: digest == hashlib.sha256(b"secret").hexdigest()
+        )
+
+        first = client.get("/api/jobs/1")
+        assert first.status_code == 200
+        assert first.headers["x-ratelimit-limit"] == "2"
+        assert first.headers["x-ratelimit-remaining"] == "1"
+
+        client.get("/api/jobs/1")
+        limited = client.get("/api/jobs/1")
+        assert limited.status_code == 429
+        assert int(limited.headers["retry-after"]) >= 1
+        assert limited.json()["rule"] == "/api/jobs"
+
+        # Пути без правила не ограничены
+        assert client.get("/health").status_code == 200
+        assert "x-ratelimit-limit" not in client.get("/health").headers
+
+        # Ключ API и пользователь - отдельные вёдра, недействительный токен - по IP
+        assert client.get("/api/jobs/1", headers={"X-API-Key": "secret"}).status_code == 200
+        assert client.get("/api/jobs/1", headers={"Authorization": "Bearer good"}).status_code == 200
+        assert client.get("/api/jobs/1", headers={"Authorization": "Bearer bad"}).status_code == 429
+
+    def test_unknown_api_keys_share_ip_bucket(self):
+        """Test that rotating unknown API keys does not reset the limit"""
+        checked = []
+
+        def api_key_valid(digest):
+            checked.append(digest)
+            return False
+
+        limiter = RateLimiter(rules=parse_rate_limits("/api/jobs=1/m:2"), overrides={})
+        client = make_client(limiter, api_key_valid=api_key_valid)
+
+        statuses = [client.get("/api/jobs/1", headers={"X-API-Key": f"rotated-{i}"}).status_code
+                    for i in range(4)]
+        assert statuses == [200, 200, 429, 429]
+
+        # Результат проверки кэшируется: повтор ключа не идёт в БД
+        client.get("/api/jobs/1", headers={"X-API-Key": "rotated-0"})
+        assert len(checked) == 4
+
+        # Без проверки ключей X-API-Key не учитывается вовсе
+        client = make_client(RateLimiter(rules=parse_rate_limits("/api/jobs=1/m:1"), overrides={}))
+        assert client.get("/api/jobs/1", headers={"X-API-Key": "a"}).status_code == 200
+        assert client.get("/api/jobs/1", headers={"X-API-Key": "b"}).status_code == 429
+
+    def test_decision_hook(self):
+        decisions = []
+        limiter = RateLimiter(rules=parse_rate_limits("/api=1/m:1"), overrides={})
+        client = make_client(limiter, on_decision=lambda decision, scope, seconds: decisions.append(
+            (decision.allowed, scope, seconds)))
+
+        client.get("/api/jobs/1")
+        client.get("/api/jobs/1")
+
+        assert [(allowed, scope) for allowed, scope, _ in decisions] == [(True, "ip"), (False, "ip")]
+        assert all(seconds < 0.01 for _, _, seconds in decisions)
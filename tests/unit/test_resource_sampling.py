@@ -0,0 +1,85 @@
+"""
+Unit Tests for Job Resource Accounting
+
+Tests for ProcessTreeSampler and JobResult.resources in backend/tool_runner.py.
+"""
+
+import pytest
+from pathlib import Path
+import asyncio
+import sys
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from tool_runner import JobStatus, ToolRunner
+
+
+# Инструмент: ~100 MB памяти в себе и ~0.5 с процессорного времени в потомке
+TOOL = '''
+import subprocess, sys, time
+
+data = bytearray(100 * 1024 * 1024)
+for i in range(0, len(data), 4096):
+    data[i] = 1
+
+subprocess.run([sys.executable, "-c",
+                "import time\\nend = time.process_time() + 0.5\\nwhile time.process_time() < end: pass"])
+time.sleep(0.3)
+'''
+
+# Инструмент короче интервала опроса: ~50 MB и ~0.3 с процессорного времени в потомке
+QUICK_TOOL = '''
+import subprocess, sys
+
+data = bytearray(50 * 1024 * 1024)
+for i in range(0, len(data), 4096):
+    data[i] = 1
+
+subprocess.run([sys.executable, "-c",
+                "import time\\nend = time.process_time() + 0.3\\nwhile time.process_time() < end: pass"])
+'''
+
+
+@pytest.mark.unit
+class TestResourceSampling:
+    """Test sampling of the whole process tree"""
+
+    def test_peak_memory_and_child_cpu(self, tmp_path):
+        (tmp_path / "tools").mkdir()
+        (tmp_path / "tools" / "heavy.py").write_text(TOOL, encoding="utf-8")
+        runner = ToolRunner(tmp_path / "tools", tmp_path, sample_interval=0.05)
+
+        job = asyncio.run(runner.run_tool("heavy"))
+        resources = job.resources
+
+        assert job.status == JobStatus.COMPLETED
+        assert resources["peak_rss_mb"] >= 90
+        assert resources["cpu_seconds"] >= 0.4  # процессорное время потомка учтено
+        assert resources["peak_processes"] >= 2
+        assert 0 < resources["wall_time"] <= job.duration + 0.5
+        assert resources["cpu_percent"] > 0
+        assert resources["samples"] > 5
+        assert resources["io_read_bytes"] >= 0 and resources["io_write_bytes"] >= 0
+
+    def test_job_shorter_than_interval(self, tmp_path):
+        """Test that the exit rusage covers a job no poll caught running"""
+        (tmp_path / "tools").mkdir()
+        (tmp_path / "tools" / "quick.py").write_text(QUICK_TOOL, encoding="utf-8")
+        runner = ToolRunner(tmp_path / "tools", tmp_path, sample_interval=30)
+
+        job = asyncio.run(runner.run_tool("quick"))
+        resources = job.resources
+
+        assert job.status == JobStatus.COMPLETED
+        assert resources["samples"] <= 1
+        assert resources["cpu_seconds"] >= 0.25
+        assert resources["peak_rss_mb"] >= 45
+
+    def test_missing_tool(self, tmp_path):
+        (tmp_path / "tools").mkdir()
+        job = asyncio.run(ToolRunner(tmp_path / "tools", tmp_path).run_tool("missing"))
+
+        assert job.status == JobStatus.FAILED
+        assert job.resources == {}
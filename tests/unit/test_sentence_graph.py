@@ -0,0 +1,102 @@
+"""
+Unit Tests for Sentence Graph
+
+Tests for tools/shared/sentence_graph.py and its use in
+summary_generator (vectorized scores must match the set-based ones).
+"""
+
+import pytest
+import random
+from pathlib import Path
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+import summary_generator
+from shared.sentence_graph import NUMPY_AVAILABLE, SentenceMatrix
+from summary_generator import AdvancedSummaryGenerator, SummaryDiversityScorer, TopicModelingSummarizer
+
+
+pytestmark = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+
+WORDS = ['python', 'docker', 'контейнер', 'образ', 'сеть', 'данные', 'индекс',
+         'поиск', 'запрос', 'кэш', 'сервер', 'клиент', 'модель', 'граф']
+
+
+def make_sentences(count, seed=3):
+    rng = random.Random(seed)
+    return [
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))) + ' и дополнительный контекст'
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.unit
+class TestSentenceMatrix:
+    """Test CSR construction and derived similarities"""
+
+    def test_overlap_and_similarity(self):
+        """Test intersections, cosine and Jaccard on a small example"""
+        matrix = SentenceMatrix([['a', 'b', 'b'], ['b', 'c'], []])
+
+        assert matrix.terms == ['a', 'b', 'c']
+        assert matrix.lengths.tolist() == [3, 2, 0]
+        assert matrix.overlap()[0, 1] == 1
+        assert matrix.cosine_similarity()[0, 1] == pytest.approx(0.5)
+        assert matrix.jaccard_similarity()[0, 1] == pytest.approx(1 / 3)
+        assert matrix.mean_pairwise_jaccard() == pytest.approx(1 / 3)
+
+    def test_dominant_topic_ties(self):
+        """Test that equal topic scores go to the topic seen first"""
+        matrix = SentenceMatrix([['x', 'y'], ['y', 'x'], ['x', 'x', 'y', 'y']])
+
+        assert matrix.dominant_topics(2) == [0, 1, 0]
+
+
+@pytest.mark.unit
+class TestSummaryParity:
+    """Test vectorized summary scores against the set-based fallback"""
+
+    @pytest.fixture
+    def fallback(self, monkeypatch):
+        def run(func, *args):
+            monkeypatch.setattr(summary_generator, 'NUMPY_AVAILABLE', False)
+            try:
+                return func(*args)
+            finally:
+                monkeypatch.setattr(summary_generator, 'NUMPY_AVAILABLE', True)
+        return run
+
+    def test_tfidf_and_textrank(self, fallback):
+        """Test TF-IDF and TextRank scores"""
+        sentences = make_sentences(40)
+        generator = AdvancedSummaryGenerator(workers=1)
+
+        for method in (generator.calculate_tf_idf, generator.textrank_score):
+            expected = fallback(method, sentences)
+            actual = method(sentences)
+            assert [i for i, _ in actual] == [i for i, _ in expected]
+            assert [s for _, s in actual] == pytest.approx([s for _, s in expected], rel=1e-6)
+
+    def test_redundancy_and_topics(self, fallback):
+        """Test redundancy and topic grouping"""
+        sentences = make_sentences(25, seed=11)
+        scorer = SummaryDiversityScorer()
+        topics = TopicModelingSummarizer(summary_generator.STOP_WORDS)
+
+        assert scorer.calculate_redundancy(sentences) == fallback(scorer.calculate_redundancy, sentences)
+        assert topics.extract_topics(sentences) == fallback(topics.extract_topics, sentences)
+
+    def test_cached_articles(self, tmp_path):
+        """Test that a second run is served from .summaries_cache.json"""
+        article = tmp_path / "knowledge" / "a.md"
+        article.parent.mkdir()
+        article.write_text("---\ntitle: A\n---\n" + '. '.join(make_sentences(10)) + '.', encoding='utf-8')
+
+        first = AdvancedSummaryGenerator(tmp_path, workers=1).process_all()
+
+        generator = AdvancedSummaryGenerator(tmp_path, workers=1)
+        generator.summarize_article = lambda content: pytest.fail("should be cached")
+        assert generator.process_all() == first
@@ -0,0 +1,195 @@
+"""
+Unit Tests for Shared Text Statistics
+
+Tests for tools/shared/text_stats.py used by the readability and
+quality tools. TestToolResults pins each tool's results on a fixed
+article: the values are the ones the tools produced before they moved
+to the shared statistics.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from shared.text_stats import TextStatsCache, analyze_text, count_syllables
+
+
+FRONTMATTER = """---
+title: Пример статьи
+tags: [python, patterns, testing]
+category: programming
+---
+"""
+
+ARTICLE = """
+# Паттерны проектирования
+
+Первое предложение статьи про Python. Второе предложение со [ссылкой](https://example.com/page)!
+Изображение ![схема архитектуры](img/diagram.png) и текст с `inline_code` в конце?
+
+## Пример кода
+
+```python
+def main():
+    for item in range(3):
+        if item:
+            return item
+```
+
+Queue and rhythm are English words. Программирование требует внимательности... Конец.
+
+```
+plain block
+```
+"""
+
+
+@pytest.fixture
+def article_file(tmp_path):
+    """Статья в knowledge/ временного корня"""
+    path = tmp_path / "knowledge" / "sample.md"
+    path.parent.mkdir()
+    path.write_text(FRONTMATTER + ARTICLE, encoding="utf-8")
+    return path
+
+
+@pytest.mark.unit
+class TestAnalyzeText:
+    """Test single-pass statistics"""
+
+    def test_whole_text_counts(self):
+        """Test sentences and words over the whole text"""
+        stats = analyze_text(ARTICLE)
+
+        assert stats['sentences'] == 10
+        assert stats['words'] == 51
+        assert stats['all_words'] == 53
+        assert stats['unique_words'] == 47
+        assert stats['characters'] == 286
+        assert stats['max_sentence_tokens'] == 21
+
+    def test_prose_counts(self):
+        """Test prose views exclude code and link targets"""
+        stats = analyze_text(ARTICLE)
+
+        assert stats['prose_sentences'] == 7
+        assert stats['prose_words'] == 31
+        assert stats['reading_words'] == 27
+
+    def test_code_blocks(self):
+        """Test fenced code statistics"""
+        stats = analyze_text(ARTICLE)
+
+        assert stats['code_blocks'] == 2
+        assert stats['code_lines'] == 5
+        assert stats['code_complexity'] == 3
+        assert stats['fenced_lines'] == 5
+        assert stats['fence_markers'] == 4
+
+    def test_syllable_schemes(self):
+        """Test the syllable counting of each tool"""
+        assert count_syllables("программирование", 'vowel_groups') == 6
+        assert count_syllables("queue", 'vowel_groups') == 1
+        assert count_syllables("queue", 'all_vowels') == 4
+        assert count_syllables("queue", 'ru_vowels') == 1
+        assert count_syllables("rhythm") == 1
+
+        stats = analyze_text(ARTICLE)
+        assert stats['syllables'] == {'vowel_groups': 103, 'all_vowels': 118, 'ru_vowels': 99}
+        assert stats['polysyllables'] == {'vowel_groups': 9, 'all_vowels': 14, 'ru_vowels': 11}
+
+    def test_empty_text(self):
+        """Test that empty text gives zero ratios"""
+        stats = analyze_text("")
+
+        assert stats['words'] == 0
+        assert stats['lexical_diversity'] == 0.0
+        assert stats['avg_sentence_tokens'] == 0.0
+
+
+@pytest.mark.unit
+class TestToolResults:
+    """Test that each tool keeps its own results on a fixed article"""
+
+    def test_calculate_difficulty(self, article_file, tmp_path):
+        """Test difficulty score, readability and vocabulary"""
+        from calculate_difficulty import AdvancedDifficultyCalculator
+
+        result = AdvancedDifficultyCalculator(tmp_path).calculate_comprehensive_difficulty(article_file)
+
+        assert result['score'] == 60.61
+        assert result['level'] == "Advanced"
+        assert result['text_stats'] == {'sentences': 10, 'words': 51, 'characters': 286, 'syllables': 103}
+        assert result['readability']['flesch_reading_ease'] == 30.8
+        assert result['readability']['smog_index'] == 8.55
+        assert result['vocabulary']['complex_words'] == 9
+        assert result['vocabulary']['rare_words'] == 5
+        assert result['code'] == {'count': 2, 'total_lines': 5, 'avg_lines': 2.5, 'complexity_score': 3}
+
+    def test_calculate_reading_time(self, tmp_path):
+        """Test sentence complexity, Flesch, ARI and word counts"""
+        from calculate_reading_time import ComplexityScorer, ReadabilityMetrics, ReadingTimeCalculator
+
+        sentences = ComplexityScorer(tmp_path).calculate_sentence_complexity(ARTICLE)
+        assert sentences['avg_sentence_length'] == 5.2
+        assert sentences['max_sentence_length'] == 21
+
+        metrics = ReadabilityMetrics(tmp_path)
+        flesch = metrics.flesch_reading_ease_adapted(ARTICLE)
+        assert flesch['flesch_score'] == 5.9
+        assert flesch['total_syllables'] == 118
+        assert metrics.automated_readability_index(ARTICLE)['ari_score'] == 7.5
+
+        calculator = ReadingTimeCalculator(tmp_path)
+        assert calculator.count_words(ARTICLE) == 27
+        assert calculator.count_code_blocks(ARTICLE) == 5
+
+    def test_quality_metrics(self, tmp_path):
+        """Test readability score and Flesch of the quality report"""
+        from quality_metrics import QualityAnalyzer, ReadabilityAnalyzer
+
+        analyzer = QualityAnalyzer(tmp_path)
+        assert analyzer.analyze_readability(ARTICLE) == 59
+        assert ReadabilityAnalyzer(analyzer).calculate_flesch_reading_ease(ARTICLE) == pytest.approx(37.43497, abs=1e-4)
+
+    def test_generate_statistics(self, tmp_path):
+        """Test word count and simplified readability"""
+        from generate_statistics import AdvancedStatisticsGenerator
+
+        generator = AdvancedStatisticsGenerator(tmp_path)
+        assert generator.count_words(ARTICLE) == 53
+        assert generator.calculate_readability_score(ARTICLE) == 94.7
+
+    def test_validate(self, article_file):
+        """Test word count of the readability check"""
+        from validate import ContentQualityChecker
+
+        issues = ContentQualityChecker().check_readability(FRONTMATTER + ARTICLE, article_file)
+        assert [issue.message for issue in issues] == ["Content too short (53 words, min: 100)"]
+
+    def test_statistics_dashboard(self, tmp_path):
+        """Test article quality score"""
+        from statistics_dashboard import QualityScorer
+
+        frontmatter = {'title': "Пример статьи", 'tags': ['python', 'patterns', 'testing'], 'category': 'programming'}
+        assert QualityScorer(tmp_path).calculate_quality_score(frontmatter, ARTICLE) == 33
+
+
+@pytest.mark.unit
+class TestTextStatsCache:
+    """Test hash-keyed cache"""
+
+    def test_persistent_cache(self, tmp_path):
+        """Test that a saved entry is reused without recomputation"""
+        cache = TextStatsCache(tmp_path)
+        stats = cache.get(ARTICLE)
+        cache.save()
+
+        reloaded = TextStatsCache(tmp_path)
+        assert reloaded.entries
+        assert reloaded.get(ARTICLE) == stats
+        assert not reloaded._dirty
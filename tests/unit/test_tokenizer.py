@@ -0,0 +1,74 @@
+"""
+Unit Tests for Shared Tokenizer
+
+Tests for tools/shared/tokenizer.py used by the search, tagging,
+related-articles and summary tools.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from shared.tokenizer import count_syllables, stem, tokenize
+from search_index import AdvancedSearchIndex
+from find_related import AdvancedRelatedFinder
+
+
+@pytest.mark.unit
+class TestTokenize:
+    """Test compiled patterns, stop words and interning"""
+
+    def test_min_length_and_stop_words(self):
+        """Test filtering by length and stop-word set"""
+        text = "Docker и Kubernetes в облаке: a to be"
+
+        assert tokenize(text) == ['docker', 'и', 'kubernetes', 'в', 'облаке', 'a', 'to', 'be']
+        assert tokenize(text, min_length=2) == ['docker', 'kubernetes', 'облаке', 'to', 'be']
+        assert tokenize(text, min_length=3, stop_words=frozenset({'docker'})) == ['kubernetes', 'облаке']
+
+    def test_tokens_are_interned(self):
+        """Test that equal tokens from different texts are one object"""
+        first = tokenize("".join(["распределённая", " система"]))
+        second = tokenize("Распределённая СИСТЕМА")
+
+        assert first == second
+        assert all(a is b for a, b in zip(first, second))
+
+    def test_tools_keep_semantics(self):
+        """Test tool tokenizers against their previous markdown handling"""
+        text = "# Заголовок\n**Важно**: [ссылка](http://example.com/path) и `код` snake_case"
+
+        assert AdvancedSearchIndex().tokenize(text) == [
+            'заголовок', 'важно', 'ссылка', 'http', 'example', 'com', 'path', 'код'
+        ]
+        assert AdvancedRelatedFinder().tokenize(text) == [
+            'заголовок', 'важно', 'ссылка', 'код', 'snakecase'
+        ]
+
+
+@pytest.mark.unit
+class TestWordCaches:
+    """Test LRU caches keyed by word type"""
+
+    def test_syllables_cached(self):
+        """Test syllable counts and cache hits on repeated words"""
+        count_syllables.cache_clear()
+
+        for _ in range(3):
+            assert count_syllables("программирование") == 7
+            assert count_syllables("queue") == 1
+
+        info = count_syllables.cache_info()
+        assert info.misses == 2
+        assert info.hits == 4
+
+    def test_stem(self):
+        """Test simple English suffix stripping"""
+        assert stem("running") == "runn"
+        assert stem("indexed") == "index"
+        assert stem("containers") == "container"
+        assert stem("bus") == "bus"
@@ -0,0 +1,132 @@
+"""
+Unit Tests for Incremental Tool Statistics
+
+Tests for backend/tool_stats.py against an in-memory SQLite database.
+"""
+
+import pytest
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import random
+import statistics
+import sys
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from models import Base, Job, JobStatus, ToolStats
+from tool_stats import (
+    RELATIVE_ACCURACY, duration_stddev, reconcile_tool_stats, record_job_stats,
+    sketch_add, sketch_quantile
+)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    @contextmanager
+    def factory():
+        db = Session()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    return factory
+
+
+def finished_job(tool_name, status=JobStatus.COMPLETED, duration=1.0, age_minutes=0):
+    return Job(
+        tool_name=tool_name,
+        status=status,
+        duration=duration,
+        completed_at=datetime.utcnow() - timedelta(minutes=age_minutes)
+    )
+
+
+@pytest.mark.unit
+class TestSketch:
+    """Test streaming quantiles"""
+
+    def test_quantiles_within_accuracy(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(2, 1) for _ in range(5000)]
+
+        sketch = {}
+        for value in values:
+            sketch = sketch_add(sketch, value)
+
+        values.sort()
+        for q in (0.5, 0.95):
+            exact = values[int(q * (len(values) - 1))]
+            assert sketch_quantile(sketch, q) == pytest.approx(exact, rel=RELATIVE_ACCURACY * 1.5)
+
+        assert len(sketch) < 500
+        assert sketch_quantile({}, 0.5) is None
+        assert sketch_quantile(sketch_add({}, 0), 0.5) == 0.0
+
+
+@pytest.mark.unit
+class TestRecordJobStats:
+    """Test incremental updates at job completion"""
+
+    def test_counts_and_welford(self, session_factory):
+        durations = [3.0, 5.0, 4.0, 10.0, 8.0]
+
+        with session_factory() as db:
+            for duration in durations:
+                job = finished_job("build_graph", duration=duration)
+                db.add(job)
+                db.flush()
+                assert record_job_stats(db, job)
+                assert not record_job_stats(db, job)  # уже учтена
+
+            for status in (JobStatus.FAILED, JobStatus.CANCELLED):
+                job = finished_job("build_graph", status=status)
+                db.add(job)
+                db.flush()
+                record_job_stats(db, job)
+
+        with session_factory() as db:
+            row = db.query(ToolStats).filter_by(tool_name="build_graph").one()
+
+            assert (row.total_runs, row.successful_runs, row.failed_runs) == (6, 5, 1)
+            assert row.avg_duration == pytest.approx(statistics.mean(durations))
+            assert duration_stddev(row) == pytest.approx(statistics.stdev(durations))
+            assert (row.min_duration, row.max_duration) == (3.0, 10.0)
+            assert row.p50_duration == pytest.approx(5.0, rel=RELATIVE_ACCURACY)
+            assert row.p95_duration == pytest.approx(8.0, rel=RELATIVE_ACCURACY)  # ранг 0.95 * (5 - 1)
+            assert row.last_failure is not None
+
+    def test_reconcile_in_batches(self, session_factory):
+        """Test that missed jobs are counted once, old enough ones only"""
+        with session_factory() as db:
+            for index in range(7):
+                db.add(finished_job("check_links", duration=index + 1, age_minutes=60))
+            db.add(finished_job("check_links", age_minutes=1))  # может ещё повториться
+            db.add(Job(tool_name="check_links", status=JobStatus.RUNNING))
+
+        result = reconcile_tool_stats(session_factory, batch_size=3, max_batches=2)
+        assert result == {"recorded": 6, "batches": 2}
+
+        result = reconcile_tool_stats(session_factory, batch_size=3)
+        assert result == {"recorded": 1, "batches": 1}
+        assert reconcile_tool_stats(session_factory)["recorded"] == 0
+
+        with session_factory() as db:
+            row = db.query(ToolStats).filter_by(tool_name="check_links").one()
+            assert row.total_runs == 7
+            assert row.avg_duration == pytest.approx(4.0)
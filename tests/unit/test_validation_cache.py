@@ -0,0 +1,153 @@
+"""
+Unit Tests for Shared Validation Cache
+
+Tests for tools/shared/validation_cache.py used by validate and
+metadata_validator.
+"""
+
+import pytest
+from pathlib import Path
+import os
+import sys
+
+# Add tools directory to path
+tools_dir = Path(__file__).parent.parent.parent / "tools"
+sys.path.insert(0, str(tools_dir))
+
+from shared.validation_cache import ValidationCache, parallel_map
+from validate import AdvancedKnowledgeBaseValidator
+from metadata_validator import AdvancedMetadataValidator
+
+
+ARTICLE = """---
+title: {title}
+date: 2025-01-01
+tags: [python, testing]
+category: computers
+related: [{related}]
+---
+
+# Заголовок
+
+Текст статьи со ссылкой на [соседнюю статью]({link}) и картинкой ![схема](img.png).
+"""
+
+
+def write_article(path: Path, title="Article", link="b.md", related="b.md"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(ARTICLE.format(title=title, link=link, related=related), encoding='utf-8')
+
+
+@pytest.mark.unit
+class TestValidationCache:
+    """Test cache keys, freshness and persistence"""
+
+    def test_hit_and_invalidation(self, tmp_path):
+        """Test content changes, touch without changes and dependencies"""
+        article = tmp_path / "knowledge" / "a.md"
+        write_article(article)
+        image = tmp_path / "knowledge" / "img.png"
+
+        cache = ValidationCache(tmp_path, ".cache.json", 1, {'rule': 1})
+        assert cache.get("knowledge/a.md") is None
+
+        cache.put("knowledge/a.md", {'issues': []}, [image])
+        assert cache.get("knowledge/a.md") == {'issues': []}
+
+        # mtime изменился, содержимое - нет
+        os.utime(article, ns=(1, 1))
+        assert cache.get("knowledge/a.md") == {'issues': []}
+
+        # Зависимость появилась
+        image.write_bytes(b'png')
+        assert cache.get("knowledge/a.md") is None
+
+        cache.put("knowledge/a.md", {'issues': []}, [image])
+        article.write_text("changed", encoding='utf-8')
+        assert cache.get("knowledge/a.md") is None
+
+    def test_persistence_and_rules(self, tmp_path):
+        """Test that entries survive reload only with the same version and rules"""
+        write_article(tmp_path / "knowledge" / "a.md")
+
+        cache = ValidationCache(tmp_path, ".cache.json", 1, {'rule': 1})
+        cache.put("knowledge/a.md", ['ok'])
+        cache.save()
+
+        assert ValidationCache(tmp_path, ".cache.json", 1, {'rule': 1}).get("knowledge/a.md") == ['ok']
+        assert ValidationCache(tmp_path, ".cache.json", 1, {'rule': 2}).get("knowledge/a.md") is None
+        assert ValidationCache(tmp_path, ".cache.json", 2, {'rule': 1}).get("knowledge/a.md") is None
+
+    def test_parallel_map(self):
+        """Test that the pool keeps order and results"""
+        items = ['x' * i for i in range(25)]
+        assert parallel_map(len, items, workers=2) == list(range(25))
+
+
+@pytest.mark.unit
+class TestValidatorsUseCache:
+    """Test cached and parallel validation against a full run"""
+
+    def test_validate_incremental(self, tmp_path):
+        """Test cached results and revalidation after a link target is removed"""
+        for name in ("a", "b", "c"):
+            write_article(tmp_path / "knowledge" / f"{name}.md", title=name.upper())
+
+        def run():
+            validator = AdvancedKnowledgeBaseValidator(tmp_path, use_cache=True)
+            validator.scan_and_validate()
+            return validator
+
+        first = run()
+        second = run()
+        assert second.stats['revalidated'] == 0
+        assert [i.to_dict() for i in first.issues] == [i.to_dict() for i in second.issues]
+        assert [i.to_dict() for i in second.issues] == [
+            i.to_dict() for i in _uncached(tmp_path).issues]
+
+        # a.md и c.md ссылаются на b.md - их результаты устарели
+        (tmp_path / "knowledge" / "b.md").unlink()
+        third = run()
+        assert third.stats['revalidated'] == 2
+        assert sum(1 for i in third.issues if i.message == "Broken link: b.md") == 2
+
+    def test_validate_files(self, tmp_path):
+        """Test validation of selected files only"""
+        for name in ("a", "b"):
+            write_article(tmp_path / "knowledge" / f"{name}.md")
+
+        validator = AdvancedKnowledgeBaseValidator(tmp_path)
+        validator.run(files=[tmp_path / "knowledge" / "a.md"])
+
+        assert validator.stats['total_articles'] == 1
+        assert {str(i.file_path) for i in validator.issues if i.file_path} == {
+            str(tmp_path / "knowledge" / "a.md")}
+
+    def test_metadata_cross_checks(self, tmp_path):
+        """Test duplicate titles and related articles via the link index"""
+        write_article(tmp_path / "knowledge" / "a.md", title="Same", related="b.md")
+        write_article(tmp_path / "knowledge" / "b.md", title="Same", related="missing.md")
+        write_article(tmp_path / "knowledge" / "c.md", title="Other", link="../x/../c.md", related="a.md")
+
+        def run():
+            validator = AdvancedMetadataValidator(tmp_path, use_cache=True)
+            validator.validate_all()
+            return {r['path']: r['cross_issues'] for r in validator.results}, validator
+
+        cross, _ = run()
+        assert cross == {
+            'knowledge/a.md': ["Duplicate title detected: 'Same'"],
+            'knowledge/b.md': ["Duplicate title detected: 'Same'",
+                               "Related article not found: knowledge/missing.md"],
+            'knowledge/c.md': ["Suspicious link path: ../x/../c.md"],
+        }
+
+        cached, validator = run()
+        assert validator.stats['revalidated'] == 0
+        assert cached == cross
+
+
+def _uncached(root):
+    validator = AdvancedKnowledgeBaseValidator(root)
+    validator.scan_and_validate()
+    return validator
@@ -0,0 +1,220 @@
+"""
+Unit Tests for Workflow Engine
+
+Tests for backend/workflow_engine.py: DAG validation, parallel execution,
+artifact passing and result caching.
+"""
+
+import pytest
+from pathlib import Path
+import asyncio
+import multiprocessing
+import sys
+
+# Add backend directory to path
+backend_dir = Path(__file__).parent.parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from tool_runner import ToolRunner
+from workflow_engine import ResultCache, WorkflowExecutor, parse_steps, topological_levels
+
+
+# Инструменты как в tools/: корень вычисляется от своего пути
+PRODUCE = '''
+import sys, time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+name = sys.argv[sys.argv.index("--name") + 1]
+time.sleep(0.3)
+articles = len(list((root_dir / "knowledge").glob("*.md")))
+(root_dir / f"{name}.txt").write_text(f"{name}:{articles}", encoding="utf-8")
+'''
+
+COMBINE = '''
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+parts = [(root_dir / f"{name}.txt").read_text(encoding="utf-8") for name in ("a", "b")]
+(root_dir / "combined.txt").write_text("+".join(parts), encoding="utf-8")
+'''
+
+FAIL = '''
+raise SystemExit(1)
+'''
+
+STEPS = [
+    {"id": "a", "tool": "produce", "parameters": {"name": "a"}},
+    {"id": "b", "tool": "produce", "parameters": {"name": "b"}},
+    {"id": "combined", "tool": "combine", "depends_on": ["a", "b"]},
+]
+
+
+def setup_repo(root: Path):
+    (root / "tools").mkdir()
+    (root / "tools" / "produce.py").write_text(PRODUCE, encoding="utf-8")
+    (root / "tools" / "combine.py").write_text(COMBINE, encoding="utf-8")
+    (root / "tools" / "fail.py").write_text(FAIL, encoding="utf-8")
+    (root / "knowledge").mkdir()
+    (root / "knowledge" / "one.md").write_text("# One", encoding="utf-8")
+
+
+def save_entries(root: str, worker: int, count: int):
+    """Сохранять записи кэша по одной, как шаги на разных воркерах"""
+    for i in range(count):
+        cache = ResultCache(Path(root))
+        cache.put(f"{worker}-{i}", "produce", [], 0.1)
+        cache.save()
+
+
+def run(root: Path, steps, **kwargs):
+    runner = ToolRunner(root / "tools", root, publish_outputs=kwargs.pop("publish_outputs", True))
+    executor = WorkflowExecutor(runner, **kwargs)
+    return asyncio.run(executor.run(steps)), runner
+
+
+@pytest.mark.unit
+class TestWorkflowDefinition:
+    """Test step parsing and DAG validation"""
+
+    def test_levels(self):
+        assert topological_levels(parse_steps(STEPS)) == [["a", "b"], ["combined"]]
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="cycle"):
+            parse_steps([{"id": "x", "tool": "t", "depends_on": ["y"]},
+                         {"id": "y", "tool": "t", "depends_on": ["x"]}])
+        with pytest.raises(ValueError, match="unknown"):
+            parse_steps([{"tool": "t", "depends_on": ["missing"]}])
+        with pytest.raises(ValueError, match="Duplicate"):
+            parse_steps([{"tool": "t"}, {"tool": "t"}])
+
+
+@pytest.mark.unit
+class TestWorkflowExecutor:
+    """Test parallel execution, artifact passing and caching"""
+
+    def test_parallel_and_artifacts(self, tmp_path):
+        """Test that independent steps overlap and outputs reach dependents"""
+        setup_repo(tmp_path)
+        result, runner = run(tmp_path, STEPS, max_parallel=2, publish_outputs=False)
+
+        assert result["status"] == "completed"
+        records = {record["step"]: record for record in result["steps"]}
+        assert [record["step"] for record in result["steps"]][-1] == "combined"
+
+        # a и b выполнялись одновременно
+        a, b = records["a"], records["b"]
+        assert a["started_at"] < b["completed_at"] and b["started_at"] < a["completed_at"]
+
+        # Без публикации combine видит a.txt и b.txt только как артефакты шагов
+        assert not (tmp_path / "a.txt").exists()
+        combined = records["combined"]["output_files"]
+        assert [ref["name"] for ref in combined] == ["combined.txt"]
+        assert runner.artifacts.read_bytes(combined[0]["sha256"]) == b"a:1+b:1"
+
+    def test_unchanged_steps_are_cached(self, tmp_path):
+        """Test that a rerun skips steps whose inputs are unchanged"""
+        setup_repo(tmp_path)
+        run(tmp_path, STEPS)
+        (tmp_path / "combined.txt").write_text("stale", encoding="utf-8")
+
+        result, _ = run(tmp_path, STEPS)
+        assert all(record["cached"] for record in result["steps"])
+        assert all(record["job_id"] is None for record in result["steps"])
+        assert (tmp_path / "combined.txt").read_text(encoding="utf-8") == "a:1+b:1"
+
+        # Новая статья меняет входы всех шагов
+        (tmp_path / "knowledge" / "two.md").write_text("# Two", encoding="utf-8")
+        result, _ = run(tmp_path, STEPS)
+        assert not any(record["cached"] for record in result["steps"])
+        assert (tmp_path / "combined.txt").read_text(encoding="utf-8") == "a:2+b:2"
+
+        # Входы шага можно ограничить: статьи не влияют на шаг без входов
+        steps = [dict(STEPS[0], inputs=[]), STEPS[1], STEPS[2]]
+        run(tmp_path, steps)
+        (tmp_path / "knowledge" / "three.md").write_text("# Three", encoding="utf-8")
+        result, _ = run(tmp_path, steps)
+        assert {record["step"]: record["cached"] for record in result["steps"]} == {
+            "a": True, "b": False, "combined": False}
+
+    def test_failure_cancels_dependents(self, tmp_path):
+        """Test that a failed step cancels its dependents only"""
+        setup_repo(tmp_path)
+        steps = [
+            {"id": "broken", "tool": "fail"},
+            {"id": "after", "tool": "combine", "depends_on": ["broken"]},
+            {"id": "a", "tool": "produce", "parameters": {"name": "a"}},
+        ]
+        result, _ = run(tmp_path, steps)
+
+        statuses = {record["step"]: record["status"] for record in result["steps"]}
+        assert result["status"] == "failed"
+        assert statuses == {"broken": "failed", "after": "cancelled", "a": "completed"}
+
+    def test_shared_module_change_invalidates_cache(self, tmp_path):
+        """Test that editing a tools/shared module imported by a tool reruns its step"""
+        setup_repo(tmp_path)
+        (tmp_path / "tools" / "shared").mkdir()
+        (tmp_path / "tools" / "shared" / "__init__.py").write_text("", encoding="utf-8")
+        (tmp_path / "tools" / "shared" / "helper.py").write_text("from .base import X\n", encoding="utf-8")
+        (tmp_path / "tools" / "shared" / "base.py").write_text("X = 1\n", encoding="utf-8")
+        (tmp_path / "tools" / "uses_shared.py").write_text(
+            "import sys\nfrom pathlib import Path\n"
+            "sys.path.insert(0, str(Path(__file__).parent))\n"
+            "from shared.helper import X\n"
+            "(Path(__file__).parent.parent / 'x.txt').write_text(str(X), encoding='utf-8')\n",
+            encoding="utf-8"
+        )
+        steps = [{"id": "x", "tool": "uses_shared", "inputs": []}]
+
+        run(tmp_path, steps)
+        result, _ = run(tmp_path, steps)
+        assert result["steps"][0]["cached"]
+
+        # Модуль, импортируемый транзитивно (helper -> base)
+        (tmp_path / "tools" / "shared" / "base.py").write_text("X = 2\n", encoding="utf-8")
+        result, _ = run(tmp_path, steps)
+        assert not result["steps"][0]["cached"]
+        assert (tmp_path / "x.txt").read_text(encoding="utf-8") == "2"
+
+    def test_step_exception_fails_run(self, tmp_path):
+        """Test that an exception in run_step fails the step instead of the whole run"""
+        setup_repo(tmp_path)
+        runner = ToolRunner(tmp_path / "tools", tmp_path)
+        run_tool = runner.run_tool
+
+        async def broken_run_tool(tool_name, *args, **kwargs):
+            if tool_name == "combine":
+                raise OSError("disk full")
+            return await run_tool(tool_name, *args, **kwargs)
+
+        runner.run_tool = broken_run_tool
+        steps = STEPS + [{"id": "after", "tool": "produce", "parameters": {"name": "c"},
+                          "depends_on": ["combined"]}]
+        result = asyncio.run(WorkflowExecutor(runner, use_cache=False).run(steps))
+
+        records = {record["step"]: record for record in result["steps"]}
+        assert result["status"] == "failed"
+        assert records["combined"]["status"] == "failed"
+        assert "disk full" in records["combined"]["error"]
+        assert records["after"]["status"] == "cancelled"
+        assert records["a"]["status"] == "completed"
+
+
+@pytest.mark.unit
+class TestResultCache:
+    """Test the persistent step result cache"""
+
+    def test_concurrent_saves_keep_all_entries(self, tmp_path):
+        """Test that saves from parallel processes do not drop each other's entries"""
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=save_entries, args=(str(tmp_path), worker, 20)) for worker in range(6)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        assert all(process.exitcode == 0 for process in processes)
+        entries = ResultCache(tmp_path).entries
+        assert sorted(entries) == sorted(f"{worker}-{i}" for worker in range(6) for i in range(20))
@@ -33,6 +33,8 @@ import argparse
 from collections import defaultdict, Counter
 from typing import Dict, List, Tuple, Optional
 
+from shared.keyword_classifier import KeywordClassifier
+
 
 # Extended Dewey Decimal Classification (simplified)
 EXTENDED_DEWEY = {
@@ -81,6 +83,13 @@ class MLClassifier:
     def __init__(self):
         self.keyword_weights = self._build_keyword_index()
 
+        # Матрица ключевое слово × номер Dewey - одна на все статьи
+        self.model = KeywordClassifier(
+            (keyword, dewey_num, weight)
+            for keyword, dewey_list in self.keyword_weights.items()
+            for dewey_num, weight in dewey_list
+        )
+
     def _build_keyword_index(self) -> Dict[str, List[Tuple[str, float]]]:
         """Построить индекс ключевых слов"""
         index = defaultdict(list)
@@ -99,39 +108,19 @@ class MLClassifier:
         Классифицировать контент
         Returns: [(dewey_number, confidence_score), ...]
         """
-        # Combine title and content (title has more weight)
-        text = (title * 3 + " " + content).lower()
-
-        # Extract words
-        words = re.findall(r'\b\w+\b', text)
-        word_freq = Counter(words)
-
-        # Score each Dewey number
-        scores = defaultdict(float)
-
-        for keyword, dewey_list in self.keyword_weights.items():
-            if keyword in word_freq:
-                freq = word_freq[keyword]
-                for dewey_num, weight in dewey_list:
-                    scores[dewey_num] += freq * weight
-
-        # Normalize to 0-100
-        if not scores:
-            return []
+        return self.classify_batch([(content, title)])[0]
 
-        max_score = max(scores.values())
-        if max_score == 0:
-            return []
-
-        normalized = []
-        for dewey_num, score in scores.items():
-            confidence = min(100, (score / max_score) * 100)
-            normalized.append((dewey_num, round(confidence, 2)))
+    def classify_batch(self, documents: List[Tuple[str, str]], top_k: int = 5) -> List[List[Tuple[str, float]]]:
+        """
+        Классифицировать пачку документов [(content, title), ...] за один проход
 
-        # Sort by confidence
-        normalized.sort(key=lambda x: x[1], reverse=True)
+        Returns: для каждого документа [(dewey_number, confidence_score), ...]
+        (0-100 относительно лучшего номера, top_k лучших)
+        """
+        # Combine title and content (title has more weight)
+        texts = [title * 3 + " " + content for content, title in documents]
 
-        return normalized[:5]  # Top 5
+        return self.model.top_k(texts, k=top_k, normalize='max')
 
 
 class AdvancedDeweyClassifier:
@@ -146,6 +135,9 @@ class AdvancedDeweyClassifier:
         self.ml_classifier = MLClassifier()
         self.stats = defaultdict(int)
 
+        # Предсказания, посчитанные пачкой: (content, title) → [(dewey, confidence)]
+        self.predictions = {}
+
     def get_classification_number(self, category: str, subcategory: str = None,
                                   content: str = "", title: str = "") -> Optional[Dict]:
         """Получить классификационный номер"""
@@ -190,7 +182,9 @@ class AdvancedDeweyClassifier:
 
         # ML-based classification if enabled
         if self.auto_classify and content:
-            predictions = self.ml_classifier.classify(content, title)
+            predictions = self.predictions.get((content, title))
+            if predictions is None:
+                predictions = self.ml_classifier.classify(content, title)
 
             if predictions:
                 top_prediction, confidence = predictions[0]
@@ -278,6 +272,30 @@ class AdvancedDeweyClassifier:
             self.stats['errors'] += 1
             return None
 
+    def prepare_predictions(self, articles: List[Path]):
+        """Классифицировать статьи одной пачкой (для get_classification_number)"""
+        documents = []
+
+        for article_path in articles:
+            try:
+                with open(article_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+
+                match = re.match(r'^---\s*\n(.*?)\n---\s*\n(.*)', content, re.DOTALL)
+                if not match:
+                    continue
+
+                fm = yaml.safe_load(match.group(1))
+                body = match.group(2)
+                title = fm.get('title', '')
+                if body and isinstance(title, str):
+                    documents.append((body, title))
+            except Exception:
+                continue
+
+        predictions = self.ml_classifier.classify_batch(documents)
+        self.predictions = dict(zip(documents, predictions))
+
     def _dewey_to_loc(self, dewey: str) -> Optional[str]:
         """Конвертировать Dewey в LoC"""
         # Simplified mapping
@@ -440,11 +458,14 @@ class AdvancedDeweyClassifier:
 
         print(f"\n📝 Classifying articles (scheme: {self.scheme})...\n")
 
-        results = []
-        for md_file in self.knowledge_dir.rglob("*.md"):
-            if md_file.name == "INDEX.md":
-                continue
+        articles = [f for f in self.knowledge_dir.rglob("*.md") if f.name != "INDEX.md"]
 
+        # ML-классификация всех статей - один векторный проход
+        if self.auto_classify:
+            self.prepare_predictions(articles)
+
+        results = []
+        for md_file in articles:
             result = self.classify_article(md_file, dry_run=dry_run)
             if result:
                 results.append(result)
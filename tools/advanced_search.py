@@ -31,37 +31,21 @@ import json
 import argparse
 from datetime import datetime
 
+from shared.fuzzy_match import levenshtein
+from shared.tokenizer import tokenize
+
 
 class LevenshteinDistance:
     """Levenshtein distance для fuzzy matching"""
 
     @staticmethod
-    def calculate(s1: str, s2: str) -> int:
+    def calculate(s1: str, s2: str, max_distance: Optional[int] = None) -> int:
         """
         Вычислить Levenshtein distance (edit distance)
         Количество операций (вставка, удаление, замена) для превращения s1 в s2
+        С max_distance - ограниченный расчёт (max_distance + 1, если больше)
         """
-        if len(s1) < len(s2):
-            return LevenshteinDistance.calculate(s2, s1)
-
-        if len(s2) == 0:
-            return len(s1)
-
-        previous_row = range(len(s2) + 1)
-
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                # Стоимость операций
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-
-                current_row.append(min(insertions, deletions, substitutions))
-
-            previous_row = current_row
-
-        return previous_row[-1]
+        return levenshtein(s1, s2, max_distance)
 
     @staticmethod
     def similarity(s1: str, s2: str) -> float:
@@ -193,9 +177,8 @@ class AdvancedSearch:
 
     def tokenize(self, text):
         """Разбить текст на токены"""
-        # Извлечь слова (кириллица и латиница, минимум 2 символа)
-        words = re.findall(r'\b[а-яёa-z]{2,}\b', text.lower())
-        return words
+        # Слова кириллицей и латиницей, минимум 2 символа
+        return tokenize(text, min_length=2)
 
     def calculate_idf(self):
         """Вычислить IDF (Inverse Document Frequency) для всех терминов"""
@@ -241,7 +224,7 @@ class AdvancedSearch:
                 if len(word) < 3:  # Skip short words
                     continue
 
-                distance = LevenshteinDistance.calculate(term.lower(), word)
+                distance = LevenshteinDistance.calculate(term.lower(), word, max_distance)
                 if distance <= max_distance:
                     matched_words.add(word)
 
@@ -24,6 +24,19 @@ from collections import Counter, defaultdict
 import json
 import math
 
+from shared.sentence_graph import NUMPY_AVAILABLE, SentenceMatrix
+from shared.tokenizer import tokenize
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+# Стоп-слова (расширенный список)
+STOP_WORDS = frozenset([
+    'и', 'в', 'на', 'с', 'по', 'для', 'к', 'о', 'от', 'из', 'у', 'за', 'это', 'как',
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does'
+])
+
 
 class AdvancedAutoTagger:
     """Продвинутый автоматический генератор тегов"""
@@ -33,11 +46,7 @@ class AdvancedAutoTagger:
         self.knowledge_dir = self.root_dir / "knowledge"
 
         # Стоп-слова (расширенный список)
-        self.stop_words = set([
-            'и', 'в', 'на', 'с', 'по', 'для', 'к', 'о', 'от', 'из', 'у', 'за', 'это', 'как',
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-            'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does'
-        ])
+        self.stop_words = STOP_WORDS
 
         # Глобальная статистика тегов
         self.tag_stats = defaultdict(int)
@@ -48,6 +57,9 @@ class AdvancedAutoTagger:
         # Кэш для похожих статей
         self.article_vectors = {}
 
+        # Похожие статьи для всего корпуса (build_similarity_index)
+        self.similar_index = {}
+
     def extract_frontmatter_and_content(self, file_path):
         """Извлечь frontmatter и содержимое"""
         try:
@@ -90,6 +102,9 @@ class AdvancedAutoTagger:
             # Document frequency для IDF
             words = self.tokenize(content)
             unique_words = set(words)
+            self.article_vectors[str(md_file.relative_to(self.root_dir))] = (
+                unique_words, frontmatter.get('tags') if frontmatter and 'tags' in frontmatter else None
+            )
             for word in unique_words:
                 self.document_frequency[word] += 1
 
@@ -98,17 +113,8 @@ class AdvancedAutoTagger:
         print(f"   Словарь: {len(self.document_frequency)} слов\n")
 
     def tokenize(self, text):
-        """Токенизация текста"""
-        # Удалить markdown
-        text = re.sub(r'[#*`\[\]()]', ' ', text)
-
-        # Извлечь слова (русские и английские)
-        words = re.findall(r'\b[а-яёa-z]{3,}\b', text.lower())
-
-        # Фильтровать стоп-слова
-        words = [w for w in words if w not in self.stop_words]
-
-        return words
+        """Токенизация текста (слова от 3 символов без стоп-слов)"""
+        return tokenize(text, min_length=3, stop_words=self.stop_words)
 
     def extract_ngrams(self, text, n=2):
         """Извлечь n-граммы (биграммы, триграммы)"""
@@ -223,8 +229,40 @@ class AdvancedAutoTagger:
 
         return min(confidence, 1.0)
 
+    def build_similarity_index(self, top_k=3):
+        """
+        Похожие статьи для всего корпуса за один проход
+
+        Сходство Жаккара всех пар статей - одно произведение разреженной
+        матрицы статья × слово на себя (вместо перечитывания корпуса для
+        каждой статьи). Нужны build_corpus_statistics и numpy.
+        """
+        if not NUMPY_AVAILABLE or not self.article_vectors:
+            return
+
+        paths = list(self.article_vectors)
+        vectors = [self.article_vectors[path] for path in paths]
+        similarity = SentenceMatrix([list(words) for words, _ in vectors]).jaccard_similarity()
+
+        # Кандидаты - только статьи с тегами, выше минимального порога
+        tagged = np.array([tags is not None for _, tags in vectors])
+        similarity = np.where(tagged[None, :] & (similarity > 0.1), similarity, 0.0)
+
+        # Топ-k по каждой строке (при равенстве - в порядке обхода корпуса)
+        order = np.argsort(-similarity, axis=1, kind='stable')[:, :top_k]
+
+        for i, path in enumerate(paths):
+            self.similar_index[path] = [
+                {'path': paths[j], 'similarity': float(similarity[i, j]), 'tags': vectors[j][1]}
+                for j in order[i].tolist()
+                if similarity[i, j] > 0
+            ]
+
     def find_similar_articles(self, article_path, top_k=3):
         """Найти похожие статьи для рекомендаций"""
+        if article_path in self.similar_index:
+            return self.similar_index[article_path][:top_k]
+
         # Простая similarity на основе общих слов
         target_file = self.root_dir / article_path
         _, _, target_content = self.extract_frontmatter_and_content(target_file)
@@ -309,10 +347,13 @@ class AdvancedAutoTagger:
         # Объединить все кандидаты
         candidates = []
 
+        existing_lower = {t.lower() for t in existing_tags}
+        word_counts = Counter(self.tokenize(content))
+
         # Одиночные слова (TF-IDF)
         for word, score in weighted_scores.items():
-            if word not in [t.lower() for t in existing_tags]:
-                word_freq = Counter(self.tokenize(content))[word]
+            if word not in existing_lower:
+                word_freq = word_counts[word]
                 confidence = self.calculate_confidence(word, score, word_freq, existing_tags)
 
                 candidates.append({
@@ -325,7 +366,7 @@ class AdvancedAutoTagger:
 
         # Биграммы
         for bigram, freq in bigrams.items():
-            if bigram not in [t.lower() for t in existing_tags]:
+            if bigram not in existing_lower:
                 candidates.append({
                     'tag': bigram,
                     'score': freq * 2,  # Биграммы ценнее
@@ -336,7 +377,7 @@ class AdvancedAutoTagger:
 
         # Триграммы
         for trigram, freq in trigrams.items():
-            if trigram not in [t.lower() for t in existing_tags]:
+            if trigram not in existing_lower:
                 candidates.append({
                     'tag': trigram,
                     'score': freq * 3,  # Триграммы еще ценнее
@@ -373,8 +414,9 @@ class AdvancedAutoTagger:
         """Проанализировать все статьи"""
         print("🏷️  Продвинутая генерация тегов...\n")
 
-        # Сначала построить статистику
+        # Сначала построить статистику и индекс похожих статей
         self.build_corpus_statistics()
+        self.build_similarity_index()
 
         suggestions = []
 
@@ -12,9 +12,12 @@ import re
 from collections import defaultdict, Counter
 import json
 import argparse
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Optional, Tuple, Set
 import math
 
+from shared.citation_matrix import CitationMatrix
+from shared.link_index import LinkIndex
+
 
 class BacklinkAnalyzer:
     """Анализатор метрик обратных ссылок"""
@@ -23,6 +26,18 @@ class BacklinkAnalyzer:
         self.backlinks = backlinks
         self.articles = articles
 
+        # Матрица цитирований (строится при первом запросе)
+        self.matrix = None
+
+    def citation_matrix(self) -> CitationMatrix:
+        """Граф обратных ссылок как разреженная матрица C (источник → цель)"""
+        if self.matrix is None:
+            edges = [(bl['source'], target)
+                     for target, backlinks in self.backlinks.items()
+                     for bl in backlinks]
+            self.matrix = CitationMatrix(edges, nodes=self.articles)
+        return self.matrix
+
     def calculate_citation_strength(self, article_path: str) -> float:
         """Вычислить силу цитирования (учитывает количество и качество)"""
         if article_path not in self.backlinks:
@@ -79,26 +94,8 @@ class BacklinkAnalyzer:
         return actual_links / max_possible if max_possible > 0 else 0.0
 
     def get_mutual_citations(self) -> List[Tuple[str, str]]:
-        """Найти взаимные цитирования (A→B и B→A)"""
-        mutual = []
-
-        # Построить forward links из backlinks
-        forward_links = defaultdict(set)
-        for target, backlinks in self.backlinks.items():
-            for bl in backlinks:
-                forward_links[bl['source']].add(target)
-
-        # Найти взаимные
-        checked = set()
-        for article_a in forward_links:
-            for article_b in forward_links[article_a]:
-                if article_a in forward_links.get(article_b, set()):
-                    pair = tuple(sorted([article_a, article_b]))
-                    if pair not in checked:
-                        mutual.append(pair)
-                        checked.add(pair)
-
-        return mutual
+        """Найти взаимные цитирования (A→B и B→A) - C ∧ Cᵀ"""
+        return self.citation_matrix().mutual_pairs()
 
 
 class BacklinkScorer:
@@ -159,13 +156,17 @@ class BacklinkScorer:
 class BrokenBacklinksDetector:
     """Детектор сломанных/некорректных обратных ссылок"""
 
-    def __init__(self, root_dir: Path):
+    def __init__(self, root_dir: Path, link_index: Optional[LinkIndex] = None):
         self.root_dir = root_dir
         self.knowledge_dir = root_dir / "knowledge"
 
+        # Существование файлов и якоря - из общего индекса, без обращений к диску
+        self.link_index = link_index or LinkIndex.open(root_dir)
+
     def check_backlinks(self, backlinks: Dict, articles: Dict) -> Dict[str, List[Dict]]:
         """Проверить все обратные ссылки на корректность"""
         issues = defaultdict(list)
+        index = self.link_index
 
         for target_path, backlinks_list in backlinks.items():
             # Проверка 1: Целевой файл существует?
@@ -177,7 +178,7 @@ class BrokenBacklinksDetector:
                 continue
 
             target_file = articles[target_path]['file']
-            if not target_file.exists():
+            if not index.exists(target_path):
                 issues['missing_files'].append({
                     'target': target_path,
                     'file': str(target_file)
@@ -194,13 +195,26 @@ class BrokenBacklinksDetector:
                     continue
 
                 source_file = articles[source_path]['file']
-                if not source_file.exists():
+                if not index.exists(source_path):
                     issues['missing_source_files'].append({
                         'source': source_path,
                         'target': target_path,
                         'file': str(source_file)
                     })
 
+        # Проверка 3: Якоря ссылок есть в целевой статье?
+        for target_path in articles:
+            anchors = index.anchors(target_path)
+            if anchors is None:
+                continue
+            for source_path, link in index.incoming(target_path, kinds=('content', 'related', 'anchor')):
+                if link['anchor'] and link['anchor'] not in anchors:
+                    issues['broken_anchors'].append({
+                        'source': source_path,
+                        'target': target_path,
+                        'anchor': link['anchor']
+                    })
+
         return dict(issues)
 
     def find_orphaned_articles(self, backlinks: Dict, articles: Dict) -> List[str]:
@@ -235,6 +249,9 @@ class BacklinksGenerator:
         self.backlinks = defaultdict(list)
         self.articles = {}
 
+        # Общий индекс ссылок (shared/link_index.py)
+        self.link_index = None
+
         # Анализаторы
         self.analyzer = None
         self.scorer = None
@@ -256,74 +273,25 @@ class BacklinksGenerator:
         """Построить граф обратных ссылок"""
         print("🔗 Построение графа обратных ссылок...\n")
 
-        # Собрать все статьи
-        for md_file in self.knowledge_dir.rglob("*.md"):
-            if md_file.name == "INDEX.md":
-                continue
-
-            frontmatter_str, content = self.extract_frontmatter_and_content(md_file)
-
-            if not content:
-                continue
-
-            article_path = str(md_file.relative_to(self.root_dir))
-
-            # Парсинг frontmatter для заголовка
-            if frontmatter_str:
-                try:
-                    frontmatter = yaml.safe_load(frontmatter_str)
-                    title = frontmatter.get('title', md_file.stem)
-                except:
-                    title = md_file.stem
-            else:
-                title = md_file.stem
+        if self.link_index is None:
+            self.link_index = LinkIndex.open(self.root_dir)
 
+        # Собрать все статьи
+        for article_path in self.link_index.articles():
             self.articles[article_path] = {
-                'title': title,
-                'file': md_file
+                'title': self.link_index.title(article_path),
+                'file': self.root_dir / article_path
             }
 
-        # Построить граф ссылок
-        for md_file in self.knowledge_dir.rglob("*.md"):
-            if md_file.name == "INDEX.md":
-                continue
-
-            _, content = self.extract_frontmatter_and_content(md_file)
-
-            if not content:
-                continue
-
-            source_path = str(md_file.relative_to(self.root_dir))
-            source_title = self.articles[source_path]['title']
-
-            # Извлечь все markdown ссылки
-            links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', content)
-
-            for link_text, link_url in links:
-                # Пропустить внешние ссылки
-                if link_url.startswith('http'):
-                    continue
-
-                # Пропустить якорные ссылки
-                if link_url.startswith('#'):
-                    continue
-
-                try:
-                    # Разрешить относительный путь
-                    target = (md_file.parent / link_url.split('#')[0]).resolve()
-
-                    if target.exists() and target.is_relative_to(self.root_dir):
-                        target_path = str(target.relative_to(self.root_dir))
-
-                        # Добавить обратную ссылку
-                        if target_path in self.articles:
-                            self.backlinks[target_path].append({
-                                'source': source_path,
-                                'title': source_title,
-                                'context': link_text
-                            })
-                except:
-                    pass
+        # Построить граф ссылок из общего индекса
+        for target_path in self.articles:
+            for source_path, link in self.link_index.incoming(target_path):
+                if source_path in self.articles:
+                    self.backlinks[target_path].append({
+                        'source': source_path,
+                        'title': self.articles[source_path]['title'],
+                        'context': link['text']
+                    })
 
         print(f"   Статей обработано: {len(self.articles)}")
         print(f"   Обратных ссылок: {sum(len(links) for links in self.backlinks.values())}\n")
@@ -331,7 +299,7 @@ class BacklinksGenerator:
         # Инициализировать анализаторы
         self.analyzer = BacklinkAnalyzer(self.backlinks, self.articles)
         self.scorer = BacklinkScorer(self.backlinks, self.articles)
-        self.broken_detector = BrokenBacklinksDetector(self.root_dir)
+        self.broken_detector = BrokenBacklinksDetector(self.root_dir, self.link_index)
 
     def generate_backlinks_section(self, article_path):
         """Создать секцию обратных ссылок"""
@@ -27,6 +27,8 @@ import json
 import argparse
 import math
 
+from shared.cooccurrence import CooccurrenceMatrix
+
 
 class KWICGenerator:
     """KWIC (Key Word In Context) generator"""
@@ -172,28 +174,15 @@ class CooccurrenceAnalyzer:
 
     def __init__(self, window_size=10):
         self.window_size = window_size
-        self.cooccurrences = defaultdict(lambda: defaultdict(int))
+        self.cooccurrences = CooccurrenceMatrix()
 
     def analyze_text(self, words: List[str]):
         """Анализ совместной встречаемости в окне"""
-        for i, word in enumerate(words):
-            # Слова в окне
-            window_start = max(0, i - self.window_size)
-            window_end = min(len(words), i + self.window_size + 1)
-
-            for j in range(window_start, window_end):
-                if i != j:
-                    other_word = words[j]
-                    self.cooccurrences[word][other_word] += 1
-
-    def get_related_words(self, word: str, top_n: int = 10) -> List[Tuple[str, int]]:
-        """Получить слова, часто встречающиеся рядом"""
-        if word not in self.cooccurrences:
-            return []
+        self.cooccurrences.add_window(words, self.window_size)
 
-        related = self.cooccurrences[word].items()
-        related = sorted(related, key=lambda x: x[1], reverse=True)
-        return related[:top_n]
+    def get_related_words(self, word: str, top_n: int = 10, measure: str = 'count') -> List[Tuple[str, float]]:
+        """Получить слова, часто встречающиеся рядом (count, pmi, npmi, jaccard)"""
+        return self.cooccurrences.related(word, top_n, measure)
 
 
 class ConcordanceBuilder:
@@ -589,9 +578,9 @@ class ConcordanceBuilder:
         for i, (word, score) in enumerate(keywords, 1):
             print(f"{i:3d}. {word:20s} - {score:.4f}")
 
-    def show_related_words(self, word: str, top_n: int = 10):
+    def show_related_words(self, word: str, top_n: int = 10, measure: str = 'count'):
         """Показать связанные слова (co-occurrence)"""
-        related = self.cooccurrence.get_related_words(word.lower(), top_n)
+        related = self.cooccurrence.get_related_words(word.lower(), top_n, measure)
 
         if not related:
             print(f"❌ Нет данных о связанных словах для '{word}'")
@@ -599,8 +588,11 @@ class ConcordanceBuilder:
 
         print(f"\n📊 Слова, часто встречающиеся рядом с '{word}':\n")
 
-        for i, (related_word, count) in enumerate(related, 1):
-            print(f"{i:3d}. {related_word:20s} - {count:4d} раз")
+        for i, (related_word, score) in enumerate(related, 1):
+            if measure == 'count':
+                print(f"{i:3d}. {related_word:20s} - {score:4d} раз")
+            else:
+                print(f"{i:3d}. {related_word:20s} - {measure} {score:.4f}")
 
 
 def main():
@@ -615,6 +607,7 @@ Examples:
   build_concordance.py --bigrams            # Show top bigrams
   build_concordance.py --trigrams           # Show top trigrams
   build_concordance.py --related python     # Words related to 'python'
+  build_concordance.py --related python --measure npmi
   build_concordance.py --html               # Generate HTML concordance
         """
     )
@@ -629,6 +622,8 @@ Examples:
                         help='Show top trigrams (3-word phrases)')
     parser.add_argument('--related', type=str, metavar='WORD',
                         help='Show words related to the given word')
+    parser.add_argument('--measure', choices=['count', 'pmi', 'npmi', 'jaccard'], default='count',
+                        help='Association measure for --related (default: count)')
     parser.add_argument('--tfidf', type=str, metavar='FILE',
                         help='Show TF-IDF keywords for file')
     parser.add_argument('--html', action='store_true',
@@ -649,7 +644,7 @@ Examples:
 
     # Related words
     if args.related:
-        builder.show_related_words(args.related)
+        builder.show_related_words(args.related, measure=args.measure)
         return
 
     # TF-IDF keywords
@@ -27,6 +27,8 @@ import argparse
 import csv
 import math
 
+from shared.fuzzy_match import BKTree, levenshtein, similar_pairs
+
 
 class AdvancedGlossaryBuilder:
     """Продвинутый построитель глоссария"""
@@ -44,6 +46,11 @@ class AdvancedGlossaryBuilder:
         self.synonyms = defaultdict(set)
         self.related_terms = defaultdict(set)
 
+        # BK-дерево терминов для find_similar_terms (перестраивается при изменении глоссария)
+        self._term_tree = None
+        self._term_tree_size = 0
+        self._term_positions = {}
+
         # Категории терминов (автоопределение)
         self.category_keywords = {
             'technical': ['алгоритм', 'программирование', 'функция', 'метод', 'класс', 'объект'],
@@ -174,50 +181,48 @@ class AdvancedGlossaryBuilder:
 
     def levenshtein_distance(self, s1, s2):
         """Вычислить расстояние Левенштейна"""
-        if len(s1) < len(s2):
-            return self.levenshtein_distance(s2, s1)
-
-        if len(s2) == 0:
-            return len(s1)
-
-        previous_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-
-        return previous_row[-1]
+        return levenshtein(s1, s2)
 
     def find_similar_terms(self, term, max_distance=2):
-        """Найти похожие термины (fuzzy matching)"""
-        similar = []
+        """Найти похожие термины (fuzzy matching через BK-дерево)"""
+        if self._term_tree is None or self._term_tree_size != len(self.glossary):
+            self._term_positions = defaultdict(list)
+            for position, existing_term in enumerate(self.glossary):
+                self._term_positions[existing_term.lower()].append((position, existing_term))
+            self._term_tree = BKTree(self._term_positions)
+            self._term_tree_size = len(self.glossary)
 
         term_lower = term.lower()
+        similar = []
 
-        for existing_term in self.glossary.keys():
-            existing_lower = existing_term.lower()
-
+        for existing_lower, distance in self._term_tree.search(term_lower, max_distance):
             # Пропустить сам термин
             if existing_lower == term_lower:
                 continue
 
-            # Вычислить расстояние
-            distance = self.levenshtein_distance(term_lower, existing_lower)
+            for position, existing_term in self._term_positions[existing_lower]:
+                similar.append((distance, position, existing_term))
 
-            if distance <= max_distance:
-                similar.append({
-                    'term': existing_term,
-                    'distance': distance
-                })
+        # Сортировать по расстоянию (при равенстве - в порядке глоссария)
+        similar.sort()
+
+        return [{'term': t, 'distance': d} for d, _, t in similar[:5]]
 
-        # Сортировать по расстоянию
-        similar.sort(key=lambda x: x['distance'])
+    def find_all_similar_terms(self, max_distance=2):
+        """Похожие термины для всего глоссария (одно самосоединение вместо n запросов)"""
+        terms = list(self.glossary)
+        similar = defaultdict(list)
 
-        return similar[:5]
+        for i, j, distance in similar_pairs([t.lower() for t in terms], max_distance=max_distance):
+            if distance == 0:
+                continue
+            similar[i].append((distance, j))
+            similar[j].append((distance, i))
+
+        return {
+            term: [terms[j] for _, j in sorted(similar[i])[:5]]
+            for i, term in enumerate(terms)
+        }
 
     def extract_term_context(self, term, content):
         """Извлечь контекст использования термина"""
@@ -332,9 +337,8 @@ class AdvancedGlossaryBuilder:
             self.glossary[term]['importance'] = self.calculate_term_importance(self.glossary[term])
 
         # Найти похожие термины
-        for term in self.glossary:
-            similar = self.find_similar_terms(term)
-            self.glossary[term]['similar_terms'] = [s['term'] for s in similar]
+        for term, similar in self.find_all_similar_terms().items():
+            self.glossary[term]['similar_terms'] = similar
 
         print(f"   Найдено терминов: {len(self.glossary)}")
         print(f"   Категорий: {len(self.term_categories)}")
@@ -15,8 +15,9 @@ import yaml
 import re
 from collections import defaultdict
 import json
-import subprocess
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from shared.git_history import GitHistory
 
 
 class TaxonomyStatistics:
@@ -689,45 +690,24 @@ class TaxonomyEvolution:
 
     def get_git_history(self, days_back=90):
         """Получить историю коммитов за последние N дней"""
-        try:
-            # Получить список коммитов
-            cmd = [
-                'git', 'log',
-                f'--since={days_back} days ago',
-                '--pretty=format:%H|%ai|%s',
-                '--', 'knowledge/'
-            ]
-
-            result = subprocess.run(
-                cmd,
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            if result.returncode != 0:
-                return []
-
-            commits = []
-            for line in result.stdout.strip().split('\n'):
-                if not line:
-                    continue
-
-                parts = line.split('|', 2)
-                if len(parts) == 3:
-                    commits.append({
-                        'hash': parts[0],
-                        'date': parts[1],
-                        'message': parts[2]
-                    })
-
-            return commits
-
-        except Exception as e:
-            print(f"⚠️  Git история недоступна: {e}")
+        history = GitHistory.open(self.root_dir)
+
+        if not history.available:
+            print("⚠️  Git история недоступна")
             return []
 
+        since = datetime.now() - timedelta(days=days_back)
+
+        return [
+            {
+                'hash': commit['hash'],
+                'date': commit['date'],
+                'message': commit['message'],
+                'files': [change[1] for change in commit['files']]
+            }
+            for commit in history.iter_commits(since=since, path_prefix='knowledge/')
+        ]
+
     def track_category_growth(self):
         """Отследить рост категорий по коммитам"""
         commits = self.get_git_history()
@@ -739,29 +719,14 @@ class TaxonomyEvolution:
         timeline = []
 
         for commit in commits[:20]:  # Последние 20 коммитов
-            # Получить файлы, изменённые в коммите
-            try:
-                cmd = ['git', 'diff-tree', '--no-commit-id', '--name-only', '-r', commit['hash']]
-                result = subprocess.run(
-                    cmd,
-                    cwd=self.root_dir,
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-
-                files = result.stdout.strip().split('\n')
-                md_files = [f for f in files if f.startswith('knowledge/') and f.endswith('.md')]
-
-                if md_files:
-                    timeline.append({
-                        'date': commit['date'][:10],
-                        'message': commit['message'],
-                        'files_changed': len(md_files)
-                    })
+            md_files = [f for f in commit['files'] if f.startswith('knowledge/') and f.endswith('.md')]
 
-            except:
-                continue
+            if md_files:
+                timeline.append({
+                    'date': commit['date'][:10],
+                    'message': commit['message'],
+                    'files_changed': len(md_files)
+                })
 
         return {
             'total_commits': len(commits),
@@ -13,6 +13,8 @@ import json
 from collections import defaultdict, Counter
 import math
 
+from shared.cooccurrence import CooccurrenceMatrix
+
 
 class TermExtractor:
     """Извлечение терминов из контента"""
@@ -162,7 +164,7 @@ class RelationshipMiner:
         Returns:
             dict: термины и их связи
         """
-        cooccurrence = defaultdict(lambda: Counter())
+        cooccurrence = CooccurrenceMatrix()
 
         for md_file in self.knowledge_dir.rglob("*.md"):
             if md_file.name == "INDEX.md":
@@ -175,28 +177,16 @@ class RelationshipMiner:
 
                 words = re.findall(r'\b\w+\b', content.lower())
 
-                # Скользящее окно
-                for i in range(len(words)):
-                    term = words[i]
-
-                    # Окно вокруг термина
-                    start = max(0, i - window_size)
-                    end = min(len(words), i + window_size + 1)
-
-                    for j in range(start, end):
-                        if i != j:
-                            cooccurrence[term][words[j]] += 1
+                # Скользящее окно вокруг каждого термина
+                cooccurrence.add_window(words, window_size)
             except:
                 pass
 
-        # Топ связи для каждого термина
+        # Топ-10 связанных для каждого термина - одним проходом по матрице
         relationships = {}
 
-        for term, related_counts in cooccurrence.items():
-            # Топ-10 связанных
-            top_related = related_counts.most_common(10)
-            if top_related:
-                relationships[term] = [r[0] for r in top_related]
+        for term, top_related in cooccurrence.related_all(top_n=10).items():
+            relationships[term] = [r[0] for r in top_related]
 
         return relationships
 
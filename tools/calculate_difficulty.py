@@ -16,10 +16,12 @@ import yaml
 import re
 import json
 import math
-from collections import Counter, defaultdict
+from collections import defaultdict
 from datetime import datetime
 import argparse
 
+from shared.text_stats import count_syllables, text_stats
+
 
 class AdvancedDifficultyCalculator:
     """Продвинутый калькулятор уровня сложности с формулами читаемости"""
@@ -41,7 +43,6 @@ class AdvancedDifficultyCalculator:
 
         # Кэш для результатов
         self.difficulty_cache = {}
-        self.syllable_cache = {}
 
     def extract_frontmatter_and_content(self, file_path):
         """Извлечь frontmatter и содержимое"""
@@ -56,27 +57,8 @@ class AdvancedDifficultyCalculator:
         return None, None
 
     def count_syllables(self, word):
-        """Подсчитать количество слогов в слове (упрощённая версия)"""
-        if word in self.syllable_cache:
-            return self.syllable_cache[word]
-
-        word = word.lower()
-        syllables = 0
-        vowels = 'aeiouyаеёиоуыэюя'
-        previous_was_vowel = False
-
-        for char in word:
-            is_vowel = char in vowels
-            if is_vowel and not previous_was_vowel:
-                syllables += 1
-            previous_was_vowel = is_vowel
-
-        # Минимум 1 слог
-        if syllables == 0:
-            syllables = 1
-
-        self.syllable_cache[word] = syllables
-        return syllables
+        """Подсчитать количество слогов в слове (группы гласных, минимум 1)"""
+        return count_syllables(word, 'vowel_groups')
 
     def flesch_reading_ease(self, sentences, words, syllables):
         """
@@ -156,66 +138,38 @@ class AdvancedDifficultyCalculator:
         fog = 0.4 * ((words / sentences) + 100 * (complex_words / words))
         return max(0, fog)
 
-    def calculate_lexical_diversity(self, tokens):
-        """
-        Лексическое разнообразие (Type-Token Ratio)
-        Unique words / Total words
-        Выше = больше разнообразие = сложнее
-        """
-        if not tokens:
-            return 0.0
-
-        unique = len(set(tokens))
-        total = len(tokens)
-        return unique / total if total > 0 else 0.0
-
-    def calculate_vocabulary_metrics(self, tokens):
-        """Вычислить метрики словарного запаса"""
-        if not tokens:
+    def calculate_vocabulary_metrics(self, stats):
+        """Вычислить метрики словарного запаса (из общей статистики текста)"""
+        words = stats['words']
+        if not words:
             return {}
 
-        word_lengths = [len(word) for word in tokens]
-        syllable_counts = [self.count_syllables(word) for word in tokens]
-
-        # Сложные слова (3+ слогов)
-        complex_words = sum(1 for s in syllable_counts if s >= 3)
-
-        # Редкие слова (длинные, нечастые)
-        freq = Counter(tokens)
-        rare_words = sum(1 for word, count in freq.items() if count == 1 and len(word) > 8)
-
         return {
-            'avg_word_length': sum(word_lengths) / len(word_lengths) if word_lengths else 0,
-            'avg_syllables': sum(syllable_counts) / len(syllable_counts) if syllable_counts else 0,
-            'complex_words': complex_words,
-            'complex_words_pct': (complex_words / len(tokens) * 100) if tokens else 0,
-            'rare_words': rare_words,
-            'rare_words_pct': (rare_words / len(tokens) * 100) if tokens else 0,
-            'lexical_diversity': self.calculate_lexical_diversity(tokens),
+            'avg_word_length': stats['avg_word_length'],
+            'avg_syllables': stats['syllables']['vowel_groups'] / words,
+            # Сложные слова (3+ слогов)
+            'complex_words': stats['polysyllables']['vowel_groups'],
+            'complex_words_pct': stats['polysyllables']['vowel_groups'] / words * 100,
+            # Редкие слова (длинные, нечастые)
+            'rare_words': stats['rare_words'],
+            'rare_words_pct': stats['rare_words'] / words * 100,
+            # Лексическое разнообразие (Type-Token Ratio): выше = сложнее
+            'lexical_diversity': stats['lexical_diversity'],
         }
 
     def analyze_code_complexity(self, content):
         """Анализ сложности кода"""
-        code_blocks = re.findall(r'```[\w]*\n(.*?)```', content, re.DOTALL)
+        stats = text_stats(content, self.root_dir)
 
-        if not code_blocks:
+        if not stats['code_blocks']:
             return {'count': 0, 'total_lines': 0, 'avg_lines': 0, 'complexity_score': 0}
 
-        total_lines = 0
-        complexity_indicators = 0
-
-        for code in code_blocks:
-            lines = code.strip().split('\n')
-            total_lines += len(lines)
-
-            # Индикаторы сложности: циклы, условия, функции
-            complexity_indicators += len(re.findall(r'\b(for|while|if|else|elif|def|class|async|await|try|except)\b', code))
-
+        # Индикаторы сложности: циклы, условия, функции
         return {
-            'count': len(code_blocks),
-            'total_lines': total_lines,
-            'avg_lines': total_lines / len(code_blocks) if code_blocks else 0,
-            'complexity_score': complexity_indicators,
+            'count': stats['code_blocks'],
+            'total_lines': stats['code_lines'],
+            'avg_lines': stats['code_lines'] / stats['code_blocks'],
+            'complexity_score': stats['code_complexity'],
         }
 
     def calculate_comprehensive_difficulty(self, file_path):
@@ -225,17 +179,15 @@ class AdvancedDifficultyCalculator:
         if not content:
             return None
 
-        # Базовые метрики текста
-        sentences = [s for s in re.split(r'[.!?]+', content) if s.strip()]
-        tokens = re.findall(r'\b[а-яёa-z]+\b', content.lower())
-        characters = sum(len(word) for word in tokens)
+        # Базовые метрики текста (один проход, кэш по хэшу текста)
+        stats = text_stats(content, self.root_dir)
 
-        # Подсчёт слогов
-        total_syllables = sum(self.count_syllables(word) for word in tokens)
-        polysyllables = sum(1 for word in tokens if self.count_syllables(word) >= 3)
+        characters = stats['characters']
+        total_syllables = stats['syllables']['vowel_groups']
+        polysyllables = stats['polysyllables']['vowel_groups']
 
-        num_sentences = len(sentences)
-        num_words = len(tokens)
+        num_sentences = stats['sentences']
+        num_words = stats['words']
 
         # Формулы читаемости
         flesch_ease = self.flesch_reading_ease(num_sentences, num_words, total_syllables)
@@ -244,8 +196,8 @@ class AdvancedDifficultyCalculator:
         ari = self.automated_readability_index(num_sentences, num_words, characters)
         smog = self.smog_index(num_sentences, polysyllables)
 
-        vocab_metrics = self.calculate_vocabulary_metrics(tokens)
-        gunning_fog = self.gunning_fog_index(num_sentences, num_words, vocab_metrics['complex_words'])
+        vocab_metrics = self.calculate_vocabulary_metrics(stats)
+        gunning_fog = self.gunning_fog_index(num_sentences, num_words, polysyllables)
 
         # Анализ кода
         code_metrics = self.analyze_code_complexity(content)
@@ -282,8 +234,8 @@ class AdvancedDifficultyCalculator:
             score += min(15, flesch_grade * 1.5)  # max 15
 
         # 2. Лексическое разнообразие (0-15)
-        score += vocab_metrics['lexical_diversity'] * 20  # max ~20, cap at 15
-        score += vocab_metrics['complex_words_pct'] * 0.3  # max ~10
+        score += vocab_metrics.get('lexical_diversity', 0) * 20  # max ~20, cap at 15
+        score += vocab_metrics.get('complex_words_pct', 0) * 0.3  # max ~10
 
         # 3. Код (0-25)
         score += min(20, code_metrics['count'] * 5)
@@ -18,6 +18,8 @@ from collections import Counter, defaultdict
 from typing import Dict, List, Tuple
 import json
 
+from shared.text_stats import count_syllables, text_stats
+
 
 class ReadingSpeedAnalyzer:
     """
@@ -105,23 +107,19 @@ class ComplexityScorer:
     Анализирует различные метрики для определения сложности контента
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, root_dir=None):
+        self.root_dir = root_dir
 
     def calculate_sentence_complexity(self, text: str) -> Dict[str, float]:
         """Анализ сложности предложений"""
-        # Разбить на предложения
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        stats = text_stats(text, self.root_dir)
 
-        if not sentences:
+        if not stats['sentences']:
             return {'avg_length': 0, 'max_length': 0, 'complexity_score': 0}
 
-        # Длина предложений
-        lengths = [len(s.split()) for s in sentences]
-
-        avg_length = sum(lengths) / len(lengths) if lengths else 0
-        max_length = max(lengths) if lengths else 0
+        # Длина предложений (в словах через пробел)
+        avg_length = stats['avg_sentence_tokens']
+        max_length = stats['max_sentence_tokens']
 
         # Оценка сложности на основе длины предложений
         # Простые предложения: 5-15 слов
@@ -137,26 +135,23 @@ class ComplexityScorer:
         return {
             'avg_sentence_length': round(avg_length, 1),
             'max_sentence_length': max_length,
-            'total_sentences': len(sentences),
+            'total_sentences': stats['sentences'],
             'complexity_score': complexity
         }
 
     def calculate_vocabulary_richness(self, text: str) -> Dict[str, float]:
         """Анализ богатства словаря (Type-Token Ratio)"""
-        # Извлечь слова
-        words = re.findall(r'\b[а-яёa-z]+\b', text.lower())
+        stats = text_stats(text, self.root_dir)
 
-        if not words:
+        if not stats['words']:
             return {'ttr': 0, 'unique_words': 0, 'total_words': 0}
 
-        unique_words = set(words)
-
         # Type-Token Ratio
-        ttr = len(unique_words) / len(words) if words else 0
+        ttr = stats['lexical_diversity']
 
         return {
-            'total_words': len(words),
-            'unique_words': len(unique_words),
+            'total_words': stats['words'],
+            'unique_words': stats['unique_words'],
             'type_token_ratio': round(ttr, 3),
             'vocabulary_richness': 'high' if ttr > 0.6 else 'medium' if ttr > 0.4 else 'low'
         }
@@ -244,18 +239,15 @@ class ReadabilityMetrics:
     Реализует классические индексы читаемости
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, root_dir=None):
+        self.root_dir = root_dir
 
     def count_syllables_russian(self, word: str) -> int:
         """
         Приблизительный подсчет слогов в русском слове
         Основано на количестве гласных
         """
-        vowels = 'аеёиоуыэюяaeiouy'
-        word = word.lower()
-        syllable_count = sum(1 for char in word if char in vowels)
-        return max(1, syllable_count)
+        return count_syllables(word, 'all_vowels')
 
     def flesch_reading_ease_adapted(self, text: str) -> Dict[str, any]:
         """
@@ -269,20 +261,14 @@ class ReadabilityMetrics:
         60-70: стандартный текст
         0-30: очень сложно
         """
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-
-        words = re.findall(r'\b[а-яёa-z]+\b', text.lower())
+        stats = text_stats(text, self.root_dir)
 
-        if not sentences or not words:
+        if not stats['sentences'] or not stats['words']:
             return {'score': 0, 'level': 'unknown'}
 
-        # Подсчитать слоги
-        total_syllables = sum(self.count_syllables_russian(word) for word in words)
-
         # Вычислить метрики
-        words_per_sentence = len(words) / len(sentences)
-        syllables_per_word = total_syllables / len(words)
+        words_per_sentence = stats['words'] / stats['sentences']
+        syllables_per_word = stats['syllables']['all_vowels'] / stats['words']
 
         # Формула Флеша (адаптированная)
         score = 206.835 - (1.015 * words_per_sentence) - (84.6 * syllables_per_word)
@@ -295,9 +281,9 @@ class ReadabilityMetrics:
             'level': self._flesch_level(score),
             'words_per_sentence': round(words_per_sentence, 1),
             'syllables_per_word': round(syllables_per_word, 2),
-            'total_sentences': len(sentences),
-            'total_words': len(words),
-            'total_syllables': total_syllables
+            'total_sentences': stats['sentences'],
+            'total_words': stats['words'],
+            'total_syllables': stats['syllables']['all_vowels']
         }
 
     def _flesch_level(self, score: float) -> str:
@@ -326,17 +312,13 @@ class ReadabilityMetrics:
 
         Результат показывает примерный класс образования для понимания текста
         """
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-
-        words = re.findall(r'\b[а-яёa-z]+\b', text.lower())
-        chars = sum(len(word) for word in words)
+        stats = text_stats(text, self.root_dir)
 
-        if not sentences or not words:
+        if not stats['sentences'] or not stats['words']:
             return {'ari_score': 0, 'grade_level': 0}
 
-        chars_per_word = chars / len(words)
-        words_per_sentence = len(words) / len(sentences)
+        chars_per_word = stats['avg_word_length']
+        words_per_sentence = stats['words'] / stats['sentences']
 
         ari = (4.71 * chars_per_word) + (0.5 * words_per_sentence) - 21.43
 
@@ -375,8 +357,8 @@ class ReadingTimeCalculator:
 
         # Инициализация анализаторов
         self.speed_analyzer = ReadingSpeedAnalyzer(wpm)
-        self.complexity_scorer = ComplexityScorer()
-        self.readability_metrics = ReadabilityMetrics()
+        self.complexity_scorer = ComplexityScorer(root_dir)
+        self.readability_metrics = ReadabilityMetrics(root_dir)
 
     def extract_frontmatter_and_content(self, file_path):
         """Извлечь frontmatter и содержимое"""
@@ -395,34 +377,12 @@ class ReadingTimeCalculator:
         return None, None
 
     def count_words(self, text):
-        """Подсчитать слова в тексте"""
-        # Удалить markdown разметку
-        # Удалить заголовки
-        text = re.sub(r'^#{1,6}\s+.*$', '', text, flags=re.MULTILINE)
-        # Удалить код
-        text = re.sub(r'```.*?```', '', text, flags=re.DOTALL)
-        text = re.sub(r'`[^`]+`', '', text)
-        # Удалить ссылки
-        text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
-        # Удалить изображения
-        text = re.sub(r'!\[([^\]]*)\]\([^\)]+\)', '', text)
-
-        # Подсчитать слова (кириллица + латиница)
-        words = re.findall(r'\b[а-яёa-z]+\b', text.lower())
-
-        return len(words)
+        """Подсчитать слова в тексте (без заголовков, кода, ссылок и изображений)"""
+        return text_stats(text, self.root_dir)['reading_words']
 
     def count_code_blocks(self, text):
-        """Подсчитать блоки кода"""
-        code_blocks = re.findall(r'```.*?```', text, re.DOTALL)
-        total_lines = 0
-
-        for block in code_blocks:
-            lines = block.split('\n')
-            # Минус первая и последняя строка (```)
-            total_lines += max(0, len(lines) - 2)
-
-        return total_lines
+        """Подсчитать строки в блоках кода"""
+        return text_stats(text, self.root_dir)['fenced_lines']
 
     def calculate_reading_time(self, file_path):
         """
@@ -3,7 +3,7 @@
 Advanced Link Health Monitor - Продвинутый мониторинг здоровья ссылок
 
 Комплексная система проверки ссылок с поддержкой:
-- Внутренние ссылки (файлы, якоря)
+- Внутренние ссылки (файлы, якоря) - по общему индексу путей и якорей
 - Внешние HTTP/HTTPS ссылки с полной валидацией
 - SSL сертификаты и безопасность
 - Цепочки редиректов
@@ -11,6 +11,9 @@ Advanced Link Health Monitor - Продвинутый мониторинг зд
 - Исторический трекинг статуса
 - Автоматические предложения замены
 - Health scoring (0-100)
+- Асинхронная проверка внешних ссылок (httpx): общий лимит запросов,
+  лимит соединений и пауза на хост, каждый URL - один раз на всю базу,
+  условные запросы (ETag/Last-Modified) и пропуск свежих здоровых ссылок
 
 Inspired by: LinkChecker, W3C Link Checker, Broken Link Checker
 
@@ -20,6 +23,7 @@ Version: 2.0
 
 from pathlib import Path
 import re
+import asyncio
 import yaml
 import json
 import hashlib
@@ -29,6 +33,9 @@ from collections import defaultdict
 from urllib.parse import urlparse, urljoin
 import argparse
 
+from shared.fuzzy_match import levenshtein
+from shared.link_index import LinkIndex, heading_anchors
+
 # Optional dependencies для HTTP checking
 try:
     import requests
@@ -38,6 +45,12 @@ try:
 except ImportError:
     REQUESTS_AVAILABLE = False
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
 try:
     import ssl
     import socket
@@ -47,6 +60,12 @@ except ImportError:
     SSL_AVAILABLE = False
 
 
+USER_AGENT = 'Mozilla/5.0 (compatible; LinkHealthMonitor/2.0; +https://github.com)'
+
+# Статусы внешних ссылок, которые попадают в список битых
+BROKEN_EXTERNAL_STATUSES = {'not_found', 'timeout', 'ssl_error', 'connection_error'}
+
+
 class LinkHealthMonitor:
     """
     Продвинутый монитор здоровья ссылок
@@ -63,7 +82,8 @@ class LinkHealthMonitor:
     - Link freshness tracking
     """
 
-    def __init__(self, root_dir=".", cache_file=".link_health_cache.json"):
+    def __init__(self, root_dir=".", cache_file=".link_health_cache.json",
+                 concurrency=20, max_per_host=2, host_delay=0.2, recheck=False):
         self.root_dir = Path(root_dir)
         self.knowledge_dir = self.root_dir / "knowledge"
         self.cache_file = self.root_dir / cache_file
@@ -78,9 +98,20 @@ class LinkHealthMonitor:
         # Performance tracking
         self.performance_stats = defaultdict(list)
 
+        # Индекс путей и якорей для внутренних ссылок (открывается при первой проверке)
+        self.link_index = None
+
         # External link cache (чтобы не проверять один URL много раз)
         self.external_cache = {}
 
+        # Асинхронная проверка: лимиты и отложенные внешние ссылки
+        # [(индекс в self.links, url, текст, файл)]
+        self.concurrency = concurrency
+        self.max_per_host = max_per_host
+        self.host_delay = host_delay
+        self.recheck = recheck
+        self.pending_external = []
+
         # HTTP session с retry logic
         if REQUESTS_AVAILABLE:
             self.session = self.create_http_session()
@@ -104,7 +135,7 @@ class LinkHealthMonitor:
 
         # User-Agent чтобы не блокировали
         session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (compatible; LinkHealthMonitor/2.0; +https://github.com)'
+            'User-Agent': USER_AGENT
         })
 
         return session
@@ -142,78 +173,55 @@ class LinkHealthMonitor:
 
     def extract_headings(self, content):
         """Извлечь заголовки для проверки якорей"""
-        headings = []
-        for line in content.split('\n'):
-            match = re.match(r'^#{1,6}\s+(.+)$', line)
-            if match:
-                text = match.group(1).strip()
-                # Создать якорь (GitHub-style)
-                anchor = text.lower()
-                anchor = re.sub(r'[^\w\s-]', '', anchor)
-                anchor = re.sub(r'\s+', '-', anchor)
-                anchor = re.sub(r'-+', '-', anchor)
-                anchor = anchor.strip('-')
-                headings.append(anchor)
-        return headings
+        return heading_anchors(content)
+
+    def get_link_index(self):
+        """Общий индекс ссылок и якорей (shared/link_index.py)"""
+        if self.link_index is None:
+            self.link_index = LinkIndex.open(self.root_dir)
+        return self.link_index
 
     def check_internal_link(self, file_path, link, link_text):
-        """Проверить внутреннюю ссылку (файл/якорь)"""
+        """Проверить внутреннюю ссылку (файл/якорь) - по индексу, без чтения файлов"""
+        source = str(file_path.relative_to(self.root_dir))
         result = {
             'url': link,
             'type': 'internal',
             'link_text': link_text,
-            'source': str(file_path.relative_to(self.root_dir)),
+            'source': source,
             'status': 'ok',
             'health_score': 100.0,
             'issues': []
         }
 
-        # Разделить на файл и якорь
-        if '#' in link:
-            file_part, anchor_part = link.split('#', 1)
-        else:
-            file_part = link
-            anchor_part = None
+        index = self.get_link_index()
+        check = index.check_link(source, link)
 
         # Проверить файл
-        if file_part:
-            target = (file_path.parent / file_part).resolve()
-
-            if not target.exists():
-                result['status'] = 'broken_file'
-                result['health_score'] = 0.0
-                result['issues'].append(f"File not found: {file_part}")
-                result['target'] = str(target.relative_to(self.root_dir)) if target.is_relative_to(self.root_dir) else str(target)
-                self.broken_links.append(result)
-                return result
+        if check['status'] in ('missing', 'outside'):
+            result['status'] = 'broken_file'
+            result['health_score'] = 0.0
+            result['issues'].append(f"File not found: {check['path']}")
+            result['target'] = check['target'] or check['path']
+            self.broken_links.append(result)
+            return result
 
         # Проверить якорь
-        if anchor_part:
-            if file_part:
+        if check['status'] == 'broken_anchor':
+            result['status'] = 'broken_anchor'
+            result['anchor'] = check['anchor']
+
+            if check['path']:
                 # Якорь в другом файле
-                target = (file_path.parent / file_part).resolve()
-                if target.exists():
-                    target_content = self.extract_content(target)
-                    if target_content:
-                        target_anchors = set(self.extract_headings(target_content))
-                        if anchor_part not in target_anchors:
-                            result['status'] = 'broken_anchor'
-                            result['health_score'] = 30.0  # Файл есть, якоря нет
-                            result['issues'].append(f"Anchor not found: #{anchor_part}")
-                            result['anchor'] = anchor_part
-                            result['available_anchors'] = list(target_anchors)[:5]  # Первые 5 для подсказки
-                            self.broken_links.append(result)
+                result['health_score'] = 30.0  # Файл есть, якоря нет
+                result['issues'].append(f"Anchor not found: #{check['anchor']}")
+                result['available_anchors'] = index.sources[check['target']]['anchors'][:5]  # Первые 5 для подсказки
             else:
                 # Якорь в текущем файле
-                content = self.extract_content(file_path)
-                if content:
-                    local_anchors = set(self.extract_headings(content))
-                    if anchor_part not in local_anchors:
-                        result['status'] = 'broken_anchor'
-                        result['health_score'] = 50.0
-                        result['issues'].append(f"Local anchor not found: #{anchor_part}")
-                        result['anchor'] = anchor_part
-                        self.broken_links.append(result)
+                result['health_score'] = 50.0
+                result['issues'].append(f"Local anchor not found: #{check['anchor']}")
+
+            self.broken_links.append(result)
 
         return result
 
@@ -281,26 +289,109 @@ class LinkHealthMonitor:
 
         return chain
 
-    def check_external_link(self, url, link_text, source_file):
-        """Проверить внешнюю HTTP/HTTPS ссылку"""
-        # Проверить кэш
-        url_hash = self.get_link_hash(url)
-        if url in self.external_cache:
-            cached = self.external_cache[url].copy()
-            cached['cached'] = True
-            return cached
-
-        result = {
+    def new_external_result(self, url, link_text, source):
+        """Заготовка результата проверки внешней ссылки"""
+        return {
             'url': url,
             'type': 'external',
             'link_text': link_text,
-            'source': str(source_file.relative_to(self.root_dir)),
+            'source': source,
             'status': 'unknown',
             'health_score': 0.0,
             'issues': [],
             'timestamp': datetime.now().isoformat()
         }
 
+    def score_response(self, result, status_code, final_url, redirect_count, elapsed_ms, ssl_info=None):
+        """Оценить ответ: статус, редиректы, SSL, скорость → health score"""
+        result['status_code'] = status_code
+        result['response_time_ms'] = round(elapsed_ms, 2)
+
+        # Health score на основе статуса
+        if status_code == 200:
+            result['status'] = 'ok'
+            result['health_score'] = 100.0
+        elif status_code in [301, 302, 303, 307, 308]:
+            result['status'] = 'redirect'
+            result['health_score'] = 80.0
+            result['issues'].append(f"Redirect: {status_code}")
+            result['final_url'] = final_url
+        elif status_code == 404:
+            result['status'] = 'not_found'
+            result['health_score'] = 0.0
+            result['issues'].append("404 Not Found")
+        elif status_code == 403:
+            result['status'] = 'forbidden'
+            result['health_score'] = 50.0
+            result['issues'].append("403 Forbidden")
+        elif status_code >= 500:
+            result['status'] = 'server_error'
+            result['health_score'] = 20.0
+            result['issues'].append(f"Server error: {status_code}")
+        else:
+            result['status'] = 'other'
+            result['health_score'] = 60.0
+
+        # Проверить редиректы
+        if redirect_count > 0:
+            result['redirect_count'] = redirect_count
+            if redirect_count > 3:
+                result['issues'].append(f"Too many redirects: {redirect_count}")
+                result['health_score'] -= 10
+
+        # SSL сертификат для HTTPS
+        if ssl_info is not None:
+            result['ssl'] = ssl_info
+
+            if ssl_info.get('valid') is False:
+                result['issues'].append(f"SSL error: {ssl_info.get('error')}")
+                result['health_score'] -= 20
+            elif ssl_info.get('days_remaining') is not None:
+                days = ssl_info['days_remaining']
+                if days < 30:
+                    result['issues'].append(f"SSL expires soon: {days} days")
+                    result['health_score'] -= 10
+
+        # Performance warning
+        if elapsed_ms > 5000:
+            result['issues'].append(f"Slow response: {elapsed_ms:.0f}ms")
+            result['health_score'] -= 5
+
+    def record_check(self, result, elapsed_ms, etag=None, last_modified=None):
+        """Запомнить проверку в истории (и валидаторы для условных запросов)"""
+        url = result['url']
+        url_hash = self.get_link_hash(url)
+
+        if url_hash not in self.history:
+            self.history[url_hash] = {'url': url, 'checks': []}
+
+        entry = self.history[url_hash]
+        entry['checks'].append({
+            'timestamp': result['timestamp'],
+            'status_code': result.get('status_code'),
+            'response_time_ms': elapsed_ms,
+            'health_score': result['health_score']
+        })
+
+        # Ограничить историю до 10 последних проверок
+        entry['checks'] = entry['checks'][-10:]
+
+        # Последний результат и ETag/Last-Modified - для следующего запуска
+        entry['result'] = {key: value for key, value in result.items()
+                           if key not in ('link_text', 'source', 'cached')}
+        entry['etag'] = etag
+        entry['last_modified'] = last_modified
+
+    def check_external_link(self, url, link_text, source_file):
+        """Проверить внешнюю HTTP/HTTPS ссылку"""
+        # Проверить кэш
+        if url in self.external_cache:
+            cached = self.external_cache[url].copy()
+            cached['cached'] = True
+            return cached
+
+        result = self.new_external_result(url, link_text, str(source_file.relative_to(self.root_dir)))
+
         if not REQUESTS_AVAILABLE:
             result['issues'].append("requests library not available")
             return result
@@ -318,105 +409,50 @@ class LinkHealthMonitor:
 
             elapsed_ms = (time.time() - start_time) * 1000
 
-            # Статус код
-            status_code = response.status_code
-            result['status_code'] = status_code
-            result['response_time_ms'] = round(elapsed_ms, 2)
-
-            # Health score на основе статуса
-            if status_code == 200:
-                result['status'] = 'ok'
-                result['health_score'] = 100.0
-            elif status_code in [301, 302, 303, 307, 308]:
-                result['status'] = 'redirect'
-                result['health_score'] = 80.0
-                result['issues'].append(f"Redirect: {status_code}")
-                result['final_url'] = response.url
-            elif status_code == 404:
-                result['status'] = 'not_found'
-                result['health_score'] = 0.0
-                result['issues'].append("404 Not Found")
-                self.broken_links.append(result)
-            elif status_code == 403:
-                result['status'] = 'forbidden'
-                result['health_score'] = 50.0
-                result['issues'].append("403 Forbidden")
-            elif status_code >= 500:
-                result['status'] = 'server_error'
-                result['health_score'] = 20.0
-                result['issues'].append(f"Server error: {status_code}")
-            else:
-                result['status'] = 'other'
-                result['health_score'] = 60.0
-
-            # Проверить редиректы
-            if len(response.history) > 0:
-                result['redirect_count'] = len(response.history)
-                if len(response.history) > 3:
-                    result['issues'].append(f"Too many redirects: {len(response.history)}")
-                    result['health_score'] -= 10
-
             # SSL сертификат для HTTPS
+            ssl_info = None
             if url.startswith('https://'):
-                parsed = urlparse(url)
-                ssl_info = self.check_ssl_certificate(parsed.hostname)
-                result['ssl'] = ssl_info
-
-                if ssl_info.get('valid') is False:
-                    result['issues'].append(f"SSL error: {ssl_info.get('error')}")
-                    result['health_score'] -= 20
-                elif ssl_info.get('days_remaining') is not None:
-                    days = ssl_info['days_remaining']
-                    if days < 30:
-                        result['issues'].append(f"SSL expires soon: {days} days")
-                        result['health_score'] -= 10
-
-            # Performance warning
-            if elapsed_ms > 5000:
-                result['issues'].append(f"Slow response: {elapsed_ms:.0f}ms")
-                result['health_score'] -= 5
-
-            # Запомнить в истории
-            if url_hash not in self.history:
-                self.history[url_hash] = {'url': url, 'checks': []}
+                ssl_info = self.check_ssl_certificate(urlparse(url).hostname)
 
-            self.history[url_hash]['checks'].append({
-                'timestamp': result['timestamp'],
-                'status_code': status_code,
-                'response_time_ms': elapsed_ms,
-                'health_score': result['health_score']
-            })
+            self.score_response(result, response.status_code, response.url,
+                                len(response.history), elapsed_ms, ssl_info)
 
-            # Ограничить историю до 10 последних проверок
-            self.history[url_hash]['checks'] = self.history[url_hash]['checks'][-10:]
+            # Запомнить в истории
+            self.record_check(result, elapsed_ms, response.headers.get('ETag'),
+                              response.headers.get('Last-Modified'))
 
         except requests.exceptions.Timeout:
             result['status'] = 'timeout'
             result['health_score'] = 10.0
             result['issues'].append("Request timeout (>10s)")
-            self.broken_links.append(result)
         except requests.exceptions.SSLError as e:
             result['status'] = 'ssl_error'
             result['health_score'] = 0.0
             result['issues'].append(f"SSL error: {str(e)[:100]}")
-            self.broken_links.append(result)
         except requests.exceptions.ConnectionError as e:
             result['status'] = 'connection_error'
             result['health_score'] = 0.0
             result['issues'].append(f"Connection error: {str(e)[:100]}")
-            self.broken_links.append(result)
         except Exception as e:
             result['status'] = 'error'
             result['health_score'] = 0.0
             result['issues'].append(f"Error: {str(e)[:100]}")
 
+        if result['status'] in BROKEN_EXTERNAL_STATUSES:
+            self.broken_links.append(result)
+
         # Кэшировать результат
         self.external_cache[url] = result
 
         return result
 
-    def check_file(self, file_path, check_external=True):
-        """Проверить все ссылки в файле"""
+    def check_file(self, file_path, check_external=True, defer_external=False):
+        """
+        Проверить все ссылки в файле
+
+        defer_external - внешние ссылки только собираются (self.pending_external)
+        и проверяются потом все вместе асинхронно
+        """
         content = self.extract_content(file_path)
         if not content:
             return
@@ -427,7 +463,10 @@ class LinkHealthMonitor:
         for text, link in links:
             # Внешние ссылки
             if link.startswith('http://') or link.startswith('https://'):
-                if check_external:
+                if check_external and defer_external:
+                    self.pending_external.append((len(self.links), link, text, file_path))
+                    self.links.append(None)
+                elif check_external:
                     result = self.check_external_link(link, text, file_path)
                     self.links.append(result)
             # Внутренние ссылки
@@ -435,6 +474,38 @@ class LinkHealthMonitor:
                 result = self.check_internal_link(file_path, link, text)
                 self.links.append(result)
 
+    def check_pending_external(self):
+        """Проверить собранные внешние ссылки: каждый URL один раз, асинхронно"""
+        if not self.pending_external:
+            return
+
+        urls = list(dict.fromkeys(url for _, url, _, _ in self.pending_external))
+        print(f"   Внешних ссылок: {len(self.pending_external)}, уникальных URL: {len(urls)}")
+
+        checker = AsyncLinkChecker(self, concurrency=self.concurrency, max_per_host=self.max_per_host,
+                                   host_delay=self.host_delay, recheck=self.recheck)
+        results = checker.run(urls)
+
+        print(f"   Запросов: {checker.stats['requests']}, не изменились (304): {checker.stats['not_modified']}, "
+              f"пропущено свежих: {checker.stats['fresh']}")
+
+        seen = set()
+        for index, url, text, file_path in self.pending_external:
+            result = dict(results[url])
+            result['link_text'] = text
+            result['source'] = str(file_path.relative_to(self.root_dir))
+
+            if url in seen:
+                result['cached'] = True
+            else:
+                seen.add(url)
+                if result['status'] in BROKEN_EXTERNAL_STATUSES:
+                    self.broken_links.append(result)
+
+            self.links[index] = result
+
+        self.pending_external = []
+
     def check_all(self, check_external=True):
         """Проверить все файлы"""
         print("🔗 Link Health Monitor - Проверка ссылок...\n")
@@ -442,6 +513,9 @@ class LinkHealthMonitor:
         md_files = list(self.knowledge_dir.rglob("*.md"))
         print(f"   Файлов для проверки: {len(md_files)}")
 
+        # С httpx внешние ссылки проверяются асинхронно после обхода файлов
+        defer_external = check_external and HTTPX_AVAILABLE
+
         for i, md_file in enumerate(md_files, 1):
             if md_file.name == "INDEX.md":
                 continue
@@ -449,7 +523,10 @@ class LinkHealthMonitor:
             if i % 10 == 0:
                 print(f"   Обработано: {i}/{len(md_files)}")
 
-            self.check_file(md_file, check_external=check_external)
+            self.check_file(md_file, check_external=check_external, defer_external=defer_external)
+
+        if defer_external:
+            self.check_pending_external()
 
         print(f"\n   Всего ссылок: {len(self.links)}")
         print(f"   Битых/проблемных: {len(self.broken_links)}\n")
@@ -489,7 +566,7 @@ class LinkHealthMonitor:
             for md_file in self.knowledge_dir.rglob("*.md"):
                 file_name = md_file.stem.lower()
                 # Простая Levenshtein distance
-                if self.levenshtein_distance(target_name, file_name) <= 3:
+                if self.levenshtein_distance(target_name, file_name, 3) <= 3:
                     suggestions.append(str(md_file.relative_to(self.root_dir)))
 
         # Для битых якорей - показать доступные якоря
@@ -500,24 +577,9 @@ class LinkHealthMonitor:
 
         return suggestions[:5]  # Максимум 5 предложений
 
-    def levenshtein_distance(self, s1, s2):
+    def levenshtein_distance(self, s1, s2, max_distance=None):
         """Расстояние Левенштейна для поиска похожих слов"""
-        if len(s1) < len(s2):
-            return self.levenshtein_distance(s2, s1)
-        if len(s2) == 0:
-            return len(s1)
-
-        previous_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-
-        return previous_row[-1]
+        return levenshtein(s1, s2, max_distance)
 
     def generate_statistics(self):
         """Статистика по ссылкам"""
@@ -644,6 +706,193 @@ class LinkHealthMonitor:
         return output_file
 
 
+class AsyncLinkChecker:
+    """
+    Асинхронная проверка внешних URL (httpx)
+
+    - не больше concurrency запросов одновременно на всю проверку;
+    - на хост - не больше max_per_host соединений и пауза host_delay
+      между началами запросов (вежливость к сайтам);
+    - один AsyncClient: соединения переиспользуются (keep-alive по хостам);
+    - ссылка, проверенная меньше fresh_hours назад со статусом ok,
+      не запрашивается (calculate_link_freshness);
+    - остальные запрашиваются условно (If-None-Match / If-Modified-Since
+      из истории): 304 - прежний результат без повторной оценки;
+    - 429/5xx и сетевые ошибки повторяются с экспоненциальной паузой
+      (Retry-After, если сервер его прислал, но не дольше MAX_RETRY_AFTER).
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    # Retry-After задаёт сервер - огромное значение не должно останавливать проверку
+    MAX_RETRY_AFTER = 60
+
+    def __init__(self, monitor: 'LinkHealthMonitor', concurrency=20, max_per_host=2, host_delay=0.2,
+                 timeout=10, retries=3, backoff_factor=0.3, fresh_hours=24, recheck=False):
+        self.monitor = monitor
+        self.concurrency = concurrency
+        self.max_per_host = max_per_host
+        self.host_delay = host_delay
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.fresh_hours = fresh_hours
+        self.recheck = recheck
+
+        self.stats = defaultdict(int)
+
+        # Создаются внутри цикла событий (_run)
+        self._limit = None
+        self._host_limits = {}
+        self._host_next = {}
+        self._ssl = {}
+
+    def run(self, urls):
+        """Проверить URL: {url: result}"""
+        return asyncio.run(self._run(list(dict.fromkeys(urls))))
+
+    async def _run(self, urls):
+        self._limit = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(max_connections=self.concurrency,
+                              max_keepalive_connections=self.concurrency)
+
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits,
+                                     headers={'User-Agent': USER_AGENT}) as client:
+            results = await asyncio.gather(*(self.check(client, url) for url in urls))
+
+        return dict(zip(urls, results))
+
+    # ========================
+    # Requests
+    # ========================
+
+    async def _wait_for_host(self, host):
+        """Пауза между запросами к одному хосту (очередь по времени старта)"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._host_next.get(host, now))
+        self._host_next[host] = start + self.host_delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _send(self, client, method, url, headers):
+        host = urlparse(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.max_per_host)
+
+        # Сначала лимит и пауза хоста, потом общий слот: запросы, ждущие
+        # медленный хост, не занимают слоты остальных хостов
+        async with self._host_limits[host]:
+            await self._wait_for_host(host)
+
+            async with self._limit:
+                self.stats['requests'] += 1
+
+                if method == 'HEAD':
+                    return await client.head(url, headers=headers, follow_redirects=True)
+
+                # GET без скачивания тела
+                async with client.stream('GET', url, headers=headers, follow_redirects=True) as response:
+                    return response
+
+    async def request(self, client, method, url, headers):
+        """Запрос с повторами для 429/5xx и сетевых ошибок"""
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self._send(client, method, url, headers)
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+                continue
+
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.retries:
+                return response
+
+            retry_after = response.headers.get('Retry-After', '')
+            delay = float(retry_after) if retry_after.isdigit() else self.backoff_factor * 2 ** attempt
+            await asyncio.sleep(min(delay, self.MAX_RETRY_AFTER))
+
+    async def ssl_info(self, hostname):
+        """Сертификат хоста - один раз на хост (в отдельном потоке)"""
+        if hostname not in self._ssl:
+            self._ssl[hostname] = asyncio.ensure_future(
+                asyncio.to_thread(self.monitor.check_ssl_certificate, hostname))
+        return await self._ssl[hostname]
+
+    # ========================
+    # Checking
+    # ========================
+
+    async def check(self, client, url):
+        """Проверить один URL (результат без source/link_text)"""
+        monitor = self.monitor
+        entry = monitor.history.get(monitor.get_link_hash(url), {})
+        stored = entry.get('result')
+
+        # Свежая здоровая ссылка - без запроса
+        if stored and not self.recheck and stored.get('status') == 'ok':
+            freshness = monitor.calculate_link_freshness(monitor.get_link_hash(url))
+            if freshness and freshness['age_hours'] < self.fresh_hours:
+                self.stats['fresh'] += 1
+                return dict(stored, cached=True, freshness=freshness)
+
+        # Условный запрос по сохранённым валидаторам
+        headers = {}
+        if stored and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if stored and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        result = monitor.new_external_result(url, None, None)
+        start_time = time.monotonic()
+
+        try:
+            response = await self.request(client, 'HEAD', url, headers)
+
+            # Некоторые сайты не поддерживают HEAD - пробуем GET
+            if response.status_code == 405:
+                response = await self.request(client, 'GET', url, headers)
+
+            elapsed_ms = (time.monotonic() - start_time) * 1000
+
+            if response.status_code == 304 and stored:
+                # Не изменилась - прежняя оценка, новые время и отметка проверки
+                self.stats['not_modified'] += 1
+                result = dict(stored, timestamp=result['timestamp'],
+                              response_time_ms=round(elapsed_ms, 2), not_modified=True)
+                monitor.record_check(result, elapsed_ms, entry.get('etag'), entry.get('last_modified'))
+                return result
+
+            ssl_info = None
+            if url.startswith('https://'):
+                ssl_info = await self.ssl_info(urlparse(url).hostname)
+
+            monitor.score_response(result, response.status_code, str(response.url),
+                                   len(response.history), elapsed_ms, ssl_info)
+            monitor.record_check(result, elapsed_ms, response.headers.get('ETag'),
+                                 response.headers.get('Last-Modified'))
+
+        except httpx.TimeoutException:
+            result['status'] = 'timeout'
+            result['health_score'] = 10.0
+            result['issues'].append(f"Request timeout (>{self.timeout}s)")
+        except httpx.ConnectError as e:
+            if 'ssl' in str(e).lower() or 'certificate' in str(e).lower():
+                result['status'] = 'ssl_error'
+                result['issues'].append(f"SSL error: {str(e)[:100]}")
+            else:
+                result['status'] = 'connection_error'
+                result['issues'].append(f"Connection error: {str(e)[:100]}")
+            result['health_score'] = 0.0
+        except Exception as e:
+            result['status'] = 'error'
+            result['health_score'] = 0.0
+            result['issues'].append(f"Error: {str(e)[:100]}")
+
+        return result
+
+
 def main():
     parser = argparse.ArgumentParser(description='Advanced Link Health Monitor')
     parser.add_argument('--no-external', action='store_true',
@@ -652,13 +901,23 @@ def main():
                        help='Report format (default: markdown)')
     parser.add_argument('--cache', default='.link_health_cache.json',
                        help='Cache file for historical data')
+    parser.add_argument('--concurrency', type=int, default=20,
+                       help='Max simultaneous external requests (default: 20)')
+    parser.add_argument('--per-host', type=int, default=2,
+                       help='Max simultaneous requests per host (default: 2)')
+    parser.add_argument('--host-delay', type=float, default=0.2,
+                       help='Min delay between requests to one host, seconds (default: 0.2)')
+    parser.add_argument('--recheck', action='store_true',
+                       help='Recheck fresh healthy links too (ignore freshness)')
 
     args = parser.parse_args()
 
     script_dir = Path(__file__).parent
     root_dir = script_dir.parent
 
-    monitor = LinkHealthMonitor(root_dir, cache_file=args.cache)
+    monitor = LinkHealthMonitor(root_dir, cache_file=args.cache, concurrency=args.concurrency,
+                                max_per_host=args.per_host, host_delay=args.host_delay,
+                                recheck=args.recheck)
     monitor.check_all(check_external=not args.no_external)
     monitor.generate_report(format=args.format)
 
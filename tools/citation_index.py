@@ -16,13 +16,15 @@ Citation Index - Индекс цитирований
 from pathlib import Path
 import yaml
 import re
-from collections import defaultdict, Counter
+from collections import defaultdict
 import json
 import argparse
 from typing import List, Dict, Tuple, Set
 from datetime import datetime
 import math
 
+from shared.citation_matrix import CitationMatrix
+
 
 class CitationIndexer:
     """Индексатор цитирований"""
@@ -37,6 +39,10 @@ class CitationIndexer:
         # Все статьи
         self.articles = {}
 
+        # Матрица цитирований и индексы по ней (shared/citation_matrix.py)
+        self.matrix = None
+        self.indices = None
+
     def extract_frontmatter_and_content(self, file_path):
         """Извлечь frontmatter и содержимое"""
         try:
@@ -106,6 +112,9 @@ class CitationIndexer:
         """Построить индекс цитирований"""
         print("📚 Построение индекса цитирований...\n")
 
+        self.matrix = None
+        self.indices = None
+
         # Собрать все статьи
         for md_file in self.knowledge_dir.rglob("*.md"):
             if md_file.name == "INDEX.md":
@@ -162,41 +171,41 @@ class CitationIndexer:
         print(f"   Статей проиндексировано: {len(self.articles)}")
         print(f"   Связей найдено: {sum(len(c['cites']) for c in self.citations.values())}\n")
 
+    def citation_matrix(self) -> CitationMatrix:
+        """Разреженная матрица цитирований (строится один раз после build_index)"""
+        if self.matrix is None:
+            edges = [(article, cited['article'])
+                     for article, data in self.citations.items()
+                     for cited in data['cites']]
+            self.matrix = CitationMatrix(edges, nodes=self.articles)
+        return self.matrix
+
+    def citation_indices(self) -> Dict[str, Tuple[int, int]]:
+        """
+        h-index и i10-index всех статей за один проход по матрице:
+        {article: (h_index, i10_index)}
+        """
+        if self.indices is None:
+            matrix = self.citation_matrix()
+            counts = [self.citations[node]['citation_count'] if node in self.citations else 0
+                      for node in matrix.nodes]
+            self.indices = dict(zip(matrix.nodes, zip(matrix.h_indices(counts),
+                                                     matrix.count_at_least(10, counts))))
+        return self.indices
+
     def calculate_h_index(self, article_path):
         """
         Вычислить h-index для статьи
         h-index = максимальное h, при котором статья имеет h цитирований
         от статей, у которых тоже есть хотя бы h цитирований
         """
-        citation_counts = []
-
-        for citing in self.citations[article_path]['cited_by']:
-            citing_article = citing['article']
-            citing_count = self.citations[citing_article]['citation_count']
-            citation_counts.append(citing_count)
-
-        citation_counts.sort(reverse=True)
-
-        h = 0
-        for i, count in enumerate(citation_counts, 1):
-            if count >= i:
-                h = i
-            else:
-                break
-
-        return h
+        return self.citation_indices().get(article_path, (0, 0))[0]
 
     def calculate_i10_index(self, article_path):
         """
         i10-index: количество статей с 10+ цитированиями
         """
-        count = 0
-        for citing in self.citations[article_path]['cited_by']:
-            citing_article = citing['article']
-            citing_count = self.citations[citing_article]['citation_count']
-            if citing_count >= 10:
-                count += 1
-        return count
+        return self.citation_indices().get(article_path, (0, 0))[1]
 
     def calculate_impact_factor(self) -> float:
         """Impact Factor: среднее количество цитирований на статью"""
@@ -208,62 +217,28 @@ class CitationIndexer:
         Co-citation analysis: найти статьи, которые цитируются вместе
 
         Если A и B цитируются вместе в статье C, это co-citation
+        (CᵀC считается один раз для всех статей)
         """
-        cocitations = Counter()
-
-        # Для каждой статьи, которая цитирует нашу
-        for citing in self.citations[article_path]['cited_by']:
-            citing_article = citing['article']
-
-            # Найти другие статьи, которые она тоже цитирует
-            for cited in self.citations[citing_article]['cites']:
-                cited_article = cited['article']
-                if cited_article != article_path:
-                    cocitations[cited_article] += 1
-
-        # Вернуть только с достаточным количеством co-citations
-        return [(article, count) for article, count in cocitations.most_common()
-                if count >= min_cocitations]
+        return self.citation_matrix().cocitations(article_path, min_cocitations)
 
     def find_bibliographic_coupling(self, article_path: str, min_coupling: int = 2) -> List[Tuple[str, int]]:
         """
         Bibliographic Coupling: статьи, цитирующие те же источники
 
         Если A и B цитируют одни и те же статьи, это coupling
+        (CCᵀ считается один раз для всех статей)
         """
-        coupling = Counter()
-
-        # Статьи, которые цитирует наша статья
-        our_cites = set(c['article'] for c in self.citations[article_path]['cites'])
-
-        # Для каждой другой статьи
-        for other_article in self.articles:
-            if other_article == article_path:
-                continue
-
-            # Найти общие цитирования
-            other_cites = set(c['article'] for c in self.citations[other_article]['cites'])
-            common = our_cites & other_cites
-
-            if len(common) >= min_coupling:
-                coupling[other_article] = len(common)
-
-        return coupling.most_common()
+        return self.citation_matrix().coupling(article_path, min_coupling)
 
     def calculate_citation_network_metrics(self) -> Dict:
         """Вычислить метрики сети цитирований"""
-        # Граф как adjacency dict
-        graph = defaultdict(set)
-        for article, data in self.citations.items():
-            for cited in data['cites']:
-                graph[article].add(cited['article'])
+        matrix = self.citation_matrix()
 
         # Nodes and edges
-        nodes = set(self.articles.keys())
-        edges = sum(len(neighbors) for neighbors in graph.values())
+        n = len(self.articles)
+        edges = matrix.edges
 
         # Density: actual edges / possible edges
-        n = len(nodes)
         max_edges = n * (n - 1)  # Directed graph
         density = edges / max_edges if max_edges > 0 else 0
 
@@ -271,8 +246,9 @@ class CitationIndexer:
         avg_out_degree = edges / n if n > 0 else 0
 
         # Find isolated nodes
-        isolated = [node for node in nodes
-                   if not graph[node] and not self.citations[node]['cited_by']]
+        degrees = zip(matrix.nodes, matrix.in_degree(), matrix.out_degree())
+        isolated = [node for node, in_degree, out_degree in degrees
+                    if node in self.articles and not in_degree and not out_degree]
 
         return {
             'nodes': n,
@@ -18,6 +18,8 @@ import csv
 from datetime import datetime
 from typing import Dict, List, Tuple, Set
 
+from shared.fuzzy_match import levenshtein, similar_pairs
+
 
 class DuplicateDetector:
     """Детектор дубликатов"""
@@ -81,28 +83,7 @@ class DuplicateDetector:
 
     def levenshtein_distance(self, s1, s2):
         """Вычислить расстояние Левенштейна"""
-        if len(s1) < len(s2):
-            return self.levenshtein_distance(s2, s1)
-
-        if len(s2) == 0:
-            return len(s1)
-
-        previous_row = range(len(s2) + 1)
-
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-
-            for j, c2 in enumerate(s2):
-                # Стоимость вставки, удаления или замены
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-
-                current_row.append(min(insertions, deletions, substitutions))
-
-            previous_row = current_row
-
-        return previous_row[-1]
+        return levenshtein(s1, s2)
 
     def title_similarity(self, title1, title2):
         """Вычислить сходство заголовков"""
@@ -198,26 +179,31 @@ class DuplicateDetector:
 
         print(f"   Найдено пар похожих статей: {len(self.duplicates['near_duplicate'])}\n")
 
-    def find_similar_titles(self):
+    def find_similar_titles(self, threshold=0.7):
         """Найти статьи с похожими заголовками"""
         print("📝 Поиск похожих заголовков...\n")
 
         articles_list = list(self.articles.items())
-
-        for i, (path1, data1) in enumerate(articles_list):
-            for path2, data2 in articles_list[i + 1:]:
-                # Вычислить сходство заголовков
-                similarity = self.title_similarity(data1['title'], data2['title'])
-
-                if similarity >= 0.7:  # Более низкий порог для заголовков
-                    self.duplicates['similar_titles'].append({
-                        'type': 'similar_title',
-                        'articles': [
-                            {'path': path1, 'title': data1['title']},
-                            {'path': path2, 'title': data2['title']}
-                        ],
-                        'similarity': similarity
-                    })
+        titles = [self.normalize_text(data['title']) for _, data in articles_list]
+
+        # Пары-кандидаты - через фильтры длины и q-грамм, а не перебор всех пар
+        # (более низкий порог для заголовков)
+        for i, j, distance in similar_pairs(titles, min_similarity=threshold):
+            path1, data1 = articles_list[i]
+            path2, data2 = articles_list[j]
+
+            # Вычислить сходство заголовков
+            max_len = max(len(titles[i]), len(titles[j]))
+            similarity = 1.0 - (distance / max_len) if distance else 1.0
+
+            self.duplicates['similar_titles'].append({
+                'type': 'similar_title',
+                'articles': [
+                    {'path': path1, 'title': data1['title']},
+                    {'path': path2, 'title': data2['title']}
+                ],
+                'similarity': similarity
+            })
 
         print(f"   Найдено пар с похожими заголовками: {len(self.duplicates['similar_titles'])}\n")
 
@@ -24,6 +24,8 @@ import json
 from collections import defaultdict, Counter
 import math
 
+from shared.link_index import LinkIndex
+
 
 class OrphanImpactAnalyzer:
     """Анализ влияния сирот на граф знаний"""
@@ -893,6 +895,9 @@ class AdvancedOrphanFinder:
         self.incoming_links = defaultdict(set)  # target -> sources
         self.outgoing_links = defaultdict(set)  # source -> targets
 
+        # Общий индекс ссылок (shared/link_index.py)
+        self.link_index = None
+
     def extract_frontmatter_and_content(self, file_path):
         """Извлечь frontmatter и содержимое"""
         try:
@@ -945,6 +950,9 @@ class AdvancedOrphanFinder:
         """Построить граф ссылок"""
         print("🔍 Анализ статей и ссылок...\n")
 
+        if self.link_index is None:
+            self.link_index = LinkIndex.open(self.root_dir)
+
         for md_file in self.knowledge_dir.rglob("*.md"):
             if md_file.name == "INDEX.md":
                 continue
@@ -956,38 +964,10 @@ class AdvancedOrphanFinder:
             if not content:
                 continue
 
-            # Найти все markdown ссылки
-            links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', content)
-            for text, link in links:
-                # Пропустить внешние ссылки и якоря
-                if link.startswith('http') or link.startswith('#'):
-                    continue
-
-                # Разрешить относительный путь
-                try:
-                    target = (md_file.parent / link.split('#')[0]).resolve()
-                    target_path = str(target.relative_to(self.root_dir))
-
-                    # Записать связь
-                    self.outgoing_links[article_path].add(target_path)
-                    self.incoming_links[target_path].add(article_path)
-                except:
-                    pass
-
-            # Ссылки из frontmatter (related)
-            frontmatter = self.all_articles[article_path]['frontmatter']
-            if frontmatter and 'related' in frontmatter:
-                related = frontmatter['related']
-                if isinstance(related, list):
-                    for link in related:
-                        try:
-                            target = (md_file.parent / link).resolve()
-                            target_path = str(target.relative_to(self.root_dir))
-
-                            self.outgoing_links[article_path].add(target_path)
-                            self.incoming_links[target_path].add(article_path)
-                        except:
-                            pass
+            # Ссылки из текста и из frontmatter (related) - из общего индекса
+            for link in self.link_index.outgoing(article_path, kinds=('content', 'related')):
+                self.outgoing_links[article_path].add(link['target'])
+                self.incoming_links[link['target']].add(article_path)
 
         print(f"   Статей: {len(self.all_articles)}")
         print(f"   Связей: {sum(len(v) for v in self.outgoing_links.values())}\n")
@@ -28,6 +28,19 @@ import json
 import math
 from collections import defaultdict, Counter
 
+from shared.tokenizer import tokenize
+
+MARKDOWN_LINK = re.compile(r'!?\[([^\]]*)\]\([^)]+\)')
+MARKDOWN_FORMATTING = re.compile(r'[#*`_]')
+
+# Стоп-слова (упрощённый список)
+STOP_WORDS = frozenset({
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'her', 'was', 'one',
+    'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its', 'may', 'new', 'now',
+    'это', 'как', 'для', 'что', 'при', 'или', 'его', 'еще', 'так', 'уже', 'где', 'там',
+    'был', 'была', 'было', 'были', 'есть', 'чем', 'все', 'этот', 'эта', 'эти', 'более'
+})
+
 
 class AdvancedRelatedFinder:
     """Продвинутый поиск связанных статей"""
@@ -64,22 +77,11 @@ class AdvancedRelatedFinder:
     def tokenize(self, text):
         """Токенизация текста"""
         # Удалить markdown форматирование
-        text = re.sub(r'!?\[([^\]]*)\]\([^)]+\)', r'\1', text)  # Ссылки и изображения
-        text = re.sub(r'[#*`_]', '', text)  # Форматирование
-        text = re.sub(r'```.*?```', '', text, flags=re.DOTALL)  # Код-блоки
+        text = MARKDOWN_LINK.sub(r'\1', text)  # Ссылки и изображения
+        text = MARKDOWN_FORMATTING.sub('', text)  # Форматирование
 
         # Токенизировать (слова 3+ символов)
-        tokens = re.findall(r'\b[а-яёa-z]{3,}\b', text.lower())
-
-        # Стоп-слова (упрощённый список)
-        stop_words = {
-            'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'her', 'was', 'one',
-            'our', 'out', 'day', 'get', 'has', 'him', 'his', 'how', 'its', 'may', 'new', 'now',
-            'это', 'как', 'для', 'что', 'при', 'или', 'его', 'еще', 'так', 'уже', 'где', 'там',
-            'был', 'была', 'было', 'были', 'есть', 'чем', 'все', 'этот', 'эта', 'эти', 'более'
-        }
-
-        return [t for t in tokens if t not in stop_words]
+        return tokenize(text, min_length=3, stop_words=STOP_WORDS)
 
     def load_documents(self):
         """Загрузить все документы в память"""
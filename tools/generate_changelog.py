@@ -109,9 +109,21 @@ class CommitParser:
 class ChangelogGenerator:
     """Расширенный генератор CHANGELOG"""
 
+    CACHE_VERSION = 1
+
     def __init__(self, root_dir="."):
         self.root_dir = Path(root_dir)
 
+        # Теги читаются одним git for-each-ref: [{'name', 'sha', 'date', 'author'}]
+        self._tags = None
+        self._head_sha = None
+
+        # Коммиты диапазонов между тегами неизменны - кэш по "sha_from..sha_to"
+        self.cache_file = self.root_dir / ".changelog_cache.json"
+        self._cache = None
+        self._cache_dirty = False
+        self._used_ranges = set()
+
         # Категории изменений (Keep a Changelog)
         self.categories = {
             'added': [],      # Новая функциональность
@@ -137,54 +149,191 @@ class ChangelogGenerator:
             'revert': 'changed'
         }
 
-    def get_git_tags(self):
-        """Получить все git теги (версии)"""
+    def _git(self, *args):
         try:
             result = subprocess.run(
-                ['git', 'tag', '--sort=-version:refname'],
+                ['git', *args],
                 cwd=self.root_dir,
                 capture_output=True,
                 text=True
             )
             if result.returncode == 0:
-                return [tag.strip() for tag in result.stdout.split('\n') if tag.strip()]
+                return result.stdout
         except:
             pass
-        return []
+        return None
+
+    def _load_tags(self):
+        """Все теги с SHA коммита, датой и автором за один вызов git"""
+        if self._tags is not None:
+            return self._tags
+
+        self._tags = []
+
+        # Для аннотированных тегов поля коммита берутся через разыменование (*)
+        output = self._git(
+            'for-each-ref', '--sort=-version:refname',
+            '--format=%(refname:short)%1f%(objectname)%1f%(*objectname)'
+            '%1f%(authordate:short)%1f%(*authordate:short)'
+            '%1f%(authorname)%1f%(*authorname)',
+            'refs/tags'
+        )
+
+        for line in (output or '').split('\n'):
+            parts = line.split('\x1f')
+            if len(parts) != 7 or not parts[0]:
+                continue
+            name, sha, peeled_sha, date, peeled_date, author, peeled_author = parts
+            self._tags.append({
+                'name': name,
+                'sha': peeled_sha or sha,
+                'date': peeled_date or date,
+                'author': peeled_author or author
+            })
+
+        return self._tags
+
+    def _tag_info(self, tag):
+        for info in self._load_tags():
+            if info['name'] == tag:
+                return info
+        return None
+
+    def get_git_tags(self):
+        """Получить все git теги (версии)"""
+        return [info['name'] for info in self._load_tags()]
+
+    def get_tag_date(self, tag):
+        """Дата коммита, на который указывает тег"""
+        info = self._tag_info(tag)
+        return info['date'] if info else ''
+
+    def get_tag_author(self, tag):
+        """Автор коммита, на который указывает тег"""
+        info = self._tag_info(tag)
+        return info['author'] if info else ''
+
+    def _resolve(self, ref):
+        """Ревизия -> SHA коммита (теги - из уже прочитанного списка)"""
+        if ref is None:
+            return ''
+
+        info = self._tag_info(ref)
+        if info:
+            return info['sha']
+
+        if ref == 'HEAD':
+            if self._head_sha is None:
+                output = self._git('rev-parse', 'HEAD')
+                self._head_sha = output.strip() if output else ''
+            return self._head_sha
+
+        output = self._git('rev-parse', ref)
+        return output.strip() if output else ''
+
+    def _load_cache(self):
+        if self._cache is not None:
+            return self._cache
+
+        self._cache = {'ranges': {}, 'counts': {}}
+
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.CACHE_VERSION:
+                    self._cache['ranges'] = data.get('ranges', {})
+                    self._cache['counts'] = data.get('counts', {})
+            except (OSError, json.JSONDecodeError):
+                pass
+
+        return self._cache
+
+    def save_cache(self):
+        """Сохранить кэш диапазонов (только диапазоны до тегов и использованные сейчас)"""
+        if not self._cache_dirty:
+            return
+
+        tag_shas = {info['sha'] for info in self._load_tags()}
+        ranges = {
+            key: commits for key, commits in self._cache['ranges'].items()
+            if key in self._used_ranges or key.split('..')[-1] in tag_shas
+        }
+        counts = {sha: count for sha, count in self._cache['counts'].items() if sha in tag_shas}
+
+        data = {
+            'version': self.CACHE_VERSION,
+            'updated': datetime.now().isoformat(),
+            'ranges': ranges,
+            'counts': counts
+        }
+
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            self._cache_dirty = False
+        except OSError:
+            pass
 
     def get_commits_between(self, tag_from=None, tag_to='HEAD'):
         """Получить коммиты между версиями"""
-        try:
-            if tag_from:
-                range_spec = f"{tag_from}..{tag_to}"
-            else:
-                range_spec = tag_to
+        sha_from = self._resolve(tag_from)
+        sha_to = self._resolve(tag_to)
 
-            result = subprocess.run(
-                ['git', 'log', range_spec, '--pretty=format:%H|%an|%ae|%ad|%s|%b', '--date=short'],
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True
-            )
+        cache = self._load_cache()
+        key = f"{sha_from}..{sha_to}" if sha_to else None
 
-            if result.returncode == 0:
-                commits = []
-                for line in result.stdout.split('\n'):
-                    if line.strip() and '|' in line:
-                        parts = line.split('|', 5)
-                        if len(parts) >= 5:
-                            commits.append({
-                                'hash': parts[0],
-                                'author': parts[1],
-                                'email': parts[2],
-                                'date': parts[3],
-                                'message': parts[4],
-                                'body': parts[5] if len(parts) > 5 else ''
-                            })
-                return commits
-        except:
-            pass
-        return []
+        if key and key in cache['ranges']:
+            self._used_ranges.add(key)
+            # Копии - categorize_commit дописывает поля в коммиты
+            return [dict(commit) for commit in cache['ranges'][key]]
+
+        if tag_from:
+            range_spec = f"{tag_from}..{tag_to}"
+        else:
+            range_spec = tag_to
+
+        output = self._git('log', range_spec, '--pretty=format:%H|%an|%ae|%ad|%s|%b', '--date=short')
+        if output is None:
+            return []
+
+        commits = []
+        for line in output.split('\n'):
+            if line.strip() and '|' in line:
+                parts = line.split('|', 5)
+                if len(parts) >= 5:
+                    commits.append({
+                        'hash': parts[0],
+                        'author': parts[1],
+                        'email': parts[2],
+                        'date': parts[3],
+                        'message': parts[4],
+                        'body': parts[5] if len(parts) > 5 else ''
+                    })
+
+        if key:
+            cache['ranges'][key] = commits
+            self._used_ranges.add(key)
+            self._cache_dirty = True
+
+        return [dict(commit) for commit in commits]
+
+    def count_commits(self, tag):
+        """Количество коммитов, достижимых из тега (git rev-list --count, с кэшем)"""
+        sha = self._resolve(tag)
+        cache = self._load_cache()
+
+        if sha and sha in cache['counts']:
+            return cache['counts'][sha]
+
+        output = self._git('rev-list', '--count', tag)
+        count = int(output.strip()) if output and output.strip().isdigit() else 0
+
+        if sha:
+            cache['counts'][sha] = count
+            self._cache_dirty = True
+
+        return count
 
     def categorize_commit(self, commit):
         """Категоризировать коммит по сообщению"""
@@ -254,6 +403,8 @@ class ChangelogGenerator:
         elif output_format == 'html':
             self._generate_html()
 
+        self.save_cache()
+
     def _generate_markdown(self):
         """Generate Markdown CHANGELOG"""
         lines = []
@@ -305,17 +456,7 @@ class ChangelogGenerator:
             for i, tag in enumerate(tags):
                 tag_from = tags[i + 1] if i + 1 < len(tags) else None
 
-                # Получить дату тега
-                try:
-                    result = subprocess.run(
-                        ['git', 'log', '-1', '--format=%ad', '--date=short', tag],
-                        cwd=self.root_dir,
-                        capture_output=True,
-                        text=True
-                    )
-                    tag_date = result.stdout.strip() if result.returncode == 0 else ''
-                except:
-                    tag_date = ''
+                tag_date = self.get_tag_date(tag)
 
                 lines.append(f"## [{tag}] - {tag_date}\n\n")
 
@@ -366,16 +507,7 @@ class ChangelogGenerator:
         for i, tag in enumerate(tags):
             tag_from = tags[i + 1] if i + 1 < len(tags) else None
 
-            try:
-                result = subprocess.run(
-                    ['git', 'log', '-1', '--format=%ad', '--date=short', tag],
-                    cwd=self.root_dir,
-                    capture_output=True,
-                    text=True
-                )
-                tag_date = result.stdout.strip() if result.returncode == 0 else ''
-            except:
-                tag_date = ''
+            tag_date = self.get_tag_date(tag)
 
             commits = self.get_commits_between(tag_from=tag_from, tag_to=tag)
             categorized, breaking = self.parse_commits(commits)
@@ -453,16 +585,7 @@ class ChangelogGenerator:
         for i, tag in enumerate(tags[:10]):  # Limit to 10 versions
             tag_from = tags[i + 1] if i + 1 < len(tags) else None
 
-            try:
-                result = subprocess.run(
-                    ['git', 'log', '-1', '--format=%ad', '--date=short', tag],
-                    cwd=self.root_dir,
-                    capture_output=True,
-                    text=True
-                )
-                tag_date = result.stdout.strip() if result.returncode == 0 else ''
-            except:
-                tag_date = ''
+            tag_date = self.get_tag_date(tag)
 
             content_lines.append('<div class="version">')
             content_lines.append(f'<h2>{tag} - {tag_date}</h2>')
@@ -600,28 +723,12 @@ class ChangelogGenerator:
             lines.append(f"**Total versions**: {len(tags)}\n\n")
 
             for tag in tags:
-                # Дата и автор тега
-                try:
-                    result = subprocess.run(
-                        ['git', 'log', '-1', '--format=%ad|%an', '--date=short', tag],
-                        cwd=self.root_dir,
-                        capture_output=True,
-                        text=True
-                    )
-                    if result.returncode == 0:
-                        date, author = result.stdout.strip().split('|')
-                    else:
-                        date, author = '', ''
-                except:
-                    date, author = '', ''
-
-                # Количество коммитов в версии
-                commits = self.get_commits_between(tag_from=None, tag_to=tag)
-
                 lines.append(f"## {tag}\n\n")
-                lines.append(f"- **Date**: {date}\n")
-                lines.append(f"- **Author**: {author}\n")
-                lines.append(f"- **Commits**: {len(commits)}\n\n")
+                lines.append(f"- **Date**: {self.get_tag_date(tag)}\n")
+                lines.append(f"- **Author**: {self.get_tag_author(tag)}\n")
+                lines.append(f"- **Commits**: {self.count_commits(tag)}\n\n")
+
+        self.save_cache()
 
         output_file = self.root_dir / "VERSION_SUMMARY.md"
 
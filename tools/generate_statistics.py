@@ -32,6 +32,8 @@ import argparse
 import csv
 from typing import Dict, List, Tuple, Optional
 
+from shared.text_stats import text_stats
+
 
 class AdvancedStatisticsGenerator:
     def __init__(self, root_dir=".", timeframe_days=None):
@@ -72,8 +74,7 @@ class AdvancedStatisticsGenerator:
 
     def count_words(self, text):
         """Подсчитать слова"""
-        words = re.findall(r'\b\w+\b', text)
-        return len(words)
+        return text_stats(text, self.root_dir)['all_words']
     
     def calculate_readability_score(self, text: str) -> float:
         """
@@ -81,13 +82,9 @@ class AdvancedStatisticsGenerator:
         Score = 206.835 - 1.015 × (words/sentences) - 84.6 × (syllables/words)
         Simplified: ~180 - (words/sentences)
         """
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s for s in sentences if s.strip()]
-        
-        word_count = self.count_words(text)
-        sentence_count = len(sentences) if sentences else 1
+        stats = text_stats(text, self.root_dir)
         
-        avg_sentence_length = word_count / sentence_count
+        avg_sentence_length = stats['all_words'] / max(1, stats['sentences'])
         
         # Simplified readability (higher = easier)
         score = max(0, min(100, 100 - avg_sentence_length))
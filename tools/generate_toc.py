@@ -11,7 +11,7 @@ Table of Contents Generator - Генератор оглавления
 - Auto-numbering (1.1, 1.2, etc.)
 - Multi-format export (Markdown, HTML, JSON)
 - TOC validation (проверка якорей)
-- Cross-reference detection
+- Cross-reference detection (файлы и якоря - по общему индексу ссылок)
 - Interactive HTML TOC
 """
 
@@ -23,6 +23,8 @@ from typing import List, Tuple, Dict, Optional
 from datetime import datetime
 from collections import defaultdict
 
+from shared.link_index import LinkIndex, slugify_heading
+
 
 class AutoNumbering:
     """Автоматическая нумерация заголовков"""
@@ -160,10 +162,12 @@ class TOCValidator:
 class CrossReferenceDetector:
     """Детектор перекрёстных ссылок"""
 
-    def __init__(self, content: str, file_path: Path, root_dir: Path):
+    def __init__(self, content: str, file_path: Path, root_dir: Path,
+                 link_index: Optional[LinkIndex] = None):
         self.content = content
         self.file_path = file_path
         self.root_dir = root_dir
+        self.link_index = link_index
 
     def find_internal_links(self) -> List[Dict]:
         """Найти все внутренние ссылки [text](url)"""
@@ -195,31 +199,34 @@ class CrossReferenceDetector:
         return links
 
     def validate_links(self, links: List[Dict]) -> List[Dict]:
-        """Проверить, что все ссылки работают"""
+        """Проверить, что все ссылки работают (пути и якоря - из индекса, без чтения файлов)"""
+        if self.link_index is None:
+            self.link_index = LinkIndex.open(self.root_dir)
+
+        source = str(self.file_path.relative_to(self.root_dir))
         broken = []
 
         for link in links:
-            if link['type'] == 'anchor_only':
-                # Anchor within same file - would need TOC to validate
-                continue
-
-            # Check if file exists
-            if link['path']:
-                # Resolve relative to current file
-                target = (self.file_path.parent / link['path']).resolve()
+            check = self.link_index.check_link(source, link['url'])
 
-                if not target.exists():
-                    broken.append({
-                        'link': link,
-                        'reason': f'Файл не найден: {link["path"]}',
-                        'severity': 'high'
-                    })
-                elif target.is_dir():
-                    broken.append({
-                        'link': link,
-                        'reason': f'Ссылка на директорию: {link["path"]}',
-                        'severity': 'medium'
-                    })
+            if check['status'] in ('missing', 'outside'):
+                broken.append({
+                    'link': link,
+                    'reason': f'Файл не найден: {link["path"]}',
+                    'severity': 'high'
+                })
+            elif check['status'] == 'directory':
+                broken.append({
+                    'link': link,
+                    'reason': f'Ссылка на директорию: {link["path"]}',
+                    'severity': 'medium'
+                })
+            elif check['status'] == 'broken_anchor':
+                broken.append({
+                    'link': link,
+                    'reason': f'Якорь не найден: #{link["anchor"]}',
+                    'severity': 'medium'
+                })
 
         return broken
 
@@ -233,6 +240,14 @@ class TOCGenerator:
         self.numbered = numbered
         self.numbering_style = numbering_style
 
+        # Общий индекс путей и якорей для проверки ссылок (открывается при первой проверке)
+        self.link_index = None
+
+    def get_link_index(self) -> LinkIndex:
+        if self.link_index is None:
+            self.link_index = LinkIndex.open(self.root_dir)
+        return self.link_index
+
     def extract_frontmatter_and_content(self, file_path):
         """Извлечь frontmatter и содержимое"""
         try:
@@ -264,15 +279,7 @@ class TOCGenerator:
                 level = len(hashes)
 
                 # Создать якорь (как GitHub)
-                anchor = text.lower()
-                # Удалить специальные символы
-                anchor = re.sub(r'[^\w\s-]', '', anchor)
-                # Заменить пробелы на дефисы
-                anchor = re.sub(r'\s+', '-', anchor)
-                # Удалить множественные дефисы
-                anchor = re.sub(r'-+', '-', anchor)
-                # Удалить дефисы в начале и конце
-                anchor = anchor.strip('-')
+                anchor = slugify_heading(text)
 
                 headings.append((level, text, anchor))
 
@@ -529,7 +536,7 @@ class TOCGenerator:
         validation = validator.validate()
 
         # Find and validate cross-references
-        detector = CrossReferenceDetector(content, file_path, self.root_dir)
+        detector = CrossReferenceDetector(content, file_path, self.root_dir, self.get_link_index())
         links = detector.find_internal_links()
         broken_links = detector.validate_links(links)
 
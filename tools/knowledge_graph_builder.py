@@ -16,6 +16,8 @@ import argparse
 from typing import Dict, List, Tuple, Set
 import math
 
+from shared.fuzzy_match import levenshtein, similar_pairs
+
 
 class EntityLinker:
     """Линковка и объединение похожих сущностей"""
@@ -25,47 +27,28 @@ class EntityLinker:
 
     def levenshtein_distance(self, s1: str, s2: str) -> int:
         """Расстояние Левенштейна"""
-        if len(s1) < len(s2):
-            return self.levenshtein_distance(s2, s1)
-
-        if len(s2) == 0:
-            return len(s1)
-
-        previous_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-
-        return previous_row[-1]
+        return levenshtein(s1, s2)
 
     def find_similar_entities(self, threshold: float = 0.8) -> List[Tuple[str, str, float]]:
         """Найти похожие сущности (кандидаты на объединение)"""
-        similar_pairs = []
+        similar_pairs_list = []
         entity_names = list(self.entities.keys())
 
-        for i, name1 in enumerate(entity_names):
-            for name2 in entity_names[i+1:]:
-                # Нормализовать
-                norm1 = name1.lower().strip()
-                norm2 = name2.lower().strip()
+        # Нормализовать
+        normalized = [name.lower().strip() for name in entity_names]
 
-                if norm1 == norm2:
-                    continue
+        # Кандидаты - через фильтры длины и q-грамм, без перебора всех пар
+        for i, j, distance in similar_pairs(normalized, min_similarity=threshold):
+            if distance == 0:
+                continue
 
-                # Расчёт схожести
-                distance = self.levenshtein_distance(norm1, norm2)
-                max_len = max(len(norm1), len(norm2))
-                similarity = 1 - (distance / max_len)
+            # Расчёт схожести
+            max_len = max(len(normalized[i]), len(normalized[j]))
+            similarity = 1 - (distance / max_len)
 
-                if similarity >= threshold:
-                    similar_pairs.append((name1, name2, similarity))
+            similar_pairs_list.append((entity_names[i], entity_names[j], similarity))
 
-        return sorted(similar_pairs, key=lambda x: -x[2])
+        return sorted(similar_pairs_list, key=lambda x: -x[2])
 
     def merge_entities(self, entity1: str, entity2: str, target_name: str = None):
         """Объединить две сущности"""
@@ -23,18 +23,26 @@ Usage:
     python3 metadata_validator.py --fix              # Auto-fix issues
     python3 metadata_validator.py --format html      # HTML report
     python3 metadata_validator.py --threshold 80     # Min quality score
+    python3 metadata_validator.py --changed          # Only files changed vs HEAD
 """
 
 from pathlib import Path
 import yaml
 import re
 import json
+import sys
 import argparse
+import copy
 import hashlib
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
+from multiprocessing import cpu_count
 from typing import Dict, List, Set, Tuple, Optional
 
+from shared.git_history import changed_files
+from shared.link_index import LinkIndex
+from shared.validation_cache import ValidationCache, parallel_map
+
 
 class MetadataQualityScorer:
     """Расчёт quality score для метаданных (0-100)"""
@@ -226,64 +234,66 @@ class MetadataEnrichmentSuggester:
 
 
 class CrossArticleValidator:
-    """Валидация связей между статьями"""
+    """Валидация связей между статьями (по общему индексу ссылок)"""
 
-    def __init__(self):
-        self.all_titles = set()
-        self.all_files = {}
-        self.link_graph = defaultdict(set)
+    def __init__(self, link_index: LinkIndex = None):
+        self.link_index = link_index
+        self.title_counts = Counter()
 
-    def add_article(self, file_path: Path, frontmatter: Dict, content: str):
-        """Добавить статью в базу"""
-        title = frontmatter.get('title', '')
+    def add_article(self, title):
+        """Учесть заголовок статьи"""
         if title:
-            self.all_titles.add(title.lower())
+            self.title_counts[str(title).lower()] += 1
 
-        self.all_files[str(file_path)] = {
-            'title': title,
-            'frontmatter': frontmatter,
-            'content': content
-        }
+    @staticmethod
+    def find_suspicious_links(content: str) -> List[str]:
+        """Подозрительные пути внутренних ссылок (проверка одной статьи)"""
+        links = re.findall(r'\[([^\]]+)\]\(([^)]+\.md)\)', content)
+        return [link_path for _, link_path in links if '..' in link_path or '//' in link_path]
 
-    def validate_cross_references(self, file_path: Path, frontmatter: Dict, content: str) -> List[str]:
+    def validate_cross_references(self, article_path: str, title,
+                                  suspicious_links: List[str] = ()) -> List[str]:
         """Проверить межстатейные ссылки"""
         issues = []
 
         # 1. Check for duplicate titles
-        title = frontmatter.get('title', '').lower()
-        if title:
-            # Count occurrences
-            same_title_count = sum(1 for info in self.all_files.values()
-                                  if info['title'].lower() == title)
-            if same_title_count > 1:
-                issues.append(f"Duplicate title detected: '{frontmatter['title']}'")
+        if title and self.title_counts[str(title).lower()] > 1:
+            issues.append(f"Duplicate title detected: '{title}'")
 
         # 2. Check related articles exist
-        related = frontmatter.get('related', [])
-        if isinstance(related, list):
-            for rel_path in related:
-                # Check if file exists
-                if rel_path not in self.all_files:
-                    issues.append(f"Related article not found: {rel_path}")
+        if self.link_index is not None:
+            for link in self.link_index.outgoing(article_path, kinds=('related',)):
+                if not self.link_index.exists(link['target']):
+                    issues.append(f"Related article not found: {link['target']}")
 
         # 3. Check internal links in content
-        links = re.findall(r'\[([^\]]+)\]\(([^)]+\.md)\)', content)
-        for link_text, link_path in links:
-            # Simplified check - just warn if path looks suspicious
-            if '..' in link_path or '//' in link_path:
-                issues.append(f"Suspicious link path: {link_path}")
+        for link_path in suspicious_links:
+            issues.append(f"Suspicious link path: {link_path}")
 
         return issues
 
 
+def validate_article_worker(args) -> Dict:
+    """Проверка одной статьи в процессе пула (см. check_article)"""
+    root_dir, file_path, quality_threshold = args
+    validator = AdvancedMetadataValidator(root_dir, quality_threshold=quality_threshold)
+    return validator.check_article(Path(file_path))
+
+
 class AdvancedMetadataValidator:
     """Продвинутый валидатор метаданных"""
 
-    def __init__(self, root_dir=".", auto_fix=False, quality_threshold=0):
+    # Версия проверок статьи - при изменении логики кэш результатов сбрасывается
+    VERSION = 1
+
+    def __init__(self, root_dir=".", auto_fix=False, quality_threshold=0,
+                 use_cache=False, workers=None):
         self.root_dir = Path(root_dir)
         self.knowledge_dir = self.root_dir / "knowledge"
         self.auto_fix = auto_fix
         self.quality_threshold = quality_threshold
+        self.use_cache = use_cache
+        self.workers = workers or max(1, cpu_count() - 1)
 
         # Extended schema
         self.schema = {
@@ -339,10 +349,27 @@ class AdvancedMetadataValidator:
         self.enricher = MetadataEnrichmentSuggester()
         self.cross_validator = CrossArticleValidator()
 
+        # Общий индекс ссылок (shared/link_index.py) и кэш результатов по статьям
+        self.link_index = None
+        self.cache = None
+
         # Results
         self.results = []
         self.stats = defaultdict(int)
 
+    def rules(self) -> Dict:
+        """
+        Правила проверок статьи (входят в ключ кэша)
+
+        Оценка и предложения зависят от текущей даты (дата в будущем,
+        статья старше года), поэтому дата - тоже часть правил.
+        """
+        return {
+            'schema': self.schema,
+            'quality_threshold': self.quality_threshold,
+            'today': datetime.now().strftime('%Y-%m-%d')
+        }
+
     def extract_frontmatter(self, file_path: Path) -> Tuple[Optional[Dict], str]:
         """Извлечь frontmatter и content"""
         try:
@@ -404,11 +431,11 @@ class AdvancedMetadataValidator:
 
         return errors
 
-    def validate_article(self, file_path: Path) -> Dict:
-        """Валидировать статью"""
+    def validate_article(self, file_path: Path, extracted: Tuple = None) -> Dict:
+        """Валидировать статью (extracted - уже извлечённые frontmatter и content)"""
         article_path = str(file_path.relative_to(self.root_dir))
 
-        frontmatter, content = self.extract_frontmatter(file_path)
+        frontmatter, content = extracted or self.extract_frontmatter(file_path)
 
         result = {
             'path': article_path,
@@ -428,9 +455,6 @@ class AdvancedMetadataValidator:
             result['errors'].append("Frontmatter missing or corrupted")
             return result
 
-        # Add to cross-validator
-        self.cross_validator.add_article(file_path, frontmatter, content)
-
         # Validate each field
         for field_name, rules in self.schema.items():
             value = frontmatter.get(field_name)
@@ -471,34 +495,102 @@ class AdvancedMetadataValidator:
 
         return result
 
-    def validate_all(self):
-        """Валидировать все статьи"""
+    def check_article(self, file_path: Path) -> Dict:
+        """
+        Проверка одной статьи, не зависящая от других статей (кэшируется)
+
+        Returns: {'result': результат validate_article, 'title': заголовок,
+                  'cross_check': нужна ли межстатейная проверка,
+                  'suspicious_links': [...]}
+        """
+        frontmatter, content = self.extract_frontmatter(file_path)
+
+        return {
+            'result': self.validate_article(file_path, (frontmatter, content)),
+            'title': frontmatter.get('title') if frontmatter else None,
+            'cross_check': bool(frontmatter),
+            'suspicious_links': CrossArticleValidator.find_suspicious_links(content) if frontmatter else []
+        }
+
+    def check_files(self, md_files: List[Path]) -> List[Dict]:
+        """Проверить статьи: неизменённые - из кэша, остальные - в пуле процессов"""
+        if self.use_cache and self.cache is None:
+            self.cache = ValidationCache(self.root_dir, ".metadata_validation_cache.json",
+                                         self.VERSION, self.rules())
+
+        entries = {}
+        pending = []
+
+        for md_file in md_files:
+            entry = self.cache.get(self.relpath(md_file)) if self.cache else None
+            if entry is None:
+                pending.append(md_file)
+            else:
+                entries[md_file] = entry
+
+        checked = parallel_map(validate_article_worker,
+                               [(str(self.root_dir), str(md_file), self.quality_threshold)
+                                for md_file in pending],
+                               self.workers)
+
+        for md_file, entry in zip(pending, checked):
+            entries[md_file] = entry
+            if self.cache:
+                self.cache.put(self.relpath(md_file), entry)
+
+        self.stats['revalidated'] = len(pending)
+
+        if self.cache:
+            self.cache.save()
+
+        # Копии: межстатейная проверка дописывает предупреждения в результат
+        return [copy.deepcopy(entries[md_file]) for md_file in md_files]
+
+    def validate_all(self, files: List[Path] = None):
+        """Валидировать все статьи (files - только указанные)"""
         print("🔍 Advanced metadata validation...\n")
 
         start_time = datetime.now()
 
-        # First pass: collect all articles
-        for md_file in self.knowledge_dir.rglob("*.md"):
-            if md_file.name == "INDEX.md":
-                continue
+        if self.link_index is None:
+            self.link_index = LinkIndex.open(self.root_dir)
+        self.cross_validator.link_index = self.link_index
 
-            result = self.validate_article(md_file)
-            self.results.append(result)
+        if files is None:
+            md_files = [md_file for md_file in self.knowledge_dir.rglob("*.md")
+                        if md_file.name != "INDEX.md"]
+        else:
+            md_files = files
+
+        # First pass: per-article validation
+        entries = self.check_files(md_files)
+
+        # Заголовки для проверки уникальности: при частичной проверке
+        # остальные статьи берутся из индекса ссылок
+        titles = {}
+        if files is not None:
+            titles = {article: self.link_index.title(article) for article in self.link_index.articles()}
+        for entry in entries:
+            titles[entry['result']['path']] = entry['title']
+
+        for title in titles.values():
+            self.cross_validator.add_article(title)
 
         # Second pass: cross-validation
-        for result in self.results:
-            file_path = self.root_dir / result['path']
-            frontmatter, content = self.extract_frontmatter(file_path)
+        for entry in entries:
+            result = entry['result']
 
-            if frontmatter:
+            if entry['cross_check']:
                 cross_issues = self.cross_validator.validate_cross_references(
-                    file_path, frontmatter, content
+                    result['path'], entry['title'], entry['suspicious_links']
                 )
                 result['cross_issues'] = cross_issues
 
                 if cross_issues:
                     result['warnings'].extend(cross_issues)
 
+            self.results.append(result)
+
         # Statistics
         self.stats['total'] = len(self.results)
         self.stats['valid'] = sum(1 for r in self.results if r['valid'])
@@ -511,11 +603,27 @@ class AdvancedMetadataValidator:
         elapsed = (datetime.now() - start_time).total_seconds()
 
         print(f"   Articles checked: {self.stats['total']}")
+        if self.cache:
+            print(f"   🔄 Revalidated: {self.stats['revalidated']} (cached: {self.stats['total'] - self.stats['revalidated']})")
         print(f"   ✅ Valid: {self.stats['valid']}")
         print(f"   ❌ Invalid: {self.stats['invalid']}")
         print(f"   📊 Avg quality: {self.stats['avg_quality']:.1f}/100")
         print(f"   ⏱️  Time: {elapsed:.2f}s\n")
 
+    def changed_articles(self) -> Optional[List[Path]]:
+        """Статьи, изменённые относительно HEAD (None - не git-репозиторий)"""
+        changed = changed_files(self.root_dir, 'knowledge')
+        if changed is None:
+            return None
+
+        return [self.root_dir / path for path in changed
+                if path.endswith('.md') and Path(path).name != "INDEX.md"
+                and (self.root_dir / path).exists()]
+
+    def relpath(self, file_path: Path) -> str:
+        """Путь статьи от корня (ключ кэша)"""
+        return str(file_path.relative_to(self.root_dir))
+
     def generate_report_markdown(self):
         """Markdown отчёт"""
         lines = []
@@ -588,11 +696,26 @@ class AdvancedMetadataValidator:
 
         print(f"✅ JSON report: {output_file}")
 
-    def run(self):
-        """Запустить валидацию"""
-        self.validate_all()
+    def run(self, files: List[Path] = None) -> int:
+        """
+        Запустить валидацию
+
+        files - только указанные статьи: отчёты не перезаписываются,
+        ошибки печатаются в консоль, код возврата 1 при невалидных статьях
+        """
+        self.validate_all(files)
+
+        if files is not None:
+            for result in self.results:
+                if not result['valid']:
+                    print(f"❌ {result['path']}")
+                    for error in result['errors']:
+                        print(f"   - {error}")
+            return 0 if self.stats['invalid'] == 0 else 1
+
         self.generate_report_markdown()
         self.save_json()
+        return 0
 
 
 def main():
@@ -605,9 +728,16 @@ Examples:
   %(prog)s                          # Full validation
   %(prog)s --threshold 80           # Min quality score 80
   %(prog)s --fix                    # Auto-fix simple issues
+  %(prog)s --changed                # Only files changed vs HEAD (pre-commit)
         """
     )
 
+    parser.add_argument(
+        'files',
+        nargs='*',
+        help='Validate only these articles'
+    )
+
     parser.add_argument(
         '--fix',
         action='store_true',
@@ -621,6 +751,25 @@ Examples:
         help='Minimum quality score threshold (0-100)'
     )
 
+    parser.add_argument(
+        '--changed',
+        action='store_true',
+        help='Validate only articles changed vs HEAD (staged, unstaged, untracked)'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Revalidate all articles, ignoring .metadata_validation_cache.json'
+    )
+
+    parser.add_argument(
+        '-p', '--parallel',
+        type=int,
+        default=None,
+        help=f'Number of parallel workers (default: {max(1, cpu_count()-1)})'
+    )
+
     args = parser.parse_args()
 
     # Определить корневую директорию
@@ -631,11 +780,23 @@ Examples:
     validator = AdvancedMetadataValidator(
         root_dir,
         auto_fix=args.fix,
-        quality_threshold=args.threshold
+        quality_threshold=args.threshold,
+        use_cache=not args.no_cache,
+        workers=args.parallel
     )
 
+    # Только изменённые или указанные статьи
+    files = None
+    if args.files:
+        files = [root_dir / Path(f).resolve().relative_to(root_dir.resolve())
+                 for f in args.files if f.endswith('.md')]
+    elif args.changed:
+        files = validator.changed_articles()
+        if files is None:
+            print("⚠️  Not a git repository - validating all articles")
+
     # Запустить
-    validator.run()
+    sys.exit(validator.run(files))
 
 
 if __name__ == "__main__":
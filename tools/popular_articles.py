@@ -10,13 +10,15 @@ from pathlib import Path
 import yaml
 import re
 from collections import defaultdict, Counter
-import subprocess
 import json
 import math
 import argparse
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
+from shared.git_history import GitHistory
+from shared.link_index import LinkIndex
+
 
 class TrendAnalyzer:
     """Анализатор трендов и прогнозирование"""
@@ -159,42 +161,25 @@ class CategoryPopularityAnalyzer:
 class TimeSeriesPopularityAnalyzer:
     """Анализ популярности во времени"""
 
-    def __init__(self, root_dir: Path):
+    def __init__(self, root_dir: Path, git_history: Optional[GitHistory] = None):
         self.root_dir = root_dir
         self.knowledge_dir = root_dir / "knowledge"
+        self.git_history = git_history
 
     def get_edit_timeline(self, file_path: Path, months: int = 6) -> List[Tuple[str, int]]:
         """Получить временную шкалу редактирований"""
-        try:
-            cutoff_date = datetime.now() - timedelta(days=months * 30)
-            cutoff_str = cutoff_date.strftime('%Y-%m-%d')
-
-            result = subprocess.run(
-                ['git', 'log', '--pretty=format:%ad', '--date=short', f'--since={cutoff_str}', '--', str(file_path)],
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True
-            )
-
-            if result.returncode == 0 and result.stdout:
-                dates = result.stdout.strip().split('\n')
+        if self.git_history is None:
+            self.git_history = GitHistory.open(self.root_dir)
 
-                # Группировать по месяцам
-                monthly_counts = Counter()
-                for date_str in dates:
-                    if date_str:
-                        # YYYY-MM
-                        month_key = date_str[:7]
-                        monthly_counts[month_key] += 1
+        cutoff_str = (datetime.now() - timedelta(days=months * 30)).strftime('%Y-%m-%d')
 
-                # Сортировать
-                timeline = sorted(monthly_counts.items())
-                return timeline
-
-        except:
-            pass
+        # Группировать по месяцам (YYYY-MM)
+        monthly_counts = Counter()
+        for entry in self.git_history.file_history(file_path):
+            if entry['date'][:10] >= cutoff_str:
+                monthly_counts[entry['date'][:7]] += 1
 
-        return []
+        return sorted(monthly_counts.items())
 
     def detect_activity_spikes(self, file_path: Path) -> List[str]:
         """Обнаружить всплески активности"""
@@ -308,6 +293,12 @@ class PopularityTracker:
         self.articles = {}
         self.popularity_scores = {}
 
+        # Общий индекс ссылок (строится один раз, обновляется инкрементально)
+        self.link_index = None
+
+        # Общая git история (один проход git log вместо вызова на каждую статью)
+        self.git_history = None
+
         # Анализаторы
         self.trend_analyzer = None
         self.category_analyzer = None
@@ -327,71 +318,29 @@ class PopularityTracker:
         return None, None
 
     def count_incoming_links(self, target_path):
-        """Подсчитать входящие ссылки"""
-        count = 0
-
-        for md_file in self.knowledge_dir.rglob("*.md"):
-            if md_file.name == "INDEX.md":
-                continue
-
-            _, content = self.extract_frontmatter_and_content(md_file)
-            if not content:
-                continue
-
-            # Ссылки в контенте
-            links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', content)
-
-            for text, link in links:
-                if link.startswith('http'):
-                    continue
+        """Подсчитать входящие ссылки (O(1) по общему индексу ссылок)"""
+        if self.link_index is None:
+            self.link_index = LinkIndex.open(self.root_dir)
 
-                try:
-                    resolved = (md_file.parent / link.split('#')[0]).resolve()
-                    if resolved.exists() and resolved.is_relative_to(self.root_dir):
-                        resolved_path = str(resolved.relative_to(self.root_dir))
-                        if resolved_path == target_path:
-                            count += 1
-                except:
-                    pass
-
-        return count
+        return self.link_index.incoming_count(target_path)
 
     def get_edit_count(self, file_path):
-        """Получить количество редактирований из git"""
-        try:
-            result = subprocess.run(
-                ['git', 'log', '--oneline', '--', str(file_path)],
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True
-            )
+        """Получить количество редактирований из общей git истории"""
+        if self.git_history is None:
+            self.git_history = GitHistory.open(self.root_dir)
 
-            if result.returncode == 0:
-                return len(result.stdout.strip().split('\n')) if result.stdout.strip() else 0
-        except:
-            pass
-
-        return 0
+        return self.git_history.edit_count(file_path)
 
     def get_recent_activity(self, file_path):
         """Получить недавнюю активность (дней с последнего изменения)"""
-        try:
-            result = subprocess.run(
-                ['git', 'log', '-1', '--pretty=format:%ad', '--date=short', '--', str(file_path)],
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True
-            )
+        if self.git_history is None:
+            self.git_history = GitHistory.open(self.root_dir)
 
-            if result.returncode == 0 and result.stdout:
-                from datetime import datetime
-                last_edit = datetime.strptime(result.stdout.strip(), '%Y-%m-%d')
-                days_ago = (datetime.now() - last_edit).days
-                return days_ago
-        except:
-            pass
+        last_edit = self.git_history.last_modified(file_path)
+        if last_edit is None:
+            return 999  # Очень старая статья
 
-        return 999  # Очень старая статья
+        return (datetime.now() - last_edit.replace(hour=0, minute=0, second=0, microsecond=0)).days
 
     def calculate_content_quality(self, content):
         """Оценить качество контента"""
@@ -470,7 +419,7 @@ class PopularityTracker:
         # Инициализировать анализаторы
         self.trend_analyzer = TrendAnalyzer(self.articles)
         self.category_analyzer = CategoryPopularityAnalyzer(self.articles, self.popularity_scores)
-        self.timeseries_analyzer = TimeSeriesPopularityAnalyzer(self.root_dir)
+        self.timeseries_analyzer = TimeSeriesPopularityAnalyzer(self.root_dir, self.git_history)
         self.engagement_scorer = EngagementScorer(self.articles)
 
     def calculate_popularity(self, incoming_links, edit_count, days_since_edit, content_quality):
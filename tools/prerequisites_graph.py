@@ -166,17 +166,15 @@ class CriticalPathAnalyzer:
             if not self.graph.get(node, []):
                 dist[node] = self.weights.get(node, 1.0)
 
+        # Successors (node -> nodes that depend on it)
+        reverse_graph = sorter.reverse_graph
+
         # Relax edges in topological order
         for node in topo_order:
             if dist[node] == float('-inf'):
                 dist[node] = self.weights.get(node, 1.0)
 
             # Update successors
-            reverse_graph = defaultdict(list)
-            for n, deps in self.graph.items():
-                for dep in deps:
-                    reverse_graph[dep].append(n)
-
             for successor in reverse_graph.get(node, []):
                 new_dist = dist[node] + self.weights.get(successor, 1.0)
                 if new_dist > dist[successor]:
@@ -205,6 +203,7 @@ class CurriculumBuilder:
     def __init__(self, graph: Dict[str, List[str]], articles_info: Dict[str, Dict]):
         self.graph = graph
         self.articles_info = articles_info
+        self._depth_cache = {}
 
     def build_curriculum(self, target_article: str, max_depth: Optional[int] = None) -> List[Dict]:
         """
@@ -274,22 +273,469 @@ class CurriculumBuilder:
         return curriculum_levels
 
     def _calculate_depth(self, article: str) -> int:
-        """Вычислить глубину статьи"""
+        """Вычислить глубину статьи (с мемоизацией между вызовами)"""
+        if article in self._depth_cache:
+            return self._depth_cache[article]
+
         visited = set()
 
         def dfs(node: str) -> int:
+            if node in self._depth_cache:
+                return self._depth_cache[node]
             if node in visited:
                 return 0
             visited.add(node)
 
             if not self.graph.get(node, []):
-                return 0
+                depth = 0
+            else:
+                depth = 1 + max(dfs(dep) for dep in self.graph[node])
 
-            return 1 + max(dfs(dep) for dep in self.graph[node])
+            self._depth_cache[node] = depth
+            return depth
 
         return dfs(article)
 
 
+# Фразы в тексте, обозначающие зависимость от другой статьи
+PREREQ_PATTERNS = [
+    re.compile(r'предполагает знание \[([^\]]+)\]\(([^)]+)\)', re.IGNORECASE),
+    re.compile(r'требует понимания \[([^\]]+)\]\(([^)]+)\)', re.IGNORECASE),
+    re.compile(r'основывается на \[([^\]]+)\]\(([^)]+)\)', re.IGNORECASE),
+    re.compile(r'см\. сначала \[([^\]]+)\]\(([^)]+)\)', re.IGNORECASE)
+]
+
+
+def find_prerequisite_targets(md_file: Path, frontmatter: Optional[Dict], content: str) -> List[Path]:
+    """
+    Найти все кандидаты в prerequisites статьи (frontmatter + фразы в тексте)
+
+    Returns: список абсолютных путей (существование не проверяется)
+    """
+    targets = []
+
+    if frontmatter and isinstance(frontmatter.get('prerequisites'), list):
+        for prereq in frontmatter['prerequisites']:
+            try:
+                targets.append((md_file.parent / prereq).resolve())
+            except (TypeError, OSError):
+                pass
+
+    for pattern in PREREQ_PATTERNS:
+        for text, link in pattern.findall(content):
+            if link.startswith('http'):
+                continue
+            try:
+                targets.append((md_file.parent / link.split('#')[0]).resolve())
+            except OSError:
+                pass
+
+    return targets
+
+
+class IncrementalDAG:
+    """
+    DAG с инкрементально поддерживаемым топологическим порядком
+
+    Алгоритм Pearce–Kelly: при добавлении ребра x → y, нарушающего порядок,
+    переупорядочивается только затронутый участок между ord[y] и ord[x].
+    Для каждой вершины хранится битсет предков (int), поэтому
+    "путь обучения к X" - это O(ancestors) операция без обхода графа.
+
+    Рёбра, которые создали бы цикл, не добавляются, а откладываются
+    в cycle_edges и повторно пробуются после удаления рёбер.
+    """
+
+    def __init__(self):
+        self.succ = defaultdict(set)   # prereq -> статьи, которые от неё зависят
+        self.pred = defaultdict(set)   # статья -> её prerequisites
+        self.ord = {}                  # node -> позиция в топологическом порядке
+        self.ancestors = {}            # node -> битсет всех предков
+        self.cycle_edges = set()       # отклонённые рёбра (x, y)
+
+        self._bit = {}                 # node -> номер бита
+        self._node_by_bit = {}         # номер бита -> node
+        self._free_bits = []
+        self._next_ord = 0
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.ord
+
+    def __len__(self) -> int:
+        return len(self.ord)
+
+    def add_node(self, node: str):
+        """Добавить вершину в конец топологического порядка"""
+        if node in self.ord:
+            return
+
+        bit = self._free_bits.pop() if self._free_bits else len(self._bit)
+        self._bit[node] = bit
+        self._node_by_bit[bit] = node
+        self.ord[node] = self._next_ord
+        self._next_ord += 1
+        self.ancestors[node] = 0
+
+    def remove_node(self, node: str):
+        """Удалить вершину вместе со всеми её рёбрами"""
+        if node not in self.ord:
+            return
+
+        for prereq in list(self.pred[node]):
+            self.remove_edge(prereq, node, retry_cycles=False)
+        for dependent in list(self.succ[node]):
+            self.remove_edge(node, dependent, retry_cycles=False)
+
+        self.cycle_edges = {(x, y) for x, y in self.cycle_edges if node not in (x, y)}
+
+        bit = self._bit.pop(node)
+        del self._node_by_bit[bit]
+        self._free_bits.append(bit)
+        del self.ord[node]
+        del self.ancestors[node]
+        self.succ.pop(node, None)
+        self.pred.pop(node, None)
+
+        self._retry_cycle_edges()
+
+    def add_edge(self, x: str, y: str) -> bool:
+        """
+        Добавить зависимость: x должна изучаться до y
+
+        Returns: False, если ребро создало бы цикл (ребро отложено)
+        """
+        self.add_node(x)
+        self.add_node(y)
+
+        if y in self.succ[x]:
+            return True
+
+        if x == y:
+            self.cycle_edges.add((x, y))
+            return False
+
+        lower, upper = self.ord[y], self.ord[x]
+        if lower < upper:
+            forward = self._dfs_forward(y, upper, x)
+            if forward is None:
+                self.cycle_edges.add((x, y))
+                return False
+            backward = self._dfs_backward(x, lower)
+            self._reorder(backward, forward)
+
+        self.succ[x].add(y)
+        self.pred[y].add(x)
+        self.cycle_edges.discard((x, y))
+
+        inherited = self.ancestors[x] | (1 << self._bit[x])
+        if inherited & ~self.ancestors[y]:
+            for node in self._descendants(y):
+                self.ancestors[node] |= inherited
+
+        return True
+
+    def remove_edge(self, x: str, y: str, retry_cycles: bool = True):
+        """Удалить зависимость x → y"""
+        self.cycle_edges.discard((x, y))
+
+        if y not in self.succ.get(x, ()):
+            return
+
+        self.succ[x].discard(y)
+        self.pred[y].discard(x)
+
+        # Удаление ребра не нарушает порядок, но меняет предков потомков y
+        for node in sorted(self._descendants(y), key=self.ord.__getitem__):
+            bits = 0
+            for prereq in self.pred[node]:
+                bits |= self.ancestors[prereq] | (1 << self._bit[prereq])
+            self.ancestors[node] = bits
+
+        if retry_cycles:
+            self._retry_cycle_edges()
+
+    def _retry_cycle_edges(self):
+        """Повторить отложенные рёбра - после удаления цикл мог исчезнуть"""
+        for x, y in list(self.cycle_edges):
+            self.add_edge(x, y)
+
+    def _dfs_forward(self, start: str, upper: int, target: str) -> Optional[List[str]]:
+        """Вершины, достижимые из start с ord < upper (None - найден цикл)"""
+        visited = {start}
+        stack = [start]
+
+        while stack:
+            node = stack.pop()
+            for w in self.succ.get(node, ()):
+                if w == target:
+                    return None
+                if w not in visited and self.ord[w] < upper:
+                    visited.add(w)
+                    stack.append(w)
+
+        return list(visited)
+
+    def _dfs_backward(self, start: str, lower: int) -> List[str]:
+        """Вершины, из которых достижима start, с ord > lower"""
+        visited = {start}
+        stack = [start]
+
+        while stack:
+            node = stack.pop()
+            for w in self.pred.get(node, ()):
+                if w not in visited and self.ord[w] > lower:
+                    visited.add(w)
+                    stack.append(w)
+
+        return list(visited)
+
+    def _reorder(self, backward: List[str], forward: List[str]):
+        """Переназначить освободившиеся позиции: сначала backward, затем forward"""
+        backward.sort(key=self.ord.__getitem__)
+        forward.sort(key=self.ord.__getitem__)
+
+        nodes = backward + forward
+        slots = sorted(self.ord[node] for node in nodes)
+
+        for node, slot in zip(nodes, slots):
+            self.ord[node] = slot
+
+    def _descendants(self, start: str) -> List[str]:
+        """start и все вершины, зависящие от неё"""
+        visited = {start}
+        stack = [start]
+
+        while stack:
+            node = stack.pop()
+            for w in self.succ.get(node, ()):
+                if w not in visited:
+                    visited.add(w)
+                    stack.append(w)
+
+        return list(visited)
+
+    def topological_order(self) -> List[str]:
+        """Текущий топологический порядок (без пересчёта)"""
+        return sorted(self.ord, key=self.ord.__getitem__)
+
+    def ancestors_of(self, node: str) -> List[str]:
+        """Все prerequisites вершины (транзитивно), в порядке изучения"""
+        bits = self.ancestors.get(node, 0)
+        nodes = []
+
+        while bits:
+            low = bits & -bits
+            nodes.append(self._node_by_bit[low.bit_length() - 1])
+            bits ^= low
+
+        nodes.sort(key=self.ord.__getitem__)
+        return nodes
+
+    def learning_path(self, node: str) -> List[str]:
+        """Путь обучения: все prerequisites в топологическом порядке + сама статья"""
+        if node not in self.ord:
+            return []
+        return self.ancestors_of(node) + [node]
+
+    def is_prerequisite(self, x: str, y: str) -> bool:
+        """Является ли x (транзитивно) prerequisite для y - O(1)"""
+        if x not in self._bit or y not in self.ancestors:
+            return False
+        return bool(self.ancestors[y] >> self._bit[x] & 1)
+
+    def to_dict(self) -> Dict:
+        return {
+            'order': self.topological_order(),
+            'edges': sorted([x, y] for x, targets in self.succ.items() for y in targets),
+            'cycle_edges': sorted([x, y] for x, y in self.cycle_edges)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'IncrementalDAG':
+        """Восстановить DAG; порядок из data уже топологический, поэтому без reorder"""
+        dag = cls()
+
+        for node in data.get('order', []):
+            dag.add_node(node)
+        for x, y in data.get('edges', []):
+            dag.add_edge(x, y)
+        for x, y in data.get('cycle_edges', []):
+            dag.add_edge(x, y)
+
+        return dag
+
+
+class PrerequisiteDAGStore:
+    """
+    Персистентный DAG prerequisites с инкрементальным обновлением
+
+    Хранится в .prerequisites_dag.json. refresh() перечитывает только
+    изменённые статьи (по mtime/size) и применяет разницу рёбер к
+    IncrementalDAG вместо полного пересчёта графа.
+    """
+
+    VERSION = 2
+
+    def __init__(self, root_dir=".", cache_file=".prerequisites_dag.json"):
+        self.root_dir = Path(root_dir).resolve()
+        self.knowledge_dir = self.root_dir / "knowledge"
+        self.cache_file = self.root_dir / cache_file
+
+        self.dag = IncrementalDAG()
+        self.articles = {}      # article -> {'title', 'difficulty', 'tags'}
+        self.signatures = {}    # article -> [mtime_ns, size]
+        self.candidates = {}    # article -> все кандидаты в prerequisites
+
+        self.load()
+
+    def load(self):
+        """Загрузить сохранённое состояние"""
+        if not self.cache_file.exists():
+            return
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+
+        if data.get('version') != self.VERSION:
+            return
+
+        self.dag = IncrementalDAG.from_dict(data.get('dag', {}))
+        self.articles = data.get('articles', {})
+        self.signatures = data.get('signatures', {})
+        self.candidates = data.get('candidates', {})
+
+    def save(self):
+        """Сохранить состояние"""
+        data = {
+            'version': self.VERSION,
+            'updated': datetime.now().isoformat(),
+            'dag': self.dag.to_dict(),
+            'articles': self.articles,
+            'signatures': self.signatures,
+            'candidates': self.candidates
+        }
+
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Синхронизировать DAG с knowledge/
+
+        Returns: {'changed': N, 'removed': M}
+        """
+        current = {}
+        if self.knowledge_dir.exists():
+            for md_file in self.knowledge_dir.rglob("*.md"):
+                if md_file.name == "INDEX.md":
+                    continue
+                stat = md_file.stat()
+                current[str(md_file.relative_to(self.root_dir))] = [stat.st_mtime_ns, stat.st_size]
+
+        removed = [article for article in self.signatures if article not in current]
+        changed = [article for article, sig in current.items() if self.signatures.get(article) != sig]
+        added = [article for article in changed if article not in self.signatures]
+
+        for article in removed:
+            self.signatures.pop(article, None)
+            self.articles.pop(article, None)
+            self.candidates.pop(article, None)
+            self.dag.remove_node(article)
+
+        for article in changed:
+            self.signatures[article] = current[article]
+            self._update_article(article)
+
+        # Новые/удалённые файлы могут разрешить или сломать ссылки в других статьях
+        if removed or added:
+            for article in self.candidates:
+                self._apply_candidates(article)
+
+        if changed or removed:
+            self.save()
+
+        return {'changed': len(changed), 'removed': len(removed)}
+
+    def _update_article(self, article: str):
+        """Перечитать одну статью"""
+        md_file = self.root_dir / article
+        frontmatter, content = None, None
+
+        try:
+            with open(md_file, 'r', encoding='utf-8') as f:
+                text = f.read()
+            match = re.match(r'^---\s*\n(.*?)\n---\s*\n(.*)', text, re.DOTALL)
+            if match:
+                frontmatter, content = yaml.safe_load(match.group(1)), match.group(2)
+        except Exception:
+            pass
+
+        if not content:
+            # Снимаются только свои данные статьи: вершина остаётся, пока
+            # на неё ссылаются другие статьи (как при полном пересчёте)
+            self.articles.pop(article, None)
+            self.candidates.pop(article, None)
+            self._apply_candidates(article)
+            self._drop_if_unused(article)
+            return
+
+        frontmatter = frontmatter if isinstance(frontmatter, dict) else {}
+        self.articles[article] = {
+            'title': frontmatter.get('title', md_file.stem),
+            'difficulty': frontmatter.get('difficulty', 'средний'),
+            'tags': frontmatter.get('tags', [])
+        }
+
+        targets = []
+        for target in find_prerequisite_targets(md_file, frontmatter, content):
+            if target.is_relative_to(self.root_dir):
+                target_path = str(target.relative_to(self.root_dir))
+                if target_path not in targets:
+                    targets.append(target_path)
+
+        self.candidates[article] = targets
+        self.dag.add_node(article)
+        self._apply_candidates(article)
+
+    def _apply_candidates(self, article: str):
+        """Привести входящие рёбра статьи в соответствие с её кандидатами"""
+        wanted = {target for target in self.candidates.get(article, [])
+                  if (self.root_dir / target).exists()}
+        current = set(self.dag.pred.get(article, ()))
+        current |= {x for x, y in self.dag.cycle_edges if y == article}
+
+        for prereq in current - wanted:
+            self.dag.remove_edge(prereq, article)
+            self._drop_if_unused(prereq)
+        for prereq in wanted - current:
+            self.dag.add_edge(prereq, article)
+
+    def _drop_if_unused(self, node: str):
+        """Удалить вершину без данных статьи, если у неё не осталось рёбер"""
+        if node in self.articles or node not in self.dag:
+            return
+        if self.dag.pred.get(node) or self.dag.succ.get(node):
+            return
+        if any(node in edge for edge in self.dag.cycle_edges):
+            return
+        self.dag.remove_node(node)
+
+    def learning_path(self, article: str) -> List[Dict]:
+        """Учебный план для статьи - O(ancestors) по кэшированным битсетам"""
+        return [
+            {
+                'article': step,
+                'title': self.articles.get(step, {}).get('title', step),
+                'difficulty': self.articles.get(step, {}).get('difficulty', 'средний'),
+                'order': i
+            }
+            for i, step in enumerate(self.dag.learning_path(article), 1)
+        ]
+
+
 class PrerequisitesGraph:
     """Построитель графа зависимостей"""
 
@@ -339,53 +785,20 @@ class PrerequisitesGraph:
                 'tags': frontmatter.get('tags', []) if frontmatter else []
             }
 
-            # Извлечь prerequisites из frontmatter
-            if frontmatter and 'prerequisites' in frontmatter:
-                prereqs = frontmatter['prerequisites']
-                if isinstance(prereqs, list):
-                    for prereq in prereqs:
-                        try:
-                            target = (md_file.parent / prereq).resolve()
-
-                            if target.exists() and target.is_relative_to(self.root_dir):
-                                target_path = str(target.relative_to(self.root_dir))
-
-                                # Добавить в граф
-                                if target_path not in self.prerequisites[article_path]['requires']:
-                                    self.prerequisites[article_path]['requires'].append(target_path)
-
-                                if article_path not in self.prerequisites[target_path]['required_by']:
-                                    self.prerequisites[target_path]['required_by'].append(article_path)
-                        except:
-                            pass
-
-            # Анализировать контент на наличие фраз типа "предполагает знание"
-            prereq_patterns = [
-                r'предполагает знание \[([^\]]+)\]\(([^)]+)\)',
-                r'требует понимания \[([^\]]+)\]\(([^)]+)\)',
-                r'основывается на \[([^\]]+)\]\(([^)]+)\)',
-                r'см\. сначала \[([^\]]+)\]\(([^)]+)\)'
-            ]
-
-            for pattern in prereq_patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                for text, link in matches:
-                    if link.startswith('http'):
-                        continue
-
-                    try:
-                        target = (md_file.parent / link.split('#')[0]).resolve()
-
-                        if target.exists() and target.is_relative_to(self.root_dir):
-                            target_path = str(target.relative_to(self.root_dir))
-
-                            if target_path not in self.prerequisites[article_path]['requires']:
-                                self.prerequisites[article_path]['requires'].append(target_path)
-
-                            if article_path not in self.prerequisites[target_path]['required_by']:
-                                self.prerequisites[target_path]['required_by'].append(article_path)
-                    except:
-                        pass
+            # Prerequisites из frontmatter и фраз типа "предполагает знание"
+            for target in find_prerequisite_targets(md_file, frontmatter, content):
+                try:
+                    if target.exists() and target.is_relative_to(self.root_dir):
+                        target_path = str(target.relative_to(self.root_dir))
+
+                        # Добавить в граф
+                        if target_path not in self.prerequisites[article_path]['requires']:
+                            self.prerequisites[article_path]['requires'].append(target_path)
+
+                        if article_path not in self.prerequisites[target_path]['required_by']:
+                            self.prerequisites[target_path]['required_by'].append(article_path)
+                except:
+                    pass
 
         print(f"   Статей проиндексировано: {len(self.articles)}")
         print(f"   Зависимостей найдено: {sum(len(p['requires']) for p in self.prerequisites.values())}\n")
@@ -899,6 +1312,7 @@ def main():
   %(prog)s --export dot                       # Экспорт в Graphviz DOT
   %(prog)s --export html                      # Интерактивная HTML визуализация
   %(prog)s --metrics                          # Метрики графа
+  %(prog)s --learning-path "article.md"       # Путь обучения из инкрементального DAG
         """
     )
 
@@ -938,6 +1352,12 @@ def main():
         help='Показать метрики графа'
     )
 
+    parser.add_argument(
+        '--learning-path',
+        metavar='ARTICLE',
+        help='Путь обучения из персистентного DAG (.prerequisites_dag.json, обновляется инкрементально)'
+    )
+
     parser.add_argument(
         '--report',
         action='store_true',
@@ -949,6 +1369,21 @@ def main():
     script_dir = Path(__file__).parent
     root_dir = script_dir.parent
 
+    if args.learning_path:
+        store = PrerequisiteDAGStore(root_dir)
+        stats = store.refresh()
+        print(f"🔗 DAG обновлён: изменено {stats['changed']}, удалено {stats['removed']} статей\n")
+
+        path = store.learning_path(args.learning_path)
+        if path:
+            print(f"📚 Путь обучения для: {args.learning_path}\n")
+            for step in path:
+                print(f"{step['order']}. {step['title']}")
+                print(f"   Файл: {step['article']}\n")
+        else:
+            print(f"❌ Статья '{args.learning_path}' не найдена.\n")
+        return
+
     graph = PrerequisitesGraph(root_dir)
     graph.build_graph()
 
@@ -27,6 +27,12 @@ from datetime import datetime
 from collections import Counter, defaultdict
 import argparse
 
+from shared.keyword_classifier import KeywordClassifier
+
+
+# Веса уровней ключевых слов категорий
+KEYWORD_LEVEL_WEIGHTS = {'high': 3.0, 'medium': 2.0, 'low': 1.0}
+
 
 class AdvancedInboxProcessor:
     """
@@ -72,6 +78,15 @@ class AdvancedInboxProcessor:
             }
         }
 
+        # Матрица ключевое слово × категория (подстроки, как str.count)
+        self.category_model = KeywordClassifier(
+            ((word, category, KEYWORD_LEVEL_WEIGHTS[level])
+             for category, levels in self.category_keywords.items()
+             for level in ('high', 'medium', 'low')
+             for word in levels[level]),
+            match='substring'
+        )
+
         # Stop words (RU + EN)
         self.stop_words = {
             'и', 'в', 'на', 'с', 'по', 'для', 'как', 'что', 'это', 'из', 'к', 'или',
@@ -148,26 +163,8 @@ class AdvancedInboxProcessor:
 
         Returns: {category: score, ...}
         """
-        text_lower = text.lower()
-        scores = defaultdict(float)
-
-        for category, levels in self.category_keywords.items():
-            # High-weight keywords
-            for word in levels['high']:
-                count = text_lower.count(word)
-                scores[category] += count * 3.0  # High weight
-
-            # Medium-weight keywords
-            for word in levels['medium']:
-                count = text_lower.count(word)
-                scores[category] += count * 2.0  # Medium weight
-
-            # Low-weight keywords
-            for word in levels['low']:
-                count = text_lower.count(word)
-                scores[category] += count * 1.0  # Low weight
-
-        return dict(scores)
+        scores = self.category_model.scores([text])[0]
+        return {category: float(score) for category, score in zip(self.category_model.labels, scores)}
 
     def categorize_content(self, text):
         """
@@ -175,20 +172,35 @@ class AdvancedInboxProcessor:
 
         Returns: (category, confidence)
         """
-        scores = self.calculate_category_score(text)
+        return self.categorize_batch([text])[0]
+
+    def categorize_batch(self, texts):
+        """
+        Категоризация пачки текстов одним произведением матриц
+
+        Returns: [(category, confidence), ...]
+        """
+        categories = self.category_model.labels
+        results = []
+
+        for scores in self.category_model.scores(texts):
+            if not categories:
+                results.append((None, 0.0))
+                continue
 
-        if not scores:
-            return None, 0.0
+            scores = [float(score) for score in scores]
 
-        # Best category
-        best_category = max(scores, key=scores.get)
-        best_score = scores[best_category]
+            # Best category (первая при равенстве)
+            best_index = max(range(len(scores)), key=scores.__getitem__)
+            best_score = scores[best_index]
 
-        # Calculate confidence (0-100)
-        total = sum(scores.values())
-        confidence = (best_score / total * 100) if total > 0 else 0.0
+            # Calculate confidence (0-100)
+            total = sum(scores)
+            confidence = (best_score / total * 100) if total > 0 else 0.0
 
-        return best_category, round(confidence, 2)
+            results.append((categories[best_index], round(confidence, 2)))
+
+        return results
 
     # ==================== Auto-Tagging ====================
 
@@ -392,8 +404,13 @@ class AdvancedInboxProcessor:
 
     # ==================== Processing ====================
 
-    def process_file(self, file_path):
-        """Обработать один файл из inbox"""
+    def process_file(self, file_path, extracted=None, categorization=None):
+        """
+        Обработать один файл из inbox
+
+        extracted и categorization - заранее посчитанные (frontmatter, content)
+        и (category, confidence), когда файлы обрабатываются пачкой.
+        """
         print(f"\n📄 Processing: {file_path.name}")
 
         # 1. Format detection
@@ -401,7 +418,7 @@ class AdvancedInboxProcessor:
         print(f"   Format: {file_format}")
 
         # 2. Extract content
-        frontmatter, content = self.extract_frontmatter(file_path)
+        frontmatter, content = extracted or self.extract_frontmatter(file_path)
 
         if not content.strip():
             print(f"   ⚠️  Empty file, skipping")
@@ -414,7 +431,7 @@ class AdvancedInboxProcessor:
             return {'status': 'duplicate', 'hash': content_hash}
 
         # 4. Categorization
-        category, confidence = self.categorize_content(content)
+        category, confidence = categorization or self.categorize_content(content)
         print(f"   📂 Category: {category} (confidence: {confidence}%)")
 
         # 5. Auto-tagging
@@ -516,9 +533,13 @@ class AdvancedInboxProcessor:
 
         print(f"   Found: {len(files)} files\n")
 
+        # Категоризация всех файлов - один векторный проход
+        extracted = [self.extract_frontmatter(f) for f in files]
+        categorizations = self.categorize_batch([content for _, content in extracted])
+
         reports = []
-        for file_path in files:
-            report = self.process_file(file_path)
+        for file_path, file_extracted, categorization in zip(files, extracted, categorizations):
+            report = self.process_file(file_path, file_extracted, categorization)
             if report:
                 reports.append(report)
 
@@ -22,6 +22,8 @@ import re
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+from shared.text_stats import count_syllables, text_stats
+
 
 class QualityAnalyzer:
     """
@@ -217,40 +219,26 @@ class QualityAnalyzer:
 
         score = 50  # Базовый балл
 
-        # Удалить код и ссылки для анализа
-        text = re.sub(r'```.*?```', '', content, flags=re.DOTALL)
-        text = re.sub(r'`[^`]+`', '', text)
-        text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
-
-        # Предложения
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        # Статистика прозы (код и разметка ссылок исключены)
+        stats = text_stats(content, self.root_dir)
 
-        if sentences:
+        if stats['prose_sentences']:
             # Средняя длина предложения (слов)
-            words_per_sentence = []
-            for sent in sentences:
-                words = re.findall(r'\b[а-яёa-z]+\b', sent.lower())
-                words_per_sentence.append(len(words))
-
-            if words_per_sentence:
-                avg_words = sum(words_per_sentence) / len(words_per_sentence)
-
-                # Оптимально: 15-25 слов в предложении
-                if 15 <= avg_words <= 25:
-                    score += 30
-                elif 10 <= avg_words <= 30:
-                    score += 15
-                else:
-                    # Штраф за слишком длинные или короткие
-                    score -= 10
+            avg_words = stats['prose_words'] / stats['prose_sentences']
+
+            # Оптимально: 15-25 слов в предложении
+            if 15 <= avg_words <= 25:
+                score += 30
+            elif 10 <= avg_words <= 30:
+                score += 15
+            else:
+                # Штраф за слишком длинные или короткие
+                score -= 10
 
         # Разнообразие (разные слова vs общее количество)
-        words = re.findall(r'\b[а-яёa-z]+\b', text.lower())
-        if words:
-            unique_ratio = len(set(words)) / len(words)
+        if stats['prose_words']:
             # Чем выше разнообразие, тем лучше
-            score += int(unique_ratio * 20)
+            score += int(stats['prose_unique_words'] / stats['prose_words'] * 20)
 
         return min(100, max(0, score))
 
@@ -499,40 +487,29 @@ class ReadabilityAnalyzer:
     
     def count_syllables(self, word):
         """Подсчёт слогов (упрощённый)"""
-        word = word.lower()
-        vowels = 'аеёиоуыэюя'
-        count = sum(1 for char in word if char in vowels)
-        return max(1, count)
+        return count_syllables(word, 'ru_vowels')
     
     def calculate_flesch_reading_ease(self, text):
         """Flesch Reading Ease (адаптация для русского)"""
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s for s in sentences if s.strip()]
-        
-        words = re.findall(r'\b[а-яА-ЯёЁa-zA-Z]+\b', text)
+        stats = text_stats(text, self.analyzer.root_dir)
         
-        if not sentences or not words:
+        if not stats['sentences'] or not stats['words']:
             return 0
         
-        total_syllables = sum(self.count_syllables(w) for w in words)
-        avg_sentence_length = len(words) / len(sentences)
-        avg_syllables_per_word = total_syllables / len(words)
+        avg_sentence_length = stats['words'] / stats['sentences']
+        avg_syllables_per_word = stats['syllables']['ru_vowels'] / stats['words']
         
         score = 206.835 - 1.015 * avg_sentence_length - 84.6 * avg_syllables_per_word
         return max(0, min(100, score))
     
     def calculate_smog_index(self, text):
         """SMOG (Simple Measure of Gobbledygook)"""
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s for s in sentences if s.strip()]
+        stats = text_stats(text, self.analyzer.root_dir)
         
-        if len(sentences) < 30:
+        if stats['sentences'] < 30:
             return 0
         
-        words = re.findall(r'\b[а-яА-ЯёЁa-zA-Z]+\b', text)
-        polysyllables = sum(1 for w in words if self.count_syllables(w) >= 3)
-        
-        smog = 1.043 * (polysyllables * (30 / len(sentences))) ** 0.5 + 3.1291
+        smog = 1.043 * (stats['polysyllables']['ru_vowels'] * (30 / stats['sentences'])) ** 0.5 + 3.1291
         return round(smog, 1)
     
     def analyze_all(self):
@@ -545,20 +522,15 @@ class ReadabilityAnalyzer:
             flesch = self.calculate_flesch_reading_ease(content)
             smog = self.calculate_smog_index(content)
             
-            words = re.findall(r'\b[а-яА-ЯёЁa-zA-Z]+\b', content)
-            sentences = re.split(r'[.!?]+', content)
-            sentences = [s for s in sentences if s.strip()]
-            
-            avg_word_length = sum(len(w) for w in words) / len(words) if words else 0
-            avg_sentence_length = len(words) / len(sentences) if sentences else 0
+            stats = text_stats(content, self.analyzer.root_dir)
             
             self.readability_scores.append({
                 'article': article_path,
                 'flesch_score': round(flesch, 1),
                 'smog_index': smog,
-                'avg_word_length': round(avg_word_length, 1),
-                'avg_sentence_length': round(avg_sentence_length, 1),
-                'total_words': len(words)
+                'avg_word_length': round(stats['avg_word_length'], 1),
+                'avg_sentence_length': round(stats['words'] / stats['sentences'] if stats['sentences'] else 0, 1),
+                'total_words': stats['words']
             })
         
         print(f"   Проанализировано статей: {len(self.readability_scores)}\n")
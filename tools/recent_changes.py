@@ -17,13 +17,14 @@ Advanced Recent Changes - Продвинутый анализ последних
 """
 
 from pathlib import Path
-import subprocess
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 import json
 import xml.etree.ElementTree as ET
 import re
 
+from shared.commit_ledger import CommitLedger
+
 
 class ContributorAnalyzer:
     """Детальный анализ контрибьюторов"""
@@ -32,6 +33,11 @@ class ContributorAnalyzer:
         self.contributors = contributors
         self.changes = changes
 
+        # Коммиты по авторам - один проход вместо фильтрации на каждый запрос
+        self.commits_by_author = defaultdict(list)
+        for commit in changes:
+            self.commits_by_author[commit['author']].append(commit)
+
     def analyze_contributor_patterns(self, author):
         """
         Анализ паттернов работы контрибьютора
@@ -46,7 +52,7 @@ class ContributorAnalyzer:
             return None
 
         stats = self.contributors[author]
-        author_commits = [c for c in self.changes if c['author'] == author]
+        author_commits = self.commits_by_author.get(author, [])
 
         if not author_commits:
             return None
@@ -89,7 +95,7 @@ class ContributorAnalyzer:
         Returns:
             dict: специализация по категориям
         """
-        author_commits = [c for c in self.changes if c['author'] == author]
+        author_commits = self.commits_by_author.get(author, [])
         category_changes = defaultdict(int)
 
         for commit in author_commits:
@@ -195,10 +201,14 @@ class ContributorAnalyzer:
 class ChangeImpactAnalyzer:
     """Анализ влияния изменений"""
 
-    def __init__(self, changes, file_activity):
+    def __init__(self, changes, file_activity, file_churn=None, daily_stats=None):
         self.changes = changes
         self.file_activity = file_activity
 
+        # Готовые агрегаты из журнала коммитов (если есть)
+        self.file_churn = file_churn
+        self.daily_stats = daily_stats
+
     def calculate_risk_score(self, commit):
         """
         Вычислить risk score для коммита
@@ -287,15 +297,17 @@ class ChangeImpactAnalyzer:
         """
         hotspots = []
 
-        for file_path, change_count in sorted(self.file_activity.items(), key=lambda x: -x[1])[:top_n]:
-            # Вычислить churn (количество строк изменено во всех коммитах)
-            total_churn = 0
-
+        # Churn (количество строк изменено во всех коммитах) - один проход
+        file_churn = self.file_churn
+        if file_churn is None:
+            file_churn = defaultdict(int)
             for commit in self.changes:
                 for file_info in commit['files']:
-                    if file_info['path'] == file_path:
-                        total_churn += commit['stats']['insertions'] + commit['stats']['deletions']
+                    file_churn[file_info['path']] += file_info.get(
+                        'insertions', 0) + file_info.get('deletions', 0)
 
+        for file_path, change_count in sorted(self.file_activity.items(), key=lambda x: -x[1])[:top_n]:
+            total_churn = file_churn.get(file_path, 0)
             avg_churn = total_churn / change_count if change_count > 0 else 0
 
             hotspots.append({
@@ -315,12 +327,13 @@ class ChangeImpactAnalyzer:
             dict: velocity тренды
         """
         # Группировать изменения по датам
-        daily_stats = defaultdict(lambda: {'commits': 0, 'changes': 0})
-
-        for commit in self.changes:
-            date = commit['date']
-            daily_stats[date]['commits'] += 1
-            daily_stats[date]['changes'] += commit['stats']['insertions'] + commit['stats']['deletions']
+        daily_stats = self.daily_stats
+        if daily_stats is None:
+            daily_stats = defaultdict(lambda: {'commits': 0, 'changes': 0})
+            for commit in self.changes:
+                date = commit['date']
+                daily_stats[date]['commits'] += 1
+                daily_stats[date]['changes'] += commit['stats']['insertions'] + commit['stats']['deletions']
 
         # Сортировать по дате
         sorted_dates = sorted(daily_stats.keys())
@@ -782,108 +795,38 @@ class AdvancedRecentChanges:
             'dates': []
         })
         self.file_activity = defaultdict(int)
+        self.file_churn = defaultdict(int)
         self.hourly_activity = defaultdict(int)
         self.daily_activity = defaultdict(int)
+        self.daily_stats = {}
+
+    def load_changes(self):
+        """
+        Загрузить изменения за период из журнала коммитов
+
+        Журнал дописывается только новыми коммитами (last_sha..HEAD),
+        а статистика окна собирается из дневных агрегатов.
+
+        Returns:
+            bool: удалось ли получить git историю
+        """
+        ledger = CommitLedger.open(self.root_dir)
+        if ledger.last_sha is None:
+            return False
 
-    def get_git_log(self):
-        """Получить git лог за период"""
         since_date = (datetime.now() - timedelta(days=self.days)).strftime('%Y-%m-%d')
 
-        try:
-            result = subprocess.run(
-                ['git', 'log', f'--since={since_date}', '--name-status', '--numstat',
-                 '--pretty=format:%H|%an|%ae|%ad|%s|%ai', '--date=short'],
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True
-            )
-
-            if result.returncode == 0:
-                return result.stdout
-        except:
-            pass
-
-        return None
-
-    def parse_log(self, log_output):
-        """Парсинг git лога с numstat"""
-        changes = []
-        current_commit = None
-
-        for line in log_output.split('\n'):
-            if '|' in line and not line.startswith(('A\t', 'M\t', 'D\t')) and not '\t' in line[:5]:
-                # Информация о коммите
-                parts = line.split('|')
-                if len(parts) == 6:
-                    commit_hash = parts[0]
-                    author = parts[1]
-                    email = parts[2]
-                    date = parts[3]
-                    message = parts[4]
-                    full_date = parts[5]
-
-                    # Извлечь час из full_date
-                    try:
-                        dt = datetime.fromisoformat(full_date.replace(' ', 'T').split('+')[0].split('-')[0].strip())
-                        hour = dt.hour
-                    except:
-                        hour = 12
-
-                    current_commit = {
-                        'hash': commit_hash,
-                        'author': author,
-                        'email': email,
-                        'date': date,
-                        'hour': hour,
-                        'message': message,
-                        'files': [],
-                        'stats': {'insertions': 0, 'deletions': 0}
-                    }
-                    changes.append(current_commit)
-
-                    # Contributor stats
-                    self.contributors[author]['commits'] += 1
-                    self.contributors[author]['dates'].append(date)
-
-                    # Time stats
-                    self.hourly_activity[hour] += 1
-                    self.daily_activity[date] += 1
-
-            elif current_commit:
-                # numstat format: insertions deletions filename
-                if '\t' in line:
-                    parts = line.split('\t')
-
-                    if len(parts) == 3:
-                        ins, dels, filename = parts
-
-                        # Попробовать парсить как numstat
-                        try:
-                            insertions = int(ins) if ins != '-' else 0
-                            deletions = int(dels) if dels != '-' else 0
-
-                            current_commit['stats']['insertions'] += insertions
-                            current_commit['stats']['deletions'] += deletions
-
-                            self.contributors[current_commit['author']]['insertions'] += insertions
-                            self.contributors[current_commit['author']]['deletions'] += deletions
-
-                            # File activity
-                            self.file_activity[filename] += 1
-                            self.contributors[current_commit['author']]['files_changed'] += 1
-
-                        except ValueError:
-                            pass
-
-                # name-status format
-                if line.startswith(('A\t', 'M\t', 'D\t')):
-                    status, file_path = line.split('\t', 1)
-                    current_commit['files'].append({
-                        'status': status,
-                        'path': file_path
-                    })
+        self.changes = ledger.commits_since(since_date)
 
-        return changes
+        totals = ledger.aggregate(since_date)
+        self.contributors = totals['contributors']
+        self.file_activity = totals['file_activity']
+        self.file_churn = totals['file_churn']
+        self.hourly_activity = totals['hourly_activity']
+        self.daily_activity = totals['daily_activity']
+        self.daily_stats = totals['daily_stats']
+
+        return True
 
     def categorize_file(self, file_path):
         """Категоризировать файл"""
@@ -1224,13 +1167,10 @@ def main():
     print(f"📂 Репозиторий: {root_dir}\n")
 
     # Получить данные
-    log_output = analyzer.get_git_log()
-
-    if not log_output:
+    if not analyzer.load_changes():
         print("⚠️  Не удалось получить git лог")
         return
 
-    analyzer.changes = analyzer.parse_log(log_output)
     print(f"✅ Найдено коммитов: {len(analyzer.changes)}")
     print(f"✅ Контрибьюторов: {len(analyzer.contributors)}")
     print(f"✅ Файлов изменено: {len(analyzer.file_activity)}\n")
@@ -1341,7 +1281,9 @@ def main():
         print("\n💥 Impact Analysis...")
         impact_analyzer = ChangeImpactAnalyzer(
             analyzer.changes,
-            dict(analyzer.file_activity)
+            dict(analyzer.file_activity),
+            file_churn=analyzer.file_churn,
+            daily_stats=analyzer.daily_stats
         )
 
         # Risky commits
@@ -1371,7 +1313,9 @@ def main():
         print(f"\n🔥 Hotspot Analysis (топ {args.hotspots})...")
         impact_analyzer = ChangeImpactAnalyzer(
             analyzer.changes,
-            dict(analyzer.file_activity)
+            dict(analyzer.file_activity),
+            file_churn=analyzer.file_churn,
+            daily_stats=analyzer.daily_stats
         )
         hotspots = impact_analyzer.identify_hotspots(args.hotspots)
 
@@ -1384,7 +1328,9 @@ def main():
         print("\n📈 Velocity Analysis...")
         impact_analyzer = ChangeImpactAnalyzer(
             analyzer.changes,
-            dict(analyzer.file_activity)
+            dict(analyzer.file_activity),
+            file_churn=analyzer.file_churn,
+            daily_stats=analyzer.daily_stats
         )
         velocity_trend = impact_analyzer.analyze_change_velocity()
 
@@ -15,6 +15,8 @@ import math
 import argparse
 from typing import Dict, List, Tuple, Set
 
+from shared.cooccurrence import CooccurrenceMatrix
+
 
 class TFIDFAnalyzer:
     """
@@ -142,23 +144,17 @@ class SemanticAnalyzer:
 
     def analyze_keyword_cooccurrence(self, min_cooccurrence: int = 3) -> Dict[Tuple[str, str], int]:
         """Анализ совместной встречаемости ключевых слов"""
-        cooccurrence = defaultdict(int)
+        cooccurrence = CooccurrenceMatrix()
 
-        # Для каждой статьи найти пары ключевых слов
+        # Для каждой статьи - все пары ключевых слов
         for article_path in self.engine.articles:
-            topics = self.extract_topics(article_path, 10)
-
-            # Все пары слов
-            for i, word1 in enumerate(topics):
-                for word2 in topics[i+1:]:
-                    pair = tuple(sorted([word1, word2]))
-                    cooccurrence[pair] += 1
+            cooccurrence.add_document(self.extract_topics(article_path, 10))
 
         # Фильтровать по минимальной частоте
-        filtered = {pair: count for pair, count in cooccurrence.items()
-                   if count >= min_cooccurrence}
-
-        return dict(filtered)
+        return {
+            tuple(sorted((word1, word2))): count
+            for word1, word2, count in cooccurrence.pairs(min_count=min_cooccurrence)
+        }
 
     def find_semantic_clusters(self, similarity_threshold: float = 0.3) -> List[List[str]]:
         """Найти кластеры семантически похожих статей"""
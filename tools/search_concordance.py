@@ -22,6 +22,9 @@ import re
 from collections import Counter, defaultdict
 import math
 
+from shared.fuzzy_match import levenshtein
+from shared.tokenizer import stem
+
 
 class QueryParser:
     """Парсинг и оптимизация поисковых запросов"""
@@ -68,17 +71,8 @@ class QueryParser:
         Returns:
             str: основа слова
         """
-        # Простые правила для английского
-        if word.endswith('ing'):
-            return word[:-3]
-        elif word.endswith('ed'):
-            return word[:-2]
-        elif word.endswith('s') and len(word) > 3:
-            return word[:-1]
-        elif word.endswith('ly'):
-            return word[:-2]
-
-        return word
+        # Простые правила для английского (LRU-кэш по слову)
+        return stem(word)
 
     def expand_query(self, query, synonyms=None):
         """
@@ -807,30 +801,9 @@ class AdvancedConcordanceSearch:
 
         return True
 
-    def levenshtein_distance(self, s1, s2):
+    def levenshtein_distance(self, s1, s2, max_distance=None):
         """Вычислить расстояние Левенштейна"""
-        if len(s1) < len(s2):
-            return self.levenshtein_distance(s2, s1)
-
-        if len(s2) == 0:
-            return len(s1)
-
-        previous_row = range(len(s2) + 1)
-
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-
-            for j, c2 in enumerate(s2):
-                # Стоимость вставки, удаления, замены
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-
-                current_row.append(min(insertions, deletions, substitutions))
-
-            previous_row = current_row
-
-        return previous_row[-1]
+        return levenshtein(s1, s2, max_distance)
 
     def fuzzy_search(self, word, max_distance=2):
         """Нечёткий поиск с Levenshtein distance"""
@@ -841,7 +814,7 @@ class AdvancedConcordanceSearch:
         matches = []
 
         for concordance_word in self.concordance.keys():
-            distance = self.levenshtein_distance(word_lower, concordance_word)
+            distance = self.levenshtein_distance(word_lower, concordance_word, max_distance)
 
             if distance <= max_distance:
                 matches.append((concordance_word, distance))
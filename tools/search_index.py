@@ -27,6 +27,17 @@ import math
 import argparse
 from datetime import datetime
 
+from shared.fuzzy_match import levenshtein
+from shared.tokenizer import tokenize
+
+# Stop words (frequent words to ignore)
+STOP_WORDS = frozenset({
+    'и', 'в', 'на', 'с', 'к', 'по', 'для', 'из', 'что', 'это',
+    'как', 'или', 'но', 'а', 'о', 'от', 'до', 'за', 'при', 'не',
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to',
+    'for', 'of', 'as', 'by', 'with', 'from', 'is', 'are', 'was', 'were',
+})
+
 
 class AdvancedSearchIndex:
     """Продвинутая поисковая система с BM25"""
@@ -60,12 +71,7 @@ class AdvancedSearchIndex:
         self.no_result_queries = []
 
         # Stop words (frequent words to ignore)
-        self.stop_words = {
-            'и', 'в', 'на', 'с', 'к', 'по', 'для', 'из', 'что', 'это',
-            'как', 'или', 'но', 'а', 'о', 'от', 'до', 'за', 'при', 'не',
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to',
-            'for', 'of', 'as', 'by', 'with', 'from', 'is', 'are', 'was', 'were',
-        }
+        self.stop_words = STOP_WORDS
 
     def extract_frontmatter_and_content(self, file_path):
         """Извлечь frontmatter и содержимое"""
@@ -81,41 +87,16 @@ class AdvancedSearchIndex:
 
     def tokenize(self, text, remove_stop_words=True):
         """Токенизация с опциональным удалением stop words"""
-        # Удалить markdown
-        text = re.sub(r'[#*`\[\]()]', ' ', text)
-
-        # Извлечь слова (русский + английский)
-        words = re.findall(r'\b[а-яёa-z]{2,}\b', text.lower())
-
-        if remove_stop_words:
-            words = [w for w in words if w not in self.stop_words]
-
-        return words
+        return tokenize(text, min_length=2, stop_words=self.stop_words if remove_stop_words else None)
 
     def extract_headers(self, content):
         """Извлечь все заголовки из markdown"""
         headers = re.findall(r'^#{1,6}\s+(.+)$', content, re.MULTILINE)
         return ' '.join(headers)
 
-    def levenshtein_distance(self, s1, s2):
+    def levenshtein_distance(self, s1, s2, max_distance=None):
         """Расстояние Левенштейна для fuzzy search"""
-        if len(s1) < len(s2):
-            return self.levenshtein_distance(s2, s1)
-
-        if len(s2) == 0:
-            return len(s1)
-
-        previous_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-
-        return previous_row[-1]
+        return levenshtein(s1, s2, max_distance)
 
     def build_index(self):
         """Построить полный индекс"""
@@ -313,7 +294,7 @@ class AdvancedSearchIndex:
         similar_words = []
 
         for indexed_word in self.index.keys():
-            distance = self.levenshtein_distance(query_word, indexed_word)
+            distance = self.levenshtein_distance(query_word, indexed_word, max_distance)
             if distance <= max_distance:
                 similar_words.append((indexed_word, distance))
 
@@ -0,0 +1,20 @@
+"""
+Shared infrastructure for Knowledge Base tools
+
+Модули здесь - не самостоятельные инструменты (ToolRegistry их не видит),
+а общие индексы и кэши, которые используют сразу несколько инструментов:
+
+- link_index - единый индекс ссылок (source → targets, target → sources)
+- git_history - пофайловая история git из одного прохода git log
+- commit_ledger - журнал обработанных коммитов с дневными агрегатами
+- blob_cache - контентно-адресуемый кэш версий файлов из git
+- line_diff - построчный patience diff
+- text_stats - статистика текста статьи за один проход (с кэшем по хэшу)
+- tokenizer - общая токенизация RU/EN, LRU-кэш слогов и основ слов
+- sentence_graph - разреженная матрица предложение × термин, TextRank на numpy
+- fuzzy_match - ограниченное расстояние Левенштейна, BK-дерево, самосоединение строк
+- cooccurrence - разреженная матрица совместной встречаемости (COO → CSR), PMI/NPMI/Жаккар
+- keyword_classifier - пакетная классификация по матрице весов ключевое слово × класс
+- citation_matrix - матрица цитирований в CSR: co-citation, coupling, h/i10-index
+- validation_cache - кэш результатов проверки статей (хэш, версия, правила), пул процессов
+"""
@@ -0,0 +1,212 @@
+"""
+Blob Cache - Контентно-адресуемый кэш содержимого файлов из git
+
+Объекты git неизменны, поэтому содержимое файла хранится один раз
+по его object id (.git_blob_cache/objects/ab/cdef...). Соответствие
+"полный SHA коммита + путь -> blob id" тоже неизменно и сохраняется
+в .git_blob_cache/ids.json. Повторное сравнение тех же версий не
+запускает git вовсе; промахи дочитываются одним `git cat-file --batch`
+на весь запрос, а не отдельным `git show` на каждую версию.
+"""
+
+from pathlib import Path
+import re
+import json
+import subprocess
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+FULL_SHA = re.compile(r'^[0-9a-f]{40}$')
+
+
+class BlobCache:
+    """Кэш содержимого git blob по object id"""
+
+    def __init__(self, root_dir=".", cache_dir=".git_blob_cache"):
+        self.root_dir = Path(root_dir).resolve()
+        self.cache_dir = self.root_dir / cache_dir
+        self.objects_dir = self.cache_dir / "objects"
+        self.ids_file = self.cache_dir / "ids.json"
+
+        # "sha:path" -> blob id (только полные SHA - они неизменны)
+        self.ids: Dict[str, Optional[str]] = {}
+        self._ids_dirty = False
+
+        self._load_ids()
+
+    def _load_ids(self):
+        if not self.ids_file.exists():
+            return
+        try:
+            with open(self.ids_file, 'r', encoding='utf-8') as f:
+                self.ids = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.ids = {}
+
+    def save(self):
+        """Сохранить соответствия коммит:путь -> blob id"""
+        if not self._ids_dirty:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.ids_file, 'w', encoding='utf-8') as f:
+            json.dump(self.ids, f)
+        self._ids_dirty = False
+
+    # ========================
+    # Objects
+    # ========================
+
+    def _object_path(self, oid: str) -> Path:
+        return self.objects_dir / oid[:2] / oid[2:]
+
+    def _read_object(self, oid: str) -> Optional[bytes]:
+        try:
+            return self._object_path(oid).read_bytes()
+        except OSError:
+            return None
+
+    def _write_object(self, oid: str, data: bytes):
+        path = self._object_path(oid)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(data)
+        tmp.replace(path)
+
+    def _cat_file(self, specs: List[str]) -> Dict[str, Tuple[Optional[str], Optional[bytes]]]:
+        """
+        Один `git cat-file --batch` для списка спецификаций (oid или rev:path)
+
+        Returns: spec -> (oid, содержимое) или (None, None), если объекта нет
+        """
+        results = {spec: (None, None) for spec in specs}
+        if not specs:
+            return results
+
+        try:
+            proc = subprocess.run(
+                ['git', 'cat-file', '--batch'],
+                cwd=self.root_dir,
+                input=''.join(f'{spec}\n' for spec in specs).encode('utf-8'),
+                capture_output=True
+            )
+        except OSError:
+            return results
+
+        if proc.returncode != 0:
+            return results
+
+        out = proc.stdout
+        pos = 0
+        for spec in specs:
+            newline = out.find(b'\n', pos)
+            if newline == -1:
+                break
+            header = out[pos:newline].decode('utf-8', errors='replace').split()
+            pos = newline + 1
+
+            # "<oid> <type> <size>" или "<spec> missing"/"ambiguous"
+            if len(header) == 3 and header[2].isdigit():
+                size = int(header[2])
+                data = out[pos:pos + size]
+                pos += size + 1
+                if header[1] == 'blob':
+                    results[spec] = (header[0], data)
+
+        return results
+
+    # ========================
+    # Queries
+    # ========================
+
+    def read_blobs(self, oids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Содержимое blob по id (промахи - одним вызовом git)"""
+        contents = {}
+        missing = []
+
+        for oid in oids:
+            if oid in contents:
+                continue
+            data = self._read_object(oid)
+            if data is None:
+                missing.append(oid)
+                contents[oid] = None
+            else:
+                contents[oid] = data.decode('utf-8', errors='replace')
+
+        if not missing:
+            return contents
+
+        for oid, (found, data) in self._cat_file(missing).items():
+            if found:
+                self._write_object(found, data)
+                contents[oid] = data.decode('utf-8', errors='replace')
+
+        return contents
+
+    def read_blob(self, oid: str) -> Optional[str]:
+        return self.read_blobs([oid]).get(oid)
+
+    def files_at(self, requests: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        Содержимое файлов на коммитах: [(commit, path)] -> {(commit, path): text}
+        """
+        contents = {}
+        missing = []
+
+        for commit, path in requests:
+            key = f'{commit}:{path}'
+            if (commit, path) in contents:
+                continue
+
+            oid = self.ids.get(key)
+            data = self._read_object(oid) if oid else None
+
+            if data is not None:
+                contents[(commit, path)] = data.decode('utf-8', errors='replace')
+            elif key in self.ids and oid is None:
+                # Известно, что файла на этом коммите нет
+                contents[(commit, path)] = None
+            else:
+                contents[(commit, path)] = None
+                missing.append((commit, path))
+
+        if not missing:
+            return contents
+
+        results = self._cat_file([f'{commit}:{path}' for commit, path in missing])
+
+        for commit, path in missing:
+            key = f'{commit}:{path}'
+            oid, data = results[key]
+
+            if oid:
+                self._write_object(oid, data)
+                contents[(commit, path)] = data.decode('utf-8', errors='replace')
+
+            if FULL_SHA.match(commit):
+                self.ids[key] = oid
+                self._ids_dirty = True
+
+        self.save()
+        return contents
+
+    def file_at(self, commit: str, path: str) -> Optional[str]:
+        """Содержимое файла на коммите"""
+        return self.files_at([(commit, path)]).get((commit, path))
+
+    def blob_id(self, commit: str, path: str) -> Optional[str]:
+        """Blob id файла на коммите (с загрузкой содержимого в кэш)"""
+        key = f'{commit}:{path}'
+
+        if FULL_SHA.match(commit):
+            if key not in self.ids:
+                self.files_at([(commit, path)])
+            return self.ids.get(key)
+
+        # Не полный SHA (ветка, HEAD~1) - соответствие не кэшируется
+        oid, data = self._cat_file([key])[key]
+        if oid:
+            self._write_object(oid, data)
+        return oid
@@ -0,0 +1,247 @@
+"""
+Citation Matrix - Разреженная матрица цитирований
+
+citation_index (co-citation, bibliographic coupling, h/i10-index) и
+backlinks_generator (взаимные цитирования) перебирали пары статей для
+каждой запрошенной статьи.
+
+CitationMatrix хранит граф как матрицу C в CSR: C[i, j] = 1, если статья i
+цитирует j (повторные ссылки считаются один раз). Всё остальное
+вычисляется один раз на весь граф:
+
+- co-citation - CᵀC: сколько статей цитируют i и j вместе;
+- bibliographic coupling - CCᵀ: сколько источников у i и j общих;
+  оба произведения - сумма внешних произведений строк, то есть
+  совместная встречаемость (shared/cooccurrence.py) ссылок одной статьи
+  или цитирующих одну статью;
+- взаимные цитирования - C ∧ Cᵀ;
+- h-index и i10-index всех статей - по отсортированным внутри столбцов
+  C значениям (например, числу цитирований цитирующих статей).
+
+numpy - необязательная зависимость: без неё те же структуры
+обрабатываются циклами Python.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from shared.cooccurrence import NUMPY_AVAILABLE, CooccurrenceMatrix
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+
+class CitationMatrix:
+    """Ориентированный граф цитирований как разреженная матрица C"""
+
+    def __init__(self, edges: Iterable[Tuple[str, str]], nodes: Iterable[str] = (),
+                 use_numpy: Optional[bool] = None):
+        """
+        Args:
+            edges: пары (цитирующая статья, цитируемая статья)
+            nodes: статьи в нужном порядке (задают порядок при равенстве оценок);
+                   статьи из edges, которых нет в nodes, добавляются в конец
+        """
+        self.use_numpy = NUMPY_AVAILABLE if use_numpy is None else use_numpy and NUMPY_AVAILABLE
+
+        self.index: Dict[str, int] = {}
+        self.nodes: List[str] = []
+        for node in nodes:
+            self._node_id(node)
+
+        pairs = sorted({(self._node_id(source), self._node_id(target)) for source, target in edges})
+
+        # CSR строк C (цитирует) и столбцов C (цитируют)
+        self.indptr, self.indices = self._csr(pairs)
+        self.t_indptr, self.t_indices = self._csr(sorted((b, a) for a, b in pairs))
+
+        self._cocitation = None
+        self._coupling = None
+        self._related = {}
+
+    def _node_id(self, node: str) -> int:
+        node_id = self.index.get(node)
+        if node_id is None:
+            node_id = self.index[node] = len(self.nodes)
+            self.nodes.append(node)
+        return node_id
+
+    def _csr(self, pairs: Sequence[Tuple[int, int]]):
+        """indptr/indices из отсортированных пар (строка, столбец)"""
+        counts = [0] * (len(self.nodes) + 1)
+        for row, _ in pairs:
+            counts[row + 1] += 1
+        for i in range(len(self.nodes)):
+            counts[i + 1] += counts[i]
+        indices = [col for _, col in pairs]
+
+        if self.use_numpy:
+            return np.array(counts, dtype=np.int64), np.array(indices, dtype=np.int64)
+        return counts, indices
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @property
+    def edges(self) -> int:
+        """Число различных рёбер (ненулевых элементов C)"""
+        return len(self.indices)
+
+    # ========================
+    # Rows and columns
+    # ========================
+
+    def _row(self, indptr, indices, node: str) -> List[str]:
+        node_id = self.index.get(node)
+        if node_id is None:
+            return []
+        start, end = int(indptr[node_id]), int(indptr[node_id + 1])
+        return [self.nodes[int(col)] for col in indices[start:end]]
+
+    def cites(self, node: str) -> List[str]:
+        """Статьи, которые цитирует node"""
+        return self._row(self.indptr, self.indices, node)
+
+    def cited_by(self, node: str) -> List[str]:
+        """Статьи, которые цитируют node"""
+        return self._row(self.t_indptr, self.t_indices, node)
+
+    def out_degree(self) -> List[int]:
+        """Число различных цитируемых статей для каждого узла"""
+        return [int(self.indptr[i + 1] - self.indptr[i]) for i in range(len(self.nodes))]
+
+    def in_degree(self) -> List[int]:
+        """Число различных цитирующих статей для каждого узла"""
+        return [int(self.t_indptr[i + 1] - self.t_indptr[i]) for i in range(len(self.nodes))]
+
+    # ========================
+    # Products
+    # ========================
+
+    def _outer_products(self, indptr, indices) -> CooccurrenceMatrix:
+        """Σ по строкам внешних произведений - недиагональная часть MᵀM"""
+        matrix = CooccurrenceMatrix(use_numpy=self.use_numpy)
+
+        # Все узлы заранее - идентификаторы совпадают с self.nodes
+        for node in self.nodes:
+            matrix.term_id(node)
+
+        for row in range(len(self.nodes)):
+            start, end = int(indptr[row]), int(indptr[row + 1])
+            if end - start > 1:
+                matrix.add_document([self.nodes[int(col)] for col in indices[start:end]])
+        return matrix
+
+    def cocitation_matrix(self) -> CooccurrenceMatrix:
+        """CᵀC: статьи, цитируемые вместе"""
+        if self._cocitation is None:
+            self._cocitation = self._outer_products(self.indptr, self.indices)
+        return self._cocitation
+
+    def coupling_matrix(self) -> CooccurrenceMatrix:
+        """CCᵀ: статьи с общими источниками"""
+        if self._coupling is None:
+            self._coupling = self._outer_products(self.t_indptr, self.t_indices)
+        return self._coupling
+
+    def _related_all(self, kind: str, min_count: int) -> Dict[str, List[Tuple[str, int]]]:
+        key = (kind, min_count)
+        if key not in self._related:
+            matrix = self.cocitation_matrix() if kind == 'cocitation' else self.coupling_matrix()
+            self._related[key] = matrix.related_all(top_n=None, min_count=min_count)
+        return self._related[key]
+
+    def cocitations(self, node: str, min_count: int = 1) -> List[Tuple[str, int]]:
+        """
+        Статьи, цитируемые вместе с node [(article, count)] по убыванию
+        (при равенстве - в порядке узлов); порог применяется ко всей
+        матрице один раз и переиспользуется для всех статей
+        """
+        return self._related_all('cocitation', min_count).get(node, [])
+
+    def coupling(self, node: str, min_count: int = 1) -> List[Tuple[str, int]]:
+        """Статьи с общими с node источниками [(article, count)] по убыванию"""
+        return self._related_all('coupling', min_count).get(node, [])
+
+    def mutual_pairs(self) -> List[Tuple[str, str]]:
+        """Взаимные цитирования (C ∧ Cᵀ): отсортированные пары (a, b), a < b"""
+        n = len(self.nodes)
+
+        if self.use_numpy:
+            rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.indptr))
+            cols = self.indices
+            keys = rows * n + cols
+            mutual = np.isin(cols * n + rows, keys) & (rows < cols)
+            found = zip(rows[mutual].tolist(), cols[mutual].tolist())
+        else:
+            edges = set()
+            for row in range(n):
+                for col in self.indices[self.indptr[row]:self.indptr[row + 1]]:
+                    edges.add((row, col))
+            found = [(a, b) for a, b in edges if a < b and (b, a) in edges]
+
+        return sorted(tuple(sorted((self.nodes[a], self.nodes[b]))) for a, b in found)
+
+    # ========================
+    # Indices
+    # ========================
+
+    def _citing_values(self, values: Sequence[float]):
+        """Значения цитирующих статей по столбцам C: (столбец, значение)"""
+        if self.use_numpy:
+            cols = np.repeat(np.arange(len(self.nodes), dtype=np.int64), np.diff(self.t_indptr))
+            return cols, np.asarray(values, dtype=np.float64)[self.t_indices]
+
+        cols, citing = [], []
+        for col in range(len(self.nodes)):
+            for row in self.t_indices[self.t_indptr[col]:self.t_indptr[col + 1]]:
+                cols.append(col)
+                citing.append(values[row])
+        return cols, citing
+
+    def h_indices(self, values: Optional[Sequence[float]] = None) -> List[int]:
+        """
+        h-index каждого узла: максимальное h, при котором у узла есть h
+        цитирующих статей со значением не меньше h
+
+        Args:
+            values: значение каждого узла (по умолчанию - in-degree)
+        """
+        if values is None:
+            values = self.in_degree()
+
+        n = len(self.nodes)
+        cols, citing = self._citing_values(values)
+
+        if self.use_numpy:
+            # Внутри столбца - по убыванию значения; h = число позиций с value >= rank
+            order = np.lexsort((-citing, cols))
+            cols, citing = cols[order], citing[order]
+            rank = np.arange(1, len(cols) + 1) - np.asarray(self.t_indptr)[cols]
+            return np.bincount(cols[citing >= rank], minlength=n).tolist()
+
+        result = []
+        for col in range(n):
+            start, end = self.t_indptr[col], self.t_indptr[col + 1]
+            ranked = sorted(citing[start:end], reverse=True)
+            result.append(sum(1 for rank, value in enumerate(ranked, 1) if value >= rank))
+        return result
+
+    def count_at_least(self, threshold: float, values: Optional[Sequence[float]] = None) -> List[int]:
+        """
+        Число цитирующих статей со значением >= threshold для каждого узла
+        (i10-index при threshold=10)
+        """
+        if values is None:
+            values = self.in_degree()
+
+        n = len(self.nodes)
+        cols, citing = self._citing_values(values)
+
+        if self.use_numpy:
+            return np.bincount(cols[citing >= threshold], minlength=n).tolist()
+
+        result = [0] * n
+        for col, value in zip(cols, citing):
+            if value >= threshold:
+                result[col] += 1
+        return result
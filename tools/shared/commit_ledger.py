@@ -0,0 +1,296 @@
+"""
+Commit Ledger - Журнал обработанных коммитов с инкрементальными агрегатами
+
+recent_changes раньше на каждый запуск заново разбирал `git log --since`
+и пересчитывал статистику контрибьюторов, hotspots и velocity. Теперь:
+
+- .commit_ledger.jsonl - append-only журнал: одна строка на коммит
+  (в формате recent_changes, с numstat по каждому файлу);
+- .commit_ledger_state.json - последний обработанный SHA, дневные агрегаты
+  (коммиты/строки по авторам, файлам и часам) и смещения сегментов журнала.
+
+Каждый запуск читает только коммиты last_sha..HEAD, дописывает их в журнал
+и добавляет к дневным агрегатам. Статистика за окно N дней - сумма дневных
+корзин, а коммиты окна читаются с нужного сегмента журнала, а не с начала.
+Если история переписана (last_sha больше не предок HEAD), журнал строится заново.
+"""
+
+from pathlib import Path
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from shared.git_history import read_log, run_git
+
+
+class CommitLedger:
+    """Append-only журнал коммитов с дневными агрегатами"""
+
+    # 2: пути файлов без C-кавычек (git_history.run_git)
+    VERSION = 2
+
+    def __init__(self, root_dir=".", ledger_file=".commit_ledger.jsonl",
+                 state_file=".commit_ledger_state.json"):
+        self.root_dir = Path(root_dir).resolve()
+        self.ledger_file = self.root_dir / ledger_file
+        self.state_file = self.root_dir / state_file
+
+        self.last_sha: Optional[str] = None
+
+        # date -> {'commits', 'insertions', 'deletions', 'hours': {h: n},
+        #          'authors': {author: {...}}, 'files': {path: [changes, churn]}}
+        self.days: Dict[str, Dict] = {}
+
+        # Сегменты журнала: [{'offset', 'max_date'}] - по одному на update()
+        self.segments: List[Dict] = []
+
+        self.load()
+
+    @classmethod
+    def open(cls, root_dir=".") -> 'CommitLedger':
+        """Загрузить журнал и дописать новые коммиты"""
+        ledger = cls(root_dir)
+        ledger.update()
+        return ledger
+
+    # ========================
+    # Persistence
+    # ========================
+
+    def load(self):
+        """Загрузить состояние журнала"""
+        if not self.state_file.exists() or not self.ledger_file.exists():
+            return
+
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+
+        if data.get('version') != self.VERSION:
+            return
+
+        # Журнал обрезан или повреждён - состояние ему не соответствует
+        if data.get('ledger_size') != self.ledger_file.stat().st_size:
+            return
+
+        self.last_sha = data.get('last_sha')
+        self.days = data.get('days', {})
+        self.segments = data.get('segments', [])
+
+    def save(self):
+        """Сохранить состояние (журнал уже дописан)"""
+        data = {
+            'version': self.VERSION,
+            'last_sha': self.last_sha,
+            'updated': datetime.now().isoformat(),
+            'ledger_size': self.ledger_file.stat().st_size,
+            'segments': self.segments,
+            'days': self.days
+        }
+
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    def _reset(self):
+        self.last_sha = None
+        self.days = {}
+        self.segments = []
+        self.ledger_file.write_text('', encoding='utf-8')
+
+    # ========================
+    # Building
+    # ========================
+
+    def update(self) -> int:
+        """
+        Обработать коммиты после last_sha
+
+        Returns: количество новых коммитов
+        """
+        result = run_git(self.root_dir, 'rev-parse', 'HEAD')
+        if result is None or result.returncode != 0:
+            return 0
+
+        head = result.stdout.strip()
+        if head == self.last_sha:
+            return 0
+
+        incremental = False
+        if self.last_sha:
+            ancestor = run_git(self.root_dir, 'merge-base', '--is-ancestor', self.last_sha, 'HEAD')
+            incremental = ancestor is not None and ancestor.returncode == 0
+
+        if not incremental:
+            self._reset()
+
+        log = read_log(self.root_dir, f'{self.last_sha}..{head}' if incremental else head)
+        if log is None:
+            return 0
+
+        # git log отдаёт от новых к старым - в журнал пишем в хронологическом порядке
+        commits = [self._to_change(entry) for entry in reversed(log)]
+
+        if commits:
+            offset = self.ledger_file.stat().st_size if self.ledger_file.exists() else 0
+            with open(self.ledger_file, 'a', encoding='utf-8') as f:
+                for commit in commits:
+                    f.write(json.dumps(commit, ensure_ascii=False) + '\n')
+                    self._add_to_aggregates(commit)
+
+            self.segments.append({
+                'offset': offset,
+                'max_date': max(commit['date'] for commit in commits)
+            })
+
+        self.last_sha = head
+        self.save()
+
+        return len(commits)
+
+    @staticmethod
+    def _to_change(entry: Dict) -> Dict:
+        """Коммит git_history -> запись журнала (формат recent_changes)"""
+        try:
+            dt = datetime.fromisoformat(entry['date'])
+            date, hour = dt.strftime('%Y-%m-%d'), dt.hour
+        except ValueError:
+            date, hour = entry['date'][:10], 12
+
+        files = [
+            {'status': status, 'path': path, 'insertions': added, 'deletions': removed}
+            for status, path, _, added, removed, _ in entry['files']
+        ]
+
+        return {
+            'hash': entry['hash'],
+            'author': entry['author'],
+            'email': entry['email'],
+            'date': date,
+            'hour': hour,
+            'message': entry['message'],
+            'files': files,
+            'stats': {
+                'insertions': sum(f['insertions'] for f in files),
+                'deletions': sum(f['deletions'] for f in files)
+            }
+        }
+
+    def _add_to_aggregates(self, commit: Dict):
+        day = self.days.setdefault(commit['date'], {
+            'commits': 0,
+            'insertions': 0,
+            'deletions': 0,
+            'hours': {},
+            'authors': {},
+            'files': {}
+        })
+
+        insertions = commit['stats']['insertions']
+        deletions = commit['stats']['deletions']
+
+        day['commits'] += 1
+        day['insertions'] += insertions
+        day['deletions'] += deletions
+
+        # Ключи JSON - строки
+        hour = str(commit['hour'])
+        day['hours'][hour] = day['hours'].get(hour, 0) + 1
+
+        author = day['authors'].setdefault(commit['author'], {
+            'commits': 0, 'files_changed': 0, 'insertions': 0, 'deletions': 0
+        })
+        author['commits'] += 1
+        author['files_changed'] += len(commit['files'])
+        author['insertions'] += insertions
+        author['deletions'] += deletions
+
+        for file_info in commit['files']:
+            stats = day['files'].setdefault(file_info['path'], [0, 0])
+            stats[0] += 1
+            stats[1] += file_info['insertions'] + file_info['deletions']
+
+    # ========================
+    # Queries
+    # ========================
+
+    def commits_since(self, since_date: str) -> List[Dict]:
+        """Коммиты с датой >= since_date (YYYY-MM-DD), от новых к старым"""
+        start = None
+        for segment in self.segments:
+            if segment['max_date'] >= since_date:
+                start = segment['offset']
+                break
+
+        if start is None:
+            return []
+
+        commits = []
+        with open(self.ledger_file, 'r', encoding='utf-8') as f:
+            f.seek(start)
+            for line in f:
+                if not line.strip():
+                    continue
+                commit = json.loads(line)
+                if commit['date'] >= since_date:
+                    commits.append(commit)
+
+        commits.reverse()
+        return commits
+
+    def aggregate(self, since_date: str) -> Dict:
+        """
+        Сумма дневных корзин начиная с since_date
+
+        Returns: {'contributors', 'file_activity', 'file_churn',
+                  'hourly_activity', 'daily_activity', 'daily_stats'}
+        """
+        contributors = defaultdict(lambda: {
+            'commits': 0,
+            'files_changed': 0,
+            'insertions': 0,
+            'deletions': 0,
+            'dates': []
+        })
+        file_activity = defaultdict(int)
+        file_churn = defaultdict(int)
+        hourly_activity = defaultdict(int)
+        daily_activity = defaultdict(int)
+        daily_stats = {}
+
+        for date in sorted(self.days):
+            if date < since_date:
+                continue
+
+            day = self.days[date]
+            daily_activity[date] = day['commits']
+            daily_stats[date] = {
+                'commits': day['commits'],
+                'changes': day['insertions'] + day['deletions']
+            }
+
+            for hour, count in day['hours'].items():
+                hourly_activity[int(hour)] += count
+
+            for author, stats in day['authors'].items():
+                totals = contributors[author]
+                totals['commits'] += stats['commits']
+                totals['files_changed'] += stats['files_changed']
+                totals['insertions'] += stats['insertions']
+                totals['deletions'] += stats['deletions']
+                totals['dates'].extend([date] * stats['commits'])
+
+            for path, (changes, churn) in day['files'].items():
+                file_activity[path] += changes
+                file_churn[path] += churn
+
+        return {
+            'contributors': contributors,
+            'file_activity': file_activity,
+            'file_churn': file_churn,
+            'hourly_activity': hourly_activity,
+            'daily_activity': daily_activity,
+            'daily_stats': daily_stats
+        }
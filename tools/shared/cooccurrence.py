@@ -0,0 +1,434 @@
+"""
+Cooccurrence - Разреженная матрица совместной встречаемости терминов
+
+weighted_tags, tags_cloud, build_thesaurus, build_concordance и
+related_articles раньше держали вложенные словари счётчиков пар
+(dict[str][str] → int) - сотни байт на каждую пару, а запросы "самые
+связанные термины" сортировали словари Python.
+
+CooccurrenceMatrix:
+
+- термины получают целочисленные идентификаторы (в порядке первого
+  появления);
+- пары накапливаются буфером ключей COO (a << 32 | b, a <= b) в
+  компактном array, буфер периодически сворачивается в отсортированные
+  уникальные ключи со счётчиками;
+- для запросов строится симметричная CSR-матрица (indptr, indices, data);
+- две модели накопления: по документу (каждая пара различных терминов
+  документа - один раз) и по окну (все пары позиций на расстоянии не
+  больше window_size);
+- оценки: count, PMI, NPMI (по маргиналам матрицы) и Жаккар (по частотам
+  терминов), топ-k связанных терминов для одного термина или для всех
+  сразу.
+
+numpy - необязательная зависимость: без неё те же структуры
+обрабатываются циклами Python.
+"""
+
+import math
+from array import array
+from collections import Counter
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Optional dependencies для векторных вычислений
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+MEASURES = ('count', 'pmi', 'npmi', 'jaccard')
+
+# Сколько ключей пар копить в буфере до свёртки
+COMPACT_THRESHOLD = 1 << 22
+
+_SHIFT = 32
+_MASK = (1 << _SHIFT) - 1
+
+
+class CooccurrenceMatrix:
+    """Симметричная матрица совместной встречаемости терминов"""
+
+    def __init__(self, use_numpy: Optional[bool] = None):
+        self.use_numpy = NUMPY_AVAILABLE if use_numpy is None else use_numpy and NUMPY_AVAILABLE
+
+        self.vocabulary: Dict[str, int] = {}
+        self.terms: List[str] = []
+
+        # Документов (add_document) или токенов (add_window) с термином
+        self.term_counts = array('q')
+        self.units = 0
+
+        # Накопленные пары: буфер ключей и свёрнутые (ключ → счётчик)
+        self._buffer = array('q')
+        self._keys = None
+        self._values = None
+
+        self._csr = None
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, term: str) -> bool:
+        """Есть ли у термина хотя бы одна пара"""
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            return False
+        indptr = self.csr()[0]
+        return bool(indptr[term_id + 1] > indptr[term_id])
+
+    # ========================
+    # Accumulation
+    # ========================
+
+    def term_id(self, term: str) -> int:
+        """Идентификатор термина (новый термин добавляется в словарь)"""
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self.vocabulary[term] = term_id
+            self.terms.append(term)
+            self.term_counts.append(0)
+        return term_id
+
+    def add_document(self, terms: Iterable[str]):
+        """Документная модель: каждая пара различных терминов - один раз"""
+        ids = list(dict.fromkeys(self.term_id(term) for term in terms))
+        self.units += 1
+
+        for term_id in ids:
+            self.term_counts[term_id] += 1
+
+        if len(ids) < 2:
+            return
+
+        self._buffer.extend(
+            (min(a, b) << _SHIFT) | max(a, b) for a, b in combinations(ids, 2)
+        )
+        self._changed()
+
+    def add_window(self, tokens: Sequence[str], window_size: Optional[int] = None):
+        """
+        Оконная модель: все пары позиций на расстоянии ≤ window_size
+        (None - все пары последовательности)
+
+        Пара позиций с одинаковым термином увеличивает диагональ на 2 -
+        как если бы каждая позиция отдельно считала соседей по окну.
+        """
+        ids = [self.term_id(token) for token in tokens]
+        self.units += len(ids)
+
+        for term_id in ids:
+            self.term_counts[term_id] += 1
+
+        n = len(ids)
+        if n < 2:
+            return
+
+        window = n - 1 if window_size is None else min(window_size, n - 1)
+
+        if self.use_numpy:
+            ids_array = np.asarray(ids, dtype=np.int64)
+            positions = np.arange(n)
+            for offset in range(1, window + 1):
+                self._extend(ids_array, positions[:-offset], positions[offset:])
+        else:
+            for offset in range(1, window + 1):
+                self._buffer.extend(
+                    (min(a, b) << _SHIFT) | max(a, b) for a, b in zip(ids, ids[offset:])
+                )
+        self._changed()
+
+    def _extend(self, ids, first, second):
+        """Добавить в буфер пары позиций (numpy)"""
+        a, b = ids[first], ids[second]
+        keys = (np.minimum(a, b) << _SHIFT) | np.maximum(a, b)
+        self._buffer.frombytes(keys.astype(np.int64).tobytes())
+
+    def _changed(self):
+        if len(self._buffer) >= COMPACT_THRESHOLD:
+            self._compact()
+
+    def _compact(self):
+        """Свернуть буфер в уникальные ключи со счётчиками"""
+        if not len(self._buffer):
+            return
+
+        base_keys, base_values = self._canonical()
+
+        if self.use_numpy:
+            keys = np.frombuffer(self._buffer, dtype=np.int64)
+            values = np.ones(len(keys), dtype=np.int64)
+            if base_keys is not None:
+                keys = np.concatenate([base_keys, keys])
+                values = np.concatenate([base_values, values])
+            self._keys, inverse = np.unique(keys, return_inverse=True)
+            self._values = np.bincount(inverse.ravel(), weights=values,
+                                       minlength=len(self._keys)).astype(np.int32)
+        else:
+            counts = Counter(self._buffer)
+            if base_keys is not None:
+                counts.update(dict(zip(base_keys, base_values)))
+            self._keys = array('q', sorted(counts))
+            self._values = array('i', (counts[key] for key in self._keys))
+
+        self._buffer = array('q')
+        self._csr = None
+
+    def _canonical(self):
+        """Свёрнутые пары (a <= b): из ключей или обратно из CSR"""
+        if self._keys is not None or self._csr is None:
+            return self._keys, self._values
+
+        indptr, indices, data = self._csr
+
+        if self.use_numpy:
+            rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+            upper = rows <= indices
+            rows, cols, values = rows[upper], indices[upper].astype(np.int64), data[upper]
+            values = np.where(rows == cols, values // 2, values)
+            return (rows.astype(np.int64) << _SHIFT) | cols, values.astype(np.int64)
+
+        keys, values = array('q'), array('i')
+        for row in range(len(indptr) - 1):
+            for position in range(indptr[row], indptr[row + 1]):
+                col = indices[position]
+                if row <= col:
+                    keys.append((row << _SHIFT) | col)
+                    values.append(data[position] // 2 if row == col else data[position])
+        return keys, values
+
+    # ========================
+    # CSR
+    # ========================
+
+    def csr(self):
+        """
+        Симметричная CSR-матрица (indptr, indices, data)
+
+        После построения CSR - единственное хранилище свёрнутых пар
+        (индексы и счётчики int32), ключи COO освобождаются.
+        """
+        self._compact()
+        size = len(self.terms)
+
+        if self._csr is None:
+            self._csr = self._build_csr()
+            self._keys = self._values = None
+
+        # Термины без пар, добавленные после построения
+        indptr, indices, data = self._csr
+        if len(indptr) < size + 1:
+            if self.use_numpy:
+                indptr = np.concatenate([indptr, np.full(size + 1 - len(indptr), indptr[-1])])
+            else:
+                indptr = indptr + [indptr[-1]] * (size + 1 - len(indptr))
+            self._csr = (indptr, indices, data)
+
+        return self._csr
+
+    def _build_csr(self):
+        size = len(self.terms)
+
+        if self._keys is None:
+            if self.use_numpy:
+                empty = np.zeros(0, dtype=np.int32)
+                return np.zeros(size + 1, dtype=np.int64), empty, empty
+            return [0] * (size + 1), array('i'), array('i')
+
+        if self.use_numpy:
+            rows = self._keys >> _SHIFT
+            cols = self._keys & _MASK
+            values = self._values
+
+            off_diagonal = rows != cols
+            all_rows = np.concatenate([rows, cols[off_diagonal]])
+            all_cols = np.concatenate([cols, rows[off_diagonal]])
+            # Диагональ: пара одинаковых терминов считается с обеих сторон
+            all_values = np.concatenate([np.where(off_diagonal, values, 2 * values),
+                                         values[off_diagonal]])
+
+            order = np.lexsort((all_cols, all_rows))
+            indptr = np.zeros(size + 1, dtype=np.int64)
+            np.cumsum(np.bincount(all_rows, minlength=size), out=indptr[1:])
+            return indptr, all_cols[order].astype(np.int32), all_values[order].astype(np.int32)
+
+        rows = [[] for _ in range(size)]
+        for key, value in zip(self._keys, self._values):
+            a, b = key >> _SHIFT, key & _MASK
+            if a == b:
+                rows[a].append((b, 2 * value))
+            else:
+                rows[a].append((b, value))
+                rows[b].append((a, value))
+
+        indptr, indices, data = [0], array('i'), array('i')
+        for row in rows:
+            row.sort()
+            indices.extend(col for col, _ in row)
+            data.extend(value for _, value in row)
+            indptr.append(len(indices))
+        return indptr, indices, data
+
+    def count(self, term1: str, term2: str) -> int:
+        """Счётчик пары"""
+        a, b = self.vocabulary.get(term1), self.vocabulary.get(term2)
+        if a is None or b is None:
+            return 0
+
+        indptr, indices, data = self.csr()
+        start, end = int(indptr[a]), int(indptr[a + 1])
+        for position in range(start, end):
+            if indices[position] == b:
+                return int(data[position])
+        return 0
+
+    def pairs(self, min_count: int = 1) -> List[Tuple[str, str, int]]:
+        """Пары различных терминов [(term1, term2, count)] по идентификаторам"""
+        indptr, indices, data = self.csr()
+
+        result = []
+        for term_id, term in enumerate(self.terms):
+            start, end = int(indptr[term_id]), int(indptr[term_id + 1])
+            for col, value in zip(indices[start:end].tolist() if self.use_numpy else indices[start:end],
+                                  data[start:end].tolist() if self.use_numpy else data[start:end]):
+                if col > term_id and value >= min_count:
+                    result.append((term, self.terms[col], value))
+        return result
+
+    def to_dict(self) -> Dict[str, Dict[str, int]]:
+        """Вложенный словарь {term: {other: count}} (для JSON)"""
+        indptr, indices, data = self.csr()
+        result = {}
+        for term_id, term in enumerate(self.terms):
+            start, end = int(indptr[term_id]), int(indptr[term_id + 1])
+            if start < end:
+                result[term] = {self.terms[int(col)]: int(value)
+                                for col, value in zip(indices[start:end], data[start:end])}
+        return result
+
+    # ========================
+    # Scores
+    # ========================
+
+    def _marginals(self):
+        """Суммы строк и общая сумма матрицы"""
+        indptr, _, data = self.csr()
+        if self.use_numpy:
+            rows = np.repeat(np.arange(len(self.terms)), np.diff(indptr))
+            sums = np.bincount(rows, weights=data, minlength=len(self.terms))
+            return sums, float(data.sum())
+
+        sums = [sum(data[indptr[i]:indptr[i + 1]]) for i in range(len(self.terms))]
+        return sums, float(sum(data))
+
+    def _score_numpy(self, rows, cols, counts, measure):
+        counts = counts.astype(np.float64)
+        if measure == 'count':
+            return counts
+
+        if measure == 'jaccard':
+            term_counts = np.array(self.term_counts, dtype=np.float64)
+            union = term_counts[rows] + term_counts[cols] - counts
+            return np.divide(counts, union, out=np.zeros_like(counts), where=union > 0)
+
+        sums, total = self._marginals()
+        pmi = np.log(counts * total / (sums[rows] * sums[cols]))
+        if measure == 'pmi':
+            return pmi
+
+        joint = -np.log(counts / total)
+        return np.divide(pmi, joint, out=np.ones_like(pmi), where=joint > 0)
+
+    def _score_python(self, row, col, count, measure, marginals=None):
+        if measure == 'count':
+            return float(count)
+
+        if measure == 'jaccard':
+            union = self.term_counts[row] + self.term_counts[col] - count
+            return count / union if union > 0 else 0.0
+
+        sums, total = marginals
+        pmi = math.log(count * total / (sums[row] * sums[col]))
+        if measure == 'pmi':
+            return pmi
+
+        joint = -math.log(count / total)
+        return pmi / joint if joint > 0 else 1.0
+
+    def related(self, term: str, top_n: Optional[int] = 10, measure: str = 'count',
+                min_count: int = 1) -> List[Tuple[str, float]]:
+        """
+        Самые связанные термины [(term, score)] по убыванию оценки
+        (при равенстве - по порядку первого появления термина)
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown measure: {measure}")
+
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            return []
+
+        indptr, indices, data = self.csr()
+        start, end = int(indptr[term_id]), int(indptr[term_id + 1])
+
+        if self.use_numpy:
+            cols, counts = indices[start:end], data[start:end]
+            keep = (cols != term_id) & (counts >= min_count)
+            cols, counts = cols[keep], counts[keep]
+            scores = self._score_numpy(np.full(len(cols), term_id), cols, counts, measure)
+            order = np.argsort(-scores, kind='stable')[:top_n]
+            return [(self.terms[int(cols[i])], self._plain(scores[i], measure)) for i in order]
+
+        marginals = self._marginals() if measure in ('pmi', 'npmi') else None
+        scored = [
+            (self.terms[col], self._score_python(term_id, col, count, measure, marginals))
+            for col, count in zip(indices[start:end], data[start:end])
+            if col != term_id and count >= min_count
+        ]
+        scored.sort(key=lambda item: -item[1])
+        return [(t, self._plain(s, measure)) for t, s in scored[:top_n]]
+
+    def related_all(self, top_n: Optional[int] = 10, measure: str = 'count',
+                    min_count: int = 1) -> Dict[str, List[Tuple[str, float]]]:
+        """Топ связанных терминов для всех терминов сразу"""
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown measure: {measure}")
+
+        if not self.use_numpy:
+            result = {}
+            for term in self.terms:
+                related = self.related(term, top_n, measure, min_count)
+                if related:
+                    result[term] = related
+            return result
+
+        indptr, indices, data = self.csr()
+        rows = np.repeat(np.arange(len(self.terms)), np.diff(indptr))
+
+        keep = (indices != rows) & (data >= min_count)
+        rows, cols, counts = rows[keep], indices[keep], data[keep]
+        scores = self._score_numpy(rows, cols, counts, measure)
+
+        # По строке, внутри строки - по убыванию оценки (устойчиво по столбцу)
+        order = np.lexsort((-scores, rows))
+        rows, cols, scores = rows[order], cols[order], scores[order]
+
+        starts = np.searchsorted(rows, np.arange(len(self.terms)))
+        rank = np.arange(len(rows)) - starts[rows]
+        if top_n is not None:
+            selected = rank < top_n
+            rows, cols, scores = rows[selected], cols[selected], scores[selected]
+
+        result = {}
+        for row, col, score in zip(rows.tolist(), cols.tolist(), scores.tolist()):
+            result.setdefault(self.terms[row], []).append(
+                (self.terms[col], self._plain(score, measure)))
+        return result
+
+    @staticmethod
+    def _plain(score, measure):
+        """Счётчики - int, остальные оценки - float"""
+        return int(score) if measure == 'count' else float(score)
@@ -0,0 +1,351 @@
+"""
+Fuzzy Match - Приближённое сравнение строк
+
+build_glossary, tags_cloud, knowledge_graph_builder, duplicate_detector
+(и ещё несколько инструментов) держали по своей копии levenshtein_distance
+и сравнивали все пары строк - O(n²) полных расчётов O(m²) каждый.
+
+Здесь:
+
+- levenshtein - расстояние с отсечением общего префикса/суффикса; с
+  max_distance считается только полоса шириной 2k+1 вокруг диагонали
+  и расчёт прерывается, как только вся строка DP превысила порог;
+- BKTree - дерево Буркхарда-Келлера для запросов "все слова на
+  расстоянии ≤ k" (фиксированный порог);
+- similar_pairs - самосоединение списка строк почти за линейное время.
+  Для фиксированного порога k кандидаты - строки с общим вариантом
+  "≤ k удалённых символов" (окрестности удалений: для k = 2 это десятки
+  вариантов на слово, а BK-дерево на случайных словах обходит почти всё
+  дерево). Для порога по сходству 1 - d / max(|a|, |b|), где допустимое
+  расстояние растёт с длиной, - фильтр длины и префиксный фильтр
+  q-грамм (у строк на расстоянии ≤ k не меньше max(|a|, |b|) + q - 1 - k·q
+  общих q-грамм).
+"""
+
+import math
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def levenshtein(s1: str, s2: str, max_distance: Optional[int] = None) -> int:
+    """
+    Расстояние Левенштейна
+
+    С max_distance результат точен только до порога: если расстояние
+    больше, возвращается max_distance + 1.
+    """
+    if s1 == s2:
+        return 0
+
+    # Общий префикс и суффикс не влияют на расстояние
+    start = 0
+    limit = min(len(s1), len(s2))
+    while start < limit and s1[start] == s2[start]:
+        start += 1
+
+    end1, end2 = len(s1), len(s2)
+    while end1 > start and end2 > start and s1[end1 - 1] == s2[end2 - 1]:
+        end1 -= 1
+        end2 -= 1
+
+    s1, s2 = s1[start:end1], s2[start:end2]
+
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+
+    n, m = len(s1), len(s2)
+
+    if max_distance is None:
+        if m == 0:
+            return n
+
+        previous_row = list(range(m + 1))
+        for i, c1 in enumerate(s1, 1):
+            current_row = [i]
+            for j, c2 in enumerate(s2, 1):
+                current_row.append(min(
+                    previous_row[j] + 1,
+                    current_row[j - 1] + 1,
+                    previous_row[j - 1] + (c1 != c2)
+                ))
+            previous_row = current_row
+        return previous_row[m]
+
+    k = max_distance
+    cap = k + 1
+
+    if n - m > k:
+        return cap
+    if m == 0:
+        return n
+
+    # Полоса |i - j| <= k, значения вне полосы считаются равными cap
+    previous_row = [j if j <= k else cap for j in range(m + 1)]
+
+    for i in range(1, n + 1):
+        lo = max(1, i - k)
+        hi = min(m, i + k)
+
+        current_row = [cap] * (m + 1)
+        if i <= k:
+            current_row[0] = i
+        row_min = current_row[0]
+
+        c1 = s1[i - 1]
+        for j in range(lo, hi + 1):
+            value = previous_row[j - 1] + (c1 != s2[j - 1])
+            if current_row[j - 1] + 1 < value:
+                value = current_row[j - 1] + 1
+            if previous_row[j] + 1 < value:
+                value = previous_row[j] + 1
+            if value > cap:
+                value = cap
+            current_row[j] = value
+            if value < row_min:
+                row_min = value
+
+        # Дальше расстояние не уменьшится
+        if row_min > k:
+            return cap
+
+        previous_row = current_row
+
+    return min(previous_row[m], cap)
+
+
+def similarity(s1: str, s2: str) -> float:
+    """Сходство 1 - d / max(|s1|, |s2|) (1.0 для равных строк)"""
+    max_len = max(len(s1), len(s2))
+    if max_len == 0:
+        return 1.0
+    return 1.0 - levenshtein(s1, s2) / max_len
+
+
+def max_edits(length: int, min_similarity: float) -> int:
+    """Наибольшее d, при котором 1 - d / length >= min_similarity"""
+    if length == 0:
+        return 0
+
+    d = max(0, min(length, int((1 - min_similarity) * length)))
+    while d < length and 1 - (d + 1) / length >= min_similarity:
+        d += 1
+    while d > 0 and 1 - d / length < min_similarity:
+        d -= 1
+    return d
+
+
+class _Node:
+    __slots__ = ('word', 'children')
+
+    def __init__(self, word: str):
+        self.word = word
+        self.children: Dict[int, '_Node'] = {}
+
+
+class BKTree:
+    """Дерево Буркхарда-Келлера по расстоянию Левенштейна"""
+
+    def __init__(self, words: Iterable[str] = ()):
+        self.root: Optional[_Node] = None
+        self.size = 0
+
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, word: str) -> bool:
+        """Добавить слово (False, если оно уже есть)"""
+        if self.root is None:
+            self.root = _Node(word)
+            self.size = 1
+            return True
+
+        node = self.root
+        while True:
+            distance = levenshtein(word, node.word)
+            if distance == 0:
+                return False
+
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _Node(word)
+                self.size += 1
+                return True
+            node = child
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[str, int]]:
+        """Все слова на расстоянии ≤ max_distance: [(word, distance)]"""
+        if self.root is None:
+            return []
+
+        results = []
+        stack = [self.root]
+
+        while stack:
+            node = stack.pop()
+
+            # Дети с ключом вне [d - k, d + k] не подходят, поэтому точное d
+            # нужно только до max(ключей) + k
+            bound = max(node.children, default=0) + max_distance
+            if abs(len(word) - len(node.word)) > bound:
+                continue
+
+            distance = levenshtein(word, node.word, bound)
+            if distance <= max_distance:
+                results.append((node.word, distance))
+
+            low, high = distance - max_distance, distance + max_distance
+            for key, child in node.children.items():
+                if low <= key <= high:
+                    stack.append(child)
+
+        return results
+
+
+def qgram_tokens(word: str, q: int = 2) -> List[Tuple[str, int]]:
+    """
+    q-граммы строки, дополненной q-1 символами с краёв, как множество
+    пар (q-грамма, номер повтора) - пересечение таких множеств равно
+    пересечению мультимножеств q-грамм
+    """
+    padding = '\x00' * (q - 1)
+    padded = padding + word + padding
+    seen = Counter()
+    tokens = []
+    for i in range(len(padded) - q + 1):
+        gram = padded[i:i + q]
+        tokens.append((gram, seen[gram]))
+        seen[gram] += 1
+    return tokens
+
+
+def deletion_variants(word: str, max_deletions: int) -> set:
+    """Все строки, получаемые из word удалением не более max_deletions символов"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_deletions):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+def similar_pairs(words: List[str], max_distance: Optional[int] = None,
+                  min_similarity: Optional[float] = None, q: int = 2) -> List[Tuple[int, int, int]]:
+    """
+    Все пары близких строк списка: [(i, j, distance)], i < j, по порядку
+
+    Порог - либо абсолютный max_distance, либо min_similarity
+    (1 - d / max(|a|, |b|) >= min_similarity).
+    """
+    if max_distance is not None:
+        return _deletion_join(words, max_distance)
+    return _qgram_join(words, min_similarity, q)
+
+
+def _deletion_join(words: List[str], k: int) -> List[Tuple[int, int, int]]:
+    """
+    Самосоединение с фиксированным порогом
+
+    Если d(a, b) ≤ k, то удалением не более k символов из каждой строки
+    можно получить одну и ту же строку - кандидаты ищутся по общему
+    варианту удалений и проверяются ограниченным расстоянием.
+    """
+    positions = defaultdict(list)
+    for i, word in enumerate(words):
+        positions[word].append(i)
+
+    index: Dict[str, List[str]] = defaultdict(list)
+    pairs = []
+
+    for word, indices in positions.items():
+        variants = deletion_variants(word, k)
+
+        candidates = set()
+        for variant in variants:
+            candidates.update(index.get(variant, ()))
+
+        # Одинаковые строки списка - пары с расстоянием 0
+        for n, i in enumerate(indices):
+            for j in indices[n + 1:]:
+                pairs.append((i, j, 0))
+
+        for other in candidates:
+            if abs(len(other) - len(word)) > k:
+                continue
+            distance = levenshtein(word, other, k)
+            if distance <= k:
+                for i in indices:
+                    for j in positions[other]:
+                        pairs.append((min(i, j), max(i, j), distance))
+
+        for variant in variants:
+            index[variant].append(word)
+
+    pairs.sort()
+    return pairs
+
+
+def _qgram_join(words: List[str], min_similarity: float, q: int) -> List[Tuple[int, int, int]]:
+    """
+    Самосоединение с порогом по сходству
+
+    Строки обрабатываются по возрастанию длины, каждая сравнивается только
+    с уже просмотренными. Кандидаты отбираются префиксным фильтром по
+    q-граммам: если у строк должно быть не меньше T общих q-грамм, то
+    среди |A| - T + 1 самых редких q-грамм каждой найдётся общая. Поэтому
+    индексируются только эти редкие q-граммы, а кандидаты проверяются
+    фильтром длины и ограниченным расстоянием Левенштейна.
+    """
+    def required(length):
+        """Нижняя граница числа общих q-грамм с любой строкой не короче length"""
+        # k(M) <= (1 - s)·M, отсюда T(M) >= M·(1 - (1 - s)·q) + q - 1
+        slope = 1 - (1 - min_similarity) * q
+        return math.ceil(length * slope + q - 1 - 1e-9) if slope > 0 else 0
+
+    tokens = [qgram_tokens(word, q) for word in words]
+    frequency = Counter(token for word_tokens in tokens for token in word_tokens)
+
+    postings: Dict[Tuple[str, int], List[int]] = defaultdict(list)
+    by_length: Dict[int, List[int]] = defaultdict(list)
+    pairs = []
+
+    for j in sorted(range(len(words)), key=lambda i: (len(words[i]), i)):
+        word = words[j]
+        length = len(word)
+        k = max_edits(length, min_similarity)
+
+        word_tokens = sorted(tokens[j], key=lambda token: (frequency[token], token))
+
+        # Текущая строка - самая длинная в паре, порог для неё точный
+        pair_threshold = length + q - 1 - k * q
+
+        if pair_threshold > 0:
+            # Кандидаты - строки с общей редкой q-граммой
+            candidates = set()
+            for token in word_tokens[:len(word_tokens) - pair_threshold + 1]:
+                candidates.update(postings.get(token, ()))
+        else:
+            # Фильтр q-грамм бесполезен - все строки подходящей длины
+            candidates = {
+                i for other_length in range(length - k, length + 1)
+                for i in by_length.get(other_length, ())
+            }
+
+        for i in candidates:
+            if length - len(words[i]) > k:
+                continue
+            distance = levenshtein(words[i], word, k)
+            if distance <= k:
+                pairs.append((min(i, j), max(i, j), distance))
+
+        # Для будущих (более длинных) партнёров - по нижней границе порога
+        threshold = required(length)
+        prefix = len(word_tokens) - threshold + 1 if threshold > 0 else len(word_tokens)
+        for token in word_tokens[:prefix]:
+            postings[token].append(j)
+        by_length[length].append(j)
+
+    pairs.sort()
+    return pairs
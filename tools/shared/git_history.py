@@ -0,0 +1,340 @@
+"""
+Git History - Пофайловая таблица истории из одного прохода git log
+
+Вместо `git log -- <file>` на каждую статью выполняется один
+`git log --raw --numstat` по всему репозиторию. Результат (коммиты, авторы,
+даты, статусы и churn по файлам) сохраняется в .git_history_cache.json
+вместе с HEAD, на котором он построен. При следующем запуске читаются
+только новые коммиты (last_head..HEAD); если история переписана
+(last_head больше не предок HEAD) - таблица строится заново.
+
+Используется popular_articles, version_history, sitemap_generator,
+build_taxonomy и statistics_dashboard.
+"""
+
+from pathlib import Path
+import subprocess
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+RECORD_SEPARATOR = '\x1e'
+FIELD_SEPARATOR = '\x1f'
+LOG_FORMAT = f'--pretty=format:{RECORD_SEPARATOR}%H{FIELD_SEPARATOR}%an{FIELD_SEPARATOR}%ae{FIELD_SEPARATOR}%aI{FIELD_SEPARATOR}%s'
+
+
+class GitHistory:
+    """
+    Кэшируемая история git по файлам
+
+    commits - список коммитов от новых к старым:
+        {'hash', 'author', 'email', 'date' (ISO 8601), 'message',
+         'files': [[status, path, old_path, added, removed, blob], ...]}
+    """
+
+    # 2: пути без C-кавычек (core.quotePath=false)
+    VERSION = 2
+
+    def __init__(self, root_dir=".", cache_file=".git_history_cache.json"):
+        self.root_dir = Path(root_dir).resolve()
+        self.cache_file = self.root_dir / cache_file
+
+        self.head: Optional[str] = None
+        self.commits: List[Dict] = []
+
+        # path -> [(commit_index, change)], от новых к старым
+        self._by_file: Dict[str, List] = defaultdict(list)
+
+        self.load()
+
+    @classmethod
+    def open(cls, root_dir=".", cache_file=".git_history_cache.json") -> 'GitHistory':
+        """Загрузить кэш и дочитать новые коммиты"""
+        history = cls(root_dir, cache_file)
+        history.update()
+        return history
+
+    # ========================
+    # Persistence
+    # ========================
+
+    def load(self):
+        """Загрузить сохранённую таблицу"""
+        if not self.cache_file.exists():
+            return
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+
+        if data.get('version') != self.VERSION:
+            return
+
+        self.head = data.get('head')
+        self.commits = data.get('commits', [])
+        self._build_file_index()
+
+    def save(self):
+        """Сохранить таблицу"""
+        data = {
+            'version': self.VERSION,
+            'head': self.head,
+            'updated': datetime.now().isoformat(),
+            'commits': self.commits
+        }
+
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    # ========================
+    # Building
+    # ========================
+
+    def _git(self, *args) -> Optional[subprocess.CompletedProcess]:
+        return run_git(self.root_dir, *args)
+
+    def update(self) -> int:
+        """
+        Дочитать коммиты после сохранённого HEAD
+
+        Returns: количество новых коммитов
+        """
+        result = self._git('rev-parse', 'HEAD')
+        if result is None or result.returncode != 0:
+            return 0
+
+        head = result.stdout.strip()
+        if head == self.head:
+            return 0
+
+        if self.head:
+            ancestor = self._git('merge-base', '--is-ancestor', self.head, 'HEAD')
+            incremental = ancestor is not None and ancestor.returncode == 0
+        else:
+            incremental = False
+
+        new_commits = self._read_log(f'{self.head}..{head}' if incremental else head)
+        if new_commits is None:
+            return 0
+
+        self.commits = new_commits + self.commits if incremental else new_commits
+        self.head = head
+        self._build_file_index()
+        self.save()
+
+        return len(new_commits)
+
+    def _read_log(self, revision_range: str) -> Optional[List[Dict]]:
+        return read_log(self.root_dir, revision_range)
+
+    def _build_file_index(self):
+        self._by_file = defaultdict(list)
+        for i, commit in enumerate(self.commits):
+            for change in commit['files']:
+                self._by_file[change[1]].append((i, change))
+
+    # ========================
+    # Queries
+    # ========================
+
+    @property
+    def available(self) -> bool:
+        """Есть ли git история"""
+        return self.head is not None
+
+    def relpath(self, file_path) -> str:
+        """
+        Путь относительно корня репозитория
+
+        Относительный путь считается от root_dir; от текущего каталога -
+        только если от root_dir такого файла нет.
+        """
+        path = Path(file_path)
+
+        if not path.is_absolute():
+            candidate = (self.root_dir / path).resolve()
+            if not candidate.exists():
+                cwd_candidate = (Path.cwd() / path).resolve()
+                if cwd_candidate.is_relative_to(self.root_dir) and cwd_candidate.exists():
+                    candidate = cwd_candidate
+            path = candidate
+
+        try:
+            return path.resolve().relative_to(self.root_dir).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def file_history(self, file_path, follow: bool = False) -> List[Dict]:
+        """
+        История файла от новых коммитов к старым
+
+        follow=True - продолжить историю через переименования (как git log --follow)
+        """
+        path = self.relpath(file_path)
+        entries = []
+        before = None
+
+        while path:
+            next_path = None
+
+            for i, change in self._by_file.get(path, []):
+                if before is not None and i <= before:
+                    continue
+
+                status, _, old_path, added, removed, blob = change
+                commit = self.commits[i]
+                entries.append({
+                    'hash': commit['hash'],
+                    'author': commit['author'],
+                    'email': commit['email'],
+                    'date': commit['date'],
+                    'message': commit['message'],
+                    'status': status,
+                    'path': path,
+                    'old_path': old_path,
+                    'added': added,
+                    'removed': removed,
+                    'blob': blob
+                })
+
+                if follow and status == 'R' and old_path:
+                    next_path, before = old_path, i
+                    break
+
+            path = next_path
+
+        return entries
+
+    def edit_count(self, file_path) -> int:
+        return len(self._by_file.get(self.relpath(file_path), []))
+
+    def last_modified(self, file_path) -> Optional[datetime]:
+        """Дата последнего коммита, затронувшего файл"""
+        changes = self._by_file.get(self.relpath(file_path))
+        if not changes:
+            return None
+        return parse_date(self.commits[changes[0][0]]['date'])
+
+    def iter_commits(self, since: Optional[datetime] = None, path_prefix: Optional[str] = None):
+        """Коммиты (от новых к старым), опционально после since и только затрагивающие path_prefix"""
+        for commit in self.commits:
+            if since is not None and parse_date(commit['date']) < since:
+                # Даты автора не строго монотонны - проверяем все коммиты
+                continue
+            if path_prefix and not any(change[1].startswith(path_prefix) for change in commit['files']):
+                continue
+            yield commit
+
+    def authors(self) -> set:
+        return {commit['author'] for commit in self.commits}
+
+
+def parse_date(value: str) -> datetime:
+    """ISO 8601 дата git (%aI) -> naive datetime в часовом поясе автора"""
+    return datetime.fromisoformat(value).replace(tzinfo=None)
+
+
+def run_git(root_dir, *args) -> Optional[subprocess.CompletedProcess]:
+    """
+    Запустить git в root_dir (None - git не установлен)
+
+    core.quotePath=false: не-ASCII пути (кириллические имена статей)
+    выводятся как есть, а не в C-кавычках с восьмеричными escape.
+    """
+    try:
+        return subprocess.run(
+            ['git', '-c', 'core.quotePath=false', *args],
+            cwd=root_dir,
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='replace'
+        )
+    except OSError:
+        return None
+
+
+def changed_files(root_dir, *paths) -> Optional[List[str]]:
+    """
+    Изменённые относительно HEAD (в индексе и рабочем дереве) и
+    неотслеживаемые файлы - пути от root_dir; None - не git-репозиторий
+    """
+    # -z: пути через NUL, без кавычек и escape для любых символов
+    diff = run_git(root_dir, 'diff', '--name-only', '-z', '--relative', '--diff-filter=ACMR', 'HEAD', '--', *paths)
+    if diff is None or diff.returncode != 0:
+        return None
+
+    untracked = run_git(root_dir, 'ls-files', '-z', '--others', '--exclude-standard', '--', *paths)
+    files = diff.stdout.split('\0')
+    if untracked is not None and untracked.returncode == 0:
+        files.extend(untracked.stdout.split('\0'))
+
+    return list(dict.fromkeys(path for path in files if path))
+
+
+def read_log(root_dir, revision_range: str) -> Optional[List[Dict]]:
+    """Один проход git log --raw --numstat по диапазону"""
+    result = run_git(root_dir, 'log', '--raw', '--numstat', '-M', '--no-abbrev', LOG_FORMAT, revision_range)
+    if result is None or result.returncode != 0:
+        return None
+
+    commits = []
+    for record in result.stdout.split(RECORD_SEPARATOR):
+        if not record.strip():
+            continue
+        commit = parse_record(record)
+        if commit:
+            commits.append(commit)
+
+    return commits
+
+
+def parse_record(record: str) -> Optional[Dict]:
+    """Разобрать один коммит: заголовок, raw-строки, numstat-строки"""
+    lines = record.split('\n')
+    fields = lines[0].split(FIELD_SEPARATOR)
+    if len(fields) != 5:
+        return None
+
+    raw_changes = []
+    numstats = []
+
+    for line in lines[1:]:
+        if not line:
+            continue
+
+        if line.startswith(':'):
+            # :100644 100644 <old_blob> <new_blob> M\tpath[\tnew_path]
+            meta, *paths = line.split('\t')
+            parts = meta.split()
+            status = parts[4][0]
+            blob = parts[3] if set(parts[3]) != {'0'} else None
+            if len(paths) == 2:
+                raw_changes.append([status, paths[1], paths[0], blob])
+            elif paths:
+                raw_changes.append([status, paths[0], None, blob])
+        else:
+            parts = line.split('\t')
+            if len(parts) >= 3:
+                added = int(parts[0]) if parts[0].isdigit() else 0
+                removed = int(parts[1]) if parts[1].isdigit() else 0
+                numstats.append((added, removed))
+
+    # numstat идёт в том же порядке, что и raw
+    files = []
+    for i, (status, path, old_path, blob) in enumerate(raw_changes):
+        added, removed = numstats[i] if i < len(numstats) else (0, 0)
+        files.append([status, path, old_path, added, removed, blob])
+
+    return {
+        'hash': fields[0],
+        'author': fields[1],
+        'email': fields[2],
+        'date': fields[3],
+        'message': fields[4],
+        'files': files
+    }
@@ -0,0 +1,206 @@
+"""
+Keyword Classifier - Пакетная классификация по весам ключевых слов
+
+add_dewey (MLClassifier) и process_inbox (категории) классифицировали
+каждый документ отдельно: цикл Python по всему индексу ключевых слов на
+каждый текст.
+
+KeywordClassifier строит матрицу весов ключевое слово × класс один раз,
+а пачка документов классифицируется так:
+
+- матрица признаков документ × ключевое слово (число вхождений; токены
+  по регулярному выражению или подстроки, как str.count);
+- оценки документ × класс - одно произведение разреженных матриц
+  (scipy.sparse, если установлен, иначе numpy);
+- top_k - лучшие классы каждого документа с уверенностью 0-100
+  (относительно лучшего класса или суммы оценок).
+
+numpy - необязательная зависимость: без неё оценки считаются циклами
+Python по тем же весам.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Optional dependencies для векторных вычислений
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from scipy import sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+class KeywordClassifier:
+    """Линейный классификатор: оценка класса = Σ вхождений × вес ключевого слова"""
+
+    def __init__(self, weights: Iterable[Tuple[str, str, float]], match: str = 'token',
+                 token_pattern: str = r'\b\w+\b', use_numpy: bool = None):
+        """
+        Args:
+            weights: тройки (ключевое слово, класс, вес); повторы суммируются
+            match: 'token' - ключевое слово совпадает с целым токеном,
+                   'substring' - считаются вхождения подстроки (str.count)
+            token_pattern: регулярное выражение токена для match='token'
+        """
+        if match not in ('token', 'substring'):
+            raise ValueError(f"Unknown match mode: {match}")
+
+        self.match = match
+        self.token_pattern = re.compile(token_pattern)
+        self.use_numpy = NUMPY_AVAILABLE if use_numpy is None else use_numpy and NUMPY_AVAILABLE
+
+        self.labels: List[str] = []
+        self.label_index: Dict[str, int] = {}
+        self.keywords: List[str] = []
+        self.keyword_index: Dict[str, int] = {}
+
+        # Строки матрицы весов: keyword_id → {label_id: weight}
+        self.rows: List[Dict[int, float]] = []
+
+        for keyword, label, weight in weights:
+            keyword = keyword.lower()
+
+            keyword_id = self.keyword_index.get(keyword)
+            if keyword_id is None:
+                keyword_id = self.keyword_index[keyword] = len(self.keywords)
+                self.keywords.append(keyword)
+                self.rows.append({})
+
+            label_id = self.label_index.get(label)
+            if label_id is None:
+                label_id = self.label_index[label] = len(self.labels)
+                self.labels.append(label)
+
+            row = self.rows[keyword_id]
+            row[label_id] = row.get(label_id, 0.0) + weight
+
+        self.weights = self._weight_matrix() if self.use_numpy else None
+
+    def _weight_matrix(self):
+        """Матрица весов ключевое слово × класс"""
+        shape = (len(self.keywords), len(self.labels))
+        rows, cols, values = [], [], []
+        for keyword_id, row in enumerate(self.rows):
+            for label_id, weight in row.items():
+                rows.append(keyword_id)
+                cols.append(label_id)
+                values.append(weight)
+
+        if SCIPY_AVAILABLE:
+            return sparse.csr_matrix((values, (rows, cols)), shape=shape)
+
+        matrix = np.zeros(shape)
+        matrix[rows, cols] = values
+        return matrix
+
+    # ========================
+    # Features
+    # ========================
+
+    def count_keywords(self, text: str) -> Dict[int, int]:
+        """Вхождения ключевых слов в текст: {keyword_id: count}"""
+        text = text.lower()
+
+        if self.match == 'substring':
+            counts = {}
+            for keyword_id, keyword in enumerate(self.keywords):
+                count = text.count(keyword)
+                if count:
+                    counts[keyword_id] = count
+            return counts
+
+        index = self.keyword_index
+        counts = Counter(index[word] for word in self.token_pattern.findall(text) if word in index)
+        return dict(counts)
+
+    def features(self, texts: Sequence[str]):
+        """Матрица признаков документ × ключевое слово (scipy.sparse или numpy)"""
+        shape = (len(texts), len(self.keywords))
+        rows, cols, values = [], [], []
+        for doc_id, text in enumerate(texts):
+            for keyword_id, count in self.count_keywords(text).items():
+                rows.append(doc_id)
+                cols.append(keyword_id)
+                values.append(count)
+
+        if SCIPY_AVAILABLE:
+            return sparse.csr_matrix((np.array(values, dtype=np.float64), (rows, cols)), shape=shape)
+
+        matrix = np.zeros(shape)
+        matrix[rows, cols] = values
+        return matrix
+
+    # ========================
+    # Scores
+    # ========================
+
+    def scores(self, texts: Sequence[str]):
+        """
+        Оценки документ × класс
+
+        С numpy - плотный массив (одно произведение матриц на всю пачку),
+        без numpy - список списков.
+        """
+        if self.use_numpy:
+            result = self.features(texts) @ self.weights
+            return result.toarray() if SCIPY_AVAILABLE else np.asarray(result)
+
+        result = []
+        for text in texts:
+            row_scores = [0.0] * len(self.labels)
+            for keyword_id, count in self.count_keywords(text).items():
+                for label_id, weight in self.rows[keyword_id].items():
+                    row_scores[label_id] += count * weight
+            result.append(row_scores)
+        return result
+
+    def top_k(self, texts: Sequence[str], k: int = 5, normalize: str = 'max',
+              ndigits: int = 2) -> List[List[Tuple[str, float]]]:
+        """
+        Лучшие классы каждого документа: [[(label, confidence), ...], ...]
+
+        Учитываются только классы с положительной оценкой. Уверенность -
+        доля от лучшего класса ('max') или от суммы оценок ('sum') в
+        процентах; при равенстве - класс, объявленный раньше.
+        """
+        if normalize not in ('max', 'sum'):
+            raise ValueError(f"Unknown normalization: {normalize}")
+
+        scores = self.scores(texts)
+
+        if self.use_numpy:
+            positive = np.where(scores > 0, scores, 0.0)
+            base = scores.max(axis=1, initial=0.0) if normalize == 'max' else positive.sum(axis=1)
+            order = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+            top = np.take_along_axis(scores, order, axis=1)
+            confidence = np.minimum(100, np.divide(top, base[:, None], out=np.zeros_like(top),
+                                                   where=base[:, None] > 0) * 100)
+
+            return [
+                [(self.labels[label_id], round(value, ndigits))
+                 for label_id, score, value in zip(row_order, row_top, row_confidence) if score > 0]
+                for row_order, row_top, row_confidence in zip(order.tolist(), top.tolist(), confidence.tolist())
+            ]
+
+        results = []
+        for row in scores:
+            positive = [(label_id, score) for label_id, score in enumerate(row) if score > 0]
+            if not positive:
+                results.append([])
+                continue
+
+            base = max(row) if normalize == 'max' else sum(score for _, score in positive)
+            ranked = sorted(positive, key=lambda item: -item[1])[:k]
+            results.append([
+                (self.labels[label_id], round(min(100, score / base * 100), ndigits))
+                for label_id, score in ranked
+            ])
+
+        return results
@@ -0,0 +1,169 @@
+"""
+Line Diff - Построчный diff по алгоритму patience
+
+difflib.SequenceMatcher ищет самый длинный общий блок и на больших
+markdown-файлах с повторяющимися строками (пустые строки, '---', '```')
+работает квадратично и даёт "разорванные" hunks. Patience diff сначала
+сопоставляет строки, уникальные в обеих версиях (LIS по patience sorting),
+и рекурсивно сравнивает участки между ними; участки без уникальных строк
+сравниваются обычным SequenceMatcher.
+
+PatienceMatcher совместим с SequenceMatcher (get_opcodes,
+get_grouped_opcodes), поэтому подходит и для unified diff, и для
+переноса аннотаций blame.
+"""
+
+import difflib
+from bisect import bisect_left
+from typing import Iterator, List, Sequence, Tuple
+
+
+class PatienceMatcher(difflib.SequenceMatcher):
+    """SequenceMatcher с patience-сопоставлением блоков"""
+
+    def __init__(self, a: Sequence = '', b: Sequence = ''):
+        super().__init__(None, a, b, autojunk=False)
+
+    def get_matching_blocks(self) -> List[difflib.Match]:
+        if self.matching_blocks is not None:
+            return self.matching_blocks
+
+        blocks: List[Tuple[int, int, int]] = []
+        _patience(self.a, self.b, 0, len(self.a), 0, len(self.b), blocks)
+
+        # Склеить соседние блоки
+        merged = []
+        for i, j, k in blocks:
+            if merged and merged[-1][0] + merged[-1][2] == i and merged[-1][1] + merged[-1][2] == j:
+                merged[-1][2] += k
+            else:
+                merged.append([i, j, k])
+
+        merged.append([len(self.a), len(self.b), 0])
+        self.matching_blocks = [difflib.Match(*block) for block in merged]
+        return self.matching_blocks
+
+
+def _patience(a, b, alo, ahi, blo, bhi, blocks):
+    """Добавить в blocks совпадающие блоки для a[alo:ahi] и b[blo:bhi]"""
+    # Общий префикс
+    start = 0
+    while alo + start < ahi and blo + start < bhi and a[alo + start] == b[blo + start]:
+        start += 1
+
+    # Общий суффикс
+    end = 0
+    while (ahi - end > alo + start and bhi - end > blo + start
+           and a[ahi - end - 1] == b[bhi - end - 1]):
+        end += 1
+
+    if start:
+        blocks.append((alo, blo, start))
+
+    alo, blo = alo + start, blo + start
+    ahi_inner, bhi_inner = ahi - end, bhi - end
+
+    if alo < ahi_inner and blo < bhi_inner:
+        anchors = _unique_lcs(a, b, alo, ahi_inner, blo, bhi_inner)
+
+        if anchors:
+            i_prev, j_prev = alo, blo
+            for i, j in anchors:
+                _patience(a, b, i_prev, i, j_prev, j, blocks)
+                blocks.append((i, j, 1))
+                i_prev, j_prev = i + 1, j + 1
+            _patience(a, b, i_prev, ahi_inner, j_prev, bhi_inner, blocks)
+        else:
+            # Нет уникальных строк - обычный SequenceMatcher на небольшом участке
+            matcher = difflib.SequenceMatcher(None, a[alo:ahi_inner], b[blo:bhi_inner], autojunk=False)
+            for i, j, k in matcher.get_matching_blocks():
+                if k:
+                    blocks.append((alo + i, blo + j, k))
+
+    if end:
+        blocks.append((ahi - end, bhi - end, end))
+
+
+def _unique_lcs(a, b, alo, ahi, blo, bhi) -> List[Tuple[int, int]]:
+    """Наибольшая возрастающая последовательность уникальных общих строк"""
+    counts = {}
+    for i in range(alo, ahi):
+        line = a[i]
+        count, _ = counts.get(line, (0, None))
+        counts[line] = (count + 1, i)
+
+    b_unique = {}
+    for j in range(blo, bhi):
+        line = b[j]
+        if line in counts and counts[line][0] == 1:
+            b_unique[line] = None if line in b_unique else j
+
+    pairs = [
+        (counts[line][1], j) for line, j in b_unique.items() if j is not None
+    ]
+    if not pairs:
+        return []
+    pairs.sort()
+
+    # Patience sorting по индексам в b
+    tails: List[int] = []
+    tail_index: List[int] = []
+    back: List[int] = [-1] * len(pairs)
+
+    for n, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_index.append(n)
+        else:
+            tails[pos] = j
+            tail_index[pos] = n
+        back[n] = tail_index[pos - 1] if pos > 0 else -1
+
+    result = []
+    n = tail_index[-1]
+    while n != -1:
+        result.append(pairs[n])
+        n = back[n]
+    result.reverse()
+
+    return result
+
+
+def unified_diff(a: Sequence[str], b: Sequence[str], fromfile: str = '', tofile: str = '',
+                 n: int = 3, lineterm: str = '\n') -> Iterator[str]:
+    """Unified diff в формате difflib.unified_diff, но на PatienceMatcher"""
+    started = False
+
+    for group in PatienceMatcher(a, b).get_grouped_opcodes(n):
+        if not started:
+            started = True
+            yield f'--- {fromfile}{lineterm}'
+            yield f'+++ {tofile}{lineterm}'
+
+        first, last = group[0], group[-1]
+        file1_range = _format_range(first[1], last[2])
+        file2_range = _format_range(first[3], last[4])
+        yield f'@@ -{file1_range} +{file2_range} @@{lineterm}'
+
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                for line in a[i1:i2]:
+                    yield ' ' + line
+                continue
+            if tag in ('replace', 'delete'):
+                for line in a[i1:i2]:
+                    yield '-' + line
+            if tag in ('replace', 'insert'):
+                for line in b[j1:j2]:
+                    yield '+' + line
+
+
+def _format_range(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f'{beginning}'
+    if not length:
+        beginning -= 1
+    return f'{beginning},{length}'
@@ -0,0 +1,369 @@
+"""
+Link Index - Единый индекс ссылок базы знаний
+
+Строится за один проход по knowledge/ и сохраняется в .link_index.json.
+При повторном запуске перечитываются только изменённые статьи (mtime/size),
+поэтому popular_articles, find_orphans и backlinks_generator получают
+входящие/исходящие ссылки за O(1) на статью вместо полного пересканирования.
+
+Каждая ссылка хранится как:
+    {'target': 'knowledge/x/y.md', 'anchor': 'section', 'text': '...', 'kind': 'content'}
+
+kind:
+- content - markdown ссылка в тексте статьи
+- related - ссылка из поля related во frontmatter
+- anchor  - ссылка только на якорь в той же статье (#section)
+
+Вместе со ссылками хранятся якоря заголовков каждой статьи (GitHub-style),
+а при обновлении запоминаются все файлы и директории knowledge/ - проверка
+внутренней ссылки (check_link) идёт по множествам в памяти, без чтения
+целевых файлов и обращений к диску.
+"""
+
+from pathlib import Path
+import os
+import re
+import json
+import yaml
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+LINK_PATTERN = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+FRONTMATTER_PATTERN = re.compile(r'^---\s*\n(.*?)\n---\s*\n(.*)', re.DOTALL)
+HEADING_PATTERN = re.compile(r'^#{1,6}\s+(.+)$', re.MULTILINE)
+
+
+def slugify_heading(text: str) -> str:
+    """Якорь заголовка (как GitHub)"""
+    anchor = text.strip().lower()
+    # Удалить специальные символы
+    anchor = re.sub(r'[^\w\s-]', '', anchor)
+    # Заменить пробелы на дефисы
+    anchor = re.sub(r'\s+', '-', anchor)
+    # Удалить множественные дефисы
+    anchor = re.sub(r'-+', '-', anchor)
+    # Удалить дефисы в начале и конце
+    return anchor.strip('-')
+
+
+def heading_anchors(content: str) -> List[str]:
+    """Якоря всех заголовков текста (без повторов, в порядке появления)"""
+    return list(dict.fromkeys(slugify_heading(text) for text in HEADING_PATTERN.findall(content)))
+
+
+class LinkIndex:
+    """Персистентный индекс ссылок с инкрементальным обновлением"""
+
+    VERSION = 2
+
+    def __init__(self, root_dir=".", cache_file=".link_index.json"):
+        self.root_dir = Path(root_dir).resolve()
+        self.knowledge_dir = self.root_dir / "knowledge"
+        self.cache_file = self.root_dir / cache_file
+
+        # source -> {'title', 'signature', 'links'}
+        self.sources: Dict[str, Dict] = {}
+
+        # target -> [(source, link)]
+        self._incoming: Dict[str, List[Tuple[str, Dict]]] = defaultdict(list)
+
+        # Файлы и директории knowledge/ на момент refresh (пути от корня)
+        self.files: set = set()
+        self.dirs: set = set()
+        self._scanned = False
+
+        # Кэш существования целей вне knowledge/
+        self._exists_cache: Dict[str, bool] = {}
+
+        self.load()
+
+    @classmethod
+    def open(cls, root_dir=".", cache_file=".link_index.json") -> 'LinkIndex':
+        """Загрузить индекс и досинхронизировать его с knowledge/"""
+        index = cls(root_dir, cache_file)
+        index.refresh()
+        return index
+
+    # ========================
+    # Persistence
+    # ========================
+
+    def load(self):
+        """Загрузить сохранённый индекс"""
+        if not self.cache_file.exists():
+            return
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+
+        if data.get('version') != self.VERSION:
+            return
+
+        self.sources = data.get('sources', {})
+        for source, record in self.sources.items():
+            self._add_incoming(source, record)
+
+    def save(self):
+        """Сохранить индекс"""
+        data = {
+            'version': self.VERSION,
+            'updated': datetime.now().isoformat(),
+            'sources': self.sources
+        }
+
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    # ========================
+    # Building
+    # ========================
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Синхронизировать индекс с knowledge/ - перечитать только изменённые статьи
+
+        Returns: {'changed': N, 'removed': M}
+        """
+        current = {}
+        self.files, self.dirs = set(), set()
+
+        # Один обход knowledge/: статьи для индекса и все пути для check_link
+        for dirpath, dirnames, filenames in os.walk(self.knowledge_dir):
+            rel_dir = os.path.relpath(dirpath, self.root_dir)
+            self.dirs.add(rel_dir)
+
+            for filename in filenames:
+                path = os.path.join(rel_dir, filename)
+                self.files.add(path)
+
+                if filename.endswith('.md') and filename != "INDEX.md":
+                    stat = os.stat(os.path.join(dirpath, filename))
+                    current[path] = [stat.st_mtime_ns, stat.st_size]
+
+        self._scanned = True
+
+        removed = [source for source in self.sources if source not in current]
+        changed = [source for source, sig in current.items()
+                   if self.sources.get(source, {}).get('signature') != sig]
+
+        for source in removed:
+            self._remove_source(source)
+
+        for source in changed:
+            self._remove_source(source)
+            record = self._parse_source(source)
+            record['signature'] = current[source]
+            self.sources[source] = record
+            self._add_incoming(source, record)
+
+        self._exists_cache.clear()
+
+        if changed or removed:
+            self.save()
+
+        return {'changed': len(changed), 'removed': len(removed)}
+
+    def _parse_source(self, source: str) -> Dict:
+        """Извлечь все ссылки одной статьи"""
+        md_file = self.root_dir / source
+        frontmatter, content = None, None
+
+        try:
+            with open(md_file, 'r', encoding='utf-8') as f:
+                text = f.read()
+            match = FRONTMATTER_PATTERN.match(text)
+            if match:
+                content = match.group(2)
+                try:
+                    frontmatter = yaml.safe_load(match.group(1))
+                except yaml.YAMLError:
+                    frontmatter = None
+        except (OSError, UnicodeDecodeError):
+            pass
+
+        if not isinstance(frontmatter, dict):
+            frontmatter = {}
+
+        record = {
+            'title': frontmatter.get('title', md_file.stem),
+            'has_content': bool(content),
+            'anchors': [],
+            'links': []
+        }
+
+        if not content:
+            return record
+
+        record['anchors'] = heading_anchors(content)
+
+        for text, url in LINK_PATTERN.findall(content):
+            if url.startswith('http'):
+                continue
+
+            if url.startswith('#'):
+                record['links'].append({
+                    'target': source,
+                    'anchor': url[1:],
+                    'text': text,
+                    'kind': 'anchor'
+                })
+                continue
+
+            path, _, anchor = url.partition('#')
+            target = self.resolve(source, path)
+            if target is not None:
+                record['links'].append({
+                    'target': target,
+                    'anchor': anchor or None,
+                    'text': text,
+                    'kind': 'content'
+                })
+
+        related = frontmatter.get('related')
+        if isinstance(related, list):
+            for url in related:
+                if not isinstance(url, str):
+                    continue
+                path, _, anchor = url.partition('#')
+                target = self.resolve(source, path)
+                if target is not None:
+                    record['links'].append({
+                        'target': target,
+                        'anchor': anchor or None,
+                        'text': None,
+                        'kind': 'related'
+                    })
+
+        return record
+
+    def resolve(self, source: str, link: str) -> Optional[str]:
+        """
+        Разрешить относительную ссылку файла source (путь от корня) в путь
+        от корня - только операции со строками (None - вне репозитория)
+        """
+        if os.path.isabs(link):
+            return None
+
+        target = os.path.normpath(os.path.join(os.path.dirname(source), link))
+        if target == os.curdir or target == os.pardir or target.startswith(os.pardir + os.sep):
+            return None
+
+        return target
+
+    def _add_incoming(self, source: str, record: Dict):
+        for link in record.get('links', []):
+            self._incoming[link['target']].append((source, link))
+
+    def _remove_source(self, source: str):
+        record = self.sources.pop(source, None)
+        if not record:
+            return
+
+        for target in {link['target'] for link in record.get('links', [])}:
+            remaining = [(s, l) for s, l in self._incoming.get(target, []) if s != source]
+            if remaining:
+                self._incoming[target] = remaining
+            else:
+                self._incoming.pop(target, None)
+
+    # ========================
+    # Queries
+    # ========================
+
+    def articles(self) -> List[str]:
+        """Все статьи с содержимым"""
+        return [source for source, record in self.sources.items() if record.get('has_content')]
+
+    def title(self, article: str) -> Optional[str]:
+        record = self.sources.get(article)
+        return record['title'] if record else None
+
+    def exists(self, target: str) -> bool:
+        """Существует ли цель ссылки (в knowledge/ - без обращения к диску)"""
+        if target in self.sources or target in self.files or target in self.dirs:
+            return True
+
+        if self._scanned and self._in_knowledge(target):
+            return False
+
+        if target not in self._exists_cache:
+            self._exists_cache[target] = (self.root_dir / target).exists()
+        return self._exists_cache[target]
+
+    def is_dir(self, target: str) -> bool:
+        if target in self.dirs:
+            return True
+        if self._scanned and self._in_knowledge(target):
+            return False
+        return (self.root_dir / target).is_dir()
+
+    def _in_knowledge(self, target: str) -> bool:
+        return target == "knowledge" or target.startswith("knowledge" + os.sep)
+
+    def anchors(self, article: str) -> Optional[set]:
+        """Якоря заголовков статьи (None - не статья или статья без содержимого)"""
+        record = self.sources.get(article)
+        if not record or not record.get('has_content'):
+            return None
+        return set(record.get('anchors', []))
+
+    def check_link(self, source: str, url: str) -> Dict:
+        """
+        Проверить внутреннюю ссылку файла source (путь от корня) по индексу
+
+        Returns: {'target', 'path', 'anchor', 'status'}, status:
+            ok | outside | missing | directory | broken_anchor
+        У целей без известных якорей (не статьи) якорь не проверяется.
+        """
+        path, _, anchor = url.partition('#')
+        result = {'target': source, 'path': path, 'anchor': anchor or None, 'status': 'ok'}
+
+        if path:
+            target = self.resolve(source, path)
+            result['target'] = target
+
+            if target is None:
+                result['status'] = 'outside'
+                return result
+            if not self.exists(target):
+                result['status'] = 'missing'
+                return result
+            if self.is_dir(target):
+                result['status'] = 'directory'
+                return result
+
+        if anchor:
+            anchors = self.anchors(result['target'])
+            if anchors is not None and anchor not in anchors:
+                result['status'] = 'broken_anchor'
+
+        return result
+
+    def outgoing(self, source: str, kinds=('content',), existing_only: bool = False) -> List[Dict]:
+        """Исходящие ссылки статьи"""
+        record = self.sources.get(source)
+        if not record:
+            return []
+
+        return [
+            link for link in record['links']
+            if link['kind'] in kinds and (not existing_only or self.exists(link['target']))
+        ]
+
+    def incoming(self, target: str, kinds=('content',)) -> List[Tuple[str, Dict]]:
+        """Входящие ссылки: [(source, link)]"""
+        return [(source, link) for source, link in self._incoming.get(target, [])
+                if link['kind'] in kinds]
+
+    def incoming_count(self, target: str, kinds=('content',)) -> int:
+        """Количество входящих ссылок (каждое вхождение считается)"""
+        return sum(1 for _, link in self._incoming.get(target, []) if link['kind'] in kinds)
+
+    def incoming_sources(self, target: str, kinds=('content',)) -> set:
+        """Уникальные статьи, ссылающиеся на target"""
+        return {source for source, link in self._incoming.get(target, []) if link['kind'] in kinds}
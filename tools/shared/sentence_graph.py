@@ -0,0 +1,214 @@
+"""
+Sentence Graph - Разреженная матрица предложение × термин для резюмирования
+
+summary_generator раньше для каждого метода (TF-IDF, TextRank,
+избыточность, темы) заново токенизировал предложения и сравнивал их
+попарно через множества Python - O(n²) операций с множествами на статью.
+
+SentenceMatrix строится один раз по спискам токенов предложений:
+словарь терминов (в порядке первого появления), CSR-массивы numpy
+(indptr, indices, counts). Из неё получаются:
+
+- TF-IDF оценки предложений - одно взвешенное суммирование по ненулевым;
+- матрица пересечений |Si ∩ Sj| - одно произведение B·Bᵀ бинарной
+  матрицы (scipy.sparse, если установлен, иначе плотное numpy);
+- косинусное сходство и сходство Жаккара - поэлементно из пересечений;
+- TextRank - степенной метод на нормированной матрице сходства;
+- доминирующие темы предложений по частым терминам.
+
+numpy - необязательная зависимость: без неё NUMPY_AVAILABLE = False, и
+инструменты используют прежнюю реализацию на множествах.
+"""
+
+from collections import Counter
+from typing import Dict, List, Sequence
+
+# Optional dependencies для векторных вычислений
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from scipy import sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+class SentenceMatrix:
+    """Матрица предложение × термин (CSR) с производными метриками"""
+
+    def __init__(self, tokenized: Sequence[Sequence[str]]):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy не установлен")
+
+        self.vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        indices = []
+        counts = []
+
+        for tokens in tokenized:
+            # Counter сохраняет порядок первого появления термина в предложении
+            for word, count in Counter(tokens).items():
+                term_id = self.vocabulary.setdefault(word, len(self.vocabulary))
+                indices.append(term_id)
+                counts.append(count)
+            indptr.append(len(indices))
+
+        self.n = len(tokenized)
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+        self.counts = np.array(counts, dtype=np.float64)
+
+        # Номер предложения для каждого ненулевого элемента
+        self.rows = np.repeat(np.arange(self.n), np.diff(self.indptr))
+
+        # Длина предложения в токенах и число уникальных терминов
+        self.lengths = np.bincount(self.rows, weights=self.counts, minlength=self.n)
+        self.sizes = np.diff(self.indptr).astype(np.float64)
+
+        self._overlap = None
+
+    @property
+    def terms(self) -> List[str]:
+        """Термины в порядке идентификаторов"""
+        return list(self.vocabulary)
+
+    def term_frequencies(self):
+        """Число вхождений каждого термина во всех предложениях"""
+        return np.bincount(self.indices, weights=self.counts, minlength=len(self.vocabulary))
+
+    def document_frequencies(self):
+        """Число предложений, содержащих термин"""
+        return np.bincount(self.indices, minlength=len(self.vocabulary))
+
+    # ========================
+    # Scores
+    # ========================
+
+    def tfidf_scores(self):
+        """
+        Σ tf·idf по терминам предложения,
+        tf = count / длина предложения, idf = log(N / (1 + df))
+        """
+        if not self.n:
+            return np.zeros(0)
+
+        idf = np.log(self.n / (1.0 + self.document_frequencies()))
+        totals = np.bincount(self.rows, weights=self.counts * idf[self.indices], minlength=self.n)
+
+        scores = np.zeros(self.n)
+        nonempty = self.lengths > 0
+        scores[nonempty] = totals[nonempty] / self.lengths[nonempty]
+        return scores
+
+    def overlap(self):
+        """Плотная матрица n × n: число общих терминов у пар предложений"""
+        if self._overlap is not None:
+            return self._overlap
+
+        ones = np.ones(len(self.indices))
+        shape = (self.n, len(self.vocabulary))
+
+        if SCIPY_AVAILABLE:
+            binary = sparse.csr_matrix((ones, self.indices, self.indptr), shape=shape)
+            self._overlap = (binary @ binary.T).toarray()
+        else:
+            binary = np.zeros(shape)
+            binary[self.rows, self.indices] = 1.0
+            self._overlap = binary @ binary.T
+
+        return self._overlap
+
+    def cosine_similarity(self):
+        """|Si ∩ Sj| / sqrt(|Si|·|Sj|), диагональ нулевая"""
+        norms = np.sqrt(np.outer(self.sizes, self.sizes))
+        similarity = np.divide(self.overlap(), norms, out=np.zeros((self.n, self.n)), where=norms > 0)
+        np.fill_diagonal(similarity, 0.0)
+        return similarity
+
+    def jaccard_similarity(self):
+        """|Si ∩ Sj| / |Si ∪ Sj|, диагональ нулевая"""
+        overlap = self.overlap()
+        union = self.sizes[:, None] + self.sizes[None, :] - overlap
+        similarity = np.divide(overlap, union, out=np.zeros((self.n, self.n)), where=union > 0)
+        np.fill_diagonal(similarity, 0.0)
+        return similarity
+
+    def textrank(self, damping: float = 0.85, iterations: int = 30, tolerance: float = 1e-9):
+        """
+        TextRank степенным методом
+
+        score = (1 - d) + d · Wᵀ·score, где W - матрица косинусного сходства,
+        нормированная по строкам (строки без связей остаются нулевыми).
+        """
+        if not self.n:
+            return np.zeros(0)
+
+        similarity = self.cosine_similarity()
+        row_sums = similarity.sum(axis=1, keepdims=True)
+        transition = np.divide(similarity, row_sums, out=np.zeros_like(similarity), where=row_sums > 0)
+        transition_t = transition.T
+
+        scores = np.ones(self.n)
+        for _ in range(iterations):
+            new_scores = (1 - damping) + damping * (transition_t @ scores)
+            converged = np.abs(new_scores - scores).max() < tolerance
+            scores = new_scores
+            if converged:
+                break
+
+        return scores
+
+    def mean_pairwise_jaccard(self) -> float:
+        """Среднее сходство Жаккара по парам непустых предложений"""
+        nonempty = np.flatnonzero(self.sizes > 0)
+        if len(nonempty) < 2:
+            return 0.0
+
+        similarity = self.jaccard_similarity()[np.ix_(nonempty, nonempty)]
+        upper = np.triu_indices(len(nonempty), k=1)
+        return float(similarity[upper].mean())
+
+    def dominant_topics(self, num_topics: int) -> List[int]:
+        """
+        Доминирующая тема каждого предложения (-1, если тем нет)
+
+        Темы - num_topics * 3 самых частых терминов (при равенстве - по
+        первому появлению), термин k относится к теме k % num_topics.
+        Оценка темы - число вхождений её терминов в предложение; при
+        равенстве выбирается тема, термин которой встретился раньше.
+        """
+        dominant = [-1] * self.n
+        if num_topics <= 0 or not len(self.indices):
+            return dominant
+
+        frequencies = self.term_frequencies()
+        topic_terms = np.argsort(-frequencies, kind='stable')[:num_topics * 3]
+
+        topic_of_term = np.full(len(self.vocabulary), -1)
+        topic_of_term[topic_terms] = np.arange(len(topic_terms)) % num_topics
+
+        entry_topics = topic_of_term[self.indices]
+        mask = entry_topics >= 0
+
+        scores = np.zeros((self.n, num_topics))
+        np.add.at(scores, (self.rows[mask], entry_topics[mask]), self.counts[mask])
+
+        best = scores.max(axis=1)
+        ties = (scores == best[:, None]).sum(axis=1)
+
+        for i in np.flatnonzero(best > 0):
+            if ties[i] == 1:
+                dominant[i] = int(scores[i].argmax())
+                continue
+
+            # Несколько тем с равной оценкой - первая встреченная в предложении
+            for topic in entry_topics[self.indptr[i]:self.indptr[i + 1]]:
+                if topic >= 0 and scores[i, topic] == best[i]:
+                    dominant[i] = int(topic)
+                    break
+
+        return dominant
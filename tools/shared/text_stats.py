@@ -0,0 +1,235 @@
+"""
+Text Stats - Единая статистика текста статьи
+
+calculate_reading_time, calculate_difficulty, quality_metrics,
+generate_statistics, validate и statistics_dashboard раньше каждый
+заново делили текст на предложения, токенизировали и считали слоги
+своими регулярками. Здесь всё считается за один проход по статье и
+кэшируется, а каждый инструмент получает ровно те величины, которые
+считал сам (опубликованные оценки не меняются):
+
+- весь текст (как в calculate_difficulty, generate_statistics, validate):
+  предложения, слова [а-яёa-z]+ и \\w+, символы, редкие слова, длины
+  предложений по пробелам; слоги - тремя способами, как их считали
+  инструменты (SYLLABLE_SCHEMES);
+- код: блоки ```lang ... ``` (calculate_difficulty), строки блоков
+  (calculate_reading_time), число ``` (statistics_dashboard);
+- проза без кода, inline-кода и адресов ссылок (quality_metrics) и она же
+  без заголовков и изображений (время чтения).
+
+Результат кэшируется по SHA-1 текста - в памяти процесса и (если задан
+root_dir) в .text_stats_cache.json, поэтому все инструменты "качества"
+платят за одну токенизацию статьи.
+"""
+
+from pathlib import Path
+import re
+import json
+import atexit
+import hashlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+
+from shared.tokenizer import word_pattern
+
+
+TOKEN_PATTERN = word_pattern()
+ANY_WORD_PATTERN = re.compile(r'\b\w+\b')
+SENTENCE_SPLIT = re.compile(r'[.!?]+')
+FENCED_CODE = re.compile(r'```.*?```', re.DOTALL)
+FENCED_CODE_BODY = re.compile(r'```[\w]*\n(.*?)```', re.DOTALL)
+HEADER = re.compile(r'^#{1,6}\s+.*$', re.MULTILINE)
+INLINE_CODE = re.compile(r'`[^`]+`')
+IMAGE = re.compile(r'!\[([^\]]*)\]\([^\)]+\)')
+LINK = re.compile(r'\[([^\]]+)\]\([^\)]+\)')
+CODE_COMPLEXITY = re.compile(r'\b(for|while|if|else|elif|def|class|async|await|try|except)\b')
+
+RU_VOWELS = 'аеёиоуыэюя'
+EN_VOWELS = 'aeiouy'
+
+# Многосложные (сложные) слова - от 3 слогов (SMOG, Gunning Fog)
+POLYSYLLABLE_MIN = 3
+
+# Редкие слова - встречаются один раз и длиннее 8 символов
+RARE_WORD_MIN_LENGTH = 9
+
+
+def syllables_vowel_groups(word: str) -> int:
+    """Слоги - группы подряд идущих гласных (calculate_difficulty)"""
+    syllables = 0
+    previous_was_vowel = False
+
+    for char in word.lower():
+        is_vowel = char in RU_VOWELS or char in EN_VOWELS
+        if is_vowel and not previous_was_vowel:
+            syllables += 1
+        previous_was_vowel = is_vowel
+
+    return max(1, syllables)
+
+
+def syllables_all_vowels(word: str) -> int:
+    """Слоги - каждая русская и английская гласная (calculate_reading_time)"""
+    return max(1, sum(1 for char in word.lower() if char in RU_VOWELS or char in EN_VOWELS))
+
+
+def syllables_ru_vowels(word: str) -> int:
+    """Слоги - каждая русская гласная (quality_metrics)"""
+    return max(1, sum(1 for char in word.lower() if char in RU_VOWELS))
+
+
+# Способы подсчёта слогов: ключ в stats['syllables'] / stats['polysyllables']
+SYLLABLE_SCHEMES = {
+    'vowel_groups': syllables_vowel_groups,
+    'all_vowels': syllables_all_vowels,
+    'ru_vowels': syllables_ru_vowels,
+}
+
+
+def count_syllables(word: str, scheme: str = 'vowel_groups') -> int:
+    """Количество слогов в слове (минимум 1) выбранным способом"""
+    return SYLLABLE_SCHEMES[scheme](word)
+
+
+def analyze_text(text: str) -> Dict:
+    """Посчитать статистику текста за один проход (без кэша)"""
+    # Весь текст
+    sentences = [s.strip() for s in SENTENCE_SPLIT.split(text) if s.strip()]
+    sentence_tokens = [len(s.split()) for s in sentences]
+    frequencies = Counter(TOKEN_PATTERN.findall(text.lower()))
+
+    words = sum(frequencies.values())
+    characters = 0
+    rare_words = 0
+    syllables = dict.fromkeys(SYLLABLE_SCHEMES, 0)
+    polysyllables = dict.fromkeys(SYLLABLE_SCHEMES, 0)
+
+    for word, count in frequencies.items():
+        characters += len(word) * count
+        if count == 1 and len(word) >= RARE_WORD_MIN_LENGTH:
+            rare_words += 1
+        for scheme, counter in SYLLABLE_SCHEMES.items():
+            word_syllables = counter(word)
+            syllables[scheme] += word_syllables * count
+            if word_syllables >= POLYSYLLABLE_MIN:
+                polysyllables[scheme] += count
+
+    unique_words = len(frequencies)
+
+    # Код
+    code_blocks = FENCED_CODE_BODY.findall(text)
+    fenced = FENCED_CODE.findall(text)
+
+    # Проза: без кода, inline-кода и адресов ссылок; для чтения - ещё без
+    # заголовков и изображений
+    prose = LINK.sub(r'\1', INLINE_CODE.sub('', FENCED_CODE.sub('', text)))
+    prose_sentences = sum(1 for s in SENTENCE_SPLIT.split(prose) if s.strip())
+    prose_frequencies = Counter(TOKEN_PATTERN.findall(prose.lower()))
+
+    reading_text = FENCED_CODE.sub('', HEADER.sub('', text))
+    reading_text = IMAGE.sub('', LINK.sub(r'\1', INLINE_CODE.sub('', reading_text)))
+
+    return {
+        'sentences': len(sentences),
+        'words': words,
+        'all_words': len(ANY_WORD_PATTERN.findall(text)),
+        'unique_words': unique_words,
+        'characters': characters,
+        'syllables': syllables,
+        'polysyllables': polysyllables,
+        'rare_words': rare_words,
+        'lexical_diversity': unique_words / words if words else 0.0,
+        'avg_word_length': characters / words if words else 0.0,
+        'avg_sentence_tokens': sum(sentence_tokens) / len(sentence_tokens) if sentence_tokens else 0.0,
+        'max_sentence_tokens': max(sentence_tokens, default=0),
+        'code_blocks': len(code_blocks),
+        'code_lines': sum(len(code.strip().split('\n')) for code in code_blocks),
+        'code_complexity': sum(len(CODE_COMPLEXITY.findall(code)) for code in code_blocks),
+        'fenced_lines': sum(max(0, len(block.split('\n')) - 2) for block in fenced),
+        'fence_markers': text.count('```'),
+        'prose_sentences': prose_sentences,
+        'prose_words': sum(prose_frequencies.values()),
+        'prose_unique_words': len(prose_frequencies),
+        'reading_words': len(TOKEN_PATTERN.findall(reading_text.lower()))
+    }
+
+
+class TextStatsCache:
+    """Кэш статистики по SHA-1 текста (в памяти и опционально на диске)"""
+
+    VERSION = 2
+    MAX_ENTRIES = 20000
+
+    _instances: Dict[Optional[str], 'TextStatsCache'] = {}
+
+    def __init__(self, root_dir=None, cache_file=".text_stats_cache.json"):
+        self.cache_file = Path(root_dir).resolve() / cache_file if root_dir else None
+        self.entries: Dict[str, Dict] = {}
+        self._used = set()
+        self._dirty = False
+
+        self.load()
+
+    @classmethod
+    def shared(cls, root_dir=None) -> 'TextStatsCache':
+        """Один кэш на корень в пределах процесса (сохраняется при выходе)"""
+        key = str(Path(root_dir).resolve()) if root_dir else None
+        if key not in cls._instances:
+            cache = cls(root_dir)
+            cls._instances[key] = cache
+            if cache.cache_file:
+                atexit.register(cache.save)
+        return cls._instances[key]
+
+    def load(self):
+        if not self.cache_file or not self.cache_file.exists():
+            return
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+
+        if data.get('version') == self.VERSION:
+            self.entries = data.get('entries', {})
+
+    def save(self):
+        """Сохранить кэш (при переполнении остаются записи текущего запуска)"""
+        if not self.cache_file or not self._dirty:
+            return
+
+        if len(self.entries) > self.MAX_ENTRIES:
+            self.entries = {key: value for key, value in self.entries.items() if key in self._used}
+
+        data = {
+            'version': self.VERSION,
+            'updated': datetime.now().isoformat(),
+            'entries': self.entries
+        }
+
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            self._dirty = False
+        except OSError:
+            pass
+
+    def get(self, text: str) -> Dict:
+        """Статистика текста (из кэша или посчитанная заново)"""
+        key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        self._used.add(key)
+
+        stats = self.entries.get(key)
+        if stats is None:
+            stats = analyze_text(text)
+            self.entries[key] = stats
+            self._dirty = True
+
+        return stats
+
+
+def text_stats(text: str, root_dir=None) -> Dict:
+    """Статистика текста через общий кэш процесса"""
+    return TextStatsCache.shared(root_dir).get(text or '')
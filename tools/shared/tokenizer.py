@@ -0,0 +1,90 @@
+"""
+Tokenizer - Общая токенизация русского и английского текста
+
+search_index, advanced_search, auto_tagger, find_related и
+summary_generator раньше каждый вызывали re.findall со строковым
+шаблоном, заново собирали множество стоп-слов и хранили миллионы
+одинаковых строк-токенов. Здесь:
+
+- шаблоны слов скомпилированы один раз (по минимальной длине слова);
+- токены интернируются (sys.intern) - одинаковые слова во всех индексах
+  это один объект, сравнение и хэширование в словарях дешевле;
+- стоп-слова передаются готовым frozenset (инструменты держат их
+  константой модуля);
+- слоги и основы слов считаются по типу слова (а не по каждому
+  вхождению) и кэшируются в ограниченном LRU.
+"""
+
+import re
+import sys
+from functools import lru_cache
+from typing import AbstractSet, List, Optional, Pattern
+
+
+# В русском каждая гласная - отдельный слог, в английском - группа гласных
+RU_VOWELS = frozenset('аеёиоуыэюя')
+EN_VOWELS = frozenset('aeiouy')
+
+# Размер LRU-кэшей по типам слов (словарь базы знаний заметно меньше)
+WORD_CACHE_SIZE = 65536
+
+_intern = sys.intern
+
+
+@lru_cache(maxsize=None)
+def word_pattern(min_length: int = 1) -> Pattern:
+    """Скомпилированный шаблон слова (кириллица и латиница в нижнем регистре)"""
+    if min_length <= 1:
+        return re.compile(r'\b[а-яёa-z]+\b')
+    return re.compile(r'\b[а-яёa-z]{%d,}\b' % min_length)
+
+
+def tokenize(text: str, min_length: int = 1, stop_words: Optional[AbstractSet[str]] = None) -> List[str]:
+    """
+    Разбить текст на интернированные токены в нижнем регистре
+
+    Args:
+        text: исходный текст
+        min_length: минимальная длина слова
+        stop_words: множество исключаемых слов
+    """
+    words = map(_intern, word_pattern(min_length).findall(text.lower()))
+
+    if stop_words:
+        return [w for w in words if w not in stop_words]
+    return list(words)
+
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def count_syllables(word: str) -> int:
+    """Количество слогов в слове (минимум 1)"""
+    count = 0
+    previous_en_vowel = False
+
+    for char in word.lower():
+        if char in RU_VOWELS:
+            count += 1
+            previous_en_vowel = False
+        elif char in EN_VOWELS:
+            if not previous_en_vowel:
+                count += 1
+            previous_en_vowel = True
+        else:
+            previous_en_vowel = False
+
+    return max(1, count)
+
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def stem(word: str) -> str:
+    """Простой стемминг английских окончаний (-ing, -ed, -s, -ly)"""
+    if word.endswith('ing'):
+        return word[:-3]
+    elif word.endswith('ed'):
+        return word[:-2]
+    elif word.endswith('s') and len(word) > 3:
+        return word[:-1]
+    elif word.endswith('ly'):
+        return word[:-2]
+
+    return word
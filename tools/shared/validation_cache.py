@@ -0,0 +1,179 @@
+"""
+Validation Cache - Кэш результатов проверки статей
+
+validate и metadata_validator проверяли каждую статью заново при каждом
+запуске, последовательно. Здесь:
+
+- результат проверки статьи хранится в JSON-кэше по ключу
+  (SHA-1 статьи, версия валидатора, хэш правил): изменились правила или
+  версия - кэш сбрасывается целиком;
+- статья с тем же mtime/size не перечитывается, с другим - сравнивается
+  SHA-1 (touch без изменений не сбрасывает запись);
+- результат может зависеть от других файлов (изображения, цели ссылок) -
+  валидатор передаёт их вместе с результатом, и запись считается
+  устаревшей, если изменилась их сигнатура (существование, mtime, размер);
+- parallel_map - проверка изменённых статей в пуле процессов
+  (как в update_indexes: последовательно для малых объёмов).
+"""
+
+from pathlib import Path
+import os
+import json
+import hashlib
+from datetime import datetime
+from multiprocessing import Pool, cpu_count
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+# Меньше статей - без пула процессов (накладные расходы больше выигрыша)
+PARALLEL_THRESHOLD = 10
+
+
+def file_signature(path) -> Optional[List[int]]:
+    """[mtime_ns, size] файла (None - файла нет)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def file_digest(path) -> Optional[str]:
+    """SHA-1 содержимого файла"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def rules_hash(rules) -> str:
+    """Хэш правил валидатора (схемы, пороги, списки допустимых значений)"""
+    data = json.dumps(rules, sort_keys=True, ensure_ascii=False, default=_plain)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def _plain(value):
+    """Сериализация для хэша: типы - по имени, множества - отсортированными"""
+    if isinstance(value, type):
+        return value.__name__
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+def parallel_map(func: Callable, items: List, workers: Optional[int] = None) -> List:
+    """func для каждого элемента - в пуле процессов, если элементов много"""
+    if workers is None:
+        workers = max(1, cpu_count() - 1)
+
+    if len(items) < PARALLEL_THRESHOLD or workers <= 1:
+        return [func(item) for item in items]
+
+    with Pool(processes=workers) as pool:
+        return pool.map(func, items, chunksize=max(1, len(items) // (workers * 4)))
+
+
+class ValidationCache:
+    """Персистентный кэш результатов проверки по статьям"""
+
+    VERSION = 1
+
+    def __init__(self, root_dir, cache_file: str, validator_version: int, rules):
+        self.root_dir = Path(root_dir).resolve()
+        self.cache_file = self.root_dir / cache_file
+        self.validator_version = validator_version
+        self.rules_hash = rules_hash(rules)
+
+        # article -> {'signature', 'digest', 'depends', 'result'}
+        self.entries: Dict[str, Dict] = {}
+        self._dirty = False
+
+        self.hits = 0
+        self.misses = 0
+
+        self.load()
+
+    # ========================
+    # Persistence
+    # ========================
+
+    def load(self):
+        if not self.cache_file.exists():
+            return
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+
+        if (data.get('version') == self.VERSION
+                and data.get('validator_version') == self.validator_version
+                and data.get('rules_hash') == self.rules_hash):
+            self.entries = data.get('entries', {})
+
+    def save(self):
+        """Сохранить кэш (записи удалённых статей отбрасываются)"""
+        stale = [article for article in self.entries if not (self.root_dir / article).exists()]
+        for article in stale:
+            del self.entries[article]
+
+        if not self._dirty and not stale:
+            return
+
+        data = {
+            'version': self.VERSION,
+            'validator_version': self.validator_version,
+            'rules_hash': self.rules_hash,
+            'updated': datetime.now().isoformat(),
+            'entries': self.entries
+        }
+
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            self._dirty = False
+        except OSError:
+            pass
+
+    # ========================
+    # Lookup
+    # ========================
+
+    def get(self, article: str):
+        """Сохранённый результат, если ни статья, ни её зависимости не менялись"""
+        entry = self.entries.get(article)
+        if entry is None or not self._is_fresh(article, entry):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry['result']
+
+    def _is_fresh(self, article: str, entry: Dict) -> bool:
+        path = self.root_dir / article
+        signature = file_signature(path)
+        if signature is None:
+            return False
+
+        if signature != entry['signature']:
+            if file_digest(path) != entry['digest']:
+                return False
+            entry['signature'] = signature
+            self._dirty = True
+
+        return all(file_signature(dependency) == dependency_signature
+                   for dependency, dependency_signature in entry['depends'].items())
+
+    def put(self, article: str, result, depends: Iterable = ()):
+        """Запомнить результат проверки статьи и сигнатуры файлов, от которых он зависит"""
+        path = self.root_dir / article
+        self.entries[article] = {
+            'signature': file_signature(path),
+            'digest': file_digest(path),
+            'depends': {os.path.abspath(dependency): file_signature(dependency)
+                        for dependency in depends},
+            'result': result
+        }
+        self._dirty = True
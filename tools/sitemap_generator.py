@@ -25,10 +25,11 @@ import urllib.request
 import urllib.parse
 from collections import defaultdict, Counter
 import xml.etree.ElementTree as ET
-import subprocess
 import json
 import time
 
+from shared.git_history import GitHistory
+
 
 class SEOAnalyzer:
     """
@@ -484,33 +485,29 @@ class ChangeDetector:
         self.root_dir = Path(root_dir)
         self.knowledge_dir = self.root_dir / "knowledge"
 
+        # Общая git история (один проход git log вместо вызова на каждый файл)
+        self._git_history = None
+
+    @property
+    def git_history(self):
+        if self._git_history is None:
+            self._git_history = GitHistory.open(self.root_dir)
+        return self._git_history
+
     def get_changed_files_from_git(self, since_days=7):
         """Получить изменённые файлы из git"""
-        try:
-            since_date = (datetime.now() - timedelta(days=since_days)).strftime('%Y-%m-%d')
-
-            # Modified files
-            result = subprocess.run(
-                ['git', 'log', f'--since={since_date}', '--name-only',
-                 '--pretty=format:', '--', 'knowledge/'],
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True
-            )
-
-            if not result.stdout.strip():
-                return set()
-
-            changed_files = set()
-            for line in result.stdout.strip().split('\n'):
-                if line and line.endswith('.md'):
-                    file_path = self.root_dir / line
-                    if file_path.exists():
-                        changed_files.add(str(file_path.relative_to(self.root_dir)))
-
-            return changed_files
-        except:
-            return set()
+        since_date = (datetime.now() - timedelta(days=since_days)).strftime('%Y-%m-%d')
+
+        changed_files = set()
+        for commit in self.git_history.iter_commits(path_prefix='knowledge/'):
+            if commit['date'][:10] < since_date:
+                continue
+            for change in commit['files']:
+                path = change[1]
+                if path.startswith('knowledge/') and path.endswith('.md') and (self.root_dir / path).exists():
+                    changed_files.add(path)
+
+        return changed_files
 
     def get_intelligent_changefreq(self, file_path):
         """
@@ -519,23 +516,17 @@ class ChangeDetector:
         Returns: changefreq (always/hourly/daily/weekly/monthly/yearly/never)
         """
         try:
-            # Получить даты последних коммитов для файла
-            result = subprocess.run(
-                ['git', 'log', '--format=%ai', '--', str(file_path)],
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True
-            )
-
-            if not result.stdout.strip():
+            # Даты коммитов для файла
+            entries = self.git_history.file_history(file_path)
+
+            if not entries:
                 return 'monthly'  # Default
 
             dates = []
-            for line in result.stdout.strip().split('\n'):
+            for entry in entries:
                 try:
-                    date = datetime.strptime(line.split()[0], '%Y-%m-%d')
-                    dates.append(date)
-                except:
+                    dates.append(datetime.strptime(entry['date'][:10], '%Y-%m-%d'))
+                except ValueError:
                     continue
 
             if len(dates) < 2:
@@ -10,11 +10,13 @@ from pathlib import Path
 import yaml
 import re
 from collections import defaultdict, Counter
-import subprocess
 from datetime import datetime, timedelta
 import json
 import math
 
+from shared.git_history import GitHistory
+from shared.text_stats import text_stats
+
 
 class TrendAnalyzer:
     """
@@ -34,34 +36,13 @@ class TrendAnalyzer:
 
     def analyze_git_history(self):
         """Анализировать историю git для трендов"""
-        try:
-            # Получить все коммиты с датами
-            result = subprocess.run(
-                ['git', 'log', '--format=%ai|%an', '--', 'knowledge/'],
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True
-            )
-
-            if not result.stdout.strip():
-                return
-
-            for line in result.stdout.strip().split('\n'):
-                if '|' not in line:
-                    continue
+        history = GitHistory.open(self.root_dir)
 
-                date_str, author = line.split('|', 1)
-                try:
-                    date = datetime.strptime(date_str.split()[0], '%Y-%m-%d')
-                    month_key = date.strftime('%Y-%m')
-                    year_key = date.strftime('%Y')
+        for commit in history.iter_commits(path_prefix='knowledge/'):
+            month_key = commit['date'][:7]
 
-                    self.commits_by_month[month_key] += 1
-                    self.authors_by_month[month_key].add(author.strip())
-                except:
-                    continue
-        except:
-            pass
+            self.commits_by_month[month_key] += 1
+            self.authors_by_month[month_key].add(commit['author'].strip())
 
     def analyze_article_dates(self):
         """Анализировать даты создания статей"""
@@ -358,7 +339,8 @@ class QualityScorer:
             score += 5
 
         # 3. Контент (30 баллов)
-        word_count = len(re.findall(r'\b[а-яёa-z]+\b', content.lower()))
+        stats = text_stats(content, self.root_dir)
+        word_count = stats['words']
 
         # Длина контента
         if word_count >= 1000:
@@ -371,7 +353,7 @@ class QualityScorer:
             score += 2
 
         # Примеры кода
-        code_blocks = len(re.findall(r'```', content)) // 2
+        code_blocks = stats['fence_markers'] // 2
         if code_blocks >= 3:
             score += 10
         elif code_blocks >= 1:
@@ -993,37 +975,15 @@ class StatisticsDashboard:
     def collect_activity_stats(self):
         """Собрать статистику по активности"""
         try:
+            history = GitHistory.open(self.root_dir)
+
             # Коммиты за последние 30 дней
             since_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+            recent_commits = sum(1 for commit in history.commits if commit['date'][:10] >= since_date)
 
-            result = subprocess.run(
-                ['git', 'log', f'--since={since_date}', '--oneline'],
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True
-            )
-
-            recent_commits = len(result.stdout.strip().split('\n')) if result.stdout.strip() else 0
-
-            # Всего коммитов
-            result = subprocess.run(
-                ['git', 'rev-list', '--count', 'HEAD'],
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True
-            )
-
-            total_commits = int(result.stdout.strip()) if result.stdout.strip() else 0
-
-            # Авторы
-            result = subprocess.run(
-                ['git', 'log', '--format=%an'],
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True
-            )
-
-            authors = set(result.stdout.strip().split('\n')) if result.stdout.strip() else set()
+            # Всего коммитов и авторы
+            total_commits = len(history.commits)
+            authors = history.authors()
 
             self.stats['activity'] = {
                 'total_commits': total_commits,
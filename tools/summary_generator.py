@@ -5,6 +5,10 @@ Summary Generator - Продвинутый генератор резюме
 
 Вдохновлено: TextRank, LexRank, LSA
 Методы: TF-IDF, позиционные веса, кластеризация предложений
+
+Сходство предложений считается по разреженной матрице предложение × термин
+(shared.sentence_graph, numpy); статьи обрабатываются в пуле процессов,
+результаты кэшируются по хэшу содержимого в .summaries_cache.json.
 """
 
 from pathlib import Path
@@ -16,6 +20,18 @@ import math
 import argparse
 from typing import Dict, List, Tuple, Set
 import hashlib
+from multiprocessing import Pool, cpu_count
+
+from shared.sentence_graph import NUMPY_AVAILABLE, SentenceMatrix
+from shared.tokenizer import tokenize
+
+# Стоп-слова
+STOP_WORDS = frozenset([
+    'и', 'в', 'на', 'с', 'по', 'для', 'к', 'о', 'от', 'из', 'у', 'за', 'что', 'как',
+    'это', 'все', 'еще', 'уже', 'только', 'такой', 'который', 'этот', 'весь', 'свой',
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had'
+])
 
 
 class SentenceImportanceAnalyzer:
@@ -152,7 +168,7 @@ class SummaryDiversityScorer:
         # Лексическое разнообразие (уникальные слова)
         all_words = []
         for sent in selected_sentences:
-            words = re.findall(r'\b[а-яёa-z]+\b', sent.lower())
+            words = tokenize(sent)
             all_words.extend(words)
 
         lexical_diversity = len(set(all_words)) / len(all_words) if all_words else 0
@@ -177,15 +193,19 @@ class SummaryDiversityScorer:
         if len(sentences) < 2:
             return 0.0
 
+        if NUMPY_AVAILABLE:
+            matrix = SentenceMatrix([tokenize(sentence) for sentence in sentences])
+            return round(matrix.mean_pairwise_jaccard(), 3)
+
         # Сравнить все пары предложений
         total_similarity = 0.0
         pairs = 0
 
         for i in range(len(sentences)):
-            words_i = set(re.findall(r'\b[а-яёa-z]+\b', sentences[i].lower()))
+            words_i = set(tokenize(sentences[i]))
 
             for j in range(i + 1, len(sentences)):
-                words_j = set(re.findall(r'\b[а-яёa-z]+\b', sentences[j].lower()))
+                words_j = set(tokenize(sentences[j]))
 
                 if words_i and words_j:
                     intersection = len(words_i & words_j)
@@ -219,10 +239,16 @@ class TopicModelingSummarizer:
         # Токенизировать предложения
         tokenized = []
         for sentence in sentences:
-            words = re.findall(r'\b[а-яёa-z]{3,}\b', sentence.lower())
-            words = [w for w in words if w not in self.stop_words]
+            words = tokenize(sentence, min_length=3, stop_words=self.stop_words)
             tokenized.append(words)
 
+        if NUMPY_AVAILABLE:
+            topics = defaultdict(list)
+            for i, topic_id in enumerate(SentenceMatrix(tokenized).dominant_topics(num_topics)):
+                if topic_id >= 0:
+                    topics[topic_id].append(sentences[i])
+            return dict(topics)
+
         # Найти самые частые слова (потенциальные темы)
         all_words = []
         for words in tokenized:
@@ -307,8 +333,7 @@ class AbstractiveSummarizer:
         """
         Извлечь ключевые фразы (биграммы и триграммы)
         """
-        words = re.findall(r'\b[а-яёa-z]{3,}\b', text.lower())
-        words = [w for w in words if w not in self.stop_words]
+        words = tokenize(text, min_length=3, stop_words=self.stop_words)
 
         # Биграммы
         bigrams = [f"{words[i]} {words[i+1]}" for i in range(len(words) - 1)]
@@ -387,17 +412,23 @@ class AbstractiveSummarizer:
 class AdvancedSummaryGenerator:
     """Продвинутый генератор резюме"""
 
-    def __init__(self, root_dir="."):
+    CACHE_VERSION = 1
+
+    def __init__(self, root_dir=".", workers=None):
         self.root_dir = Path(root_dir)
         self.knowledge_dir = self.root_dir / "knowledge"
+        self.workers = workers or max(1, cpu_count() - 1)
 
         # Стоп-слова
-        self.stop_words = set([
-            'и', 'в', 'на', 'с', 'по', 'для', 'к', 'о', 'от', 'из', 'у', 'за', 'что', 'как',
-            'это', 'все', 'еще', 'уже', 'только', 'такой', 'который', 'этот', 'весь', 'свой',
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-            'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had'
-        ])
+        self.stop_words = STOP_WORDS
+
+        # Матрица предложений последней статьи (общая для TF-IDF и TextRank)
+        self._matrix_key = None
+        self._matrix = None
+
+        # Кэш результатов: метод -> SHA-1 содержимого статьи -> результат
+        self.cache_file = self.root_dir / ".summaries_cache.json"
+        self.cache = None
 
         # Инициализация новых анализаторов
         self.importance_analyzer = SentenceImportanceAnalyzer(self.stop_words)
@@ -418,8 +449,7 @@ class AdvancedSummaryGenerator:
 
     def tokenize(self, text):
         """Токенизация текста"""
-        words = re.findall(r'\b[а-яёa-z]{3,}\b', text.lower())
-        return [w for w in words if w not in self.stop_words]
+        return tokenize(text, min_length=3, stop_words=self.stop_words)
 
     def split_sentences(self, text):
         """Разбить на предложения"""
@@ -432,8 +462,19 @@ class AdvancedSummaryGenerator:
 
         return sentences
 
+    def _sentence_matrix(self, sentences):
+        """Матрица предложение × термин (строится один раз на статью)"""
+        key = tuple(sentences)
+        if key != self._matrix_key:
+            self._matrix = SentenceMatrix([self.tokenize(s) for s in sentences])
+            self._matrix_key = key
+        return self._matrix
+
     def calculate_tf_idf(self, sentences):
         """Вычислить TF-IDF для предложений"""
+        if NUMPY_AVAILABLE:
+            return list(enumerate(self._sentence_matrix(sentences).tfidf_scores().tolist()))
+
         # Создать словарь слов -> документы
         word_doc_freq = defaultdict(int)
         sentence_words = []
@@ -497,6 +538,9 @@ class AdvancedSummaryGenerator:
         if n == 0:
             return []
 
+        if NUMPY_AVAILABLE:
+            return list(enumerate(self._sentence_matrix(sentences).textrank().tolist()))
+
         # Токенизировать предложения
         tokenized = [self.tokenize(s) for s in sentences]
 
@@ -607,11 +651,86 @@ class AdvancedSummaryGenerator:
             'compression_ratio': round(compression, 3)
         }
 
-    def process_all(self):
-        """Обработать все статьи"""
-        print("📝 Генерация продвинутых резюме...\n")
+    def summarize_article(self, content):
+        """Резюме статьи тремя методами, ключевые слова и метрики"""
+        # Генерировать резюме разными методами
+        summary_combined = self.generate_extractive_summary(content, max_sentences=3, method='combined')
+        summary_textrank = self.generate_extractive_summary(content, max_sentences=3, method='textrank')
+        summary_tfidf = self.generate_extractive_summary(content, max_sentences=3, method='tfidf')
 
-        summaries = []
+        # Ключевые слова
+        keywords = self.extract_keywords(content, num_keywords=10)
+
+        # Метрики качества
+        quality = self.calculate_summary_quality(content, summary_combined)
+
+        return {
+            'summary_combined': summary_combined,
+            'summary_textrank': summary_textrank,
+            'summary_tfidf': summary_tfidf,
+            'keywords': keywords,
+            'quality': quality,
+            'original_length': len(content),
+            'summary_length': len(summary_combined)
+        }
+
+    def load_cache(self):
+        """Загрузить кэш результатов"""
+        self.cache = {}
+        if not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get('version') == self.CACHE_VERSION:
+            self.cache = data.get('methods', {})
+
+    def save_cache(self):
+        """Сохранить кэш"""
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.CACHE_VERSION, 'methods': self.cache}, f, ensure_ascii=False)
+        except OSError:
+            pass
+
+    def _run_articles(self, method, articles):
+        """
+        Применить method (имя метода) к содержимому статей
+
+        Результаты берутся из кэша по SHA-1 содержимого; остальные статьи
+        обрабатываются в пуле процессов (для малых объёмов - последовательно).
+        """
+        if self.cache is None:
+            self.load_cache()
+
+        cached = self.cache.get(method, {})
+        keys = [hashlib.sha1(content.encode('utf-8')).hexdigest() for content in articles]
+        pending = [i for i, key in enumerate(keys) if key not in cached]
+
+        if len(pending) < 10 or self.workers <= 1:
+            computed = [getattr(self, method)(articles[i]) for i in pending]
+        else:
+            with Pool(processes=self.workers, initializer=_init_worker, initargs=(str(self.root_dir),)) as pool:
+                computed = pool.map(_run_worker, [(method, articles[i]) for i in pending], chunksize=4)
+
+        for i, result in zip(pending, computed):
+            cached[keys[i]] = result
+
+        if pending:
+            print(f"   Из кэша: {len(articles) - len(pending)}, обработано: {len(pending)}")
+
+        # Остаются только статьи текущего запуска
+        self.cache[method] = {key: cached[key] for key in keys}
+        if pending or len(cached) != len(self.cache[method]):
+            self.save_cache()
+
+        return [cached[key] for key in keys]
+
+    def collect_articles(self):
+        """Статьи базы знаний: [(path, title, content)]"""
+        articles = []
 
         for md_file in self.knowledge_dir.rglob("*.md"):
             if md_file.name == "INDEX.md":
@@ -623,28 +742,23 @@ class AdvancedSummaryGenerator:
 
             article_path = str(md_file.relative_to(self.root_dir))
             title = frontmatter.get('title', md_file.stem) if frontmatter else md_file.stem
+            articles.append((article_path, title, content))
 
-            # Генерировать резюме разными методами
-            summary_combined = self.generate_extractive_summary(content, max_sentences=3, method='combined')
-            summary_textrank = self.generate_extractive_summary(content, max_sentences=3, method='textrank')
-            summary_tfidf = self.generate_extractive_summary(content, max_sentences=3, method='tfidf')
+        return articles
 
-            # Ключевые слова
-            keywords = self.extract_keywords(content, num_keywords=10)
+    def process_all(self):
+        """Обработать все статьи"""
+        print("📝 Генерация продвинутых резюме...\n")
 
-            # Метрики качества
-            quality = self.calculate_summary_quality(content, summary_combined)
+        articles = self.collect_articles()
+        results = self._run_articles('summarize_article', [content for _, _, content in articles])
 
+        summaries = []
+        for (article_path, title, _), result in zip(articles, results):
             summaries.append({
                 'path': article_path,
                 'title': title,
-                'summary_combined': summary_combined,
-                'summary_textrank': summary_textrank,
-                'summary_tfidf': summary_tfidf,
-                'keywords': keywords,
-                'quality': quality,
-                'original_length': len(content),
-                'summary_length': len(summary_combined)
+                **result
             })
 
         print(f"   Резюме создано для {len(summaries)} статей\n")
@@ -780,24 +894,15 @@ class AdvancedSummaryGenerator:
 
     def analyze_all_with_metrics(self) -> List[Dict]:
         """Анализ всех статей с полными метриками"""
-        results = []
-
         print("\n📊 Комплексный анализ резюме...\n")
 
-        for md_file in self.knowledge_dir.rglob("*.md"):
-            if md_file.name == "INDEX.md":
-                continue
+        articles = self.collect_articles()
 
-            frontmatter, content = self.extract_frontmatter_and_content(md_file)
-            if not content:
-                continue
-
-            article_path = str(md_file.relative_to(self.root_dir))
-            title = frontmatter.get('title', md_file.stem) if frontmatter else md_file.stem
-
-            # Комплексный анализ
-            analysis = self.comprehensive_analysis(content, max_sentences=3)
+        # Комплексный анализ
+        analyses = self._run_articles('comprehensive_analysis', [content for _, _, content in articles])
 
+        results = []
+        for (article_path, title, _), analysis in zip(articles, analyses):
             results.append({
                 'path': article_path,
                 'title': title,
@@ -925,6 +1030,20 @@ class AdvancedSummaryGenerator:
         print(f"✅ HTML экспорт: {output_file}")
 
 
+# Генератор в процессе-воркере пула (создаётся один раз на процесс)
+_worker_generator = None
+
+
+def _init_worker(root_dir):
+    global _worker_generator
+    _worker_generator = AdvancedSummaryGenerator(root_dir, workers=1)
+
+
+def _run_worker(args):
+    method, content = args
+    return getattr(_worker_generator, method)(content)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='📝 Advanced Summary Generator - Продвинутое резюмирование текстов',
@@ -1008,6 +1127,13 @@ def main():
     )
 
     # Специальные опции
+    parser.add_argument(
+        '-p', '--parallel',
+        type=int,
+        metavar='N',
+        help=f'Число процессов (по умолчанию: {max(1, cpu_count() - 1)})'
+    )
+
     parser.add_argument(
         '--all',
         action='store_true',
@@ -1019,7 +1145,7 @@ def main():
     script_dir = Path(__file__).parent
     root_dir = script_dir.parent
 
-    generator = AdvancedSummaryGenerator(root_dir)
+    generator = AdvancedSummaryGenerator(root_dir, workers=args.parallel)
 
     # Обработка --all
     if args.all:
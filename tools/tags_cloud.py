@@ -14,7 +14,9 @@ import json
 import math
 import argparse
 from typing import Dict, List, Tuple, Set
-from itertools import combinations
+
+from shared.cooccurrence import CooccurrenceMatrix
+from shared.fuzzy_match import levenshtein, similar_pairs
 
 
 class TagsCloudGenerator:
@@ -314,25 +316,30 @@ class TagStatisticsAnalyzer:
 
     def __init__(self, tag_stats: Dict):
         self.tag_stats = tag_stats
+        self._co_occurrence = None
 
-    def calculate_co_occurrence(self) -> Dict[Tuple[str, str], int]:
-        """Вычислить совместную встречаемость тегов (co-occurrence matrix)"""
-        co_occurrence = Counter()
+    def co_occurrence_matrix(self) -> CooccurrenceMatrix:
+        """Разреженная матрица совместной встречаемости (строится один раз)"""
+        if self._co_occurrence is None:
+            # Собрать все комбинации тегов из каждой статьи
+            article_tags = defaultdict(set)
 
-        # Собрать все комбинации тегов из каждой статьи
-        article_tags = defaultdict(set)
+            for tag, data in self.tag_stats.items():
+                for article in data['articles']:
+                    article_tags[article['path']].add(tag)
 
-        for tag, data in self.tag_stats.items():
-            for article in data['articles']:
-                article_tags[article['path']].add(tag)
+            self._co_occurrence = CooccurrenceMatrix()
+            for tags in article_tags.values():
+                self._co_occurrence.add_document(sorted(tags))
 
-        # Подсчитать пары
-        for tags in article_tags.values():
-            if len(tags) >= 2:
-                for tag1, tag2 in combinations(sorted(tags), 2):
-                    co_occurrence[(tag1, tag2)] += 1
+        return self._co_occurrence
 
-        return dict(co_occurrence)
+    def calculate_co_occurrence(self) -> Dict[Tuple[str, str], int]:
+        """Вычислить совместную встречаемость тегов (co-occurrence matrix)"""
+        return {
+            tuple(sorted((tag1, tag2))): count
+            for tag1, tag2, count in self.co_occurrence_matrix().pairs()
+        }
 
     def find_tag_clusters(self, min_co_occurrence: int = 2) -> List[Set[str]]:
         """Найти кластеры связанных тегов"""
@@ -422,39 +429,21 @@ class TagNormalizer:
 
         Dynamic Programming: O(m×n)
         """
-        if len(s1) < len(s2):
-            return TagNormalizer.levenshtein_distance(s2, s1)
-
-        if len(s2) == 0:
-            return len(s1)
-
-        previous_row = range(len(s2) + 1)
-
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-
-                current_row.append(min(insertions, deletions, substitutions))
-
-            previous_row = current_row
-
-        return previous_row[-1]
+        return levenshtein(s1, s2)
 
     @staticmethod
     def find_similar_tags(tags: List[str], threshold: int = 2) -> Dict[str, List[str]]:
-        """Найти похожие теги (расстояние Левенштейна <= threshold)"""
+        """
+        Найти похожие теги (расстояние Левенштейна <= threshold)
+
+        Пары ищутся самосоединением по окрестностям удалений (shared.fuzzy_match),
+        порядок результата - как при попарном переборе.
+        """
         similar = defaultdict(list)
 
-        for i, tag1 in enumerate(tags):
-            for tag2 in tags[i + 1:]:
-                dist = TagNormalizer.levenshtein_distance(tag1, tag2)
-                if dist <= threshold:
-                    similar[tag1].append(tag2)
-                    similar[tag2].append(tag1)
+        for i, j, _ in similar_pairs(tags, max_distance=threshold):
+            similar[tags[i]].append(tags[j])
+            similar[tags[j]].append(tags[i])
 
         return dict(similar)
 
@@ -472,18 +461,16 @@ class TagRecommender:
 
         Используется co-occurrence matrix
         """
-        co_occ = self.analyzer.calculate_co_occurrence()
+        co_occ = self.analyzer.co_occurrence_matrix()
 
         recommendations = Counter()
 
         for tag in existing_tags:
             if tag in self.tag_stats:
                 # Найти теги, которые часто встречаются вместе
-                for (tag1, tag2), count in co_occ.items():
-                    if tag1 == tag and tag2 not in existing_tags:
-                        recommendations[tag2] += count
-                    elif tag2 == tag and tag1 not in existing_tags:
-                        recommendations[tag1] += count
+                for other, count in co_occ.related(tag, top_n=None):
+                    if other not in existing_tags:
+                        recommendations[other] += count
 
         # Нормализовать по частоте
         total = sum(recommendations.values())
@@ -37,6 +37,8 @@ from multiprocessing import Pool, cpu_count
 from typing import Dict, List, Set, Tuple, Optional
 import yaml
 
+from shared.link_index import LinkIndex
+
 
 class ChangeTracker:
     """Отслеживание изменений файлов через MD5 + mtime"""
@@ -104,11 +106,14 @@ class ChangeTracker:
 class IndexValidator:
     """Валидация и ремонт индексов"""
 
-    def __init__(self, root_dir: Path):
+    def __init__(self, root_dir: Path, link_index: Optional[LinkIndex] = None):
         self.root_dir = root_dir
         self.errors = []
         self.warnings = []
 
+        # Общий индекс путей и якорей (открывается при первой проверке ссылок)
+        self.link_index = link_index
+
     def validate_frontmatter(self, file_path: Path) -> bool:
         """Проверить корректность frontmatter"""
         try:
@@ -136,24 +141,30 @@ class IndexValidator:
             return False
 
     def validate_links(self, file_path: Path) -> List[str]:
-        """Проверить все ссылки в файле"""
+        """Проверить все ссылки в файле (цели и якоря - по индексу, без чтения файлов)"""
         broken_links = []
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
 
+            if self.link_index is None:
+                self.link_index = LinkIndex.open(self.root_dir)
+            source = str(file_path.relative_to(self.root_dir))
+
             # Найти все markdown-ссылки
             links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', content)
 
             for text, link in links:
                 # Пропустить внешние ссылки
-                if link.startswith(('http://', 'https://', '#')):
+                if link.startswith(('http://', 'https://')):
                     continue
 
-                # Проверить существование файла
-                target = (file_path.parent / link).resolve()
-                if not target.exists():
+                # Проверить существование файла и якоря
+                status = self.link_index.check_link(source, link)['status']
+                if status in ('missing', 'outside'):
                     broken_links.append(f"{file_path}: broken link to {link}")
+                elif status == 'broken_anchor':
+                    broken_links.append(f"{file_path}: broken anchor in {link}")
 
         except Exception as e:
             self.errors.append(f"Error validating links in {file_path}: {e}")
@@ -24,6 +24,8 @@ Usage:
     python3 validate.py --format json       # JSON report
     python3 validate.py --auto-fix          # Show fix suggestions
     python3 validate.py --category computers # Validate specific category
+    python3 validate.py --changed           # Only files changed vs HEAD (pre-commit)
+    python3 validate.py knowledge/a.md      # Only given files
 """
 
 import os
@@ -34,9 +36,14 @@ import argparse
 from pathlib import Path
 from collections import defaultdict
 from datetime import datetime
+from multiprocessing import cpu_count
 from typing import Dict, List, Set, Tuple, Optional
 import yaml
 
+from shared.git_history import changed_files
+from shared.text_stats import text_stats
+from shared.validation_cache import ValidationCache, parallel_map
+
 
 class ValidationIssue:
     """Представление одной проблемы валидации"""
@@ -205,9 +212,9 @@ class ContentQualityChecker:
         # Удалить frontmatter
         content = re.sub(r'^---\s*\n.*?\n---\s*\n', '', content, flags=re.DOTALL)
 
-        # Подсчет слов
-        words = re.findall(r'\b\w+\b', content.lower())
-        word_count = len(words)
+        # Подсчет слов (общая статистика текста)
+        stats = text_stats(content)
+        word_count = stats['all_words']
 
         if word_count < 100:
             issues.append(ValidationIssue(
@@ -221,9 +228,7 @@ class ContentQualityChecker:
             ))
 
         # Подсчет предложений
-        sentences = re.split(r'[.!?]+', content)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        sentence_count = len(sentences)
+        sentence_count = stats['sentences']
 
         if sentence_count == 0:
             issues.append(ValidationIssue(
@@ -232,7 +237,7 @@ class ContentQualityChecker:
             ))
         else:
             # Средняя длина предложения
-            avg_sentence_length = word_count / sentence_count if sentence_count > 0 else 0
+            avg_sentence_length = word_count / sentence_count
 
             if avg_sentence_length > 40:
                 issues.append(ValidationIssue(
@@ -307,8 +312,9 @@ class ImageValidator:
     ALLOWED_FORMATS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg'}
     MAX_SIZE_MB = 5
 
-    def validate_images(self, content: str, file_path: Path) -> List[ValidationIssue]:
-        """Проверка изображений"""
+    def validate_images(self, content: str, file_path: Path,
+                        depends: List[Path] = None) -> List[ValidationIssue]:
+        """Проверка изображений (depends - сюда добавляются проверенные файлы)"""
         issues = []
 
         # Найти все изображения ![alt](path)
@@ -334,6 +340,9 @@ class ImageValidator:
                 else:
                     img_file = file_path.parent / img_path
 
+                if depends is not None:
+                    depends.append(img_file)
+
                 if not img_file.exists():
                     issues.append(ValidationIssue(
                         'high', 'images', f"Image not found: {img_path}",
@@ -394,14 +403,24 @@ class CodeBlockValidator:
         return issues
 
 
+def check_article_worker(args) -> Dict:
+    """Проверка одной статьи в процессе пула (см. check_article)"""
+    root_dir, file_path = args
+    return AdvancedKnowledgeBaseValidator(root_dir).check_article(Path(file_path))
+
+
 class AdvancedKnowledgeBaseValidator:
     """Продвинутый валидатор базы знаний"""
 
-    def __init__(self, root_dir=".", min_severity='info'):
+    # Версия проверок статьи - при изменении логики кэш результатов сбрасывается
+    VERSION = 1
+
+    def __init__(self, root_dir=".", min_severity='info', use_cache=False, workers=None):
         self.root_dir = Path(root_dir)
         self.knowledge_dir = self.root_dir / "knowledge"
         self.min_severity = min_severity
         self.min_severity_level = ValidationIssue.SEVERITY_LEVELS.get(min_severity, 1)
+        self.workers = workers or max(1, cpu_count() - 1)
 
         # Компоненты валидации
         self.schema_validator = FrontmatterSchemaValidator()
@@ -409,12 +428,25 @@ class AdvancedKnowledgeBaseValidator:
         self.image_validator = ImageValidator()
         self.code_validator = CodeBlockValidator()
 
+        # Кэш результатов по статьям (shared/validation_cache.py)
+        self.cache = ValidationCache(self.root_dir, ".validation_cache.json",
+                                     self.VERSION, self.rules()) if use_cache else None
+
         # Результаты
         self.issues: List[ValidationIssue] = []
         self.stats = defaultdict(int)
         self.start_time = None
 
-    def extract_frontmatter(self, file_path: Path) -> Tuple[Optional[Dict], str]:
+    def rules(self) -> Dict:
+        """Правила проверок статьи (входят в ключ кэша)"""
+        return {
+            'schema': FrontmatterSchemaValidator.SCHEMA,
+            'image_formats': ImageValidator.ALLOWED_FORMATS,
+            'image_max_size_mb': ImageValidator.MAX_SIZE_MB,
+            'code_languages': CodeBlockValidator.COMMON_LANGUAGES
+        }
+
+    def extract_frontmatter(self, file_path: Path) -> Tuple[Optional[Dict], str, List[ValidationIssue]]:
         """Извлечь метаданные из frontmatter"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -422,62 +454,81 @@ class AdvancedKnowledgeBaseValidator:
 
             match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
             if not match:
-                return None, content
+                return None, content, []
 
             frontmatter = yaml.safe_load(match.group(1))
-            return frontmatter, content
+            return frontmatter, content, []
         except Exception as e:
-            self.add_issue(ValidationIssue(
+            return None, "", [ValidationIssue(
                 'critical', 'parsing', f"Error reading file: {e}",
                 file_path, "Check file encoding and YAML syntax"
-            ))
-            return None, ""
+            )]
 
     def add_issue(self, issue: ValidationIssue):
         """Добавить проблему (с фильтрацией по severity)"""
         if ValidationIssue.SEVERITY_LEVELS[issue.severity] >= self.min_severity_level:
             self.issues.append(issue)
 
-    def validate_article(self, file_path: Path):
-        """Валидация одной статьи"""
-        self.stats['total_articles'] += 1
+    def check_article(self, file_path: Path) -> Dict:
+        """
+        Все проверки одной статьи без фильтрации по severity
+
+        Returns: {'issues': [[severity, category, message, fix], ...],
+                  'external_links': N, 'depends': [файлы, от которых зависит результат]}
+        """
+        issues = []
+        depends = []
 
         # Извлечь frontmatter и контент
-        frontmatter, content = self.extract_frontmatter(file_path)
+        frontmatter, content, parse_issues = self.extract_frontmatter(file_path)
+        issues.extend(parse_issues)
 
         # 1. Schema validation
-        schema_issues = self.schema_validator.validate(frontmatter, file_path)
-        for issue in schema_issues:
-            self.add_issue(issue)
+        issues.extend(self.schema_validator.validate(frontmatter, file_path))
 
         # 2. Content quality checks
-        quality_issues = self.quality_checker.check_readability(content, file_path)
-        for issue in quality_issues:
-            self.add_issue(issue)
+        issues.extend(self.quality_checker.check_readability(content, file_path))
 
         # 3. SEO validation
-        seo_issues = self.quality_checker.check_seo(frontmatter or {}, content, file_path)
-        for issue in seo_issues:
-            self.add_issue(issue)
+        issues.extend(self.quality_checker.check_seo(frontmatter or {}, content, file_path))
 
         # 4. Image validation
-        image_issues = self.image_validator.validate_images(content, file_path)
-        for issue in image_issues:
-            self.add_issue(issue)
+        issues.extend(self.image_validator.validate_images(content, file_path, depends))
 
         # 5. Code block validation
-        code_issues = self.code_validator.validate_code_blocks(content, file_path)
-        for issue in code_issues:
-            self.add_issue(issue)
+        issues.extend(self.code_validator.validate_code_blocks(content, file_path))
 
         # 6. Link validation
-        self.validate_links(content, file_path)
+        link_issues, external_links = self.validate_links(content, file_path, depends)
+        issues.extend(link_issues)
 
         # 7. File naming
-        self.validate_file_naming(file_path)
+        issues.extend(self.validate_file_naming(file_path))
+
+        return {
+            'issues': [[i.severity, i.category, i.message, i.fix_suggestion] for i in issues],
+            'external_links': external_links,
+            'depends': [str(path) for path in depends]
+        }
+
+    def add_article_result(self, file_path: Path, result: Dict):
+        """Учесть результат проверки статьи в отчёте"""
+        self.stats['total_articles'] += 1
+        self.stats['external_links'] += result['external_links']
+
+        for severity, category, message, fix_suggestion in result['issues']:
+            self.add_issue(ValidationIssue(severity, category, message, file_path, fix_suggestion))
+
+    def validate_article(self, file_path: Path):
+        """Валидация одной статьи"""
+        self.add_article_result(file_path, self.check_article(file_path))
+
+    def validate_links(self, content: str, file_path: Path,
+                       depends: List[Path] = None) -> Tuple[List[ValidationIssue], int]:
+        """Проверка ссылок: (проблемы, количество внешних ссылок)"""
+        issues = []
+        external_links = 0
 
-    def validate_links(self, content: str, file_path: Path):
-        """Проверка ссылок"""
         # Найти все markdown ссылки [text](path)
         links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', content)
 
@@ -488,7 +539,7 @@ class AdvancedKnowledgeBaseValidator:
 
             # Внешние ссылки - просто отметить
             if link_path.startswith(('http://', 'https://')):
-                self.stats['external_links'] += 1
+                external_links += 1
                 continue
 
             # Внутренние ссылки - проверить существование
@@ -498,38 +549,45 @@ class AdvancedKnowledgeBaseValidator:
                 target = file_path.parent / link_path
 
             target = target.resolve()
+            if depends is not None:
+                depends.append(target)
 
             if not target.exists():
-                self.add_issue(ValidationIssue(
+                issues.append(ValidationIssue(
                     'high', 'links', f"Broken link: {link_path}",
                     file_path, f"Create file or fix path: {link_path}"
                 ))
 
-    def validate_file_naming(self, file_path: Path):
+        return issues, external_links
+
+    def validate_file_naming(self, file_path: Path) -> List[ValidationIssue]:
         """Проверка соглашений об именовании"""
+        issues = []
         filename = file_path.name
 
         # Кириллица
         if re.search(r'[а-яА-ЯёЁ]', filename):
-            self.add_issue(ValidationIssue(
+            issues.append(ValidationIssue(
                 'low', 'naming', f"Cyrillic in filename: {filename}",
                 file_path, "Use ASCII characters (transliterate)"
             ))
 
         # Пробелы
         if ' ' in filename:
-            self.add_issue(ValidationIssue(
+            issues.append(ValidationIssue(
                 'low', 'naming', f"Spaces in filename: {filename}",
                 file_path, "Use hyphens instead of spaces"
             ))
 
         # Uppercase (кроме INDEX.md, README.md)
         if filename != filename.lower() and filename not in {'INDEX.md', 'README.md'}:
-            self.add_issue(ValidationIssue(
+            issues.append(ValidationIssue(
                 'info', 'naming', f"Uppercase in filename: {filename}",
                 file_path, "Use lowercase filenames"
             ))
 
+        return issues
+
     def validate_structure(self):
         """Проверка структуры директорий"""
         required_dirs = ['inbox', 'knowledge', 'tools', 'docs']
@@ -544,7 +602,7 @@ class AdvancedKnowledgeBaseValidator:
 
     def scan_and_validate(self, categories: List[str] = None):
         """Сканировать и валидировать статьи"""
-        pattern = "**/*.md"
+        md_files = []
 
         if categories:
             # Валидация только указанных категорий
@@ -557,14 +615,59 @@ class AdvancedKnowledgeBaseValidator:
                     ))
                     continue
 
-                for md_file in category_dir.rglob("*.md"):
-                    if md_file.name != "INDEX.md":
-                        self.validate_article(md_file)
+                md_files.extend(md_file for md_file in category_dir.rglob("*.md")
+                                if md_file.name != "INDEX.md")
         else:
             # Полная валидация
-            for md_file in self.knowledge_dir.rglob("*.md"):
-                if md_file.name != "INDEX.md":
-                    self.validate_article(md_file)
+            md_files.extend(md_file for md_file in self.knowledge_dir.rglob("*.md")
+                            if md_file.name != "INDEX.md")
+
+        self.validate_files(md_files)
+
+    def validate_files(self, md_files: List[Path]):
+        """
+        Валидировать статьи: неизменённые - из кэша, остальные - в пуле процессов
+        """
+        results = {}
+        pending = []
+
+        for md_file in md_files:
+            result = self.cache.get(self.relpath(md_file)) if self.cache else None
+            if result is None:
+                pending.append(md_file)
+            else:
+                results[md_file] = result
+
+        checked = parallel_map(check_article_worker,
+                               [(str(self.root_dir), str(md_file)) for md_file in pending],
+                               self.workers)
+
+        for md_file, result in zip(pending, checked):
+            results[md_file] = result
+            if self.cache:
+                self.cache.put(self.relpath(md_file), result, result.pop('depends'))
+
+        for md_file in md_files:
+            self.add_article_result(md_file, results[md_file])
+
+        self.stats['revalidated'] = len(pending)
+
+        if self.cache:
+            self.cache.save()
+
+    def changed_articles(self) -> Optional[List[Path]]:
+        """Статьи, изменённые относительно HEAD (None - не git-репозиторий)"""
+        changed = changed_files(self.root_dir, 'knowledge')
+        if changed is None:
+            return None
+
+        return [self.root_dir / path for path in changed
+                if path.endswith('.md') and Path(path).name != "INDEX.md"
+                and (self.root_dir / path).exists()]
+
+    def relpath(self, file_path: Path) -> str:
+        """Путь статьи от корня (ключ кэша)"""
+        return str(file_path.resolve().relative_to(self.root_dir.resolve()))
 
     def generate_report_console(self) -> str:
         """Консольный отчёт"""
@@ -577,6 +680,9 @@ class AdvancedKnowledgeBaseValidator:
         report.append("📊 Statistics:")
         report.append(f"   Total articles: {self.stats['total_articles']}")
         report.append(f"   External links: {self.stats.get('external_links', 0)}")
+        if self.cache:
+            revalidated = self.stats.get('revalidated', 0)
+            report.append(f"   Revalidated: {revalidated} (cached: {self.stats['total_articles'] - revalidated})")
 
         # Подсчет по severity
         by_severity = defaultdict(int)
@@ -637,8 +743,9 @@ class AdvancedKnowledgeBaseValidator:
 
         return json.dumps(report, indent=2, ensure_ascii=False)
 
-    def run(self, categories: List[str] = None, output_format='console') -> int:
-        """Запустить валидацию"""
+    def run(self, categories: List[str] = None, output_format='console',
+            files: List[Path] = None) -> int:
+        """Запустить валидацию (files - только указанные статьи)"""
         self.start_time = datetime.now()
 
         print(f"🔍 Starting validation (min severity: {self.min_severity})...\n")
@@ -647,7 +754,10 @@ class AdvancedKnowledgeBaseValidator:
         self.validate_structure()
 
         # Статьи
-        self.scan_and_validate(categories)
+        if files is not None:
+            self.validate_files(files)
+        else:
+            self.scan_and_validate(categories)
 
         # Генерация отчёта
         if output_format == 'json':
@@ -673,9 +783,17 @@ Examples:
   %(prog)s --severity high          # Only high+ severity issues
   %(prog)s --format json            # JSON report
   %(prog)s --category computers     # Validate specific category
+  %(prog)s --changed                # Only files changed vs HEAD (pre-commit)
+  %(prog)s knowledge/a.md           # Only given files
         """
     )
 
+    parser.add_argument(
+        'files',
+        nargs='*',
+        help='Validate only these articles'
+    )
+
     parser.add_argument(
         '-s', '--severity',
         choices=['critical', 'high', 'medium', 'low', 'info'],
@@ -697,6 +815,25 @@ Examples:
         help='Validate specific category (can be repeated)'
     )
 
+    parser.add_argument(
+        '--changed',
+        action='store_true',
+        help='Validate only articles changed vs HEAD (staged, unstaged, untracked)'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Revalidate all articles, ignoring .validation_cache.json'
+    )
+
+    parser.add_argument(
+        '-p', '--parallel',
+        type=int,
+        default=None,
+        help=f'Number of parallel workers (default: {max(1, cpu_count()-1)})'
+    )
+
     args = parser.parse_args()
 
     # Определить корневую директорию
@@ -706,13 +843,25 @@ Examples:
     # Создать validator
     validator = AdvancedKnowledgeBaseValidator(
         root_dir,
-        min_severity=args.severity
+        min_severity=args.severity,
+        use_cache=not args.no_cache,
+        workers=args.parallel
     )
 
+    # Только изменённые или указанные статьи
+    files = None
+    if args.files:
+        files = [Path(f).resolve() for f in args.files if f.endswith('.md')]
+    elif args.changed:
+        files = validator.changed_articles()
+        if files is None:
+            print("⚠️  Not a git repository - validating all articles")
+
     # Запустить
     exit_code = validator.run(
         categories=args.category,
-        output_format=args.format
+        output_format=args.format,
+        files=files
     )
 
     sys.exit(exit_code)
@@ -25,35 +25,41 @@ from collections import defaultdict, Counter
 import json
 import argparse
 import re
-import difflib
+import hashlib
 from typing import List, Dict, Tuple, Optional
 
+from shared.git_history import GitHistory, run_git
+from shared.blob_cache import BlobCache
+from shared.line_diff import PatienceMatcher, unified_diff
+
+
+def split_blob_lines(text: str) -> List[str]:
+    """Строки файла так, как их нумерует git (разделитель - только перевод строки)"""
+    lines = text.split('\n')
+    if lines and lines[-1] == '':
+        lines.pop()
+    return lines
+
 
 class DiffVisualizer:
     """Визуализатор изменений между версиями"""
 
-    def __init__(self, root_dir="."):
+    def __init__(self, root_dir=".", blob_cache=None):
         self.root_dir = Path(root_dir)
 
+        # Содержимое версий - из контентно-адресуемого кэша blob'ов
+        self.blob_cache = blob_cache or BlobCache(root_dir)
+
     def get_file_at_commit(self, file_path: str, commit_hash: str) -> Optional[str]:
         """Получить содержимое файла на определённом коммите"""
-        try:
-            result = subprocess.run(
-                ['git', 'show', f'{commit_hash}:{file_path}'],
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                return result.stdout
-        except:
-            pass
-        return None
+        return self.blob_cache.file_at(commit_hash, Path(file_path).as_posix())
 
     def compare_versions(self, file_path: str, commit1: str, commit2: str) -> Dict:
-        """Сравнить две версии файла"""
-        content1 = self.get_file_at_commit(file_path, commit1)
-        content2 = self.get_file_at_commit(file_path, commit2)
+        """Сравнить две версии файла (patience diff по кэшированным blob'ам)"""
+        path = Path(file_path).as_posix()
+        contents = self.blob_cache.files_at([(commit1, path), (commit2, path)])
+        content1 = contents.get((commit1, path))
+        content2 = contents.get((commit2, path))
 
         if not content1 or not content2:
             return {'error': 'Failed to retrieve file contents'}
@@ -61,7 +67,7 @@ class DiffVisualizer:
         lines1 = content1.splitlines()
         lines2 = content2.splitlines()
 
-        differ = difflib.unified_diff(
+        differ = unified_diff(
             lines1, lines2,
             fromfile=f'{file_path} @ {commit1[:7]}',
             tofile=f'{file_path} @ {commit2[:7]}',
@@ -256,16 +262,102 @@ class ChangelogGenerator:
 
 
 class AnnotationSystem:
-    """Система аннотаций (git blame)"""
+    """
+    Система аннотаций (git blame)
 
-    def __init__(self, root_dir="."):
+    Результат blame кэшируется в .blame_cache.json по (путь, HEAD) вместе
+    с blob id версии. Если HEAD сдвинулся, а файл затронули только новые
+    коммиты линейной истории, аннотации переносятся patience diff'ом по
+    кэшированным blob'ам - git blame заново не запускается.
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, root_dir=".", blob_cache=None, git_history=None):
         self.root_dir = Path(root_dir)
+        self.cache_file = self.root_dir / ".blame_cache.json"
+        self.blob_cache = blob_cache or BlobCache(root_dir)
+        self.git_history = git_history
+
+        # path -> {'head', 'blob', 'lines'}
+        self._cache = None
+
+    def _history(self) -> GitHistory:
+        if self.git_history is None:
+            self.git_history = GitHistory.open(self.root_dir)
+        return self.git_history
+
+    def _load_cache(self) -> Dict:
+        if self._cache is not None:
+            return self._cache
+
+        self._cache = {}
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == self.CACHE_VERSION:
+                    self._cache = data.get('files', {})
+            except (OSError, json.JSONDecodeError):
+                pass
+
+        return self._cache
+
+    def _save_cache(self):
+        data = {
+            'version': self.CACHE_VERSION,
+            'updated': datetime.now().isoformat(),
+            'files': self._cache
+        }
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        except OSError:
+            pass
 
     def annotate_file(self, file_path: str) -> List[Dict]:
         """Аннотировать файл (git blame)"""
+        history = self._history()
+        if not history.available:
+            return self._run_blame(file_path)
+
+        path = history.relpath(file_path)
+        cache = self._load_cache()
+        cached = cache.get(path)
+
+        if cached and cached['head'] == history.head:
+            annotations, blob = cached['lines'], cached['blob']
+        else:
+            advanced = self._advance(path, cached) if cached else None
+
+            if advanced:
+                annotations, blob = advanced
+            else:
+                blob = self.blob_cache.blob_id(history.head, path)
+                if blob is None:
+                    # Файл не в HEAD (новый, неотслеживаемый)
+                    return self._run_blame(file_path)
+                annotations = self._run_blame(path, rev=history.head)
+
+            cache[path] = {'head': history.head, 'blob': blob, 'lines': annotations}
+            self._save_cache()
+
+        # Незакоммиченные правки - blame рабочей копии без кэша
+        if not self._worktree_matches(path, blob):
+            return self._run_blame(file_path)
+
+        return [dict(ann) for ann in annotations]
+
+    def _run_blame(self, file_path, rev: Optional[str] = None) -> List[Dict]:
+        """git blame --line-porcelain (по рабочей копии или по ревизии)"""
+        cmd = ['git', 'blame', '--line-porcelain']
+        if rev:
+            cmd += [rev, '--']
+        cmd.append(str(file_path))
+
         try:
             result = subprocess.run(
-                ['git', 'blame', '--line-porcelain', str(file_path)],
+                cmd,
                 cwd=self.root_dir,
                 capture_output=True,
                 text=True
@@ -294,6 +386,69 @@ class AnnotationSystem:
         except:
             return []
 
+    def _advance(self, path: str, cached: Dict) -> Optional[Tuple[List[Dict], str]]:
+        """
+        Перенести аннотации с cached['head'] на текущий HEAD
+
+        Returns: (аннотации, blob id) или None, если нужен полный git blame
+        """
+        history = self._history()
+        positions = {commit['hash']: i for i, commit in enumerate(history.commits)}
+
+        old_position = positions.get(cached['head'])
+        if old_position is None:
+            return None
+
+        # Изменения в merge-коммитах не видны в истории - только линейный случай
+        merges = run_git(self.root_dir, 'rev-list', '--merges', '--count', f"{cached['head']}..{history.head}")
+        if merges is None or merges.returncode != 0 or merges.stdout.strip() != '0':
+            return None
+
+        newer = [entry for entry in history.file_history(path)
+                 if positions[entry['hash']] < old_position]
+        newer.reverse()
+
+        if any(entry['status'] != 'M' or not entry['blob'] for entry in newer):
+            return None
+
+        blobs = [cached['blob']] + [entry['blob'] for entry in newer]
+        texts = self.blob_cache.read_blobs(blobs)
+        if any(texts[blob] is None for blob in blobs):
+            return None
+
+        annotations = cached['lines']
+        previous = split_blob_lines(texts[cached['blob']])
+        if len(previous) != len(annotations):
+            return None
+
+        for entry in newer:
+            current = split_blob_lines(texts[entry['blob']])
+            date = datetime.fromisoformat(entry['date']).astimezone().strftime('%Y-%m-%d')
+
+            updated = []
+            for tag, i1, i2, j1, j2 in PatienceMatcher(previous, current).get_opcodes():
+                if tag == 'equal':
+                    updated.extend(annotations[i1:i2])
+                elif tag in ('replace', 'insert'):
+                    updated.extend({
+                        'author': entry['author'],
+                        'date': date,
+                        'message': entry['message'],
+                        'content': line
+                    } for line in current[j1:j2])
+
+            annotations, previous = updated, current
+
+        return annotations, blobs[-1]
+
+    def _worktree_matches(self, path: str, blob: str) -> bool:
+        """Совпадает ли рабочая копия с blob (хэш объекта git без вызова git)"""
+        try:
+            data = (self.root_dir / path).read_bytes()
+        except OSError:
+            return False
+        return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest() == blob
+
     def get_hotspots(self, file_path: str) -> Dict:
         """Найти 'горячие точки' - часто изменяемые строки"""
         annotations = self.annotate_file(file_path)
@@ -334,76 +489,52 @@ class VersionHistoryAnalyzer:
             'lines_removed': 0
         })
 
+        # Общая git история (один проход git log для всех статей)
+        self.git_history = None
+
         # Дополнительные компоненты
-        self.diff_visualizer = DiffVisualizer(root_dir)
+        blob_cache = BlobCache(root_dir)
+        self.diff_visualizer = DiffVisualizer(root_dir, blob_cache)
         self.changelog_gen = ChangelogGenerator(root_dir)
-        self.annotator = AnnotationSystem(root_dir)
+        self.annotator = AnnotationSystem(root_dir, blob_cache)
 
     def get_file_history(self, file_path):
-        """Получить историю файла"""
-        try:
-            result = subprocess.run(
-                ['git', 'log', '--follow', '--numstat', '--pretty=format:%H|%an|%ae|%ad|%s', '--date=short', '--', str(file_path)],
-                cwd=self.root_dir,
-                capture_output=True,
-                text=True
-            )
-
-            if result.returncode == 0:
-                return result.stdout
-        except:
-            pass
+        """Получить историю файла (из общей git истории, с учётом переименований)"""
+        if self.git_history is None:
+            self.git_history = GitHistory.open(self.root_dir)
+            self.annotator.git_history = self.git_history
 
-        return None
+        return self.git_history.file_history(file_path, follow=True)
 
-    def parse_file_history(self, log_output, file_path):
-        """Парсинг истории файла"""
-        if not log_output:
+    def parse_file_history(self, entries, file_path):
+        """Заполнить article_history из записей истории (от новых к старым)"""
+        if not entries:
             return
 
-        lines = log_output.split('\n')
-        current_commit = None
-
-        for line in lines:
-            if '|' in line and not line.startswith(('---', '+++')):
-                # Информация о коммите
-                parts = line.split('|')
-                if len(parts) == 5:
-                    current_commit = {
-                        'hash': parts[0],
-                        'author': parts[1],
-                        'email': parts[2],
-                        'date': parts[3],
-                        'message': parts[4],
-                        'added': 0,
-                        'removed': 0
-                    }
-
-                    self.article_history[file_path]['commits'].append(current_commit)
-                    self.article_history[file_path]['authors'].add(parts[1])
-
-                    # Первый и последний коммит
-                    if not self.article_history[file_path]['first_commit']:
-                        self.article_history[file_path]['last_commit'] = parts[3]
-
-                    self.article_history[file_path]['first_commit'] = parts[3]
-
-            elif current_commit and '\t' in line:
-                # Статистика изменений
-                parts = line.split('\t')
-                if len(parts) >= 2:
-                    try:
-                        added = int(parts[0]) if parts[0] != '-' else 0
-                        removed = int(parts[1]) if parts[1] != '-' else 0
-
-                        current_commit['added'] = added
-                        current_commit['removed'] = removed
-
-                        self.article_history[file_path]['lines_added'] += added
-                        self.article_history[file_path]['lines_removed'] += removed
-                        self.article_history[file_path]['total_changes'] += 1
-                    except:
-                        pass
+        history = self.article_history[file_path]
+
+        for entry in entries:
+            date = entry['date'][:10]
+            history['commits'].append({
+                'hash': entry['hash'],
+                'author': entry['author'],
+                'email': entry['email'],
+                'date': date,
+                'message': entry['message'],
+                'added': entry['added'],
+                'removed': entry['removed']
+            })
+            history['authors'].add(entry['author'])
+
+            # Первый и последний коммит
+            if not history['first_commit']:
+                history['last_commit'] = date
+
+            history['first_commit'] = date
+
+            history['lines_added'] += entry['added']
+            history['lines_removed'] += entry['removed']
+            history['total_changes'] += 1
 
     def analyze_all(self):
         """Анализировать все статьи"""
@@ -418,8 +549,8 @@ class VersionHistoryAnalyzer:
             article_path = str(md_file.relative_to(self.root_dir))
             articles.append(article_path)
 
-            log_output = self.get_file_history(md_file)
-            self.parse_file_history(log_output, article_path)
+            entries = self.get_file_history(article_path)
+            self.parse_file_history(entries, article_path)
 
         print(f"   Статей проанализировано: {len(articles)}")
         print(f"   Коммитов найдено: {sum(len(h['commits']) for h in self.article_history.values())}\n")
@@ -28,6 +28,8 @@ import math
 from datetime import datetime
 import argparse
 
+from shared.cooccurrence import CooccurrenceMatrix
+
 
 class AdvancedTagAnalyzer:
     """
@@ -50,7 +52,7 @@ class AdvancedTagAnalyzer:
         # Data structures
         self.articles = []
         self.tag_stats = {}
-        self.co_occurrence = defaultdict(lambda: defaultdict(int))
+        self.co_occurrence = CooccurrenceMatrix()
         self.tag_timeline = defaultdict(list)
 
     def extract_frontmatter(self, file_path):
@@ -201,34 +203,18 @@ class AdvancedTagAnalyzer:
         for article in self.articles:
             tags = [self.normalize_tag(t) for t in article['tags']]
 
-            # Все пары тегов в статье
-            for i, tag1 in enumerate(tags):
-                for tag2 in tags[i+1:]:
-                    # Симметричная матрица
-                    self.co_occurrence[tag1][tag2] += 1
-                    self.co_occurrence[tag2][tag1] += 1
+            # Все пары тегов в статье (симметричная разреженная матрица)
+            self.co_occurrence.add_window(tags)
 
         # Конвертировать в обычный dict для сериализации
-        result = {}
-        for tag1 in self.co_occurrence:
-            result[tag1] = dict(self.co_occurrence[tag1])
-
-        return result
+        return self.co_occurrence.to_dict()
 
     def get_related_tags(self, tag, top_n=5):
         """Получить наиболее связанные теги"""
         normalized = self.normalize_tag(tag)
 
-        if normalized not in self.co_occurrence:
-            return []
-
         # Сортировать по частоте совместной встречаемости
-        related = sorted(
-            self.co_occurrence[normalized].items(),
-            key=lambda x: -x[1]
-        )
-
-        return related[:top_n]
+        return self.co_occurrence.related(normalized, top_n)
 
     # ==================== Tag Lifecycle ====================
 
@@ -447,12 +433,7 @@ class AdvancedTagAnalyzer:
 
         # Co-occurrence
         lines.append("## 🔗 Tag Co-occurrence (Top Pairs)\n\n")
-        all_pairs = []
-        for tag1 in self.co_occurrence:
-            for tag2, count in self.co_occurrence[tag1].items():
-                if tag1 < tag2:  # Avoid duplicates
-                    all_pairs.append((tag1, tag2, count))
-
+        all_pairs = self.co_occurrence.pairs()
         all_pairs.sort(key=lambda x: -x[2])
 
         for tag1, tag2, count in all_pairs[:15]:
@@ -497,7 +478,7 @@ class AdvancedTagAnalyzer:
             'timestamp': datetime.now().isoformat(),
             'statistics': self.generate_statistics(),
             'tag_weights': self.tag_stats,
-            'co_occurrence': {k: dict(v) for k, v in self.co_occurrence.items()},
+            'co_occurrence': self.co_occurrence.to_dict(),
             'lifecycle': self.analyze_tag_lifecycle(),
             'entropy': self.calculate_tag_entropy(),
             'coverage': self.calculate_tag_coverage(),